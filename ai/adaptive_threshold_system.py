@@ -6,13 +6,138 @@
 
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import json
 import os
-from collections import deque
+import bisect
 import statistics
 
+# 임계값 계산에 사용하는 백분위수
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+# 임계값 계산에 필요한 최소 정상 샘플 수
+MIN_SAMPLES = 10
+
+
+class P2QuantileSketch:
+    """
+    확장 P² 스트리밍 분위수 추정기 (Jain & Chlamtac 1985, Raatikainen 1987)
+    
+    분위수 k 개에 대해 마커 2k+3 개(최소/최대, 각 분위수, 그 사이 중간점)의 높이와 위치만 유지하므로
+    메모리는 표본 수와 무관하고 샘플당 갱신은 O(마커 수) 입니다.
+    마커 수 이하의 표본에서는 정렬된 표본 전체로 정확한 백분위수를 반환합니다.
+    """
+    
+    def __init__(self, quantiles):
+        self.quantiles = sorted(quantiles)
+        probs = [0.0]
+        previous = 0.0
+        for q in self.quantiles:
+            probs.extend([(previous + q) / 2, q])
+            previous = q
+        probs.extend([(previous + 1.0) / 2, 1.0])
+        self._probs = probs
+        self._marker = {q: 2 * i + 2 for i, q in enumerate(self.quantiles)}
+        self.count = 0
+        self._heights = []    # 마커 높이 (마커 수만큼 모이기 전에는 정렬된 표본)
+        self._positions = []  # 마커 위치 (1부터 시작하는 순위)
+    
+    def add(self, x: float):
+        m = len(self._probs)
+        self.count += 1
+        h = self._heights
+        if self.count <= m:
+            bisect.insort(h, x)
+            if self.count == m:
+                self._positions = [float(i + 1) for i in range(m)]
+            return
+        
+        n = self._positions
+        # x 가 들어가는 셀 k (h[k] <= x < h[k+1])
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[-1]:
+            h[-1] = x
+            k = m - 2
+        else:
+            k = bisect.bisect_right(h, x) - 1
+        for i in range(k + 1, m):
+            n[i] += 1
+        
+        # 원하는 위치에서 1 이상 벗어난 중간 마커를 포물선(불가 시 선형) 보간으로 이동
+        total = self.count - 1
+        for i in range(1, m - 1):
+            d = 1 + self._probs[i] * total - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = h[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not h[i - 1] < candidate < h[i + 1]:
+                    candidate = h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+                h[i] = candidate
+                n[i] += step
+    
+    def quantile(self, q: float) -> float:
+        """q (0~1, 생성 시 지정한 분위수) 추정값"""
+        if self.count == 0:
+            return 0.0
+        if self.count <= len(self._probs):
+            return float(np.percentile(self._heights, q * 100))
+        return float(self._heights[self._marker[q]])
+    
+    def to_dict(self) -> Dict:
+        return {'quantiles': self.quantiles, 'count': self.count,
+                'heights': list(self._heights), 'positions': list(self._positions)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'P2QuantileSketch':
+        sketch = cls(data['quantiles'])
+        sketch.count = data['count']
+        sketch._heights = list(data['heights'])
+        sketch._positions = list(data['positions'])
+        return sketch
+
+
+class FeatureStreamStats:
+    """특징 하나의 스트리밍 통계: Welford 평균/분산 + P² 백분위수"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = P2QuantileSketch([p / 100 for p in PERCENTILES])
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.sketch.add(value)
+    
+    @property
+    def std(self) -> float:
+        """표본 표준편차 (statistics.stdev 와 같은 n-1 기준)"""
+        return float(np.sqrt(max(self.m2, 0.0) / (self.count - 1))) if self.count > 1 else 0.0
+    
+    def percentiles(self) -> Dict[str, float]:
+        return {f'p{p}': self.sketch.quantile(p / 100) for p in PERCENTILES}
+    
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'sketch': self.sketch.to_dict()}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FeatureStreamStats':
+        stats = cls()
+        stats.count = data['count']
+        stats.mean = data['mean']
+        stats.m2 = data['m2']
+        stats.sketch = P2QuantileSketch.from_dict(data['sketch'])
+        return stats
+
+
 class AdaptiveThresholdSystem:
     def __init__(self, 
                  update_interval_hours: int = 6,
@@ -22,8 +147,9 @@ class AdaptiveThresholdSystem:
         적응형 임계값 시스템 초기화
         
         Args:
-            update_interval_hours: 임계값 업데이트 간격 (시간)
-            history_days: 통계 계산용 히스토리 기간 (일)
+            update_interval_hours: 임계값 업데이트 간격 (시간, 저장 파일 호환용 -
+                                   임계값은 정상 샘플마다 스트리밍 통계로 갱신됨)
+            history_days: 통계 계산용 히스토리 기간 (일, 저장 파일 호환용)
             sensitivity: 민감도 (0.0-1.0, 낮을수록 민감)
         """
         self.update_interval_hours = update_interval_hours
@@ -32,10 +158,9 @@ class AdaptiveThresholdSystem:
         
         # 임계값 저장소
         self.thresholds = {}
-        self.feature_stats = {}
-        
-        # 히스토리 데이터 (시간순 정렬)
-        self.history_data = deque(maxlen=history_days * 24 * 12)  # 5분 간격
+        # 특징별 스트리밍 통계 (정상 샘플 전체, 특징당 메모리 일정)
+        self.feature_stats: Dict[str, FeatureStreamStats] = {}
+        self.sample_count = 0
         
         # 업데이트 시간 추적
         self.last_update = None
@@ -60,89 +185,50 @@ class AdaptiveThresholdSystem:
         
         # 정상 데이터만 통계에 사용
         if not is_anomaly:
-            data_point = {
-                'timestamp': timestamp,
-                'features': features.copy(),
-                'is_anomaly': is_anomaly
-            }
-            self.history_data.append(data_point)
+            for feature_name, value in features.items():
+                stats = self.feature_stats.get(feature_name)
+                if stats is None:
+                    stats = self.feature_stats[feature_name] = FeatureStreamStats()
+                stats.add(float(value))
+            self.sample_count += 1
             
-            # 임계값 업데이트 필요 여부 확인
-            if self._should_update_thresholds():
-                self._update_thresholds()
+            # 스트리밍 통계에서 바로 읽으므로 샘플마다 갱신
+            self._update_thresholds(features.keys())
     
-    def _should_update_thresholds(self) -> bool:
-        """임계값 업데이트 필요 여부 확인"""
-        if self.last_update is None:
-            return True
-        
-        time_since_update = datetime.now() - self.last_update
-        return time_since_update >= timedelta(hours=self.update_interval_hours)
-    
-    def _update_thresholds(self):
-        """임계값 업데이트"""
-        if len(self.history_data) < 10:  # 최소 데이터 필요
+    def _update_thresholds(self, feature_names=None):
+        """임계값 업데이트 (특징당 O(1), 스트리밍 통계에서 읽음)"""
+        if self.sample_count < MIN_SAMPLES:  # 최소 데이터 필요
             return
         
-        print("🔄 임계값 업데이트 중...")
-        
-        # 최근 데이터만 사용 (노이즈 감소)
-        recent_data = list(self.history_data)[-1000:]  # 최근 1000개 샘플
-        
-        # 각 특징별 통계 계산
-        feature_names = list(recent_data[0]['features'].keys())
-        
-        for feature_name in feature_names:
-            values = [d['features'][feature_name] for d in recent_data]
+        now = datetime.now()
+        sensitivity_factor = 1.0 - self.sensitivity
+        for feature_name in (feature_names if feature_names is not None else self.feature_stats.keys()):
+            stats = self.feature_stats[feature_name]
+            mean_val = stats.mean
+            std_val = stats.std
+            percentiles = stats.percentiles()
             
-            if len(values) > 0:
-                # 기본 통계
-                mean_val = statistics.mean(values)
-                std_val = statistics.stdev(values) if len(values) > 1 else 0
-                
-                # 백분위수
-                percentiles = {
-                    'p1': np.percentile(values, 1),
-                    'p5': np.percentile(values, 5),
-                    'p10': np.percentile(values, 10),
-                    'p25': np.percentile(values, 25),
-                    'p50': np.percentile(values, 50),
-                    'p75': np.percentile(values, 75),
-                    'p90': np.percentile(values, 90),
-                    'p95': np.percentile(values, 95),
-                    'p99': np.percentile(values, 99)
-                }
-                
-                # 적응형 임계값 계산
-                # 민감도에 따라 임계값 범위 조정
-                sensitivity_factor = 1.0 - self.sensitivity
-                
-                # 하한선: 하위 5% * 민감도
-                lower_threshold = percentiles['p5'] * sensitivity_factor
-                
-                # 상한선: 상위 95% * (1 + 민감도)
-                upper_threshold = percentiles['p95'] * (1 + sensitivity_factor)
-                
-                # Z-score 기반 임계값 (3시그마 규칙)
-                z_lower = mean_val - (3 * std_val * sensitivity_factor)
-                z_upper = mean_val + (3 * std_val * (1 + sensitivity_factor))
-                
-                # 두 방법의 조합
-                final_lower = min(lower_threshold, z_lower)
-                final_upper = max(upper_threshold, z_upper)
-                
-                self.thresholds[feature_name] = {
-                    'lower': float(final_lower),
-                    'upper': float(final_upper),
-                    'mean': float(mean_val),
-                    'std': float(std_val),
-                    'percentiles': percentiles,
-                    'sample_count': len(values),
-                    'last_updated': datetime.now().isoformat()
-                }
-        
-        self.last_update = datetime.now()
-        print(f"✅ 임계값 업데이트 완료 ({len(feature_names)}개 특징)")
+            # 적응형 임계값 계산
+            # 하한선: 하위 5% * 민감도, 상한선: 상위 95% * (1 + 민감도)
+            lower_threshold = percentiles['p5'] * sensitivity_factor
+            upper_threshold = percentiles['p95'] * (1 + sensitivity_factor)
+            
+            # Z-score 기반 임계값 (3시그마 규칙)
+            z_lower = mean_val - (3 * std_val * sensitivity_factor)
+            z_upper = mean_val + (3 * std_val * (1 + sensitivity_factor))
+            
+            # 두 방법의 조합
+            self.thresholds[feature_name] = {
+                'lower': float(min(lower_threshold, z_lower)),
+                'upper': float(max(upper_threshold, z_upper)),
+                'mean': float(mean_val),
+                'std': float(std_val),
+                'percentiles': percentiles,
+                'sample_count': stats.count,
+                'last_updated': now.isoformat()
+            }
+        
+        self.last_update = now
     
     def get_thresholds(self) -> Dict[str, Dict]:
         """현재 임계값 반환"""
@@ -241,7 +327,7 @@ class AdaptiveThresholdSystem:
         
         # 데이터 품질 지표
         data_quality = {
-            'total_samples': len(self.history_data),
+            'total_samples': self.sample_count,
             'features_with_data': total_features,
             'update_frequency_hours': self.update_interval_hours,
             'sensitivity_level': self.sensitivity
@@ -272,8 +358,7 @@ class AdaptiveThresholdSystem:
             print(f"🎯 민감도 조정: {new_sensitivity}")
             
             # 임계값 재계산
-            if self.history_data:
-                self._update_thresholds()
+            self._update_thresholds()
         else:
             print("❌ 민감도는 0.0-1.0 사이여야 합니다.")
     
@@ -285,6 +370,8 @@ class AdaptiveThresholdSystem:
             'history_days': self.history_days,
             'sensitivity': self.sensitivity,
             'last_update': self.last_update.isoformat() if self.last_update else None,
+            'sample_count': self.sample_count,
+            'feature_state': {name: stats.to_dict() for name, stats in self.feature_stats.items()},
             'saved_at': datetime.now().isoformat()
         }
         
@@ -310,6 +397,12 @@ class AdaptiveThresholdSystem:
         if data['last_update']:
             self.last_update = datetime.fromisoformat(data['last_update'])
         
+        # 스트리밍 통계 복원 (이전 형식 파일에는 없음)
+        self.feature_stats = {
+            name: FeatureStreamStats.from_dict(state) for name, state in data.get('feature_state', {}).items()
+        }
+        self.sample_count = data.get('sample_count', 0)
+        
         print(f"📂 임계값 로드 완료: {filepath}")
         print(f"📊 로드된 특징 수: {len(self.thresholds)}")
 
@@ -139,12 +139,20 @@ class BasicAnomalyDetector:
             print(f"❌ 특징 추출 오류: {e}")
             return {name: 0.0 for name in self.feature_names}
     
-    def train_on_normal_data(self, normal_audio_files: List[str]) -> Dict:
+    def _training_builder(self, n_workers: int = None):
+        """훈련 특징 행렬 빌더 (extract 함수와 같은 특징을 윈도우 묶음 단위로 계산)"""
+        from models.window_feature_builder import WindowFeatureBuilder
+        return WindowFeatureBuilder(self.feature_names, sample_rate=self.sample_rate,
+                                    window_size=self.window_size, n_fft=self.n_fft,
+                                    hop_length=self.hop_length, n_workers=n_workers)
+    
+    def train_on_normal_data(self, normal_audio_files: List[str], n_workers: int = None) -> Dict:
         """
         정상 데이터로 훈련
         
         Args:
             normal_audio_files: 정상 오디오 파일 경로 리스트
+            n_workers: 특징 추출 프로세스 수 (None 이면 CPU 수, 최대 8)
             
         Returns:
             훈련 결과
@@ -152,29 +160,10 @@ class BasicAnomalyDetector:
         print("🎯 정상 데이터로 이상 탐지 모델 훈련 시작")
         print(f"📁 정상 오디오 파일 수: {len(normal_audio_files)}")
         
-        # 정상 데이터 특징 추출
-        normal_features = []
-        processed_files = 0
-        
-        for i, file_path in enumerate(normal_audio_files):
-            try:
-                if i % 10 == 0:
-                    print(f"처리 중: {i+1}/{len(normal_audio_files)}")
-                
-                audio_data, sr = librosa.load(file_path, sr=None)
-                
-                # 청크 단위로 분석
-                chunk_samples = int(self.window_size * sr)
-                for start in range(0, len(audio_data), chunk_samples):
-                    chunk = audio_data[start:start + chunk_samples]
-                    if len(chunk) >= chunk_samples:
-                        features = self.extract_features(chunk, sr)
-                        normal_features.append(list(features.values()))
-                        processed_files += 1
-                        
-            except Exception as e:
-                print(f"❌ 파일 처리 오류 {file_path}: {e}")
-                continue
+        # 정상 데이터 특징 추출 (블록 스트리밍 + 윈도우 벡터화 + 프로세스 풀)
+        builder = self._training_builder(n_workers)
+        normal_features = builder.build(normal_audio_files)
+        processed_files = len(normal_features)
         
         if len(normal_features) < 10:
             raise ValueError("충분한 정상 데이터가 없습니다. 최소 10개 샘플 필요")
@@ -182,7 +171,7 @@ class BasicAnomalyDetector:
         print(f"✅ 처리된 샘플 수: {len(normal_features)}")
         
         # 특징 정규화
-        X_normal = np.array(normal_features)
+        X_normal = normal_features
         X_scaled = self.scaler.fit_transform(X_normal)
         
         # PCA로 차원 축소 (노이즈 감소)
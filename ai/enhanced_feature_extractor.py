@@ -8,13 +8,110 @@ import numpy as np
 import librosa
 from scipy import signal
 from scipy.stats import skew, kurtosis
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# 특징 벡터 스키마 (extract_batch 열 순서, extract_comprehensive_features 키 순서)
+FEATURE_NAMES = (
+    'rms_energy', 'mean_amplitude', 'std_amplitude', 'max_amplitude', 'min_amplitude',
+    'skewness', 'kurtosis', 'zero_crossing_rate', 'energy_ratio', 'dynamic_range',
+    'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth', 'spectral_flatness',
+    'bearing_band_1_energy_ratio', 'bearing_band_2_energy_ratio',
+    'bearing_band_3_energy_ratio', 'bearing_band_4_energy_ratio',
+    'energy_variance', 'energy_change_rate', 'autocorr_peak', 'autocorr_ratio',
+    'bearing_energy_ratio', 'bearing_energy_concentration', 'bearing_peak_prominence',
+    'compressor_energy_ratio', 'compressor_harmonic_ratio', 'compressor_periodicity',
+    'mfcc_mean', 'mfcc_std', 'mfcc_delta_mean', 'mfcc_delta_std',
+    'mel_spectral_centroid', 'mel_spectral_contrast',
+    'chroma_mean', 'chroma_std'
+)
+
+# librosa 특징 함수 기본 n_fft (스펙트럼 특징/크로마)
+SPECTRAL_N_FFT = 2048
+MFCC_TOP_DB = 80.0
+
+
+class FeaturePlan:
+    """
+    컴파일된 특징 계산 계획
+    
+    요청한 특징에 필요한 특징 그룹과 공유 중간 결과(FFT 크기, 멜 스펙트로그램, 프레임 RMS,
+    오토코릴레이션 등)를 의존성 순서로 정리해 두고, 같은 길이 클립 묶음 (클립 수, 샘플 수)에 대해
+    중간 결과를 한 번씩만 계산합니다.
+    """
+    
+    def __init__(self, extractor: 'EnhancedFeatureExtractor', feature_names: Sequence[str],
+                 intermediates: List[str], groups: List[str]):
+        self.extractor = extractor
+        self.feature_names = tuple(feature_names)
+        self.intermediates = intermediates
+        self.groups = groups
+        self._columns = {name: i for i, name in enumerate(self.feature_names)}
+    
+    def evaluate(self, clips: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            clips: (클립 수, 샘플 수) 또는 (샘플 수,) 오디오
+            
+        Returns:
+            (클립 수, 특징 수) float32 행렬 (열 순서는 feature_names)
+        """
+        clips = np.atleast_2d(np.asarray(clips))
+        if not np.issubdtype(clips.dtype, np.floating):
+            clips = clips.astype(np.float32)
+        
+        ctx = {'signal': clips}
+        for name in self.intermediates:
+            ctx[name] = self.extractor._intermediate(name, ctx)
+        
+        out = np.zeros((len(clips), len(self.feature_names)), dtype=np.float32)
+        for group in self.groups:
+            for name, values in self.extractor._group(group, ctx).items():
+                column = self._columns.get(name)
+                if column is not None:
+                    out[:, column] = values
+        return out
+
+
 class EnhancedFeatureExtractor:
     """향상된 오디오 특징 추출기"""
     
+    # 공유 중간 결과: 이름 → 의존하는 중간 결과 ('signal' 은 입력 클립)
+    INTERMEDIATES = {
+        'abs': ('signal',),
+        'stft_mag': ('signal',),          # n_fft=1024 STFT 크기 (대역 에너지, 피크, 멜)
+        'spec_mag': ('signal',),          # n_fft=2048 STFT 크기 (librosa 스펙트럼 특징/크로마 기본값)
+        'stft_total': ('stft_mag',),
+        'bearing_band_energy': ('stft_mag',),
+        'compressor_band_energy': ('stft_mag',),
+        'mel_power': ('stft_mag',),
+        'frame_rms': ('signal',),
+        'autocorr': ('signal',),
+    }
+    
+    # 특징 그룹: 이름 → (출력 특징, 의존하는 중간 결과)
+    FEATURE_GROUPS = {
+        'statistical': (('rms_energy', 'mean_amplitude', 'std_amplitude', 'max_amplitude', 'min_amplitude',
+                         'skewness', 'kurtosis', 'energy_ratio', 'dynamic_range'), ('abs',)),
+        'zero_crossing': (('zero_crossing_rate',), ()),
+        'spectral': (('spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth', 'spectral_flatness'),
+                     ('spec_mag',)),
+        'bearing_bands': (('bearing_band_1_energy_ratio', 'bearing_band_2_energy_ratio',
+                           'bearing_band_3_energy_ratio', 'bearing_band_4_energy_ratio',
+                           'bearing_energy_ratio', 'bearing_energy_concentration'),
+                          ('bearing_band_energy', 'stft_total')),
+        'bearing_peak': (('bearing_peak_prominence',), ('stft_mag',)),
+        'energy_dynamics': (('energy_variance', 'energy_change_rate'), ('frame_rms',)),
+        'autocorr': (('autocorr_peak', 'autocorr_ratio'), ('autocorr',)),
+        'compressor_bands': (('compressor_energy_ratio', 'compressor_harmonic_ratio'),
+                             ('compressor_band_energy', 'stft_total')),
+        'periodicity': (('compressor_periodicity',), ('autocorr',)),
+        'mfcc': (('mfcc_mean', 'mfcc_std', 'mfcc_delta_mean', 'mfcc_delta_std'), ('mel_power',)),
+        'mel': (('mel_spectral_centroid', 'mel_spectral_contrast'), ('mel_power',)),
+        'chroma': (('chroma_mean', 'chroma_std'), ('spec_mag',)),
+    }
+    
     def __init__(self, sample_rate: int = 16000):
         self.sample_rate = sample_rate
         self.n_fft = 1024
@@ -36,231 +133,227 @@ class EnhancedFeatureExtractor:
             (1000, 1500),  # 압축기 고조파
             (1500, 2500)   # 압축기 노이즈
         ]
+        
+        self.feature_names = FEATURE_NAMES
+        self._plans: Dict[Tuple[str, ...], FeaturePlan] = {}
+    
+    # ------------------------------------------------------------------
+    # 계획 컴파일
+    # ------------------------------------------------------------------
+    def compile_plan(self, feature_names: Sequence[str] = FEATURE_NAMES) -> FeaturePlan:
+        """요청한 특징에 필요한 특징 그룹과 중간 결과를 의존성 순서로 정리 (결과는 캐시)"""
+        key = tuple(feature_names)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        
+        owner = {name: group for group, (names, _) in self.FEATURE_GROUPS.items() for name in names}
+        unknown = [name for name in key if name not in owner]
+        if unknown:
+            raise ValueError(f"알 수 없는 특징: {unknown}")
+        
+        groups = list(dict.fromkeys(owner[name] for name in key))
+        intermediates: List[str] = []
+        
+        def visit(name: str):
+            if name == 'signal' or name in intermediates:
+                return
+            for dependency in self.INTERMEDIATES[name]:
+                visit(dependency)
+            intermediates.append(name)
+        
+        for group in groups:
+            for dependency in self.FEATURE_GROUPS[group][1]:
+                visit(dependency)
+        
+        plan = FeaturePlan(self, key, intermediates, groups)
+        self._plans[key] = plan
+        return plan
+    
+    def extract_batch(self, clips: np.ndarray, feature_names: Sequence[str] = FEATURE_NAMES) -> np.ndarray:
+        """같은 길이 클립 묶음 (클립 수, 샘플 수) → (클립 수, 특징 수) float32 특징 행렬"""
+        return self.compile_plan(feature_names).evaluate(clips)
     
     def extract_comprehensive_features(self, audio_data: np.ndarray) -> Dict[str, float]:
         """종합적인 특징 추출"""
         try:
-            features = {}
-            
-            # 1. 기본 통계 특징
-            features.update(self._extract_statistical_features(audio_data))
-            
-            # 2. 주파수 도메인 특징
-            features.update(self._extract_frequency_features(audio_data))
-            
-            # 3. 시간 도메인 특징
-            features.update(self._extract_temporal_features(audio_data))
-            
-            # 4. 베어링 마모 특화 특징
-            features.update(self._extract_bearing_features(audio_data))
-            
-            # 5. 압축기 특화 특징
-            features.update(self._extract_compressor_features(audio_data))
-            
-            # 6. 고급 신호 처리 특징
-            features.update(self._extract_advanced_features(audio_data))
-            
-            return features
+            vector = self.extract_batch(audio_data)[0]
+            return {name: float(value) for name, value in zip(self.feature_names, vector)}
             
         except Exception as e:
             print(f"특징 추출 오류: {e}")
             return self._get_default_features()
     
-    def _extract_statistical_features(self, audio_data: np.ndarray) -> Dict[str, float]:
-        """통계적 특징 추출"""
-        features = {}
-        
-        # 기본 통계
-        features['rms_energy'] = np.sqrt(np.mean(audio_data ** 2))
-        features['mean_amplitude'] = np.mean(np.abs(audio_data))
-        features['std_amplitude'] = np.std(audio_data)
-        features['max_amplitude'] = np.max(np.abs(audio_data))
-        features['min_amplitude'] = np.min(np.abs(audio_data))
-        
-        # 고급 통계
-        features['skewness'] = skew(audio_data)
-        features['kurtosis'] = kurtosis(audio_data)
-        features['zero_crossing_rate'] = np.mean(librosa.feature.zero_crossing_rate(audio_data))
-        
+    # ------------------------------------------------------------------
+    # 공유 중간 결과
+    # ------------------------------------------------------------------
+    def _intermediate(self, name: str, ctx: Dict[str, np.ndarray]) -> np.ndarray:
+        y = ctx['signal']
+        if name == 'abs':
+            return np.abs(y)
+        if name == 'stft_mag':
+            return np.abs(librosa.stft(y, n_fft=self.n_fft, hop_length=self.hop_length))
+        if name == 'spec_mag':
+            return np.abs(librosa.stft(y, n_fft=SPECTRAL_N_FFT, hop_length=self.hop_length))
+        if name == 'stft_total':
+            return ctx['stft_mag'].sum(axis=(1, 2))
+        if name == 'bearing_band_energy':
+            return self._band_energies(ctx['stft_mag'], self.bearing_freq_bands)
+        if name == 'compressor_band_energy':
+            return self._band_energies(ctx['stft_mag'], self.compressor_freq_bands)
+        if name == 'mel_power':
+            return librosa.feature.melspectrogram(S=ctx['stft_mag'] ** 2, sr=self.sample_rate, n_mels=128)
+        if name == 'frame_rms':
+            return librosa.feature.rms(y=y, frame_length=1024, hop_length=512)[:, 0, :]
+        if name == 'autocorr':
+            # np.correlate(y, y, 'full') 의 0 이상 지연 부분을 FFT 로 계산 (O(n log n))
+            n = y.shape[-1]
+            spectrum = np.fft.rfft(y, n=2 * n, axis=-1)
+            return np.fft.irfft(np.abs(spectrum) ** 2, n=2 * n, axis=-1)[:, :n]
+        raise KeyError(name)
+    
+    def _band_energies(self, magnitude: np.ndarray, bands: List[Tuple[int, int]]) -> np.ndarray:
+        """(클립 수, 대역 수) 대역별 STFT 크기 합"""
+        frequencies = librosa.fft_frequencies(sr=self.sample_rate, n_fft=self.n_fft)
+        per_bin = magnitude.sum(axis=2)
+        return np.stack([
+            per_bin[:, (frequencies >= low) & (frequencies <= high)].sum(axis=1) for low, high in bands
+        ], axis=1)
+    
+    # ------------------------------------------------------------------
+    # 특징 그룹
+    # ------------------------------------------------------------------
+    def _group(self, group: str, ctx: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        return getattr(self, f'_features_{group}')(ctx)
+    
+    def _features_statistical(self, ctx) -> Dict[str, np.ndarray]:
+        """통계적 특징"""
+        y = ctx['signal']
+        magnitude = ctx['abs']
+        features = {
+            'rms_energy': np.sqrt(np.mean(y ** 2, axis=1)),
+            'mean_amplitude': np.mean(magnitude, axis=1),
+            'std_amplitude': np.std(y, axis=1),
+            'max_amplitude': np.max(magnitude, axis=1),
+            'min_amplitude': np.min(magnitude, axis=1),
+            'skewness': skew(y, axis=1),
+            'kurtosis': kurtosis(y, axis=1),
+        }
         # 에너지 분포
         features['energy_ratio'] = features['rms_energy'] / (features['max_amplitude'] + 1e-8)
         features['dynamic_range'] = features['max_amplitude'] - features['min_amplitude']
-        
         return features
     
-    def _extract_frequency_features(self, audio_data: np.ndarray) -> Dict[str, float]:
-        """주파수 도메인 특징 추출"""
-        features = {}
-        
-        # STFT 계산
-        stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
-        magnitude = np.abs(stft)
-        frequencies = librosa.fft_frequencies(sr=self.sample_rate, n_fft=self.n_fft)
-        
-        # 스펙트럼 중심
-        features['spectral_centroid'] = np.mean(librosa.feature.spectral_centroid(
-            y=audio_data, sr=self.sample_rate, hop_length=self.hop_length
-        ))
-        
-        # 스펙트럼 롤오프
-        features['spectral_rolloff'] = np.mean(librosa.feature.spectral_rolloff(
-            y=audio_data, sr=self.sample_rate, hop_length=self.hop_length
-        ))
-        
-        # 스펙트럼 대역폭
-        features['spectral_bandwidth'] = np.mean(librosa.feature.spectral_bandwidth(
-            y=audio_data, sr=self.sample_rate, hop_length=self.hop_length
-        ))
-        
-        # 스펙트럼 평탄도
-        features['spectral_flatness'] = np.mean(librosa.feature.spectral_flatness(
-            y=audio_data, hop_length=self.hop_length
-        ))
-        
-        # 주파수 대역별 에너지 비율
-        total_energy = np.sum(magnitude)
-        for i, (low, high) in enumerate(self.bearing_freq_bands):
-            freq_mask = (frequencies >= low) & (frequencies <= high)
-            band_energy = np.sum(magnitude[freq_mask, :])
-            features[f'bearing_band_{i+1}_energy_ratio'] = band_energy / (total_energy + 1e-8)
-        
-        return features
+    def _features_zero_crossing(self, ctx) -> Dict[str, np.ndarray]:
+        zcr = librosa.feature.zero_crossing_rate(ctx['signal'])
+        return {'zero_crossing_rate': zcr.reshape(len(zcr), -1).mean(axis=1)}
     
-    def _extract_temporal_features(self, audio_data: np.ndarray) -> Dict[str, float]:
-        """시간 도메인 특징 추출"""
-        features = {}
+    def _features_spectral(self, ctx) -> Dict[str, np.ndarray]:
+        """주파수 도메인 특징 (librosa 기본 n_fft=2048 스펙트로그램 공유)"""
+        S = ctx['spec_mag']
         
-        # 에너지 변화율
-        frame_length = 1024
-        hop_length = 512
-        energy_frames = librosa.feature.rms(
-            y=audio_data, frame_length=frame_length, hop_length=hop_length
-        )[0]
+        def frame_mean(values):
+            return values.reshape(len(values), -1).mean(axis=1)
         
-        if len(energy_frames) > 1:
-            features['energy_variance'] = np.var(energy_frames)
-            features['energy_change_rate'] = np.mean(np.abs(np.diff(energy_frames)))
-        else:
-            features['energy_variance'] = 0.0
-            features['energy_change_rate'] = 0.0
-        
-        # 오토코릴레이션 특징
-        autocorr = np.correlate(audio_data, audio_data, mode='full')
-        autocorr = autocorr[autocorr.size // 2:]
-        if len(autocorr) > 1:
-            features['autocorr_peak'] = np.max(autocorr[1:]) / (autocorr[0] + 1e-8)
-            features['autocorr_ratio'] = features['autocorr_peak']
-        else:
-            features['autocorr_peak'] = 0.0
-            features['autocorr_ratio'] = 0.0
-        
-        return features
+        return {
+            'spectral_centroid': frame_mean(librosa.feature.spectral_centroid(S=S, sr=self.sample_rate)),
+            'spectral_rolloff': frame_mean(librosa.feature.spectral_rolloff(S=S, sr=self.sample_rate)),
+            'spectral_bandwidth': frame_mean(librosa.feature.spectral_bandwidth(S=S, sr=self.sample_rate)),
+            'spectral_flatness': frame_mean(librosa.feature.spectral_flatness(S=S)),
+        }
     
-    def _extract_bearing_features(self, audio_data: np.ndarray) -> Dict[str, float]:
-        """베어링 마모 특화 특징"""
-        features = {}
-        
-        # 베어링 마모는 특정 주파수 대역에서의 에너지 집중을 보임
-        stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
-        magnitude = np.abs(stft)
-        frequencies = librosa.fft_frequencies(sr=self.sample_rate, n_fft=self.n_fft)
-        
-        # 베어링 마모 주파수 대역별 분석
-        bearing_energies = []
-        for low, high in self.bearing_freq_bands:
-            freq_mask = (frequencies >= low) & (frequencies <= high)
-            band_energy = np.sum(magnitude[freq_mask, :])
-            bearing_energies.append(band_energy)
-        
-        total_energy = np.sum(magnitude)
-        if total_energy > 0:
-            features['bearing_energy_ratio'] = sum(bearing_energies) / total_energy
-            features['bearing_energy_concentration'] = np.max(bearing_energies) / (sum(bearing_energies) + 1e-8)
-        else:
-            features['bearing_energy_ratio'] = 0.0
-            features['bearing_energy_concentration'] = 0.0
-        
-        # 베어링 마모 패턴 감지 (주파수 도메인에서의 피크)
-        features['bearing_peak_prominence'] = self._calculate_peak_prominence(magnitude, frequencies)
-        
+    def _features_bearing_bands(self, ctx) -> Dict[str, np.ndarray]:
+        """베어링 대역 에너지 비율 (베어링 마모는 특정 주파수 대역에서의 에너지 집중을 보임)"""
+        energies = ctx['bearing_band_energy']
+        total = ctx['stft_total']
+        features = {
+            f'bearing_band_{i + 1}_energy_ratio': energies[:, i] / (total + 1e-8)
+            for i in range(energies.shape[1])
+        }
+        band_sum = energies.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features['bearing_energy_ratio'] = np.where(total > 0, band_sum / total, 0.0)
+        features['bearing_energy_concentration'] = np.where(
+            total > 0, energies.max(axis=1) / (band_sum + 1e-8), 0.0
+        )
         return features
     
-    def _extract_compressor_features(self, audio_data: np.ndarray) -> Dict[str, float]:
-        """압축기 특화 특징"""
-        features = {}
-        
-        # 압축기 주파수 대역 분석
-        stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
-        magnitude = np.abs(stft)
-        frequencies = librosa.fft_frequencies(sr=self.sample_rate, n_fft=self.n_fft)
-        
-        compressor_energies = []
-        for low, high in self.compressor_freq_bands:
-            freq_mask = (frequencies >= low) & (frequencies <= high)
-            band_energy = np.sum(magnitude[freq_mask, :])
-            compressor_energies.append(band_energy)
-        
-        total_energy = np.sum(magnitude)
-        if total_energy > 0:
-            features['compressor_energy_ratio'] = sum(compressor_energies) / total_energy
-            features['compressor_harmonic_ratio'] = compressor_energies[1] / (compressor_energies[0] + 1e-8)
+    def _features_bearing_peak(self, ctx) -> Dict[str, np.ndarray]:
+        """베어링 마모 패턴 감지 (주파수 도메인에서의 피크)"""
+        freq_energy = ctx['stft_mag'].mean(axis=2)
+        return {'bearing_peak_prominence': np.array([self._calculate_peak_prominence(row) for row in freq_energy])}
+    
+    def _features_energy_dynamics(self, ctx) -> Dict[str, np.ndarray]:
+        """에너지 변화율"""
+        energy_frames = ctx['frame_rms']
+        if energy_frames.shape[1] > 1:
+            return {
+                'energy_variance': np.var(energy_frames, axis=1),
+                'energy_change_rate': np.mean(np.abs(np.diff(energy_frames, axis=1)), axis=1),
+            }
+        zeros = np.zeros(len(energy_frames))
+        return {'energy_variance': zeros, 'energy_change_rate': zeros}
+    
+    def _features_autocorr(self, ctx) -> Dict[str, np.ndarray]:
+        """오토코릴레이션 특징"""
+        autocorr = ctx['autocorr']
+        if autocorr.shape[1] > 1:
+            peak = np.max(autocorr[:, 1:], axis=1) / (autocorr[:, 0] + 1e-8)
         else:
-            features['compressor_energy_ratio'] = 0.0
-            features['compressor_harmonic_ratio'] = 0.0
-        
-        # 압축기 작동 패턴 (주기성)
-        features['compressor_periodicity'] = self._calculate_periodicity(audio_data)
-        
-        return features
+            peak = np.zeros(len(autocorr))
+        return {'autocorr_peak': peak, 'autocorr_ratio': peak}
     
-    def _extract_advanced_features(self, audio_data: np.ndarray) -> Dict[str, float]:
-        """고급 신호 처리 특징"""
-        features = {}
-        
-        # MFCC 특징 (더 많은 계수)
-        mfccs = librosa.feature.mfcc(
-            y=audio_data, sr=self.sample_rate, n_mfcc=20, 
-            n_fft=self.n_fft, hop_length=self.hop_length
-        )
-        
-        # MFCC 통계
-        features['mfcc_mean'] = np.mean(mfccs)
-        features['mfcc_std'] = np.std(mfccs)
-        features['mfcc_delta_mean'] = np.mean(np.diff(mfccs, axis=1))
-        features['mfcc_delta_std'] = np.std(np.diff(mfccs, axis=1))
-        
-        # 멜 스펙트로그램 특징
-        mel_spec = librosa.feature.melspectrogram(
-            y=audio_data, sr=self.sample_rate, n_fft=self.n_fft, 
-            hop_length=self.hop_length, n_mels=128
-        )
-        mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-        
-        features['mel_spectral_centroid'] = np.mean(librosa.feature.spectral_centroid(
-            S=mel_spec, sr=self.sample_rate, hop_length=self.hop_length
-        ))
-        features['mel_spectral_contrast'] = np.mean(librosa.feature.spectral_contrast(
-            S=mel_spec, sr=self.sample_rate, hop_length=self.hop_length
-        ))
-        
-        # 크로마 특징 (음악적 특성)
-        chroma = librosa.feature.chroma_stft(
-            y=audio_data, sr=self.sample_rate, hop_length=self.hop_length
-        )
-        features['chroma_mean'] = np.mean(chroma)
-        features['chroma_std'] = np.std(chroma)
-        
-        return features
+    def _features_compressor_bands(self, ctx) -> Dict[str, np.ndarray]:
+        """압축기 주파수 대역 분석"""
+        energies = ctx['compressor_band_energy']
+        total = ctx['stft_total']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(total > 0, energies.sum(axis=1) / total, 0.0)
+        harmonic = np.where(total > 0, energies[:, 1] / (energies[:, 0] + 1e-8), 0.0)
+        return {'compressor_energy_ratio': ratio, 'compressor_harmonic_ratio': harmonic}
+    
+    def _features_periodicity(self, ctx) -> Dict[str, np.ndarray]:
+        """압축기 작동 패턴 (주기성)"""
+        return {'compressor_periodicity': np.array([self._calculate_periodicity(row) for row in ctx['autocorr']])}
+    
+    def _features_mfcc(self, ctx) -> Dict[str, np.ndarray]:
+        """MFCC 특징 (20 계수)"""
+        mel_db = librosa.power_to_db(ctx['mel_power'], top_db=None)
+        # top_db 는 클립마다 그 클립의 최대값 기준으로 적용
+        mel_db = np.maximum(mel_db, mel_db.max(axis=(1, 2), keepdims=True) - MFCC_TOP_DB)
+        mfccs = librosa.feature.mfcc(S=mel_db, n_mfcc=20)
+        deltas = np.diff(mfccs, axis=2)
+        return {
+            'mfcc_mean': mfccs.mean(axis=(1, 2)),
+            'mfcc_std': mfccs.std(axis=(1, 2)),
+            'mfcc_delta_mean': deltas.mean(axis=(1, 2)),
+            'mfcc_delta_std': deltas.std(axis=(1, 2)),
+        }
+    
+    def _features_mel(self, ctx) -> Dict[str, np.ndarray]:
+        """멜 스펙트로그램 특징"""
+        mel_spec = ctx['mel_power']
+        centroid = librosa.feature.spectral_centroid(S=mel_spec, sr=self.sample_rate)
+        # contrast 내부의 power_to_db top_db 가 배열 전체 최대값 기준이므로 클립별로 계산
+        contrast = [np.mean(librosa.feature.spectral_contrast(S=clip, sr=self.sample_rate)) for clip in mel_spec]
+        return {
+            'mel_spectral_centroid': centroid.reshape(len(centroid), -1).mean(axis=1),
+            'mel_spectral_contrast': np.array(contrast),
+        }
     
-    def _calculate_peak_prominence(self, magnitude: np.ndarray, frequencies: np.ndarray) -> float:
-        """피크 돌출도 계산"""
+    def _features_chroma(self, ctx) -> Dict[str, np.ndarray]:
+        """크로마 특징 (튜닝 추정이 입력 전체 기준이므로 클립별로 계산)"""
+        chroma = [librosa.feature.chroma_stft(S=clip ** 2, sr=self.sample_rate) for clip in ctx['spec_mag']]
+        return {
+            'chroma_mean': np.array([np.mean(c) for c in chroma]),
+            'chroma_std': np.array([np.std(c) for c in chroma]),
+        }
+    
+    def _calculate_peak_prominence(self, freq_energy: np.ndarray) -> float:
+        """피크 돌출도 계산 (주파수별 평균 에너지)"""
         try:
-            # 주파수별 평균 에너지
-            freq_energy = np.mean(magnitude, axis=1)
-            
             # 피크 찾기
-            from scipy.signal import find_peaks
-            peaks, properties = find_peaks(freq_energy, prominence=0.1)
+            peaks, properties = signal.find_peaks(freq_energy, prominence=0.1)
             
             if len(peaks) > 0:
                 # 가장 큰 피크의 돌출도
@@ -271,13 +364,9 @@ class EnhancedFeatureExtractor:
         except:
             return 0.0
     
-    def _calculate_periodicity(self, audio_data: np.ndarray) -> float:
-        """주기성 계산"""
+    def _calculate_periodicity(self, autocorr: np.ndarray) -> float:
+        """주기성 계산 (0 이상 지연 오토코릴레이션)"""
         try:
-            # 오토코릴레이션을 통한 주기성 측정
-            autocorr = np.correlate(audio_data, audio_data, mode='full')
-            autocorr = autocorr[autocorr.size // 2:]
-            
             # 첫 번째 피크 이후의 피크들 찾기
             if len(autocorr) > 10:
                 # 첫 번째 피크 제외하고 나머지 피크들 찾기
@@ -294,36 +383,7 @@ class EnhancedFeatureExtractor:
     
     def _get_default_features(self) -> Dict[str, float]:
         """기본 특징값 반환 (오류 시)"""
-        return {
-            'rms_energy': 0.0,
-            'mean_amplitude': 0.0,
-            'std_amplitude': 0.0,
-            'max_amplitude': 0.0,
-            'min_amplitude': 0.0,
-            'skewness': 0.0,
-            'kurtosis': 0.0,
-            'zero_crossing_rate': 0.0,
-            'energy_ratio': 0.0,
-            'dynamic_range': 0.0,
-            'spectral_centroid': 0.0,
-            'spectral_rolloff': 0.0,
-            'spectral_bandwidth': 0.0,
-            'spectral_flatness': 0.0,
-            'bearing_energy_ratio': 0.0,
-            'bearing_energy_concentration': 0.0,
-            'bearing_peak_prominence': 0.0,
-            'compressor_energy_ratio': 0.0,
-            'compressor_harmonic_ratio': 0.0,
-            'compressor_periodicity': 0.0,
-            'mfcc_mean': 0.0,
-            'mfcc_std': 0.0,
-            'mfcc_delta_mean': 0.0,
-            'mfcc_delta_std': 0.0,
-            'mel_spectral_centroid': 0.0,
-            'mel_spectral_contrast': 0.0,
-            'chroma_mean': 0.0,
-            'chroma_std': 0.0
-        }
+        return dict.fromkeys(self.feature_names, 0.0)
 
 # 사용 예제
 if __name__ == "__main__":
@@ -99,6 +99,7 @@ class IntegratedAISystem:
             # 3. 온라인 학습 시스템 초기화
             print("3️⃣ 온라인 학습 시스템 초기화 중...")
             self._initialize_online_learning(normal_audio_files)
+            self.online_learner.wait_for_model_update()
             
             self.is_initialized = True
             
@@ -8,7 +8,7 @@ import numpy as np
 import joblib
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Sequence
 import json
 from collections import deque
 from sklearn.ensemble import IsolationForest
@@ -17,12 +17,97 @@ from sklearn.decomposition import PCA
 import threading
 import time
 
+class ClassStatistics:
+    """
+    한 클래스(정상/이상)의 열 단위 온라인 통계
+    
+    특징 열마다 Welford 개수/평균/M2 배열을 유지하고 배치 단위로 병합(Chan 병렬 알고리즘)하며,
+    최근 값 목록 대신 크기가 고정된 저장소 표본(reservoir sampling, Algorithm R)을 둡니다.
+    결측/비유한 값(NaN)은 해당 열의 통계에서 제외됩니다.
+    """
+    
+    def __init__(self, n_features: int, reservoir_size: int, seed: int = 42):
+        self.count = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features, dtype=np.float64)
+        self.m2 = np.zeros(n_features, dtype=np.float64)
+        self.reservoir = np.empty((reservoir_size, n_features), dtype=np.float64)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+    
+    def update(self, X: np.ndarray):
+        """(샘플 수, 특징 수) 배치 병합"""
+        mask = np.isfinite(X)
+        values = np.where(mask, X, 0.0)
+        batch_count = mask.sum(axis=0)
+        batch_mean = values.sum(axis=0) / np.maximum(batch_count, 1)
+        batch_m2 = (((values - batch_mean) * mask) ** 2).sum(axis=0)
+        
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        safe_total = np.maximum(total, 1)
+        self.mean += delta * batch_count / safe_total
+        self.m2 += batch_m2 + delta ** 2 * self.count * batch_count / safe_total
+        self.count = total
+        self._update_reservoir(X)
+    
+    def _update_reservoir(self, X: np.ndarray):
+        capacity = len(self.reservoir)
+        if capacity == 0:
+            return
+        for row in X:
+            if self.seen < capacity:
+                self.reservoir[self.seen] = row
+            else:
+                j = self._rng.integers(0, self.seen + 1)
+                if j < capacity:
+                    self.reservoir[j] = row
+            self.seen += 1
+    
+    @property
+    def std(self) -> np.ndarray:
+        """모표준편차 (기존 이동 통계와 같은 n 기준)"""
+        return np.sqrt(np.maximum(self.m2, 0.0) / np.maximum(self.count, 1))
+    
+    @property
+    def samples(self) -> np.ndarray:
+        """저장소 표본 (최대 reservoir_size 행)"""
+        return self.reservoir[:min(self.seen, len(self.reservoir))]
+    
+    def to_dict(self, feature_names: Sequence[str]) -> Dict[str, Dict]:
+        """특징 이름별 {count, mean, std} (기존 normal_stats/anomaly_stats 형식)"""
+        std = self.std
+        return {
+            name: {'count': int(self.count[i]), 'mean': float(self.mean[i]), 'std': float(std[i])}
+            for i, name in enumerate(feature_names) if self.count[i] > 0
+        }
+    
+    def get_state(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'samples': self.samples.copy(), 'seen': self.seen}
+    
+    def set_state(self, state: Dict):
+        self.count = np.asarray(state['count'], dtype=np.int64).copy()
+        self.mean = np.asarray(state['mean'], dtype=np.float64).copy()
+        self.m2 = np.asarray(state['m2'], dtype=np.float64).copy()
+        samples = np.asarray(state['samples'])[:len(self.reservoir)]
+        self.reservoir[:len(samples)] = samples
+        self.seen = max(int(state['seen']), len(samples))
+
+
 class OnlineLearningSystem:
+    # 클래스별 저장소 표본 크기 (기존 최근 값 목록 상한과 동일)
+    NORMAL_RESERVOIR_SIZE = 5000
+    ANOMALY_RESERVOIR_SIZE = 1000
+    # 모델 업데이트 최소 샘플 수
+    MIN_UPDATE_SAMPLES = 50
+    MIN_NORMAL_SAMPLES = 10
+    
     def __init__(self, 
                  model_save_path: str = "data/models/",
                  learning_rate: float = 0.01,
                  memory_size: int = 10000,
-                 update_frequency: int = 100):
+                 update_frequency: int = 100,
+                 feature_names: Optional[Sequence[str]] = None):
         """
         온라인 학습 시스템 초기화
         
@@ -31,6 +116,7 @@ class OnlineLearningSystem:
             learning_rate: 학습률
             memory_size: 메모리에 유지할 샘플 수
             update_frequency: 모델 업데이트 주기 (샘플 수)
+            feature_names: 특징 열 순서 (None 이면 첫 샘플의 키 순서로 고정)
         """
         self.model_save_path = model_save_path
         os.makedirs(model_save_path, exist_ok=True)
@@ -39,33 +125,85 @@ class OnlineLearningSystem:
         self.memory_size = memory_size
         self.update_frequency = update_frequency
         
-        # 학습 데이터 버퍼
-        self.feature_buffer = deque(maxlen=memory_size)
-        self.label_buffer = deque(maxlen=memory_size)
+        # 특징 스키마 (특징 이름 → 열 인덱스)
+        self.feature_names: List[str] = []
+        self.feature_index: Dict[str, int] = {}
+        
+        # 학습 데이터 버퍼 (고정 크기 원형 배열, 스키마 확정 시 할당)
+        self._feature_ring = None
+        self._label_ring = np.zeros(memory_size, dtype=bool)
+        self._ring_pos = 0
+        self._ring_size = 0
         self.timestamp_buffer = deque(maxlen=memory_size)
         
-        # 모델들
+        # 모델들 (백그라운드 업데이트 후 한 번에 교체)
         self.isolation_forest = None
         self.scaler = StandardScaler()
         self.pca = None
         
-        # 통계 정보
-        self.normal_stats = {}
-        self.anomaly_stats = {}
+        # 통계 정보 (클래스별 열 단위 통계)
+        self._normal = None
+        self._anomaly = None
         
         # 학습 상태
         self.is_learning = False
         self.total_samples = 0
         self.last_update = None
         
-        # 스레드 안전을 위한 락
+        # 스레드 안전을 위한 락 (버퍼/통계/모델 참조 보호, 모델 학습은 락 밖에서 수행)
         self.lock = threading.Lock()
         
+        # 백그라운드 모델 업데이트
+        self._update_requested = threading.Event()
+        self._update_idle = threading.Event()
+        self._update_idle.set()
+        self._update_thread = None
+        
+        if feature_names is not None:
+            self._set_schema(list(feature_names))
+        
         print(f"🧠 온라인 학습 시스템 초기화")
         print(f"📚 학습률: {learning_rate}")
         print(f"💾 메모리 크기: {memory_size}")
         print(f"🔄 업데이트 주기: {update_frequency}샘플")
     
+    # ------------------------------------------------------------------
+    # 특징 스키마
+    # ------------------------------------------------------------------
+    def _set_schema(self, feature_names: List[str]):
+        """특징 열 순서 확정 및 버퍼/통계 배열 할당"""
+        self.feature_names = feature_names
+        self.feature_index = {name: i for i, name in enumerate(feature_names)}
+        n_features = len(feature_names)
+        self._feature_ring = np.zeros((self.memory_size, n_features), dtype=np.float64)
+        self._ring_pos = 0
+        self._ring_size = 0
+        self._normal = ClassStatistics(n_features, self.NORMAL_RESERVOIR_SIZE)
+        self._anomaly = ClassStatistics(n_features, self.ANOMALY_RESERVOIR_SIZE, seed=43)
+    
+    def _to_vector(self, features: Dict[str, float]) -> np.ndarray:
+        """특징 딕셔너리 → 스키마 순서 벡터 (없는 특징은 NaN, 스키마 밖 특징은 무시)"""
+        vector = np.full(len(self.feature_names), np.nan)
+        index = self.feature_index
+        for name, value in features.items():
+            i = index.get(name)
+            if i is not None:
+                vector[i] = value
+        return vector
+    
+    @property
+    def normal_stats(self) -> Dict[str, Dict]:
+        """정상 클래스 특징별 통계 {count, mean, std}"""
+        return self._normal.to_dict(self.feature_names) if self._normal is not None else {}
+    
+    @property
+    def anomaly_stats(self) -> Dict[str, Dict]:
+        """이상 클래스 특징별 통계 {count, mean, std}"""
+        return self._anomaly.to_dict(self.feature_names) if self._anomaly is not None else {}
+    
+    # ------------------------------------------------------------------
+    # 학습
+    # ------------------------------------------------------------------
     def add_sample(self, features: Dict[str, float], 
                   is_anomaly: bool, 
                   confidence: float = 1.0,
@@ -79,129 +217,129 @@ class OnlineLearningSystem:
             confidence: 신뢰도 (0.0-1.0)
             timestamp: 시간
         """
-        if timestamp is None:
-            timestamp = datetime.now()
+        with self.lock:
+            if not self.feature_names:
+                self._set_schema(list(features.keys()))
+            vector = self._to_vector(features)
+        self.partial_fit(vector[np.newaxis, :], np.array([bool(is_anomaly)]),
+                         timestamps=[timestamp or datetime.now()])
+    
+    def partial_fit(self, X: np.ndarray, y: np.ndarray, timestamps: Optional[List[datetime]] = None):
+        """
+        샘플 배치 반영 (통계 병합 + 버퍼 기록, 업데이트 주기를 넘으면 백그라운드 모델 업데이트 요청)
+        
+        Args:
+            X: (샘플 수, 특징 수) 스키마 순서 특징 행렬 (결측은 NaN)
+            y: (샘플 수,) 이상 여부
+            timestamps: 샘플 시간 (기본값: 현재 시간)
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        y = np.asarray(y, dtype=bool).reshape(-1)
+        if timestamps is None:
+            timestamps = [datetime.now()] * len(X)
         
         with self.lock:
-            # 특징 벡터로 변환
-            feature_vector = np.array(list(features.values()))
-            
-            # 버퍼에 추가
-            self.feature_buffer.append(feature_vector)
-            self.label_buffer.append(is_anomaly)
-            self.timestamp_buffer.append(timestamp)
+            if self._feature_ring is None:
+                raise ValueError("특징 스키마가 정해지지 않았습니다 (feature_names 지정 또는 add_sample 필요)")
             
-            self.total_samples += 1
+            # 원형 버퍼 기록 (memory_size 보다 큰 배치는 마지막 부분만 남음)
+            positions = (self._ring_pos + np.arange(len(X))) % self.memory_size
+            self._feature_ring[positions] = X
+            self._label_ring[positions] = y
+            self._ring_pos = int((self._ring_pos + len(X)) % self.memory_size)
+            self._ring_size = min(self._ring_size + len(X), self.memory_size)
+            self.timestamp_buffer.extend(timestamps)
             
             # 통계 업데이트
-            self._update_statistics(feature_vector, is_anomaly, confidence)
+            self._update_statistics(X, y)
             
             # 주기적 모델 업데이트
-            if self.total_samples % self.update_frequency == 0:
+            previous = self.total_samples
+            self.total_samples += len(X)
+            if self.total_samples // self.update_frequency > previous // self.update_frequency:
                 self._trigger_model_update()
     
-    def _update_statistics(self, features: np.ndarray, 
-                          is_anomaly: bool, confidence: float):
-        """통계 정보 업데이트"""
-        feature_names = list(self._get_default_features().keys())
-        
-        for i, feature_name in enumerate(feature_names):
-            if i < len(features):
-                value = features[i]
-                
-                if is_anomaly:
-                    if feature_name not in self.anomaly_stats:
-                        self.anomaly_stats[feature_name] = {
-                            'values': [],
-                            'count': 0,
-                            'mean': 0,
-                            'std': 0
-                        }
-                    
-                    stats = self.anomaly_stats[feature_name]
-                    stats['values'].append(value)
-                    stats['count'] += 1
-                    
-                    # 이동 평균으로 통계 업데이트
-                    if stats['count'] == 1:
-                        stats['mean'] = value
-                        stats['std'] = 0
-                    else:
-                        old_mean = stats['mean']
-                        stats['mean'] = old_mean + (value - old_mean) / stats['count']
-                        stats['std'] = np.sqrt(
-                            (stats['std']**2 * (stats['count']-1) + (value - stats['mean'])**2) / stats['count']
-                        )
-                    
-                    # 최근 1000개만 유지
-                    if len(stats['values']) > 1000:
-                        stats['values'] = stats['values'][-1000:]
-                else:
-                    if feature_name not in self.normal_stats:
-                        self.normal_stats[feature_name] = {
-                            'values': [],
-                            'count': 0,
-                            'mean': 0,
-                            'std': 0
-                        }
-                    
-                    stats = self.normal_stats[feature_name]
-                    stats['values'].append(value)
-                    stats['count'] += 1
-                    
-                    # 이동 평균으로 통계 업데이트
-                    if stats['count'] == 1:
-                        stats['mean'] = value
-                        stats['std'] = 0
-                    else:
-                        old_mean = stats['mean']
-                        stats['mean'] = old_mean + (value - old_mean) / stats['count']
-                        stats['std'] = np.sqrt(
-                            (stats['std']**2 * (stats['count']-1) + (value - stats['mean'])**2) / stats['count']
-                        )
-                    
-                    # 최근 5000개만 유지
-                    if len(stats['values']) > 5000:
-                        stats['values'] = stats['values'][-5000:]
+    def _update_statistics(self, X: np.ndarray, y: np.ndarray):
+        """클래스별 통계 정보 업데이트 (열 단위 벡터 연산)"""
+        if y.all():
+            self._anomaly.update(X)
+        elif not y.any():
+            self._normal.update(X)
+        else:
+            self._anomaly.update(X[y])
+            self._normal.update(X[~y])
     
     def _trigger_model_update(self):
-        """모델 업데이트 트리거"""
-        if len(self.feature_buffer) < 50:  # 최소 샘플 수
+        """모델 업데이트 트리거 (락 안에서 호출, 백그라운드 스레드에 요청만 전달)"""
+        if self._ring_size < self.MIN_UPDATE_SAMPLES:  # 최소 샘플 수
             return
         
-        print(f"🔄 모델 업데이트 시작 (샘플 수: {len(self.feature_buffer)})")
+        self._update_idle.clear()
+        self._update_requested.set()
+        if self._update_thread is None or not self._update_thread.is_alive():
+            self._update_thread = threading.Thread(target=self._update_loop, daemon=True)
+            self._update_thread.start()
+    
+    def _update_loop(self):
+        """백그라운드 모델 업데이트 스레드 (진행 중 들어온 요청은 다음 한 번으로 합침)"""
+        while True:
+            self._update_requested.wait()
+            self._update_requested.clear()
+            
+            with self.lock:
+                if self._ring_size == 0:
+                    X = y = None
+                else:
+                    X = self._feature_ring[:self._ring_size].copy()
+                    y = self._label_ring[:self._ring_size].copy()
+                    fill = np.where(self._normal.count > 0, self._normal.mean, 0.0)
+            
+            if X is not None:
+                self.is_learning = True
+                try:
+                    self._fit_models(np.where(np.isfinite(X), X, fill), y)
+                finally:
+                    self.is_learning = False
+            
+            with self.lock:
+                if not self._update_requested.is_set():
+                    self._update_idle.set()
+    
+    def _fit_models(self, X: np.ndarray, y: np.ndarray):
+        """버퍼 스냅샷으로 새 모델을 학습한 뒤 락 안에서 교체"""
+        print(f"🔄 모델 업데이트 시작 (샘플 수: {len(X)})")
         
         try:
-            # 데이터 준비
-            X = np.array(list(self.feature_buffer))
-            y = np.array(list(self.label_buffer))
-            
             # 정상 데이터만 사용 (이상 탐지 모델)
-            normal_mask = ~y
-            X_normal = X[normal_mask]
+            X_normal = X[~y]
             
-            if len(X_normal) < 10:
+            if len(X_normal) < self.MIN_NORMAL_SAMPLES:
                 print("❌ 정상 데이터가 부족하여 모델 업데이트 건너뜀")
                 return
             
             # 정규화
-            X_scaled = self.scaler.fit_transform(X_normal)
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X_normal)
             
             # PCA 차원 축소
-            n_components = min(10, X_scaled.shape[1])
-            self.pca = PCA(n_components=n_components, random_state=42)
-            X_pca = self.pca.fit_transform(X_scaled)
+            n_components = min(10, X_scaled.shape[1], X_scaled.shape[0])
+            pca = PCA(n_components=n_components, random_state=42)
+            X_pca = pca.fit_transform(X_scaled)
             
             # Isolation Forest 업데이트
             contamination = min(0.1, max(0.01, np.sum(y) / len(y)))
-            self.isolation_forest = IsolationForest(
+            isolation_forest = IsolationForest(
                 contamination=contamination,
                 random_state=42,
                 n_estimators=100
             )
-            self.isolation_forest.fit(X_pca)
+            isolation_forest.fit(X_pca)
             
-            self.last_update = datetime.now()
+            with self.lock:
+                self.scaler = scaler
+                self.pca = pca
+                self.isolation_forest = isolation_forest
+                self.last_update = datetime.now()
             print(f"✅ 모델 업데이트 완료 (오염률: {contamination:.3f})")
             
             # 모델 저장
@@ -210,6 +348,13 @@ class OnlineLearningSystem:
         except Exception as e:
             print(f"❌ 모델 업데이트 오류: {e}")
     
+    def wait_for_model_update(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 백그라운드 모델 업데이트 완료 대기 (완료되면 True)"""
+        return self._update_idle.wait(timeout)
+    
+    # ------------------------------------------------------------------
+    # 예측
+    # ------------------------------------------------------------------
     def predict(self, features: Dict[str, float]) -> Dict:
         """
         이상 탐지 예측
@@ -220,7 +365,20 @@ class OnlineLearningSystem:
         Returns:
             예측 결과
         """
-        if self.isolation_forest is None:
+        with self.lock:
+            isolation_forest = self.isolation_forest
+            scaler = self.scaler
+            pca = self.pca
+            if isolation_forest is not None:
+                feature_vector = self._to_vector(features)
+                # 없는 특징은 정상 평균으로 채움
+                fill = self._normal.mean if self._normal is not None else 0.0
+                feature_vector = np.where(np.isfinite(feature_vector), feature_vector, fill)
+                statistical_anomaly = self._check_statistical_anomaly(feature_vector)
+                model_samples = self._ring_size
+                last_update = self.last_update
+        
+        if isolation_forest is None:
             return {
                 'is_anomaly': False,
                 'confidence': 0.0,
@@ -229,25 +387,19 @@ class OnlineLearningSystem:
             }
         
         try:
-            # 특징 벡터 변환
-            feature_vector = np.array(list(features.values())).reshape(1, -1)
-            
             # 정규화 및 PCA 변환
-            X_scaled = self.scaler.transform(feature_vector)
-            X_pca = self.pca.transform(X_scaled)
+            X_scaled = scaler.transform(feature_vector.reshape(1, -1))
+            X_pca = pca.transform(X_scaled)
             
             # 이상 탐지
-            anomaly_score = self.isolation_forest.score_samples(X_pca)[0]
+            anomaly_score = isolation_forest.score_samples(X_pca)[0]
             is_anomaly = anomaly_score < 0  # 음수면 이상
             
             # 신뢰도 계산
             confidence = min(1.0, max(0.0, abs(anomaly_score)))
             
-            # 통계 기반 추가 검증
-            statistical_anomaly = self._check_statistical_anomaly(features)
-            
-            # 최종 판정
-            final_anomaly = is_anomaly or statistical_anomaly
+            # 최종 판정 (통계 기반 추가 검증 포함)
+            final_anomaly = bool(is_anomaly or statistical_anomaly)
             
             message = self._get_anomaly_message(final_anomaly, confidence, statistical_anomaly)
             
@@ -257,8 +409,8 @@ class OnlineLearningSystem:
                 'message': message,
                 'anomaly_score': float(anomaly_score),
                 'statistical_anomaly': statistical_anomaly,
-                'model_samples': len(self.feature_buffer),
-                'last_update': self.last_update.isoformat() if self.last_update else None
+                'model_samples': model_samples,
+                'last_update': last_update.isoformat() if last_update else None
             }
             
         except Exception as e:
@@ -270,26 +422,23 @@ class OnlineLearningSystem:
                 'anomaly_score': 0.0
             }
     
-    def _check_statistical_anomaly(self, features: Dict[str, float]) -> bool:
-        """통계 기반 이상 검사"""
-        if not self.normal_stats:
+    def _check_statistical_anomaly(self, feature_vector: np.ndarray) -> bool:
+        """통계 기반 이상 검사 (스키마 순서 벡터, 락 안에서 호출)"""
+        if self._normal is None:
             return False
         
-        anomaly_count = 0
-        total_features = 0
+        std = self._normal.std
+        valid = (self._normal.count > 0) & (std > 0)
+        total_features = int(valid.sum())
+        if total_features == 0:
+            return False
         
-        for feature_name, value in features.items():
-            if feature_name in self.normal_stats:
-                stats = self.normal_stats[feature_name]
-                if stats['count'] > 0 and stats['std'] > 0:
-                    # Z-score 계산
-                    z_score = abs((value - stats['mean']) / stats['std'])
-                    if z_score > 3:  # 3시그마 규칙
-                        anomaly_count += 1
-                    total_features += 1
+        # Z-score 계산 (3시그마 규칙)
+        z_scores = np.abs(feature_vector[valid] - self._normal.mean[valid]) / std[valid]
+        anomaly_count = int(np.sum(z_scores > 3))
         
         # 30% 이상의 특징이 이상이면 전체를 이상으로 판정
-        return total_features > 0 and (anomaly_count / total_features) > 0.3
+        return (anomaly_count / total_features) > 0.3
     
     def _get_anomaly_message(self, is_anomaly: bool, confidence: float, 
                            statistical_anomaly: bool) -> str:
@@ -302,28 +451,21 @@ class OnlineLearningSystem:
         else:
             return f"모델 기반 이상 감지 (신뢰도: {confidence:.1%})"
     
-    def _get_default_features(self) -> Dict[str, float]:
-        """기본 특징값 반환"""
-        return {
-            'rms_energy': 0.0, 'energy_entropy': 0.0, 'temporal_std': 0.0,
-            'spectral_centroid': 0.0, 'spectral_rolloff': 0.0, 'spectral_bandwidth': 0.0,
-            'zero_crossing_rate': 0.0, 'low_freq_ratio': 0.0, 'mid_freq_ratio': 0.0,
-            'high_freq_ratio': 0.0, 'mfcc_1_mean': 0.0, 'mfcc_2_mean': 0.0
-        }
-    
     def get_learning_statistics(self) -> Dict:
         """학습 통계 정보"""
         with self.lock:
-            normal_count = sum(1 for label in self.label_buffer if not label)
-            anomaly_count = sum(1 for label in self.label_buffer if label)
+            labels = self._label_ring[:self._ring_size]
+            anomaly_count = int(np.count_nonzero(labels))
+            normal_count = self._ring_size - anomaly_count
             
             return {
                 'total_samples': self.total_samples,
-                'buffer_size': len(self.feature_buffer),
+                'buffer_size': self._ring_size,
                 'normal_samples': normal_count,
                 'anomaly_samples': anomaly_count,
-                'anomaly_rate': anomaly_count / len(self.label_buffer) if self.label_buffer else 0,
+                'anomaly_rate': anomaly_count / self._ring_size if self._ring_size else 0,
                 'last_update': self.last_update.isoformat() if self.last_update else None,
+                'is_learning': self.is_learning,
                 'learning_rate': self.learning_rate,
                 'update_frequency': self.update_frequency
             }
@@ -332,23 +474,27 @@ class OnlineLearningSystem:
         """특징별 통계 정보"""
         with self.lock:
             return {
-                'normal_stats': self.normal_stats.copy(),
-                'anomaly_stats': self.anomaly_stats.copy()
+                'normal_stats': self.normal_stats,
+                'anomaly_stats': self.anomaly_stats
             }
     
     def _save_model(self):
         """모델 저장"""
         try:
-            model_data = {
-                'isolation_forest': self.isolation_forest,
-                'scaler': self.scaler,
-                'pca': self.pca,
-                'normal_stats': self.normal_stats,
-                'anomaly_stats': self.anomaly_stats,
-                'total_samples': self.total_samples,
-                'last_update': self.last_update.isoformat() if self.last_update else None,
-                'learning_rate': self.learning_rate
-            }
+            with self.lock:
+                model_data = {
+                    'isolation_forest': self.isolation_forest,
+                    'scaler': self.scaler,
+                    'pca': self.pca,
+                    'feature_names': self.feature_names,
+                    'normal_state': self._normal.get_state() if self._normal is not None else None,
+                    'anomaly_state': self._anomaly.get_state() if self._anomaly is not None else None,
+                    'normal_stats': self.normal_stats,
+                    'anomaly_stats': self.anomaly_stats,
+                    'total_samples': self.total_samples,
+                    'last_update': self.last_update.isoformat() if self.last_update else None,
+                    'learning_rate': self.learning_rate
+                }
             
             filepath = os.path.join(self.model_save_path, "online_learning_model.pkl")
             joblib.dump(model_data, filepath)
@@ -368,17 +514,27 @@ class OnlineLearningSystem:
             return
         
         try:
+            model_data = joblib.load(filepath)
             with self.lock:
-                model_data = joblib.load(filepath)
-                
                 self.isolation_forest = model_data['isolation_forest']
                 self.scaler = model_data['scaler']
                 self.pca = model_data['pca']
-                self.normal_stats = model_data['normal_stats']
-                self.anomaly_stats = model_data['anomaly_stats']
                 self.total_samples = model_data['total_samples']
                 self.learning_rate = model_data['learning_rate']
                 
+                feature_names = model_data.get('feature_names')
+                if feature_names:
+                    self._set_schema(list(feature_names))
+                    if model_data.get('normal_state') is not None:
+                        self._normal.set_state(model_data['normal_state'])
+                    if model_data.get('anomaly_state') is not None:
+                        self._anomaly.set_state(model_data['anomaly_state'])
+                elif model_data.get('normal_stats'):
+                    # 이전 형식: 특징 이름별 {count, mean, std} 딕셔너리 (삽입 순서 = 기존 특징 벡터 순서)
+                    self._set_schema(list(model_data['normal_stats']))
+                    self._restore_legacy_stats(self._normal, model_data['normal_stats'])
+                    self._restore_legacy_stats(self._anomaly, model_data.get('anomaly_stats') or {})
+                
                 if model_data['last_update']:
                     self.last_update = datetime.fromisoformat(model_data['last_update'])
                 
@@ -387,14 +543,24 @@ class OnlineLearningSystem:
         except Exception as e:
             print(f"❌ 모델 로드 오류: {e}")
     
+    def _restore_legacy_stats(self, target: ClassStatistics, stats: Dict[str, Dict]):
+        """이전 형식 특징별 통계 → 열 통계 (저장소 표본은 비워 둠)"""
+        for name, feature_stats in stats.items():
+            i = self.feature_index.get(name)
+            if i is None:
+                continue
+            count = int(feature_stats.get('count', 0))
+            target.count[i] = count
+            target.mean[i] = feature_stats.get('mean', 0.0)
+            target.m2[i] = float(feature_stats.get('std', 0.0)) ** 2 * count
+    
     def reset_learning(self):
         """학습 상태 초기화"""
         with self.lock:
-            self.feature_buffer.clear()
-            self.label_buffer.clear()
+            if self.feature_names:
+                self._set_schema(self.feature_names)
+            self._label_ring[:] = False
             self.timestamp_buffer.clear()
-            self.normal_stats.clear()
-            self.anomaly_stats.clear()
             self.total_samples = 0
             self.last_update = None
             
@@ -432,6 +598,9 @@ if __name__ == "__main__":
         is_anomaly = np.random.random() < 0.1
         online_learner.add_sample(features, is_anomaly)
     
+    # 백그라운드 모델 업데이트 완료 대기
+    online_learner.wait_for_model_update(timeout=30)
+    
     # 학습 통계 확인
     stats = online_learner.get_learning_statistics()
     print(f"📊 학습 통계: {stats}")
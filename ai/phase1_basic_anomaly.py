@@ -13,6 +13,7 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from collections import deque
 import threading
+from scipy.signal import butter, filtfilt
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
@@ -22,7 +23,8 @@ class Phase1BasicAnomalyDetector:
     def __init__(self, 
                  model_save_path: str = "data/models/phase1/",
                  window_size: float = 5.0,
-                 sample_rate: int = 16000):
+                 sample_rate: int = 16000,
+                 feature_store=None):
         """
         Phase 1 기본 이상 탐지 시스템 초기화
         
@@ -30,6 +32,8 @@ class Phase1BasicAnomalyDetector:
             model_save_path: 모델 저장 경로
             window_size: 분석 윈도우 크기 (초)
             sample_rate: 샘플링 레이트
+            feature_store: 훈련 특징 재사용 저장소 (None 이면 services.feature_store 전역 인스턴스,
+                           False 이면 사용 안 함)
         """
         self.model_save_path = model_save_path
         os.makedirs(model_save_path, exist_ok=True)
@@ -45,12 +49,13 @@ class Phase1BasicAnomalyDetector:
         self.pca = None
         self.is_trained = False
         
-        # 특징 이름 정의
+        # 특징 이름 정의 (extract_enhanced_features 출력 순서)
         self.feature_names = [
-            'rms_energy', 'spectral_centroid', 'spectral_rolloff', 
+            'rms_energy', 'energy_entropy', 'spectral_centroid', 'spectral_rolloff',
             'zero_crossing_rate', 'spectral_bandwidth', 'spectral_contrast',
             'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio',
-            'mfcc_1_mean', 'mfcc_2_mean', 'mfcc_3_mean'
+            'mfcc_1_mean', 'mfcc_2_mean', 'mfcc_3_mean',
+            'temporal_std', 'temporal_mean'
         ]
         
         # 통계 정보
@@ -68,6 +73,9 @@ class Phase1BasicAnomalyDetector:
         # 탐지 히스토리
         self.detection_history = deque(maxlen=1000)
         
+        # 훈련 특징 저장소
+        self.feature_store = self._resolve_feature_store(feature_store)
+        
         print("🚀 Phase 1: 기본 이상 탐지 시스템 초기화")
         print(f"⏱️ 윈도우 크기: {window_size}초")
         print(f"🎵 샘플링 레이트: {sample_rate}Hz")
@@ -84,8 +92,8 @@ class Phase1BasicAnomalyDetector:
             nyquist = self.sample_rate / 2
             low_cutoff = 50 / nyquist
             high_cutoff = 4000 / nyquist
-            b, a = librosa.filters.butter(4, [low_cutoff, high_cutoff], btype='band')
-            filtered_audio = librosa.filters.filtfilt(b, a, audio_data)
+            b, a = butter(4, [low_cutoff, high_cutoff], btype='band')
+            filtered_audio = filtfilt(b, a, audio_data)
             
             # 1. 에너지 특징 (향상된)
             rms_energy = np.sqrt(np.mean(filtered_audio ** 2))
@@ -173,14 +181,44 @@ class Phase1BasicAnomalyDetector:
         except:
             return 0.0
     
+    @staticmethod
+    def _resolve_feature_store(feature_store):
+        """특징 저장소 결정 (services 패키지 밖에서 실행되면 저장소 없이 동작)"""
+        if feature_store is not None:
+            return feature_store or None
+        try:
+            from services.feature_store import feature_store as default_store
+            return default_store
+        except ImportError:
+            return None
+    
+    def _feature_spec(self):
+        """훈련 특징 저장소 키 (추출 로직을 바꾸면 버전을 올려야 함)"""
+        from services.feature_store import FeatureSpec
+        return FeatureSpec('phase1_enhanced_features', '2', {
+            'window_size': self.window_size,
+            'sample_rate': self.sample_rate,
+            'n_fft': self.n_fft,
+            'hop_length': self.hop_length
+        })
+    
+    def _training_builder(self, n_workers: int = None):
+        """훈련 특징 행렬 빌더 (블록 스트리밍 + 윈도우 벡터화 + 프로세스 풀)"""
+        from models.window_feature_builder import WindowFeatureBuilder
+        return WindowFeatureBuilder(self.feature_names, sample_rate=self.sample_rate,
+                                    window_size=self.window_size, n_fft=self.n_fft,
+                                    hop_length=self.hop_length, n_workers=n_workers)
+    
     def train_on_normal_data(self, normal_audio_files: List[str], 
-                           validation_split: float = 0.2) -> Dict:
+                           validation_split: float = 0.2,
+                           n_workers: int = None) -> Dict:
         """
         정상 데이터로 훈련 (Phase 1 최적화)
         
         Args:
             normal_audio_files: 정상 오디오 파일 경로 리스트
             validation_split: 검증 데이터 비율
+            n_workers: 특징 추출 프로세스 수 (None 이면 CPU 수, 최대 8)
             
         Returns:
             훈련 결과
@@ -188,30 +226,23 @@ class Phase1BasicAnomalyDetector:
         print("🎯 Phase 1: 정상 데이터로 이상 탐지 모델 훈련 시작")
         print(f"📁 정상 오디오 파일 수: {len(normal_audio_files)}")
         
-        # 정상 데이터 특징 추출
-        normal_features = []
-        processed_files = 0
+        # 정상 데이터 특징 추출 (특징 저장소에 없는 파일만 병렬 추출)
         start_time = time.time()
+        builder = self._training_builder(n_workers)
+        file_paths = list(dict.fromkeys(normal_audio_files))
+        if self.feature_store:
+            spec = self._feature_spec()
+            file_matrices, missing = self.feature_store.lookup(file_paths, spec)
+            if missing:
+                computed = builder.extract_files(missing)
+                self.feature_store.put_many(computed, spec)
+                file_matrices.update(computed)
+            print(f"  특징 저장소 재사용: {len(file_paths) - len(missing)}개, 신규 추출: {len(missing)}개")
+        else:
+            file_matrices = builder.extract_files(file_paths)
         
-        for i, file_path in enumerate(normal_audio_files):
-            try:
-                if i % 10 == 0:
-                    print(f"  처리 중: {i+1}/{len(normal_audio_files)}")
-                
-                audio_data, sr = librosa.load(file_path, sr=None)
-                
-                # 청크 단위로 분석
-                chunk_samples = int(self.window_size * sr)
-                for start in range(0, len(audio_data), chunk_samples):
-                    chunk = audio_data[start:start + chunk_samples]
-                    if len(chunk) >= chunk_samples:
-                        features = self.extract_enhanced_features(chunk, sr)
-                        normal_features.append(list(features.values()))
-                        processed_files += 1
-                        
-            except Exception as e:
-                print(f"❌ 파일 처리 오류 {file_path}: {e}")
-                continue
+        normal_features = builder.stack(normal_audio_files, file_matrices)
+        processed_files = len(normal_features)
         
         if len(normal_features) < 10:
             raise ValueError("충분한 정상 데이터가 없습니다. 최소 10개 샘플 필요")
@@ -219,7 +250,7 @@ class Phase1BasicAnomalyDetector:
         print(f"✅ 처리된 샘플 수: {len(normal_features)}")
         
         # 특징 정규화
-        X_normal = np.array(normal_features)
+        X_normal = normal_features
         X_scaled = self.scaler.fit_transform(X_normal)
         
         # PCA로 차원 축소 (노이즈 감소)
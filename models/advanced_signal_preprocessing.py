@@ -5,7 +5,7 @@ import scipy.stats
 from scipy.signal import butter, filtfilt, medfilt, wiener
 import matplotlib.pyplot as plt
 import os
-from typing import Tuple, Dict, List, Optional, Union
+from typing import Tuple, Dict, List, Optional, Union, Generator
 import warnings
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import multiprocessing as mp
@@ -13,6 +13,12 @@ from functools import partial
 import threading
 import queue
 import time
+
+from models.complexity_features import sample_entropy
+
+# 빠른 경로의 complexity 특징은 앞부분 최대 1000 샘플의 SampEn (학습된 모델과 같은 정의)
+# 전체 클립 SampEn 은 22.05kHz 5초 클립에서 약 9초가 걸려 실시간 분석 경로에 둘 수 없음
+COMPLEXITY_MAX_SAMPLES = 1000
 warnings.filterwarnings('ignore')
 
 class OptimizedSignalPreprocessor:
@@ -305,23 +311,8 @@ class OptimizedSignalPreprocessor:
             noise_power = np.var(audio - np.mean(audio))
             snr = 10 * np.log10(signal_power / (noise_power + 1e-10))
             
-            # 신호 복잡도 (샘플 엔트로피)
-            def sample_entropy(data, m=2, r=0.2):
-                N = len(data)
-                B = A = 0.0
-                
-                for i in range(N - m):
-                    template_i = data[i:i + m]
-                    for j in range(i + 1, N - m):
-                        template_j = data[j:j + m]
-                        if np.max(np.abs(template_i - template_j)) <= r * np.std(data):
-                            B += 1
-                            if np.abs(data[i + m] - data[j + m]) <= r * np.std(data):
-                                A += 1
-                
-                return -np.log(A / B) if B > 0 else 0
-            
-            complexity = sample_entropy(audio[:min(1000, len(audio))])
+            # 신호 복잡도 (샘플 엔트로피, 앞부분 COMPLEXITY_MAX_SAMPLES 샘플)
+            complexity = sample_entropy(audio[:COMPLEXITY_MAX_SAMPLES], m=2, r=0.2)
             
             return {
                 'rms_mean': rms_mean,
@@ -1,20 +1,65 @@
 import os
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Callable
+from typing import List, Dict, Tuple, Callable, Optional
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import multiprocessing as mp
 from functools import partial
 import time
 import json
 from datetime import datetime
-from models.optimized_signal_preprocessing import OptimizedSignalPreprocessor
+from models.advanced_signal_preprocessing import OptimizedSignalPreprocessor
+from services.feature_store import FeatureSpec, feature_store as default_feature_store
+
+# 데이터셋 행 레이아웃 (OptimizedSignalPreprocessor 기본값 n_mfcc=13, feature_length=100 기준)
+N_MFCC = 13
+MFCC_FRAMES = 100
+DATASET_LAYOUT = (
+    ('mfccs_original', (N_MFCC, MFCC_FRAMES)),
+    ('mfccs_compressor', (N_MFCC, MFCC_FRAMES)),
+    ('mfccs_refrigerant', (N_MFCC, MFCC_FRAMES)),
+    ('compressor_cycles', (7,)),
+    ('spectral_features', (8,)),
+    ('temporal_features', (6,)),
+)
+# 전처리/특징 추출 로직을 바꾸면 버전을 올려야 저장소의 이전 특징이 재사용되지 않음
+DATASET_FEATURE_SPEC = FeatureSpec('parallel_dataset_features', '1', {
+    'sample_rate': 22050, 'n_mfcc': N_MFCC, 'mfcc_frames': MFCC_FRAMES
+})
+
+
+def pack_dataset_features(features: Dict) -> Optional[np.ndarray]:
+    """전처리 특징 딕셔너리를 DATASET_LAYOUT 순서의 한 행으로 변환 (MFCC 누락 시 None)"""
+    parts = []
+    for key in ('mfccs_original', 'mfccs_compressor', 'mfccs_refrigerant'):
+        mfccs = features.get(key)
+        if mfccs is None:
+            return None
+        parts.append(np.asarray(mfccs, dtype=np.float64).ravel())
+    
+    # 딕셔너리 특성은 누락 시 0 (기존 데이터셋 생성 규칙)
+    for key, size in (('compressor_cycle', 7), ('spectral_original', 8), ('temporal', 6)):
+        values = features.get(key)
+        parts.append(np.array(list(values.values()) if values else [0] * size, dtype=np.float64))
+    return np.concatenate(parts)
+
+
+def unpack_dataset_rows(rows: np.ndarray) -> Dict[str, np.ndarray]:
+    """pack_dataset_features 행 묶음을 데이터셋 배열별로 분리"""
+    arrays = {}
+    offset = 0
+    for name, shape in DATASET_LAYOUT:
+        size = int(np.prod(shape))
+        arrays[name] = rows[:, offset:offset + size].reshape((len(rows),) + shape)
+        offset += size
+    return arrays
 
 class ParallelAudioProcessor:
-    def __init__(self, n_workers: int = None, use_multiprocessing: bool = True):
+    def __init__(self, n_workers: int = None, use_multiprocessing: bool = True, feature_store=None):
         self.n_workers = n_workers or min(mp.cpu_count(), 8)
         self.use_multiprocessing = use_multiprocessing
         self.results = []
+        self.feature_store = feature_store or default_feature_store
         
         # 프로세스 풀 생성
         if use_multiprocessing:
@@ -22,8 +67,9 @@ class ParallelAudioProcessor:
         else:
             self.executor_class = ThreadPoolExecutor
     
-    def _process_single_file(self, file_path: str, output_dir: str = "processed_features") -> Dict:
-        """단일 파일 처리 (병렬 실행용)"""
+    @staticmethod
+    def _process_single_file(file_path: str, output_dir: str = "processed_features") -> Dict:
+        """단일 파일 처리 (병렬 실행용, 프로세스 풀로 인스턴스를 넘기지 않도록 정적 메서드)"""
         try:
             # 각 프로세스에서 새로운 전처리기 생성
             preprocessor = OptimizedSignalPreprocessor()
@@ -33,6 +79,8 @@ class ParallelAudioProcessor:
                 save_features=True,
                 output_dir=output_dir
             )
+            # 실패 결과에도 파일 경로 포함 (실패 목록/특징 저장소 매칭용)
+            result.setdefault('file_path', file_path)
             
             return result
             
@@ -110,6 +158,8 @@ class ParallelAudioProcessor:
             print(f"병렬 처리 완료: {len(successful_results)}/{len(file_paths)} 파일 성공")
             print(f"처리 시간: {processing_time:.2f}초 ({summary['files_per_second']:.2f} 파일/초)")
             
+            # 특징 배열은 요약 파일이 아닌 반환값으로만 전달
+            summary['results'] = results
             return summary
             
         except Exception as e:
@@ -151,23 +201,36 @@ class ParallelAudioProcessor:
             
             print(f"병렬 데이터셋 생성 시작: {len(file_paths)}개 파일")
             
-            # 병렬 처리
-            processing_result = self.process_files_parallel(file_paths, output_dir)
-            
-            if not processing_result['success']:
-                return processing_result
-            
-            # 성공한 결과만 수집
-            successful_results = []
-            for result in processing_result.get('results', []):
-                if result.get('success', False):
-                    successful_results.append(result)
-            
-            if not successful_results:
+            # 특징 저장소에 없는 파일만 병렬 처리
+            rows, missing = self.feature_store.lookup(list(dict.fromkeys(file_paths)), DATASET_FEATURE_SPEC)
+            reused = len(rows)
+            if missing:
+                processing_result = self.process_files_parallel(missing, output_dir)
+                
+                if not processing_result['success']:
+                    return processing_result
+                
+                computed = {}
+                for result in processing_result.get('results', []):
+                    if result.get('success', False):
+                        row = pack_dataset_features(result['features'])
+                        if row is not None:
+                            computed[result['file_path']] = row[np.newaxis, :]
+                self.feature_store.put_many(computed, DATASET_FEATURE_SPEC)
+                rows.update(computed)
+            
+            print(f"특징 저장소 재사용: {reused}개, 신규 처리: {len(missing)}개")
+            
+            # 특징이 있는 파일만 레이블과 함께 수집
+            used_paths = [path for path in file_paths if path in rows]
+            if not used_paths:
                 return {'success': False, 'error': '처리된 결과가 없습니다.'}
             
+            matrix = np.concatenate([rows[path] for path in used_paths], axis=0)
+            used_labels = [label for path, label in zip(file_paths, labels) if path in rows]
+            
             # 데이터셋 생성
-            dataset_result = self._create_dataset_from_results(successful_results, labels, output_file)
+            dataset_result = self._create_dataset_from_rows(used_paths, matrix, used_labels, output_file)
             
             if dataset_result['success']:
                 print(f"병렬 데이터셋 생성 완료: {output_file}")
@@ -177,65 +240,21 @@ class ParallelAudioProcessor:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def _create_dataset_from_results(self, results: List[Dict], labels: List[int], 
-                                   output_file: str) -> Dict:
-        """처리 결과로부터 데이터셋 생성"""
+    def _create_dataset_from_rows(self, file_paths: List[str], rows: np.ndarray, labels: List[int],
+                                  output_file: str) -> Dict:
+        """데이터셋 행(pack_dataset_features)으로부터 데이터셋 생성"""
         try:
-            # 특성 추출
-            mfccs_original = []
-            mfccs_compressor = []
-            mfccs_refrigerant = []
-            compressor_cycles = []
-            spectral_features = []
-            temporal_features = []
-            
-            for result in results:
-                features = result['features']
-                
-                # MFCC 특성
-                if features.get('mfccs_original') is not None:
-                    mfccs_original.append(features['mfccs_original'])
-                if features.get('mfccs_compressor') is not None:
-                    mfccs_compressor.append(features['mfccs_compressor'])
-                if features.get('mfccs_refrigerant') is not None:
-                    mfccs_refrigerant.append(features['mfccs_refrigerant'])
-                
-                # 압축기 주기 특성
-                if features.get('compressor_cycle'):
-                    compressor_cycles.append(list(features['compressor_cycle'].values()))
-                else:
-                    compressor_cycles.append([0] * 7)  # 기본값
-                
-                # 스펙트럼 특성
-                if features.get('spectral_original'):
-                    spectral_features.append(list(features['spectral_original'].values()))
-                else:
-                    spectral_features.append([0] * 8)  # 기본값
-                
-                # 시간적 특성
-                if features.get('temporal'):
-                    temporal_features.append(list(features['temporal'].values()))
-                else:
-                    temporal_features.append([0] * 6)  # 기본값
-            
-            # 배열로 변환
-            dataset = {
-                'mfccs_original': np.array(mfccs_original),
-                'mfccs_compressor': np.array(mfccs_compressor),
-                'mfccs_refrigerant': np.array(mfccs_refrigerant),
-                'compressor_cycles': np.array(compressor_cycles),
-                'spectral_features': np.array(spectral_features),
-                'temporal_features': np.array(temporal_features),
-                'labels': np.array(labels),
-                'file_paths': [result['file_path'] for result in results]
-            }
+            labels = np.array(labels)
+            dataset = unpack_dataset_rows(rows)
+            dataset['labels'] = labels
+            dataset['file_paths'] = list(file_paths)
             
             # 데이터셋 저장
             np.savez_compressed(output_file, **dataset)
             
             # 메타데이터 저장
             metadata = {
-                'total_samples': len(results),
+                'total_samples': len(file_paths),
                 'feature_shapes': {
                     'mfccs_original': dataset['mfccs_original'].shape,
                     'mfccs_compressor': dataset['mfccs_compressor'].shape,
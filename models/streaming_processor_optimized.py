@@ -8,7 +8,77 @@ import queue
 import time
 import sounddevice as sd
 import soundfile as sf
-from models.optimized_signal_preprocessing import OptimizedSignalPreprocessor
+from models.advanced_signal_preprocessing import OptimizedSignalPreprocessor
+
+
+class SPSCFloatRingBuffer:
+    """
+    단일 생산자/단일 소비자 float32 링 버퍼 (잠금 없음)
+
+    - 생산자(오디오 콜백)만 샘플을 기록하고 기록을 마친 뒤 write_pos 를 갱신
+    - 소비자(분석 스레드)는 write_pos 스냅샷 기준으로 최근 N 샘플을 읽음
+    - 모든 샘플을 [0, capacity) 와 [capacity, 2*capacity) 에 두 번 기록하므로
+      capacity 이하의 어떤 구간도 연속 메모리 뷰로 꺼낼 수 있음
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._write_pos = 0  # 누적 기록 샘플 수 (생산자만 갱신)
+        self.torn_reads = 0
+
+    def available(self) -> int:
+        """읽을 수 있는 샘플 수"""
+        return min(self._write_pos, self.capacity)
+
+    def write(self, samples: np.ndarray):
+        """샘플 기록 (생산자 스레드 전용)"""
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        if len(samples) > self.capacity:
+            skipped = len(samples) - self.capacity
+            samples = samples[skipped:]
+        else:
+            skipped = 0
+        count = len(samples)
+        if count == 0:
+            return
+
+        pos = self._write_pos + skipped
+        start = pos % self.capacity
+        end = start + count
+        cap = self.capacity
+        self._buffer[start:end] = samples
+        if end <= cap:
+            self._buffer[start + cap:end + cap] = samples
+        else:
+            first = cap - start
+            self._buffer[start + cap:] = samples[:first]
+            self._buffer[:end - cap] = samples[first:]
+        # 데이터 기록 후 위치 공개
+        self._write_pos = pos + count
+
+    def latest(self, n_samples: int, copy: bool = True) -> np.ndarray:
+        """
+        최근 n_samples 개 샘플 (오래된 순)
+
+        copy=False 이면 내부 버퍼의 연속 뷰를 그대로 반환합니다 (생산자가 capacity - n 샘플 이상
+        더 기록하기 전까지만 유효). copy=True 이면 연속 복사 한 번을 수행하고, 복사 도중 생산자가
+        해당 구간을 덮어썼다면 다시 읽습니다.
+        """
+        while True:
+            write_pos = self._write_pos
+            n = min(n_samples, write_pos, self.capacity)
+            start = (write_pos - n) % self.capacity
+            view = self._buffer[start:start + n]
+            if not copy:
+                return view
+            out = view.copy()
+            if self._write_pos - write_pos <= self.capacity - n:
+                return out
+            self.torn_reads += 1
+
 
 class OptimizedStreamingProcessor:
     def __init__(self, sample_rate: int = 22050, chunk_size: int = 1024, 
@@ -21,8 +91,9 @@ class OptimizedStreamingProcessor:
         # 최적화된 전처리기
         self.preprocessor = OptimizedSignalPreprocessor(sample_rate)
         
-        # 실시간 버퍼
-        self.audio_buffer = deque(maxlen=self.buffer_size)
+        # 실시간 버퍼 (분석 중 생산자가 읽는 구간을 덮어쓰지 않도록 1초 여유)
+        self.analysis_window = int(sample_rate * min(5.0, buffer_duration))
+        self.audio_buffer = SPSCFloatRingBuffer(self.buffer_size + sample_rate)
         self.feature_buffer = deque(maxlen=100)
         
         # 스트리밍 상태
@@ -34,10 +105,6 @@ class OptimizedStreamingProcessor:
         # 실시간 분석 설정
         self.analysis_interval = 1.0  # 1초마다 분석
         self.last_analysis_time = 0
-        
-        # 성능 최적화를 위한 캐시
-        self._feature_cache = {}
-        self._cache_size = 50
     
     def start_microphone_stream(self, device_id: Optional[int] = None):
         """마이크로부터 실시간 스트림 시작"""
@@ -128,7 +195,7 @@ class OptimizedStreamingProcessor:
         
         # 오디오 데이터를 버퍼에 추가
         audio_chunk = indata[:, 0]  # 모노 채널
-        self.audio_buffer.extend(audio_chunk)
+        self.audio_buffer.write(audio_chunk)
     
     def _file_stream_loop(self, file_path: str, chunk_duration: float):
         """파일 스트림 루프"""
@@ -140,7 +207,7 @@ class OptimizedStreamingProcessor:
                     break
                 
                 # 오디오 데이터를 버퍼에 추가
-                self.audio_buffer.extend(chunk_audio)
+                self.audio_buffer.write(chunk_audio)
                 
                 # 스트리밍 속도 조절
                 time.sleep(chunk_duration * 0.1)  # 실제 시간보다 빠르게 재생
@@ -160,12 +227,12 @@ class OptimizedStreamingProcessor:
                     continue
                 
                 # 충분한 데이터가 있는지 확인
-                if len(self.audio_buffer) < self.sample_rate * 2:  # 최소 2초
+                if self.audio_buffer.available() < self.sample_rate * 2:  # 최소 2초
                     time.sleep(0.1)
                     continue
                 
                 # 최근 데이터 추출
-                recent_audio = np.array(list(self.audio_buffer))[-self.sample_rate * 5:]
+                recent_audio = self.audio_buffer.latest(self.analysis_window)
                 
                 # 실시간 분석
                 analysis_result = self._analyze_realtime_audio(recent_audio)
@@ -189,15 +256,6 @@ class OptimizedStreamingProcessor:
     def _analyze_realtime_audio(self, audio: np.ndarray) -> Dict:
         """실시간 오디오 분석 (최적화된 버전)"""
         try:
-            # 캐시 키 생성
-            cache_key = hash(audio.tobytes())
-            
-            # 캐시 확인
-            if cache_key in self._feature_cache:
-                cached_result = self._feature_cache[cache_key]
-                cached_result['timestamp'] = time.time()
-                return cached_result
-            
             # 1. 빠른 전처리
             cleaned_audio = self.preprocessor.remove_background_noise_optimized(audio)
             separated_audio = self.preprocessor.separate_audio_optimized(cleaned_audio)
@@ -223,14 +281,6 @@ class OptimizedStreamingProcessor:
                 'alert_level': self._determine_alert_level(anomaly_score, leak_probability)
             }
             
-            # 캐시에 저장 (크기 제한)
-            if len(self._feature_cache) >= self._cache_size:
-                # 가장 오래된 항목 제거
-                oldest_key = next(iter(self._feature_cache))
-                del self._feature_cache[oldest_key]
-            
-            self._feature_cache[cache_key] = result.copy()
-            
             return result
             
         except Exception as e:
@@ -271,4 +321,6 @@ class OptimizedStreamingProcessor:
             
             return features
             
-        e
+        except Exception as e:
+            print(f"실시간 특성 추출 오류: {e}")
+            return {}
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+윈도우 특징 훈련 데이터 빌더
+이상 탐지기(BasicAnomalyDetector / Phase1BasicAnomalyDetector / RefrigeratorAnomalyDetector)의
+정상 데이터 훈련용 특징 행렬을 만듭니다.
+
+- soundfile 블록 읽기로 파일을 윈도우 여러 개 단위로 스트리밍 (파일 전체를 메모리에 올리지 않음)
+- 블록 안의 윈도우들을 (윈도우 수, 샘플 수) 2차원 배열로 묶어 필터/STFT/특징을 한 번에 계산
+  (스펙트럼 특징과 MFCC 는 n_fft=2048 STFT 하나를 공유)
+- 파일별 행렬과 전체 행렬은 미리 할당한 배열에 행 단위로 기록
+- 파일 단위로 프로세스 풀에서 병렬 처리
+"""
+
+import numpy as np
+import librosa
+import soundfile as sf
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from scipy.signal import butter, filtfilt
+from typing import Dict, List, Optional, Sequence
+
+# 탐지기별 extract_*_features 딕셔너리 키 순서 (훈련 행렬 열 순서)
+BASIC_FEATURE_NAMES = [
+    'rms_energy', 'spectral_centroid', 'spectral_rolloff',
+    'zero_crossing_rate', 'spectral_bandwidth', 'spectral_contrast',
+    'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio',
+    'mfcc_1_mean', 'mfcc_2_mean', 'mfcc_3_mean'
+]
+PHASE1_FEATURE_NAMES = [
+    'rms_energy', 'energy_entropy', 'spectral_centroid', 'spectral_rolloff',
+    'zero_crossing_rate', 'spectral_bandwidth', 'spectral_contrast',
+    'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio',
+    'mfcc_1_mean', 'mfcc_2_mean', 'mfcc_3_mean',
+    'temporal_std', 'temporal_mean'
+]
+COMPREHENSIVE_FEATURE_NAMES = [
+    'rms_energy', 'energy_entropy', 'temporal_std', 'temporal_mean',
+    'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth',
+    'spectral_contrast', 'spectral_flatness', 'zero_crossing_rate',
+    'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio',
+    'mfcc_1_mean', 'mfcc_2_mean', 'mfcc_3_mean',
+    'mfcc_1_std', 'mfcc_2_std', 'mfcc_3_std'
+]
+
+# librosa 특징 함수 기본값 (기존 특징과 값이 일치해야 함)
+SPECTRAL_N_FFT = 2048
+ENTROPY_FRAME_LENGTH = 1024
+ENTROPY_HOP_LENGTH = 512
+MFCC_TOP_DB = 80.0
+BAND_LIMITS = {
+    'low_freq_ratio': (50, 500),
+    'mid_freq_ratio': (500, 2000),
+    'high_freq_ratio': (2000, 4000),
+}
+
+
+def _window_mean(values: np.ndarray) -> np.ndarray:
+    """(윈도우, ..., 프레임) 특징을 윈도우별 평균으로"""
+    return values.reshape(len(values), -1).mean(axis=1)
+
+
+def compute_window_features(windows: np.ndarray, sr: int, feature_names: Sequence[str],
+                            sample_rate: int = 16000, n_fft: int = 1024,
+                            hop_length: int = 512) -> np.ndarray:
+    """
+    윈도우 묶음의 특징 행렬 계산
+
+    Args:
+        windows: (윈도우 수, 샘플 수) 오디오
+        sr: windows 의 샘플링 레이트
+        feature_names: 계산할 특징 (열 순서)
+        sample_rate: 분석 샘플링 레이트 (다르면 리샘플링)
+        n_fft, hop_length: 대역 에너지 비율용 STFT / ZCR, RMS 프레임 간격
+
+    Returns:
+        (윈도우 수, 특징 수) float64 행렬
+    """
+    names = set(feature_names)
+    if sr != sample_rate:
+        windows = librosa.resample(windows, orig_sr=sr, target_sr=sample_rate, axis=-1)
+
+    # 50~4000Hz 대역 통과 필터 (윈도우별 독립)
+    nyquist = sample_rate / 2
+    b, a = butter(4, [50 / nyquist, 4000 / nyquist], btype='band')
+    filtered = filtfilt(b, a, windows, axis=-1)
+
+    values = {'rms_energy': np.sqrt(np.mean(filtered ** 2, axis=1))}
+
+    if 'energy_entropy' in names:
+        frames = librosa.util.frame(filtered, frame_length=ENTROPY_FRAME_LENGTH, hop_length=ENTROPY_HOP_LENGTH)
+        energies = np.sum(frames ** 2, axis=-2)
+        totals = np.sum(energies, axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = energies / totals + 1e-10
+            entropy = -np.sum(p * np.log2(p), axis=1)
+        values['energy_entropy'] = np.where(totals[:, 0] > 0, entropy, 0.0)
+
+    if names & set(BAND_LIMITS):
+        magnitude = np.abs(librosa.stft(filtered, n_fft=n_fft, hop_length=hop_length))
+        frequencies = librosa.fft_frequencies(sr=sample_rate, n_fft=n_fft)
+        total = magnitude.sum(axis=(1, 2))
+        for name, (low, high) in BAND_LIMITS.items():
+            band = magnitude[:, (frequencies >= low) & (frequencies <= high), :].sum(axis=(1, 2))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values[name] = np.where(total > 0, band / total, 0.0)
+
+    # 스펙트럼 특징과 MFCC 가 공유하는 STFT (librosa 특징 함수 기본 설정과 동일)
+    spectral = {'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth', 'spectral_contrast', 'spectral_flatness'}
+    mfcc_names = {name for name in names if name.startswith('mfcc_')}
+    if names & spectral or mfcc_names:
+        S = np.abs(librosa.stft(filtered, n_fft=SPECTRAL_N_FFT, hop_length=hop_length))
+        if 'spectral_centroid' in names:
+            values['spectral_centroid'] = _window_mean(librosa.feature.spectral_centroid(S=S, sr=sample_rate))
+        if 'spectral_rolloff' in names:
+            values['spectral_rolloff'] = _window_mean(librosa.feature.spectral_rolloff(S=S, sr=sample_rate))
+        if 'spectral_bandwidth' in names:
+            values['spectral_bandwidth'] = _window_mean(librosa.feature.spectral_bandwidth(S=S, sr=sample_rate))
+        if 'spectral_contrast' in names:
+            # contrast 내부의 power_to_db top_db 가 배열 전체 최대값 기준이므로 윈도우별로 계산
+            values['spectral_contrast'] = np.array([
+                np.mean(librosa.feature.spectral_contrast(S=window_S, sr=sample_rate)) for window_S in S
+            ])
+        if 'spectral_flatness' in names:
+            values['spectral_flatness'] = _window_mean(librosa.feature.spectral_flatness(S=S))
+        if mfcc_names:
+            mel = librosa.feature.melspectrogram(S=S ** 2, sr=sample_rate)
+            # top_db 는 윈도우마다 그 윈도우의 최대값 기준으로 적용
+            mel_db = librosa.power_to_db(mel, top_db=None)
+            mel_db = np.maximum(mel_db, mel_db.max(axis=(1, 2), keepdims=True) - MFCC_TOP_DB)
+            mfccs = librosa.feature.mfcc(S=mel_db, n_mfcc=13)
+            for i in range(3):
+                values[f'mfcc_{i + 1}_mean'] = mfccs[:, i, :].mean(axis=1)
+                values[f'mfcc_{i + 1}_std'] = mfccs[:, i, :].std(axis=1)
+
+    if 'zero_crossing_rate' in names:
+        values['zero_crossing_rate'] = _window_mean(
+            librosa.feature.zero_crossing_rate(filtered, hop_length=hop_length)
+        )
+
+    if 'temporal_std' in names or 'temporal_mean' in names:
+        rms_temporal = librosa.feature.rms(y=filtered, hop_length=hop_length)[:, 0, :]
+        values['temporal_std'] = rms_temporal.std(axis=1)
+        values['temporal_mean'] = rms_temporal.mean(axis=1)
+
+    return np.column_stack([values[name] for name in feature_names]).astype(np.float64)
+
+
+class WindowFeatureBuilder:
+    """정상 데이터 파일 목록 → (윈도우 수, 특징 수) 훈련 행렬"""
+
+    def __init__(self, feature_names: Sequence[str], sample_rate: int = 16000,
+                 window_size: float = 5.0, n_fft: int = 1024, hop_length: int = 512,
+                 n_workers: int = None, windows_per_block: int = 16):
+        """
+        Args:
+            feature_names: 특징 열 순서 (BASIC/PHASE1/COMPREHENSIVE_FEATURE_NAMES)
+            sample_rate: 분석 샘플링 레이트
+            window_size: 분석 윈도우 크기 (초, 원본 샘플링 레이트 기준으로 자름)
+            n_fft, hop_length: 탐지기 STFT 설정
+            n_workers: 프로세스 수 (1 이면 현재 프로세스에서 처리)
+            windows_per_block: 한 번에 읽고 계산할 윈도우 수
+        """
+        self.feature_names = list(feature_names)
+        self.sample_rate = sample_rate
+        self.window_size = window_size
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_workers = n_workers or min(mp.cpu_count(), 8)
+        self.windows_per_block = windows_per_block
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def _compute(self, windows: np.ndarray, sr: int) -> np.ndarray:
+        return compute_window_features(windows, sr, self.feature_names, self.sample_rate,
+                                       self.n_fft, self.hop_length)
+
+    def extract_file(self, file_path: str) -> Optional[np.ndarray]:
+        """
+        파일 하나의 윈도우별 특징 행렬 (끝의 불완전한 윈도우는 제외)
+
+        Returns:
+            (윈도우 수, 특징 수) 행렬, 읽기 실패 시 None
+        """
+        try:
+            info = sf.info(file_path)
+        except Exception:
+            # soundfile 이 읽지 못하는 형식은 librosa 로 전체 로드
+            return self._extract_loaded(file_path)
+
+        sr = info.samplerate
+        chunk_samples = int(self.window_size * sr)
+        if chunk_samples <= 0:
+            return np.empty((0, self.n_features))
+        n_windows = info.frames // chunk_samples
+        out = np.empty((n_windows, self.n_features), dtype=np.float64)
+
+        row = 0
+        try:
+            blocks = sf.blocks(file_path, blocksize=chunk_samples * self.windows_per_block,
+                               dtype='float32', always_2d=True)
+            for block in blocks:
+                k = min(len(block) // chunk_samples, n_windows - row)
+                if k <= 0:
+                    break
+                # librosa.load(mono=True) 와 같은 채널 평균
+                mono = block[:k * chunk_samples].mean(axis=1, dtype=np.float32)
+                out[row:row + k] = self._compute(mono.reshape(k, chunk_samples), sr)
+                row += k
+        except Exception as e:
+            print(f"❌ 파일 처리 오류 {file_path}: {e}")
+            return None
+        return out[:row]
+
+    def _extract_loaded(self, file_path: str) -> Optional[np.ndarray]:
+        try:
+            audio, sr = librosa.load(file_path, sr=None)
+            chunk_samples = int(self.window_size * sr)
+            n_windows = len(audio) // chunk_samples
+            out = np.empty((n_windows, self.n_features), dtype=np.float64)
+            windows = audio[:n_windows * chunk_samples].reshape(n_windows, chunk_samples)
+            for start in range(0, n_windows, self.windows_per_block):
+                stop = min(start + self.windows_per_block, n_windows)
+                out[start:stop] = self._compute(windows[start:stop], sr)
+            return out
+        except Exception as e:
+            print(f"❌ 파일 처리 오류 {file_path}: {e}")
+            return None
+
+    def extract_files(self, file_paths: List[str]) -> Dict[str, np.ndarray]:
+        """파일별 특징 행렬 (프로세스 풀 병렬, 실패한 파일은 제외)"""
+        file_paths = list(dict.fromkeys(file_paths))
+        if self.n_workers <= 1 or len(file_paths) <= 1:
+            matrices = [self.extract_file(path) for path in file_paths]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.n_workers, len(file_paths))) as executor:
+                matrices = list(executor.map(self.extract_file, file_paths))
+        return {path: matrix for path, matrix in zip(file_paths, matrices) if matrix is not None}
+
+    def build(self, file_paths: List[str]) -> np.ndarray:
+        """파일 목록 순서대로 쌓은 (전체 윈도우 수, 특징 수) 훈련 행렬"""
+        return self.stack(file_paths, self.extract_files(file_paths))
+
+    def stack(self, file_paths: List[str], matrices: Dict[str, np.ndarray]) -> np.ndarray:
+        """파일별 행렬을 파일 목록 순서대로 미리 할당한 행렬에 기록"""
+        ordered = [matrices[path] for path in file_paths if path in matrices]
+        X = np.empty((sum(len(m) for m in ordered), self.n_features), dtype=np.float64)
+        row = 0
+        for matrix in ordered:
+            X[row:row + len(matrix)] = matrix
+            row += len(matrix)
+        return X
@@ -9,6 +9,7 @@ import os
 import time
 import logging
 from services.ai_service import ensemble_ai_service
+from services.analysis_job_service import analysis_job_service
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -37,7 +38,7 @@ def get_ai_status():
 
 @ai_bp.route('/analyze', methods=['POST'])
 def analyze_audio():
-    """AI 오디오 분석 (고성능 앙상블)"""
+    """AI 오디오 분석 작업 제출 (분석은 작업 큐 워커 프로세스에서 실행, /jobs/<job_id> 로 결과 조회)"""
     try:
         # 파일 업로드 확인
         if 'audio' not in request.files:
@@ -55,44 +56,158 @@ def analyze_audio():
                 'message': '유효한 오디오 파일을 선택해주세요'
             }), 400
 
-        # 파일 저장
+        model_type = request.form.get('model_type', 'auto')
+
+        # 파일 저장 (작업 완료 후 작업 큐가 삭제)
         upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
         os.makedirs(upload_folder, exist_ok=True)
 
-        filename = f"ai_analysis_{int(time.time())}_{audio_file.filename}"
-        file_path = os.path.join(upload_folder, filename)
+        filename = f"ai_analysis_{int(time.time() * 1000)}_{os.path.basename(audio_file.filename)}"
+        file_path = os.path.abspath(os.path.join(upload_folder, filename))
         audio_file.save(file_path)
 
-        # AI로 분석
-        result = ensemble_ai_service.predict_ensemble(file_path)
+        job_id = analysis_job_service.submit(file_path, model_type=model_type)
+        if job_id is None:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            response = jsonify({
+                'success': False,
+                'error': '분석 대기열이 가득 찼습니다',
+                'message': '잠시 후 다시 시도해주세요'
+            })
+            response.headers['Retry-After'] = '5'
+            return response, 429
+
+        response = jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'{ai_bp.url_prefix}/jobs/{job_id}',
+            'message': 'AI 분석 작업이 접수되었습니다'
+        })
+        response.headers['Location'] = f'{ai_bp.url_prefix}/jobs/{job_id}'
+        return response, 202
+
+    except Exception as e:
+        logger.error(f"AI 분석 작업 제출 오류: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'AI 분석 중 오류가 발생했습니다'
+        }), 500
 
-        if result is None:
+@ai_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """AI 분석 작업 상태 및 결과 조회"""
+    try:
+        job = analysis_job_service.get_job(job_id)
+        if job is None:
             return jsonify({
                 'success': False,
-                'error': 'AI 분석 실패',
-                'message': '오디오 파일을 분석할 수 없습니다'
-            }), 500
+                'error': '작업을 찾을 수 없습니다',
+                'message': '만료되었거나 존재하지 않는 작업입니다'
+            }), 404
 
-        # 파일 정리
-        try:
-            os.remove(file_path)
-        except:
-            pass
+        return jsonify({
+            'success': True,
+            'job': job,
+            'message': 'AI 분석 작업 조회 성공'
+        })
+
+    except Exception as e:
+        logger.error(f"AI 분석 작업 조회 오류: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'AI 분석 작업 조회 실패'
+        }), 500
+
+@ai_bp.route('/jobs', methods=['GET'])
+def get_analysis_job_metrics():
+    """AI 분석 작업 큐 지표 (대기열 깊이, 실행 중 작업 수, 대기/처리 시간)"""
+    try:
+        return jsonify({
+            'success': True,
+            'metrics': analysis_job_service.get_metrics(),
+            'message': 'AI 분석 작업 큐 지표 조회 성공'
+        })
+    except Exception as e:
+        logger.error(f"AI 분석 작업 큐 지표 조회 오류: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'AI 분석 작업 큐 지표 조회 실패'
+        }), 500
+
+# 배치 분석 한 번에 허용하는 최대 클립 수
+MAX_BATCH_CLIPS = 64
+
+@ai_bp.route('/analyze-batch', methods=['POST'])
+def analyze_audio_batch():
+    """AI 오디오 일괄 분석 (여러 클립을 한 번의 모델 호출로 처리)"""
+    file_paths = []
+    try:
+        audio_files = [f for f in request.files.getlist('audio') if f.filename]
+        if not audio_files:
+            return jsonify({
+                'success': False,
+                'error': '오디오 파일이 없습니다',
+                'message': "'audio' 필드로 하나 이상의 오디오 파일을 업로드해주세요"
+            }), 400
+
+        if len(audio_files) > MAX_BATCH_CLIPS:
+            return jsonify({
+                'success': False,
+                'error': '배치 크기 초과',
+                'message': f'한 번에 최대 {MAX_BATCH_CLIPS}개 파일까지 분석할 수 있습니다'
+            }), 413
+
+        model_type = request.form.get('model_type', 'ensemble')
+
+        # 파일 저장
+        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+        os.makedirs(upload_folder, exist_ok=True)
+
+        batch_stamp = int(time.time() * 1000)
+        for index, audio_file in enumerate(audio_files):
+            filename = f"ai_batch_{batch_stamp}_{index}_{os.path.basename(audio_file.filename)}"
+            file_path = os.path.join(upload_folder, filename)
+            audio_file.save(file_path)
+            file_paths.append(file_path)
+
+        # AI로 일괄 분석
+        start_time = time.time()
+        results = ensemble_ai_service.analyze_batch(file_paths, model_type=model_type)
 
         return jsonify({
             'success': True,
-            'result': result,
-            'message': 'AI 분석 완료'
+            'results': [
+                dict(result, filename=audio_file.filename)
+                for audio_file, result in zip(audio_files, results)
+            ],
+            'count': len(results),
+            'batch_processing_time_ms': (time.time() - start_time) * 1000,
+            'message': 'AI 일괄 분석 완료'
         })
 
     except Exception as e:
-        logger.error(f"AI 분석 오류: {e}")
+        logger.error(f"AI 일괄 분석 오류: {e}")
         return jsonify({
             'success': False,
             'error': str(e),
-            'message': 'AI 분석 중 오류가 발생했습니다'
+            'message': 'AI 일괄 분석 중 오류가 발생했습니다'
         }), 500
 
+    finally:
+        # 파일 정리
+        for file_path in file_paths:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
 @ai_bp.route('/lightweight-analyze', methods=['POST'])
 def lightweight_analyze():
     """경량 AI 진단 (체험용)"""
@@ -4,7 +4,7 @@
 Stripe Dashboard와 AWS CloudWatch 스타일의 대시보드 API
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 import logging
 from datetime import datetime, timedelta
 import time
@@ -15,6 +15,7 @@ from services.analytics_service import analytics_service
 from services.notification_management_service import notification_management_service
 from services.store_management_service import store_management_service
 from services.user_permission_service import user_permission_service
+from services.shared_cache import shared_cache
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +24,17 @@ logger = logging.getLogger(__name__)
 # 블루프린트 생성
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
+@dashboard_bp.before_request
+def begin_cache_scope():
+    """요청 범위 캐시 시작 (한 요청에서 같은 집계를 여러 번 요청해도 공유 캐시는 한 번만 조회)"""
+    g.shared_cache_token = shared_cache.begin_request()
+
+@dashboard_bp.teardown_request
+def end_cache_scope(exc):
+    token = g.pop('shared_cache_token', None)
+    if token is not None:
+        shared_cache.end_request(token)
+
 @dashboard_bp.route('/summary', methods=['GET'])
 def get_dashboard_summary():
     """대시보드 요약 정보 조회"""
@@ -577,6 +589,24 @@ def handle_user(user_id):
             'message': '사용자 관리 중 오류가 발생했습니다.'
         }), 500
 
+@dashboard_bp.route('/cache/metrics', methods=['GET'])
+def get_cache_metrics():
+    """공유 캐시 메트릭 조회 (이 워커 프로세스 기준 적중/실패/제거 수)"""
+    try:
+        return jsonify({
+            'success': True,
+            'metrics': dashboard_data_service.get_cache_metrics(),
+            'timestamp': time.time()
+        })
+        
+    except Exception as e:
+        logger.error(f"캐시 메트릭 조회 실패: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': '캐시 메트릭 조회에 실패했습니다.'
+        }), 500
+
 @dashboard_bp.route('/health', methods=['GET'])
 def health_check():
     """대시보드 서비스 상태 확인"""
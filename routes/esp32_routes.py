@@ -9,6 +9,7 @@ import os
 import time
 import logging
 import json
+import math
 from services.esp32_optimizer import esp32_optimizer
 from services.notification_service import unified_notification_service
 from services.ai_service import ensemble_ai_service
@@ -68,13 +69,10 @@ def upload_audio():
         sample_rate = int(request.headers.get('X-Sample-Rate', '16000'))
         bits_per_sample = int(request.headers.get('X-Bits-Per-Sample', '16'))
         
-        # 오디오 데이터 수신
-        audio_data = request.data
-        
-        if not audio_data:
+        if bits_per_sample != 16:
             return jsonify({
                 'success': False,
-                'message': '오디오 데이터가 없습니다.'
+                'message': '16비트 PCM 오디오만 지원합니다.'
             }), 400
         
         # 우선순위 결정 (디바이스 상태에 따라)
@@ -84,8 +82,41 @@ def upload_audio():
         elif request.headers.get('X-Priority') == 'urgent':
             priority = 4
         
-        # 오디오 데이터를 최적화 서비스에 추가
-        esp32_optimizer.add_audio_chunk(device_id, audio_data, sample_rate, priority)
+        # 오디오 데이터를 디바이스 링 버퍼에 기록
+        # Content-Length 가 있으면 요청 본문을 링 버퍼 메모리로 직접 읽음
+        content_length = request.content_length
+        if content_length:
+            result = esp32_optimizer.ingest_stream(
+                device_id, request.stream, content_length, sample_rate, priority
+            )
+        else:
+            audio_data = request.get_data()
+            if not audio_data:
+                return jsonify({
+                    'success': False,
+                    'message': '오디오 데이터가 없습니다.'
+                }), 400
+            result = esp32_optimizer.add_audio_chunk(device_id, audio_data, sample_rate, priority)
+        
+        if not result.accepted:
+            if result.status == 'invalid':
+                return jsonify({
+                    'success': False,
+                    'message': result.message
+                }), 400
+            
+            # 디바이스 버퍼 초과는 429, 서버 전체 과부하는 503 (둘 다 재시도 힌트 포함)
+            status_code = 429 if result.status == 'device_overrun' else 503
+            retry_after = int(math.ceil(result.retry_after))
+            response = jsonify({
+                'success': False,
+                'message': result.message,
+                'device_id': device_id,
+                'processing_status': result.status,
+                'retry_after': retry_after
+            })
+            response.headers['Retry-After'] = str(retry_after)
+            return response, status_code
         
         # 즉시 응답 (비동기 처리)
         return jsonify({
@@ -93,7 +124,9 @@ def upload_audio():
             'message': '오디오 데이터 수신 완료',
             'device_id': device_id,
             'timestamp': time.time(),
-            'processing_status': 'queued'
+            'processing_status': 'queued',
+            'samples_received': result.samples,
+            'windows_queued': result.windows_queued
         })
         
     except Exception as e:
@@ -160,6 +193,33 @@ def get_metrics():
             'message': f'메트릭 조회 오류: {str(e)}'
         }), 500
 
+@esp32_bp.route('/results/<device_id>', methods=['GET'])
+def get_device_results(device_id):
+    """디바이스의 최근 오디오 분석 결과 조회"""
+    try:
+        limit = request.args.get('limit', type=int)
+        results = esp32_optimizer.get_recent_results(device_id, limit)
+        
+        if results is None:
+            return jsonify({
+                'success': False,
+                'message': '디바이스를 찾을 수 없습니다.'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'device_id': device_id,
+            'results': results,
+            'total_count': len(results)
+        })
+        
+    except Exception as e:
+        logger.error(f"분석 결과 조회 오류: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'분석 결과 조회 오류: {str(e)}'
+        }), 500
+
 @esp32_bp.route('/alert', methods=['POST'])
 def send_alert():
     """ESP32에서 직접 알림 전송"""
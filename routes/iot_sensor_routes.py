@@ -17,6 +17,7 @@ from services.realtime_streaming_service import realtime_streaming_service
 from services.sensor_database_service import sensor_database_service
 from services.sensor_monitoring_service import sensor_monitoring_service
 from services.firmware_ota_service import firmware_ota_service
+from services.sensor_ingest import SensorBatchError, parse_ndjson, parse_packed, validate_batch
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -60,7 +61,7 @@ def receive_sensor_data():
         sensor_monitoring_service.update_sensor_data(data['device_id'], data)
         
         # 실시간 스트리밍에 전달
-        realtime_streaming_service.add_sensor_data(data['device_id'], data)
+        realtime_streaming_service.publish_sensor_data(data['device_id'], data)
         
         return jsonify({
             'success': True,
@@ -75,6 +76,68 @@ def receive_sensor_data():
             'error': str(e)
         }), 500
 
+# 일괄 수집 응답에 포함하는 무효 측정값 최대 개수
+MAX_REPORTED_ERRORS = 20
+
+@iot_sensor_bp.route('/sensors/data/batch', methods=['POST'])
+def receive_sensor_data_batch():
+    """
+    센서 데이터 일괄 수신 (ESP32 가 버퍼링한 측정값 묶음)
+    
+    Content-Type: application/x-ndjson (줄마다 /sensors/data 형식 JSON)
+                  application/octet-stream (services.sensor_ingest 패킹 바이너리 프레임)
+    유효한 측정값만 저장/모니터링/스트리밍에 각각 한 번의 호출로 전달합니다.
+    """
+    try:
+        body = request.get_data(cache=False)
+        if not body:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        content_type = (request.mimetype or '').lower()
+        if content_type in ('application/x-ndjson', 'application/jsonl'):
+            batch = parse_ndjson(body)
+        elif content_type == 'application/octet-stream':
+            batch = parse_packed(body)
+        else:
+            return jsonify({
+                'success': False,
+                'error': f'Unsupported content type: {content_type}'
+            }), 415
+        
+        valid, errors = validate_batch(batch)
+        readings = batch.select(valid)
+        
+        if len(readings):
+            # 데이터베이스에 저장
+            sensor_database_service.add_sensor_readings(readings.db_rows())
+            
+            # 모니터링 서비스에 전달
+            sensor_monitoring_service.update_sensor_batch(readings)
+            
+            # 실시간 스트리밍에 전달
+            realtime_streaming_service.publish_sensor_batch(readings)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Sensor data batch received',
+            'accepted': len(readings),
+            'rejected': len(errors),
+            'errors': errors[:MAX_REPORTED_ERRORS],
+            'timestamp': time.time()
+        })
+        
+    except SensorBatchError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Sensor data batch reception error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @iot_sensor_bp.route('/sensors/data/<device_id>', methods=['GET'])
 def get_sensor_data(device_id: str):
     """센서 데이터 조회"""
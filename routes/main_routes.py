@@ -1,5 +1,6 @@
-from flask import Blueprint, render_template, send_from_directory, jsonify, request
+from flask import Blueprint, render_template, send_from_directory, jsonify, request, Response, stream_with_context
 import os
+import json
 import time
 import logging
 
@@ -8,6 +9,11 @@ logger = logging.getLogger(__name__)
 
 main_bp = Blueprint('main', __name__)
 
+# 긴 파일 스트리밍 분석 최대 시간(초, NDJSON 과 JSON 응답 모두)
+# gunicorn sync 워커는 요청 하나가 timeout(gunicorn.conf.py, 120초)을 넘으면 워커를 종료하므로
+# 업로드 시간을 감안해 그보다 짧게 끊고 그때까지 분석한 구간으로 요약 (truncated=True)
+STREAM_MAX_SECONDS = 90.0
+
 @main_bp.route('/contact')
 def contact():
     """고객 문의 페이지"""
@@ -122,15 +128,24 @@ def api_lightweight_analyze():
         audio_file = request.files['audio']
         timestamp = request.form.get('timestamp')
         model_type = request.form.get('model_type', 'auto')  # auto, lightweight, ensemble, mimii
+        stream = request.form.get('stream')  # ndjson: 윈도우별 결과를 NDJSON 으로 스트리밍
 
         # 임시 파일로 저장
         import tempfile
         with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as tmp_file:
             audio_file.save(tmp_file.name)
             
+            if stream == 'ndjson':
+                response = Response(stream_with_context(_stream_analysis(tmp_file.name, model_type)),
+                                    mimetype='application/x-ndjson')
+                # 클라이언트가 끊거나 본문을 읽지 않아도 응답을 닫을 때 임시 파일 삭제
+                response.call_on_close(lambda: _remove_upload(tmp_file.name))
+                return response
+            
             # 통합 AI 서비스로 분석
             from services.ai_service import unified_ai_service
-            result = unified_ai_service.analyze_audio(tmp_file.name, model_type=model_type)
+            result = unified_ai_service.analyze_audio(tmp_file.name, model_type=model_type,
+                                                      max_stream_seconds=STREAM_MAX_SECONDS)
             
             # 임시 파일 삭제
             os.unlink(tmp_file.name)
@@ -145,7 +160,7 @@ def api_lightweight_analyze():
                 "message": result.get('message', '분석 중 오류가 발생했습니다.')
             }), 500
 
-        return jsonify({
+        response = {
             "is_overload": result.get('is_overload', False),
             "confidence": result.get('confidence', 0.0),
             "processing_time_ms": result.get('processing_time_ms', 0.0),
@@ -154,7 +169,12 @@ def api_lightweight_analyze():
             "status": "success",
             "model_type": result.get('model_type', 'unknown'),
             "diagnosis_type": result.get('diagnosis_type', 'unknown')
-        })
+        }
+        # 긴 파일 스트리밍 분석 결과의 구간별 타임라인
+        if 'timeline' in result:
+            response['timeline'] = result['timeline']
+            response['truncated'] = result.get('truncated', False)
+        return jsonify(response)
 
     except Exception as e:
         logger.error(f"AI 분석 API 오류: {e}")
@@ -166,6 +186,32 @@ def api_lightweight_analyze():
             "message": "분석 중 오류가 발생했습니다."
         }), 500
 
+def _stream_analysis(file_path: str, model_type: str):
+    """윈도우별 분석 결과를 한 줄씩 내보내고 끝나면 임시 파일 삭제 (STREAM_MAX_SECONDS 초과 시 중단)"""
+    items = None
+    try:
+        from services.ai_service import unified_ai_service
+        items = unified_ai_service.iter_audio_analysis(file_path, model_type=model_type,
+                                                       max_seconds=STREAM_MAX_SECONDS)
+        for item in items:
+            yield json.dumps(item, ensure_ascii=False, default=str) + '\n'
+    except Exception as e:
+        logger.error(f"AI 스트리밍 분석 오류: {e}")
+        yield json.dumps({'type': 'summary', 'error': True, 'message': str(e)}, ensure_ascii=False) + '\n'
+    finally:
+        if items is not None:
+            items.close()
+        _remove_upload(file_path)
+
+def _remove_upload(file_path: str):
+    """임시 업로드 파일 삭제 (스트림 종료와 응답 종료 양쪽에서 호출되므로 이미 없으면 무시)"""
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"임시 파일 삭제 실패 {file_path}: {e}")
+
 @main_bp.route('/ai-demo')
 def ai_demo():
     """AI 진단 데모 페이지"""
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+컴파일 모델 벤치마크
+UnifiedAIService 앙상블 멤버(스케일러, RandomForest, SVC, MLP, LogisticRegression)를
+FEATURE_DIM 차원 합성 데이터로 학습한 뒤 sklearn 과 컴파일 모델(.npz)의
+- 출력 패리티 (레이블 일치, predict_proba 최대 오차)
+- 콜드 스타트 (joblib.load vs load_compiled)
+- 요청당 지연 (1행) / 배치 처리량 (64행)
+을 비교합니다.
+
+사용법:
+    python scripts/benchmark_compiled_models.py --samples 2000 --repeat 200
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.spectral_feature_engine import FEATURE_DIM
+from services.compiled_models import compile_model, check_parity, load_compiled
+
+
+def timed(fn, repeat: int) -> float:
+    """repeat 회 평균 (ms)"""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='컴파일 모델 벤치마크')
+    parser.add_argument('--samples', type=int, default=2000, help='학습 샘플 수')
+    parser.add_argument('--repeat', type=int, default=200, help='지연 측정 반복 횟수')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.samples, FEATURE_DIM))
+    y = (X[:, 0] + 0.5 * X[:, 1] ** 2 + 0.3 * rng.normal(size=args.samples) > 0.5).astype(int)
+    X_test = rng.normal(size=(1000, FEATURE_DIM))
+
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    # UnifiedAIService._create_ensemble_models 와 같은 설정
+    models = [
+        ('scaler', scaler),
+        ('random_forest', RandomForestClassifier(n_estimators=100, max_depth=20, min_samples_split=5,
+                                                 min_samples_leaf=2, random_state=42).fit(X_scaled, y)),
+        ('svm', SVC(kernel='rbf', C=1.0, gamma='scale', probability=True, random_state=42).fit(X_scaled, y)),
+        ('mlp', MLPClassifier(hidden_layer_sizes=(100, 50), alpha=0.001, learning_rate='adaptive',
+                              max_iter=1000, random_state=42).fit(X_scaled, y)),
+        ('logistic', LogisticRegression(C=1.0, max_iter=1000, random_state=42).fit(X_scaled, y)),
+    ]
+
+    print(f"\n특징 {FEATURE_DIM}차원, 학습 {args.samples}행")
+    print(f"  {'모델':14s} {'패리티':>22s} {'로드 pkl':>9s} {'로드 npz':>9s} "
+          f"{'1행 sk':>8s} {'1행 np':>8s} {'64행 sk':>8s} {'64행 np':>8s}")
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model in models:
+            compiled = compile_model(model)
+            parity = check_parity(model, compiled, X_test)
+            ok &= parity['ok']
+
+            pkl_path = os.path.join(tmp, f'{name}.pkl')
+            npz_path = os.path.join(tmp, f'{name}.npz')
+            joblib.dump(model, pkl_path)
+            compiled.save(npz_path)
+            load_pkl = timed(lambda: joblib.load(pkl_path), 5)
+            load_npz = timed(lambda: load_compiled(npz_path), 5)
+
+            call = 'transform' if name == 'scaler' else 'predict_proba'
+            one, batch = X_test[:1], X_test[:64]
+            sk_one = timed(lambda: getattr(model, call)(one), args.repeat)
+            np_one = timed(lambda: getattr(compiled, call)(one), args.repeat)
+            sk_batch = timed(lambda: getattr(model, call)(batch), args.repeat // 4 or 1)
+            np_batch = timed(lambda: getattr(compiled, call)(batch), args.repeat // 4 or 1)
+
+            status = f"{'OK' if parity['ok'] else 'FAIL'} diff {parity['max_abs_diff']:.0e}"
+            print(f"  {name:14s} {status:>22s} {load_pkl:7.2f}ms {load_npz:7.2f}ms "
+                  f"{sk_one:6.2f}ms {np_one:6.2f}ms {sk_batch:6.2f}ms {np_batch:6.2f}ms")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+샘플 엔트로피 마이크로벤치마크
+기존 중첩 루프 구현(1000 샘플 절단) 대비 KD-트리 구현의 값 일치 여부와 속도 비교
+
+사용법:
+    python scripts/benchmark_complexity_features.py --samples 1000 --duration 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.complexity_features import sample_entropy, approximate_entropy
+
+
+def legacy_sample_entropy(data, m=2, r=0.2):
+    """기존 OptimizedSignalPreprocessor._extract_temporal_features_fast 내부 구현"""
+    N = len(data)
+    B = A = 0.0
+
+    for i in range(N - m):
+        template_i = data[i:i + m]
+        for j in range(i + 1, N - m):
+            template_j = data[j:j + m]
+            if np.max(np.abs(template_i - template_j)) <= r * np.std(data):
+                B += 1
+                if np.abs(data[i + m] - data[j + m]) <= r * np.std(data):
+                    A += 1
+
+    return -np.log(A / B) if B > 0 else 0
+
+
+def make_signal(n: int, seed: int) -> np.ndarray:
+    """압축기 소음과 비슷한 float32 테스트 신호"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 22050
+    y = np.sin(2 * np.pi * 60 * t) + 0.3 * np.sin(2 * np.pi * 180 * t) + rng.normal(0, 0.3, n)
+    return y.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='샘플 엔트로피 벤치마크')
+    parser.add_argument('--samples', type=int, default=1000, help='기존 구현과 비교할 길이')
+    parser.add_argument('--duration', type=float, default=5.0, help='전체 길이 클립 (초, 22050Hz)')
+    parser.add_argument('--seeds', type=int, default=3, help='값 일치 검증 신호 수')
+    args = parser.parse_args()
+
+    ok = True
+    for seed in range(args.seeds):
+        y = make_signal(args.samples, seed)
+        start = time.perf_counter()
+        reference = legacy_sample_entropy(y)
+        legacy_s = time.perf_counter() - start
+        start = time.perf_counter()
+        value = sample_entropy(y)
+        fast_s = time.perf_counter() - start
+        match = reference == value
+        ok &= bool(match)
+        print(f"seed {seed}: 기존 {reference:.12f} ({legacy_s * 1000:8.1f} ms) | "
+              f"KD-트리 {value:.12f} ({fast_s * 1000:6.2f} ms) {'✅' if match else '❌'}")
+
+    y = make_signal(int(args.duration * 22050), 0)
+    start = time.perf_counter()
+    full = sample_entropy(y)
+    full_s = time.perf_counter() - start
+    start = time.perf_counter()
+    apen = approximate_entropy(y)
+    apen_s = time.perf_counter() - start
+    print(f"\n전체 길이 {len(y)} 샘플: SampEn {full:.4f} ({full_s * 1000:.1f} ms), "
+          f"ApEn {apen:.4f} ({apen_s * 1000:.1f} ms)")
+    print(f"값 일치: {'✅' if ok else '❌'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+센서 데이터 적재 벤치마크
+1,000대 디바이스가 동시에 측정값을 보내는 상황에서 초당 기록 건수 비교
+- 기존 방식: 측정값마다 연결 생성 → INSERT → 커밋 → 종료
+- SensorDatabaseService: 단일 WAL 쓰기 연결 + executemany 배치
+
+사용법:
+    python scripts/benchmark_sensor_ingest.py --devices 1000 --rounds 50 --producers 8
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import threading
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.sensor_database_service import SensorDatabaseService, INSERT_SENSOR_READING
+
+
+def make_readings(devices: int, rounds: int, seed: int = 0):
+    """디바이스별 rounds 개 측정값 (라운드마다 모든 디바이스가 1회 전송)"""
+    rng = np.random.default_rng(seed)
+    base = time.time() - rounds
+    values = rng.normal(size=(rounds, devices, 6))
+    readings = []
+    for r in range(rounds):
+        for d in range(devices):
+            v = values[r, d]
+            readings.append({
+                'device_id': f'ESP32_{d:04d}',
+                'timestamp': base + r,
+                'temperature': -18.0 + v[0],
+                'vibration_x': 0.5 + 0.1 * v[1],
+                'vibration_y': 0.5 + 0.1 * v[2],
+                'vibration_z': 0.5 + 0.1 * v[3],
+                'power_consumption': 50.0 + 5 * v[4],
+                'audio_level': int(300 + 50 * v[5]),
+                'sensor_quality': 1.0
+            })
+    return readings
+
+
+def legacy_ingest(db_path: str, readings) -> float:
+    """측정값마다 연결을 여는 기존 방식, 초당 기록 건수 반환"""
+    service = SensorDatabaseService(db_path=db_path)
+    service.start()  # 스키마만 생성
+    service.shutdown()
+
+    start = time.perf_counter()
+    for reading in readings:
+        conn = sqlite3.connect(db_path)
+        conn.execute(INSERT_SENSOR_READING, SensorDatabaseService._reading_row(reading))
+        conn.commit()
+        conn.close()
+    return len(readings) / (time.perf_counter() - start)
+
+
+def batched_ingest(db_path: str, readings, producers: int, batch_size: int) -> float:
+    """여러 요청 스레드가 add_sensor_reading 호출, 마지막 커밋까지의 초당 기록 건수 반환"""
+    service = SensorDatabaseService(db_path=db_path, batch_size=batch_size, batch_timeout=0.5)
+    chunks = [readings[i::producers] for i in range(producers)]
+
+    def produce(chunk):
+        for reading in chunk:
+            service.add_sensor_reading(reading)
+
+    threads = [threading.Thread(target=produce, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.flush(timeout=None)
+    elapsed = time.perf_counter() - start
+
+    stored = service.get_database_status().get('sensor_readings', 0)
+    service.shutdown()
+    assert stored == len(readings), (stored, len(readings))
+    return len(readings) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='센서 데이터 적재 벤치마크')
+    parser.add_argument('--devices', type=int, default=1000, help='시뮬레이션 디바이스 수')
+    parser.add_argument('--rounds', type=int, default=50, help='디바이스당 측정값 수')
+    parser.add_argument('--producers', type=int, default=8, help='요청 처리 스레드 수')
+    parser.add_argument('--batch-size', type=int, default=500, help='배치 크기')
+    parser.add_argument('--legacy-sample', type=int, default=2000, help='기존 방식 측정에 사용할 건수')
+    args = parser.parse_args()
+
+    readings = make_readings(args.devices, args.rounds)
+    print(f"디바이스 {args.devices}대 x {args.rounds}회 = {len(readings)}건")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_rate = legacy_ingest(os.path.join(tmp, 'legacy.db'), readings[:args.legacy_sample])
+        batched_rate = batched_ingest(os.path.join(tmp, 'batched.db'), readings,
+                                      args.producers, args.batch_size)
+
+    print(f"  연결당 1건 커밋 ({args.legacy_sample}건): {legacy_rate:10.0f} readings/s")
+    print(f"  WAL 단일 쓰기 + executemany:  {batched_rate:10.0f} readings/s  ({batched_rate / legacy_rate:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
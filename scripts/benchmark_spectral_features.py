@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+스펙트럼 특징 엔진 벤치마크
+기존 _extract_comprehensive_features (특징별 개별 STFT) 대비 값 일치 여부와 속도 비교
+
+사용법:
+    python scripts/benchmark_spectral_features.py --duration 10 --repeat 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import librosa
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.spectral_feature_engine import SpectralFeatureEngine, FEATURE_NAMES, FEATURE_DIM
+
+
+def legacy_extract(y: np.ndarray, sr: int) -> np.ndarray:
+    """기존 구현 (특징마다 librosa 가 STFT 를 다시 계산)"""
+    features = []
+    rms = librosa.feature.rms(y=y)[0]
+    zcr = librosa.feature.zero_crossing_rate(y)[0]
+    spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+    spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
+    spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
+    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+    fft_magnitude = np.abs(np.fft.fft(y))
+    chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+    tonnetz = librosa.feature.tonnetz(y=y, sr=sr)
+    spectral_contrast = librosa.feature.spectral_contrast(y=y, sr=sr)
+    stft = librosa.stft(y)
+    freqs = librosa.fft_frequencies(sr=sr)
+
+    for series in (rms, zcr, spectral_centroid, spectral_rolloff, spectral_bandwidth):
+        features.extend([np.mean(series), np.std(series), np.max(series), np.min(series)])
+    features.append(float(np.atleast_1d(tempo)[0]))
+    for i in range(13):
+        features.extend([np.mean(mfccs[i]), np.std(mfccs[i]), np.max(mfccs[i]), np.min(mfccs[i])])
+    features.extend([np.mean(fft_magnitude), np.std(fft_magnitude), np.max(fft_magnitude), np.min(fft_magnitude)])
+    for i in range(12):
+        features.extend([np.mean(chroma[i]), np.std(chroma[i])])
+    for i in range(6):
+        features.extend([np.mean(tonnetz[i]), np.std(tonnetz[i])])
+    for i in range(7):
+        features.extend([np.mean(spectral_contrast[i]), np.std(spectral_contrast[i])])
+    for low, high in ((2000, 8000), (50, 500)):
+        indices = np.where((freqs >= low) & (freqs <= high))[0]
+        if len(indices) > 0:
+            energy = np.sum(np.abs(stft[indices, :]))
+            features.extend([np.mean(energy), np.std(energy), np.max(energy), np.min(energy)])
+        else:
+            features.extend([0, 0, 0, 0])
+    return np.array(features, dtype=np.float32)
+
+
+def make_clip(duration: float, sr: int, seed: int = 0) -> np.ndarray:
+    """압축기 소음과 비슷한 테스트 신호 (기본 주파수 + 고조파 + 잡음)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sr)) / sr
+    y = np.sin(2 * np.pi * 60 * t)
+    for harmonic in (2, 3, 5):
+        y += 0.3 * np.sin(2 * np.pi * 60 * harmonic * t)
+    y += 0.2 * np.sin(2 * np.pi * 1200 * t) * (1 + np.sin(2 * np.pi * 2 * t))
+    y += rng.normal(0, 0.1, len(t))
+    return (y / np.max(np.abs(y))).astype(np.float32)
+
+
+def time_call(fn, repeat: int) -> float:
+    fn()  # 워밍업 (필터뱅크 캐시, numba JIT)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='스펙트럼 특징 엔진 벤치마크')
+    parser.add_argument('--duration', type=float, default=10.0, help='클립 길이 (초)')
+    parser.add_argument('--sr', type=int, default=16000, help='샘플링 레이트')
+    parser.add_argument('--repeat', type=int, default=5, help='반복 횟수')
+    parser.add_argument('--rtol', type=float, default=1e-3, help='허용 상대 오차')
+    args = parser.parse_args()
+
+    y = make_clip(args.duration, args.sr)
+    engine = SpectralFeatureEngine()
+    fast_engine = SpectralFeatureEngine(tonnetz_from_stft=True)
+
+    reference = legacy_extract(y, args.sr)
+    shared = engine.extract(y, args.sr)
+
+    # 값 일치 검증
+    assert reference.shape == shared.shape == (FEATURE_DIM,), (reference.shape, shared.shape)
+    scale = np.maximum(np.abs(reference), 1.0)
+    rel_err = np.abs(reference - shared) / scale
+    worst = int(np.argmax(rel_err))
+    print(f"특징 수: {FEATURE_DIM}")
+    print(f"최대 상대 오차: {rel_err[worst]:.2e} ({FEATURE_NAMES[worst]})")
+    parity_ok = bool(np.all(rel_err <= args.rtol))
+    print(f"값 일치: {'✅' if parity_ok else '❌'} (rtol={args.rtol})")
+
+    legacy_ms = time_call(lambda: legacy_extract(y, args.sr), args.repeat)
+    shared_ms = time_call(lambda: engine.extract(y, args.sr), args.repeat)
+    fast_ms = time_call(lambda: fast_engine.extract(y, args.sr), args.repeat)
+
+    print(f"\n클립 {args.duration:.1f}초 @ {args.sr}Hz, {args.repeat}회 평균")
+    print(f"  기존 구현:              {legacy_ms:8.1f} ms")
+    print(f"  공유 스펙트로그램:      {shared_ms:8.1f} ms  ({legacy_ms / shared_ms:.2f}x)")
+    print(f"  + STFT 크로마 tonnetz:  {fast_ms:8.1f} ms  ({legacy_ms / fast_ms:.2f}x, tonnetz 값은 다름)")
+
+    return 0 if parity_ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
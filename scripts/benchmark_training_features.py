@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+정상 데이터 훈련 특징 추출 벤치마크
+- 기존 방식: 파일마다 librosa.load → 5초 청크 루프 → 청크별 extract_*_features 딕셔너리
+- WindowFeatureBuilder: soundfile 블록 스트리밍 + 윈도우 묶음 벡터화 + 프로세스 풀
+
+사용법:
+    python scripts/benchmark_training_features.py --files 16 --minutes 2 --workers 4
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import numpy as np
+import librosa
+import soundfile as sf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'ai'))
+
+from models.window_feature_builder import WindowFeatureBuilder
+from basic_anomaly_detector import BasicAnomalyDetector
+from phase1_basic_anomaly import Phase1BasicAnomalyDetector
+from anomaly_detection_ai import RefrigeratorAnomalyDetector
+
+
+def make_files(directory: str, n_files: int, minutes: float, sr: int = 22050):
+    """압축기 기본음 + 고조파 + 잡음 합성 파일"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(minutes * 60 * sr)) / sr
+    paths = []
+    for i in range(n_files):
+        base = 50 + 5 * i
+        audio = 0.3 * np.sin(2 * np.pi * base * t) + 0.1 * np.sin(2 * np.pi * 3 * base * t)
+        audio += 0.05 * rng.normal(size=len(t))
+        path = os.path.join(directory, f'normal_{i:03d}.wav')
+        sf.write(path, audio.astype(np.float32), sr)
+        paths.append(path)
+    return paths
+
+
+def legacy_features(extract, window_size: float, paths) -> np.ndarray:
+    """기존 train_on_normal_data 의 특징 추출 루프"""
+    rows = []
+    for path in paths:
+        audio, sr = librosa.load(path, sr=None)
+        chunk_samples = int(window_size * sr)
+        for start in range(0, len(audio), chunk_samples):
+            chunk = audio[start:start + chunk_samples]
+            if len(chunk) >= chunk_samples:
+                rows.append(list(extract(chunk, sr).values()))
+    return np.array(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='훈련 특징 추출 벤치마크')
+    parser.add_argument('--files', type=int, default=16, help='파일 수')
+    parser.add_argument('--minutes', type=float, default=2.0, help='파일당 길이 (분)')
+    parser.add_argument('--workers', type=int, default=4, help='프로세스 수')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_files(tmp, args.files, args.minutes)
+        detectors = [
+            ('BasicAnomalyDetector', BasicAnomalyDetector(model_save_path=tmp), 'extract_features'),
+            ('Phase1BasicAnomalyDetector', Phase1BasicAnomalyDetector(model_save_path=tmp, feature_store=False),
+             'extract_enhanced_features'),
+            ('RefrigeratorAnomalyDetector', RefrigeratorAnomalyDetector(model_save_path=tmp),
+             'extract_comprehensive_features'),
+        ]
+        print(f"\n파일 {args.files}개 x {args.minutes}분, 워커 {args.workers}개")
+
+        for name, detector, extract_name in detectors:
+            start = time.perf_counter()
+            expected = legacy_features(getattr(detector, extract_name), detector.window_size, paths)
+            legacy_time = time.perf_counter() - start
+
+            builder = detector._training_builder(args.workers)
+            start = time.perf_counter()
+            X = builder.build(paths)
+            builder_time = time.perf_counter() - start
+
+            assert X.shape == expected.shape, (X.shape, expected.shape)
+            max_rel = float(np.max(np.abs(X - expected) / (np.abs(expected) + 1e-9)))
+            print(f"  {name:28s} {X.shape[0]:5d} windows  기존 {legacy_time:7.2f}s  "
+                  f"빌더 {builder_time:6.2f}s  ({legacy_time / builder_time:4.1f}x)  max rel diff {max_rel:.1e}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+sklearn 모델 → 컴파일 모델(.npz) 내보내기
+모델 디렉토리의 .pkl 중 변환 가능한 모델(스케일러, RandomForest, LogisticRegression, SVC, MLP)을
+sklearn 결과와 패리티 검사 후 같은 이름의 .npz 로 저장합니다.
+UnifiedAIService 는 .pkl 보다 새로운 .npz 가 있으면 그것을 로드합니다.
+
+사용법:
+    python scripts/export_compiled_models.py --models-dir data/models
+"""
+
+import os
+import sys
+import glob
+import argparse
+import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.compiled_models import export_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='컴파일 모델 내보내기')
+    parser.add_argument('--models-dir', default='data/models', help='모델 디렉토리')
+    parser.add_argument('--atol', type=float, default=1e-6, help='predict_proba 허용 오차')
+    args = parser.parse_args()
+
+    failed = 0
+    for model_path in sorted(glob.glob(os.path.join(args.models_dir, '*.pkl'))):
+        name = os.path.basename(model_path)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                path, parity = export_model(model_path, atol=args.atol)
+        except ValueError as e:
+            print(f"  {name:32s} 건너뜀: {e}")
+            continue
+        except Exception as e:
+            print(f"  {name:32s} 오류: {e}")
+            failed += 1
+            continue
+
+        if path is None:
+            failed += 1
+            print(f"  {name:32s} 패리티 실패: {parity}")
+        else:
+            print(f"  {name:32s} → {os.path.basename(path)}  "
+                  f"max abs diff {parity['max_abs_diff']:.1e}, 레이블 불일치 {parity['label_mismatches']}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,7 +15,6 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.anomaly_detector import CompressorAnomalyDetector
-from services.esp32_data_processor import ESP32DataProcessor
 
 # 로깅 설정
 logging.basicConfig(
@@ -29,7 +28,7 @@ class AIInferenceService:
     
     def __init__(self):
         self.detector = CompressorAnomalyDetector()
-        self.processor = ESP32DataProcessor()
+        self.processor = self.detector.processor
         self.is_initialized = False
         
     def initialize(self):
@@ -7,9 +7,9 @@
 import os
 import numpy as np
 import librosa
-import joblib
+import soundfile as sf
 import time
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 import logging
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
@@ -21,16 +21,36 @@ from tensorflow.keras.models import load_model
 from scipy import signal
 from scipy.signal import butter, filtfilt
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 import hashlib
 import json
 from datetime import datetime
 from services.ai_model_training import compressor_ai_model
 from services.smart_storage_service import SmartStorageService
+from services.spectral_feature_engine import spectral_feature_engine, FEATURE_DIM
+from services.compiled_models import load_model_file
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """
+    모델 레지스트리의 한 세대
+    
+    요청은 시작할 때 현재 스냅샷 참조를 한 번 잡고 끝까지 같은 세대를 사용합니다.
+    모델 교체는 딕셔너리를 복사한 새 스냅샷을 만든 뒤 참조만 바꾸므로(copy-on-write)
+    처리 중인 요청은 이전 버전으로 끝나고, 읽는 쪽에는 락이 필요 없습니다.
+    """
+    generation: int = 0
+    models: Dict[str, Any] = field(default_factory=dict)
+    scalers: Dict[str, Any] = field(default_factory=dict)
+    versions: Dict[str, str] = field(default_factory=dict)
+
+
 class UnifiedAIService:
     """
     통합 AI 서비스 - 모든 AI 모델과 로직의 Single Source of Truth
@@ -41,37 +61,72 @@ class UnifiedAIService:
     3. MIMII Model (산업용 이상 감지)
     4. 모델 관리 및 OTA 업데이트
     """
+    
+    # 파일 기반 모델: 모델 키 → (모델 파일, 스케일러 파일)
+    MODEL_FILES = {'mimii_rf': ('mimii_model.pkl', 'mimii_scaler.pkl')}
+    # 다른 워커 프로세스가 교체한 모델 파일 확인 간격 (초)
+    MODEL_CHECK_INTERVAL = 10.0
+    # 스트리밍 분석: 윈도우 길이(초), 한 번에 예측할 윈도우 수, 자동 스트리밍 전환 길이(초)
+    STREAM_WINDOW_SECONDS = 5.0
+    STREAM_BATCH_WINDOWS = 8
+    STREAM_MIN_WINDOW_SECONDS = 1.0
+    STREAM_THRESHOLD_SECONDS = 60.0
 
     def __init__(self, models_dir='data/models', features_dir='data/features'):
         self.models_dir = models_dir
         self.features_dir = features_dir
         
-        # 모델 저장소
-        self.models = {}
-        self.scalers = {}
+        # 모델 레지스트리 (현재 스냅샷, 교체는 update_lock 안에서 참조만 바꿈)
+        self._snapshot = ModelSnapshot()
         self.model_metadata = {}
         
+        # 로드한 모델 파일 서명 (경로 → (모델 키, (크기, 수정 시각))), 다른 워커의 교체 감지용
+        self._model_files: Dict[str, Tuple[str, Tuple[int, int]]] = {}
+        self._last_model_check = time.monotonic()
+        self._pending_reloads = set()
+        self._reload_executor = None
+        self._reload_pid = None
+        
         # 압축기 AI 모델 초기화
         self.compressor_model = compressor_ai_model
         
         # 스마트 저장 서비스 초기화
         self.storage_service = SmartStorageService()
-        self.model_versions = {}
         
         # 서비스 상태
         self.is_initialized = False
         self.last_update = None
         self.update_lock = threading.Lock()
         
+        # 배치 분석 워커 풀 (첫 배치 요청 시 생성)
+        self.batch_max_workers = min(8, os.cpu_count() or 1)
+        self._batch_executor = None
+        
         # 모델 로드 및 초기화
         self._initialize_models()
         
         logger.info("통합 AI 서비스 초기화 완료")
 
+    @property
+    def models(self) -> Dict[str, Any]:
+        """현재 스냅샷의 모델 (교체는 reload_model/update_model 로만)"""
+        return self._snapshot.models
+
+    @property
+    def scalers(self) -> Dict[str, Any]:
+        return self._snapshot.scalers
+
+    @property
+    def model_versions(self) -> Dict[str, str]:
+        return self._snapshot.versions
+
     def _initialize_models(self):
         """모든 AI 모델 초기화"""
         try:
             with self.update_lock:
+                # 아직 요청을 받기 전이므로 첫 스냅샷을 직접 채움
+                self._snapshot = ModelSnapshot()
+                
                 # 1. Lightweight Compressor AI 초기화
                 self._init_lightweight_ai()
                 
@@ -119,9 +174,12 @@ class UnifiedAIService:
             mimii_scaler_path = os.path.join(self.models_dir, 'mimii_scaler.pkl')
 
             if os.path.exists(mimii_model_path) and os.path.exists(mimii_scaler_path):
-                self.models['mimii_rf'] = joblib.load(mimii_model_path)
-                self.scalers['mimii_rf'] = joblib.load(mimii_scaler_path)
-                self.model_versions['mimii_rf'] = '1.0.0'
+                self._record_model_file('mimii_rf', mimii_model_path)
+                self._record_model_file('mimii_rf', mimii_scaler_path)
+                # 내보낸 컴파일 모델(.npz)이 있으면 sklearn 객체 역직렬화 없이 로드
+                self.models['mimii_rf'] = load_model_file(mimii_model_path)
+                self.scalers['mimii_rf'] = load_model_file(mimii_scaler_path)
+                self.model_versions['mimii_rf'] = self._read_model_version(mimii_model_path) or '1.0.0'
                 logger.info("MIMII 모델 로드 완료")
             
             # 추가 앙상블 모델들 생성
@@ -211,7 +269,8 @@ class UnifiedAIService:
                      model_type: str = 'auto', 
                      sr: Optional[int] = None,
                      enable_noise_cancellation: bool = True,
-                     enable_quality_optimization: bool = True) -> Dict:
+                     enable_quality_optimization: bool = True,
+                     max_stream_seconds: Optional[float] = None) -> Dict:
         """
         오디오 분석 - 통합 진입점 (노이즈 캔슬링 및 품질 최적화 포함)
         
@@ -221,6 +280,7 @@ class UnifiedAIService:
             sr: 샘플링 레이트 (오디오 데이터인 경우)
             enable_noise_cancellation: 노이즈 캔슬링 활성화
             enable_quality_optimization: 품질 최적화 활성화
+            max_stream_seconds: 스트리밍 분석 최대 시간(초), 넘으면 그때까지의 구간으로 요약 (None 이면 제한 없음)
             
         Returns:
             분석 결과 딕셔너리
@@ -228,34 +288,24 @@ class UnifiedAIService:
         if not self.is_initialized:
             return self._create_error_result("AI 서비스가 초기화되지 않았습니다.")
         
+        self._check_model_files()
+        
+        # 긴 파일은 전체를 디코딩하지 않고 윈도우 단위로 스트리밍 분석
+        duration = self._stream_duration(audio_input)
+        if duration is not None and duration >= self.STREAM_THRESHOLD_SECONDS:
+            return self.analyze_audio_streaming(
+                audio_input, model_type=model_type,
+                enable_noise_cancellation=enable_noise_cancellation,
+                enable_quality_optimization=enable_quality_optimization,
+                max_seconds=max_stream_seconds
+            )
+        
         try:
             start_time = time.time()
             
-            # 오디오 데이터 로드
-            if isinstance(audio_input, str):
-                audio_data, sample_rate = librosa.load(audio_input, sr=16000)
-            else:
-                audio_data = audio_input
-                sample_rate = sr or 16000
-            
-            # 오디오 품질 분석 및 최적화
-            quality_metrics = self._analyze_audio_quality(audio_data, sample_rate)
-            
-            # 품질 최적화 적용
-            if enable_quality_optimization:
-                audio_data, optimization_info = self._optimize_audio_quality(
-                    audio_data, sample_rate, quality_metrics
-                )
-            else:
-                optimization_info = {}
-            
-            # 노이즈 캔슬링 적용
-            if enable_noise_cancellation:
-                audio_data, noise_info = self._apply_noise_cancellation(
-                    audio_data, sample_rate
-                )
-            else:
-                noise_info = {}
+            audio_data, sample_rate, preprocessing_info = self._prepare_audio(
+                audio_input, sr, enable_noise_cancellation, enable_quality_optimization
+            )
             
             # 모델 타입 결정
             if model_type == 'auto':
@@ -271,56 +321,413 @@ class UnifiedAIService:
             else:
                 return self._create_error_result(f"지원하지 않는 모델 타입: {model_type}")
             
-            # 공통 결과 포맷팅
-            result['model_type'] = model_type
-            result['processing_time_ms'] = (time.time() - start_time) * 1000
-            result['timestamp'] = datetime.now().isoformat()
-            result['service_version'] = '1.0.0'
+            return self._finalize_result(result, model_type, start_time, preprocessing_info)
             
-            # 품질 및 노이즈 정보 추가
-            result['quality_metrics'] = quality_metrics
-            result['optimization_info'] = optimization_info
-            result['noise_info'] = noise_info
+        except Exception as e:
+            logger.error(f"오디오 분석 실패: {e}")
+            return self._create_error_result(f"분석 중 오류 발생: {str(e)}")
+
+    def analyze_batch(self, clips: List[Union[str, np.ndarray]],
+                      model_type: str = 'ensemble',
+                      sr: Optional[int] = None,
+                      enable_noise_cancellation: bool = True,
+                      enable_quality_optimization: bool = True) -> List[Dict]:
+        """
+        다중 클립 일괄 분석
+        
+        클립별 로드/전처리/특징 추출은 워커 풀에서 병렬로 수행하고,
+        특징 벡터를 하나의 행렬로 쌓아 스케일러와 각 모델을 배치당 한 번만 호출합니다.
+        
+        Args:
+            clips: 오디오 파일 경로 또는 오디오 데이터 목록
+            model_type: 사용할 모델 타입 ('lightweight', 'ensemble', 'mimii', 'auto')
+            sr: 샘플링 레이트 (오디오 데이터인 경우)
+            enable_noise_cancellation: 노이즈 캔슬링 활성화
+            enable_quality_optimization: 품질 최적화 활성화
             
-            # 이상 감지 시 알림 전송
-            if result.get('is_overload', False):
-                self._send_diagnosis_alert(result)
+        Returns:
+            입력 순서와 같은 분석 결과 딕셔너리 목록
+        """
+        if not self.is_initialized:
+            return [self._create_error_result("AI 서비스가 초기화되지 않았습니다.") for _ in clips]
+        
+        if model_type not in ('lightweight', 'ensemble', 'mimii', 'auto'):
+            return [self._create_error_result(f"지원하지 않는 모델 타입: {model_type}") for _ in clips]
+        
+        if not clips:
+            return []
+        
+        self._check_model_files()
+        start_time = time.time()
+        # 배치 전체가 같은 모델 세대로 예측
+        snapshot = self._snapshot
+        
+        def prepare(clip):
+            audio_data, sample_rate, preprocessing_info = self._prepare_audio(
+                clip, sr, enable_noise_cancellation, enable_quality_optimization
+            )
+            clip_model = model_type
+            if clip_model == 'auto':
+                clip_model = self._select_best_model(audio_data, sample_rate)
+            
+            if clip_model == 'lightweight':
+                # 규칙 기반이라 배치 이점이 없으므로 워커에서 바로 판별
+                return clip_model, self._analyze_with_lightweight(audio_data, sample_rate), preprocessing_info
+            return clip_model, self._extract_comprehensive_features(audio_data, sample_rate), preprocessing_info
+        
+        results: List[Optional[Dict]] = [None] * len(clips)
+        prepared = []
+        futures = [self._get_batch_executor().submit(prepare, clip) for clip in clips]
+        for index, future in enumerate(futures):
+            try:
+                prepared.append((index,) + future.result())
+            except Exception as e:
+                logger.error(f"배치 클립 {index} 전처리 실패: {e}")
+                results[index] = self._create_error_result(f"분석 중 오류 발생: {str(e)}")
+        
+        # 모델 타입별로 특징 행렬을 쌓아 한 번에 예측
+        for batch_model in ('ensemble', 'mimii'):
+            rows = [(index, features, info) for index, clip_model, features, info in prepared
+                    if clip_model == batch_model]
+            if not rows:
+                continue
+            
+            valid = [(index, features, info) for index, features, info in rows if features is not None]
+            for index, features, info in rows:
+                if features is None:
+                    results[index] = self._finalize_result(
+                        self._create_error_result("특징 추출 실패"), batch_model, start_time, info
+                    )
+            if not valid:
+                continue
+            
+            feature_matrix = np.vstack([features for _, features, _ in valid])
+            if batch_model == 'ensemble':
+                batch_results = self._analyze_batch_with_ensemble(feature_matrix, snapshot)
+            else:
+                batch_results = self._analyze_batch_with_mimii(feature_matrix, snapshot)
             
-            # 스마트 저장 (주의/긴급만 저장)
+            for (index, _, info), result in zip(valid, batch_results):
+                results[index] = self._finalize_result(result, batch_model, start_time, info)
+        
+        for index, clip_model, result, info in prepared:
+            if clip_model == 'lightweight':
+                results[index] = self._finalize_result(result, clip_model, start_time, info)
+        
+        logger.info(f"배치 분석 완료: {len(clips)}개 클립, {(time.time() - start_time) * 1000:.1f}ms")
+        return results
+
+    def analyze_audio_streaming(self, file_path: str,
+                                model_type: str = 'auto',
+                                window_seconds: Optional[float] = None,
+                                enable_noise_cancellation: bool = True,
+                                enable_quality_optimization: bool = True,
+                                max_seconds: Optional[float] = None) -> Dict:
+        """
+        긴 오디오 파일 스트리밍 분석 - 윈도우별 타임라인을 포함한 요약 결과
+        
+        Returns:
+            요약 결과 딕셔너리 ('timeline' 에 윈도우별 결과)
+        """
+        timeline = []
+        summary = None
+        for item in self.iter_audio_analysis(file_path, model_type, window_seconds,
+                                             enable_noise_cancellation, enable_quality_optimization,
+                                             max_seconds):
+            if item['type'] == 'window':
+                timeline.append(item)
+            else:
+                summary = item
+        summary['timeline'] = timeline
+        return summary
+
+    def iter_audio_analysis(self, file_path: str,
+                            model_type: str = 'auto',
+                            window_seconds: Optional[float] = None,
+                            enable_noise_cancellation: bool = True,
+                            enable_quality_optimization: bool = True,
+                            max_seconds: Optional[float] = None) -> Iterator[Dict]:
+        """
+        오디오 파일을 고정 길이 윈도우로 읽으면서 분석 (NDJSON 스트리밍용 제너레이터)
+        
+        soundfile 블록 읽기로 윈도우 하나씩 디코딩하므로 메모리 사용량은 파일 길이와 무관하게
+        STREAM_BATCH_WINDOWS 개 윈도우 크기로 제한됩니다. 각 윈도우는 품질 분석/최적화,
+        노이즈 캔슬링을 거친 뒤 STREAM_BATCH_WINDOWS 개씩 묶어 모델에 한 번에 넣습니다.
+        분석 시간이 max_seconds 를 넘으면 남은 구간은 읽지 않고 요약에 truncated=True 를 표시합니다.
+        
+        Yields:
+            {'type': 'window', ...} 윈도우별 결과, 마지막에 {'type': 'summary', ...} 요약 결과
+        """
+        if not self.is_initialized:
+            yield dict(self._create_error_result("AI 서비스가 초기화되지 않았습니다."), type='summary')
+            return
+        if model_type not in ('lightweight', 'ensemble', 'mimii', 'auto'):
+            yield dict(self._create_error_result(f"지원하지 않는 모델 타입: {model_type}"), type='summary')
+            return
+        
+        self._check_model_files()
+        start_time = time.time()
+        window_seconds = window_seconds or self.STREAM_WINDOW_SECONDS
+        # 스트림 전체가 같은 모델 세대로 예측
+        snapshot = self._snapshot
+        
+        try:
+            info = sf.info(file_path)
+        except Exception as e:
+            logger.error(f"스트리밍 분석 파일 열기 실패: {e}")
+            yield dict(self._create_error_result(f"분석 중 오류 발생: {str(e)}"), type='summary')
+            return
+        
+        duration = info.frames / info.samplerate
+        if model_type == 'auto':
+            # 윈도우가 아닌 파일 전체 길이 기준으로 선택
+            model_type = 'lightweight' if duration < 10 else 'ensemble'
+        
+        windows = 0
+        errors = 0
+        overload_windows = 0
+        confidence_sum = {True: 0.0, False: 0.0}
+        quality_sum = 0.0
+        truncated = False
+        
+        try:
+            for item in self._iter_stream_results(file_path, window_seconds, model_type, snapshot,
+                                                  enable_noise_cancellation, enable_quality_optimization):
+                windows += 1
+                if item.get('error'):
+                    errors += 1
+                else:
+                    overload_windows += item['is_overload']
+                    confidence_sum[item['is_overload']] += item['confidence']
+                    quality_sum += item.get('quality', 0.0)
+                yield item
+                if max_seconds is not None and time.time() - start_time > max_seconds:
+                    truncated = True
+                    logger.warning(f"스트리밍 분석 {max_seconds:.0f}초 초과로 {windows}개 구간에서 중단: {file_path}")
+                    break
+        except Exception as e:
+            logger.error(f"스트리밍 분석 실패: {e}")
+            yield dict(self._create_error_result(f"분석 중 오류 발생: {str(e)}"), type='summary')
+            return
+        
+        analyzed = windows - errors
+        if not analyzed:
+            summary = dict(self._create_error_result("분석 가능한 구간이 없습니다"), type='summary',
+                           windows_analyzed=windows, error_windows=errors, truncated=truncated)
+            yield self._finalize_result(summary, model_type, start_time, {})
+            return
+        
+        # 요약 (이상 윈도우가 하나라도 있으면 이상, 신뢰도는 판정과 같은 윈도우들의 평균)
+        is_overload = overload_windows > 0
+        decided = overload_windows if is_overload else analyzed
+        summary = {
+            'type': 'summary',
+            'is_overload': is_overload,
+            'confidence': confidence_sum[is_overload] / decided,
+            'message': (f'{overload_windows}개 구간에서 이상 감지됨' if is_overload
+                        else '정상 작동 중')
+                       + (f' (분석 시간 제한으로 앞 {windows * window_seconds:.0f}초만 분석)' if truncated else ''),
+            'diagnosis_type': 'streaming_analysis',
+            'duration_sec': float(duration),
+            'window_seconds': float(window_seconds),
+            'windows_analyzed': windows,
+            'overload_windows': overload_windows,
+            'error_windows': errors,
+            'overload_ratio': overload_windows / analyzed,
+            'mean_quality': quality_sum / analyzed,
+            'truncated': truncated,
+        }
+        yield self._finalize_result(summary, model_type, start_time, {})
+
+    def _iter_stream_results(self, file_path: str, window_seconds: float, model_type: str,
+                             snapshot: ModelSnapshot, enable_noise_cancellation: bool,
+                             enable_quality_optimization: bool) -> Iterator[Dict]:
+        """윈도우를 STREAM_BATCH_WINDOWS 개씩 모아 분석한 윈도우별 결과"""
+        batch = []
+        for window in self._iter_audio_windows(file_path, window_seconds):
+            batch.append(window)
+            if len(batch) == self.STREAM_BATCH_WINDOWS:
+                yield from self._analyze_stream_batch(batch, model_type, snapshot,
+                                                      enable_noise_cancellation, enable_quality_optimization)
+                batch = []
+        if batch:
+            yield from self._analyze_stream_batch(batch, model_type, snapshot,
+                                                  enable_noise_cancellation, enable_quality_optimization)
+
+    def _iter_audio_windows(self, file_path: str, window_seconds: float,
+                            target_sr: int = 16000) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """
+        soundfile 블록 읽기로 (인덱스, 시작 시각, 16kHz 모노 윈도우) 를 하나씩 생성
+        
+        원본 샘플링 레이트 기준으로 윈도우를 자른 뒤 윈도우별로 리샘플링합니다.
+        STREAM_MIN_WINDOW_SECONDS 보다 짧은 마지막 조각은 버립니다.
+        """
+        info = sf.info(file_path)
+        window_frames = int(window_seconds * info.samplerate)
+        min_frames = int(min(window_seconds, self.STREAM_MIN_WINDOW_SECONDS) * info.samplerate)
+        for index, block in enumerate(sf.blocks(file_path, blocksize=window_frames,
+                                                dtype='float32', always_2d=True)):
+            if len(block) < min_frames:
+                break
+            # librosa.load(mono=True) 와 같은 채널 평균
+            window = block.mean(axis=1, dtype=np.float32)
+            if info.samplerate != target_sr:
+                window = librosa.resample(window, orig_sr=info.samplerate, target_sr=target_sr)
+            yield index, index * window_seconds, window
+
+    def _analyze_stream_batch(self, batch: List[Tuple[int, float, np.ndarray]], model_type: str,
+                              snapshot: ModelSnapshot, enable_noise_cancellation: bool,
+                              enable_quality_optimization: bool) -> List[Dict]:
+        """
+        윈도우 묶음 분석 - 윈도우별 전처리 후 앙상블/MIMII 는 특징 행렬로 한 번에 예측
+        
+        윈도우 결과는 알림/스마트 저장을 거치지 않고 요약 결과만 _finalize_result 를 거칩니다.
+        """
+        sr = 16000
+        results = []
+        features = []
+        for index, start_sec, window in batch:
+            entry = {
+                'type': 'window',
+                'index': index,
+                'start_sec': float(start_sec),
+                'end_sec': float(start_sec + len(window) / sr),
+            }
             try:
-                store_id = "default_store"  # 실제로는 요청에서 가져와야 함
-                device_id = "default_device"  # 실제로는 요청에서 가져와야 함
-                
-                # 파일 정보 (실제로는 요청에서 가져와야 함)
-                file_info = {
-                    'name': 'audio_file',
-                    'size': 0  # 실제 파일 크기
-                }
-                
-                # 분석 결과 저장 (주의/긴급만)
-                analysis_id = self.storage_service.store_analysis_result(
-                    store_id, device_id, result, file_info
+                audio_data, _, preprocessing_info = self._prepare_audio(
+                    window, sr, enable_noise_cancellation, enable_quality_optimization
                 )
-                
-                if analysis_id:
-                    result['analysis_id'] = analysis_id
-                    result['stored'] = True
+                entry['quality'] = float(preprocessing_info['quality_metrics'].get('overall_quality', 0.0))
+                entry['noise_reduction_db'] = float(preprocessing_info['noise_info'].get('noise_reduction_db', 0.0))
+                if model_type == 'lightweight':
+                    result = self._analyze_with_lightweight(audio_data, sr)
+                    result.pop('features', None)
+                    entry.update(result)
                 else:
-                    result['stored'] = False
-                    
-                # 긍정적 신호 요약 업데이트 (정상인 경우)
-                if not result.get('is_overload', False) and result.get('confidence', 0) > 0.8:
-                    self.storage_service.update_positive_summary(store_id, result)
-                    
+                    feature_vector = self._extract_comprehensive_features(audio_data, sr)
+                    if feature_vector is None:
+                        entry.update(self._create_error_result("특징 추출 실패"))
+                    else:
+                        features.append((len(results), feature_vector))
             except Exception as e:
-                logger.error(f"스마트 저장 실패: {e}")
-                result['stored'] = False
+                logger.error(f"윈도우 {index} 분석 실패: {e}")
+                entry.update(self._create_error_result(f"분석 중 오류 발생: {str(e)}"))
+            results.append(entry)
+        
+        if features:
+            feature_matrix = np.vstack([vector for _, vector in features])
+            if model_type == 'ensemble':
+                batch_results = self._analyze_batch_with_ensemble(feature_matrix, snapshot)
+            else:
+                batch_results = self._analyze_batch_with_mimii(feature_matrix, snapshot)
+            for (position, _), result in zip(features, batch_results):
+                results[position].update(result)
+        return results
+
+    def _stream_duration(self, audio_input: Union[str, np.ndarray]) -> Optional[float]:
+        """soundfile 로 스트리밍할 수 있는 파일이면 길이(초), 아니면 None"""
+        if not isinstance(audio_input, str):
+            return None
+        try:
+            info = sf.info(audio_input)
+            return info.frames / info.samplerate
+        except Exception:
+            return None
+
+    def _get_batch_executor(self) -> ThreadPoolExecutor:
+        """배치 특징 추출용 워커 풀 (지연 생성)"""
+        if self._batch_executor is None:
+            with self.update_lock:
+                if self._batch_executor is None:
+                    self._batch_executor = ThreadPoolExecutor(
+                        max_workers=self.batch_max_workers, thread_name_prefix='ai-batch'
+                    )
+        return self._batch_executor
+
+    def _prepare_audio(self, audio_input: Union[str, np.ndarray], sr: Optional[int],
+                       enable_noise_cancellation: bool,
+                       enable_quality_optimization: bool) -> tuple:
+        """오디오 로드 + 품질 분석/최적화 + 노이즈 캔슬링"""
+        # 오디오 데이터 로드
+        if isinstance(audio_input, str):
+            audio_data, sample_rate = librosa.load(audio_input, sr=16000)
+        else:
+            audio_data = audio_input
+            sample_rate = sr or 16000
+        
+        # 오디오 품질 분석 및 최적화
+        quality_metrics = self._analyze_audio_quality(audio_data, sample_rate)
+        
+        # 품질 최적화 적용
+        if enable_quality_optimization:
+            audio_data, optimization_info = self._optimize_audio_quality(
+                audio_data, sample_rate, quality_metrics
+            )
+        else:
+            optimization_info = {}
+        
+        # 노이즈 캔슬링 적용
+        if enable_noise_cancellation:
+            audio_data, noise_info = self._apply_noise_cancellation(
+                audio_data, sample_rate
+            )
+        else:
+            noise_info = {}
+        
+        preprocessing_info = {
+            'quality_metrics': quality_metrics,
+            'optimization_info': optimization_info,
+            'noise_info': noise_info
+        }
+        return audio_data, sample_rate, preprocessing_info
+
+    def _finalize_result(self, result: Dict, model_type: str, start_time: float,
+                         preprocessing_info: Dict) -> Dict:
+        """공통 결과 포맷팅, 알림 전송, 스마트 저장"""
+        # 공통 결과 포맷팅
+        result['model_type'] = model_type
+        result['processing_time_ms'] = (time.time() - start_time) * 1000
+        result['timestamp'] = datetime.now().isoformat()
+        result['service_version'] = '1.0.0'
+        
+        # 품질 및 노이즈 정보 추가
+        result.update(preprocessing_info)
+        
+        # 이상 감지 시 알림 전송
+        if result.get('is_overload', False):
+            self._send_diagnosis_alert(result)
+        
+        # 스마트 저장 (주의/긴급만 저장)
+        try:
+            store_id = "default_store"  # 실제로는 요청에서 가져와야 함
+            device_id = "default_device"  # 실제로는 요청에서 가져와야 함
             
-            return result
+            # 파일 정보 (실제로는 요청에서 가져와야 함)
+            file_info = {
+                'name': 'audio_file',
+                'size': 0  # 실제 파일 크기
+            }
             
+            # 분석 결과 저장 (주의/긴급만)
+            analysis_id = self.storage_service.store_analysis_result(
+                store_id, device_id, result, file_info
+            )
+            
+            if analysis_id:
+                result['analysis_id'] = analysis_id
+                result['stored'] = True
+            else:
+                result['stored'] = False
+                
+            # 긍정적 신호 요약 업데이트 (정상인 경우)
+            if not result.get('is_overload', False) and result.get('confidence', 0) > 0.8:
+                self.storage_service.update_positive_summary(store_id, result)
+                
         except Exception as e:
-            logger.error(f"오디오 분석 실패: {e}")
-            return self._create_error_result(f"분석 중 오류 발생: {str(e)}")
+            logger.error(f"스마트 저장 실패: {e}")
+            result['stored'] = False
+        
+        return result
 
     def _select_best_model(self, audio_data: np.ndarray, sr: int) -> str:
         """최적의 모델 선택"""
@@ -355,6 +762,9 @@ class UnifiedAIService:
             logger.error(f"Lightweight 분석 실패: {e}")
             return self._create_error_result(f"Lightweight 분석 실패: {str(e)}")
 
+    # 앙상블 가중치 (MIMII에 더 높은 가중치)
+    ENSEMBLE_WEIGHTS = {'mimii_rf': 0.4, 'random_forest': 0.25, 'svm': 0.15, 'mlp': 0.1, 'logistic': 0.1}
+
     def _analyze_with_ensemble(self, audio_data: np.ndarray, sr: int) -> Dict:
         """앙상블 AI로 분석"""
         try:
@@ -363,69 +773,74 @@ class UnifiedAIService:
             if features is None:
                 return self._create_error_result("특징 추출 실패")
             
-            # 각 모델별 예측
-            predictions = {}
-            probabilities = {}
+            return self._analyze_batch_with_ensemble(features.reshape(1, -1))[0]
             
-            for model_name, model in self.models.items():
+        except Exception as e:
+            logger.error(f"앙상블 분석 실패: {e}")
+            return self._create_error_result(f"앙상블 분석 실패: {str(e)}")
+
+    def _analyze_batch_with_ensemble(self, feature_matrix: np.ndarray,
+                                     snapshot: Optional[ModelSnapshot] = None) -> List[Dict]:
+        """특징 행렬(N x D)을 앙상블로 분석 - 모델별 predict/predict_proba 는 배치당 1회"""
+        snapshot = snapshot or self._snapshot
+        try:
+            # 각 모델별 예측 (N개 행을 한 번에)
+            batch_predictions = {}
+            batch_probabilities = {}
+            
+            for model_name, model in snapshot.models.items():
                 if model_name == 'lightweight':
                     continue
                     
                 try:
                     # MIMII 모델은 스케일러 필요
-                    if model_name == 'mimii_rf' and 'mimii_rf' in self.scalers:
-                        features_scaled = self.scalers['mimii_rf'].transform(features.reshape(1, -1))
+                    if model_name == 'mimii_rf' and 'mimii_rf' in snapshot.scalers:
+                        features_scaled = snapshot.scalers['mimii_rf'].transform(feature_matrix)
                     else:
-                        features_scaled = features.reshape(1, -1)
+                        features_scaled = feature_matrix
                     
-                    pred = model.predict(features_scaled)[0]
+                    preds = model.predict(features_scaled)
                     
                     if hasattr(model, 'predict_proba'):
-                        prob = model.predict_proba(features_scaled)[0]
-                        probability = float(max(prob))
+                        probs = model.predict_proba(features_scaled).max(axis=1)
                     else:
-                        probability = 0.5
+                        probs = np.full(len(feature_matrix), 0.5)
                     
-                    predictions[model_name] = int(pred)
-                    probabilities[model_name] = probability
+                    batch_predictions[model_name] = preds.astype(int)
+                    batch_probabilities[model_name] = probs.astype(float)
                     
                 except Exception as e:
                     logger.warning(f"{model_name} 모델 예측 실패: {e}")
                     continue
             
             # 앙상블 결과 계산
-            if not predictions:
-                return self._create_error_result("예측 가능한 모델이 없습니다")
-            
-            # 가중 평균 (MIMII에 더 높은 가중치)
-            weights = {'mimii_rf': 0.4, 'random_forest': 0.25, 'svm': 0.15, 'mlp': 0.1, 'logistic': 0.1}
-            
-            ensemble_prediction = 0
-            ensemble_probability = 0
-            total_weight = 0
-            
-            for model_name, pred in predictions.items():
-                weight = weights.get(model_name, 0.1)
-                ensemble_prediction += pred * weight
-                ensemble_probability += probabilities.get(model_name, 0) * weight
-                total_weight += weight
-            
-            if total_weight > 0:
-                ensemble_prediction = int(round(ensemble_prediction / total_weight))
-                ensemble_probability /= total_weight
-            
-            return {
-                'is_overload': ensemble_prediction == 1,
-                'confidence': ensemble_probability,
-                'message': '과부하음 감지됨' if ensemble_prediction == 1 else '정상 작동 중',
-                'individual_predictions': predictions,
-                'individual_probabilities': probabilities,
-                'diagnosis_type': 'ensemble_analysis'
-            }
+            if not batch_predictions:
+                return [self._create_error_result("예측 가능한 모델이 없습니다") for _ in range(len(feature_matrix))]
+            
+            model_names = list(batch_predictions.keys())
+            weights = np.array([self.ENSEMBLE_WEIGHTS.get(name, 0.1) for name in model_names])
+            pred_matrix = np.column_stack([batch_predictions[name] for name in model_names])
+            prob_matrix = np.column_stack([batch_probabilities[name] for name in model_names])
+            
+            total_weight = weights.sum()
+            ensemble_predictions = np.rint(pred_matrix @ weights / total_weight).astype(int)
+            ensemble_probabilities = prob_matrix @ weights / total_weight
+            
+            results = []
+            for row, ensemble_prediction in enumerate(ensemble_predictions):
+                results.append({
+                    'is_overload': bool(ensemble_prediction == 1),
+                    'confidence': float(ensemble_probabilities[row]),
+                    'message': '과부하음 감지됨' if ensemble_prediction == 1 else '정상 작동 중',
+                    'individual_predictions': {name: int(pred_matrix[row, i]) for i, name in enumerate(model_names)},
+                    'individual_probabilities': {name: float(prob_matrix[row, i]) for i, name in enumerate(model_names)},
+                    'diagnosis_type': 'ensemble_analysis'
+                })
+            return results
             
         except Exception as e:
             logger.error(f"앙상블 분석 실패: {e}")
-            return self._create_error_result(f"앙상블 분석 실패: {str(e)}")
+            return [self._create_error_result(f"앙상블 분석 실패: {str(e)}") for _ in range(len(feature_matrix))]
 
     def _analyze_with_mimii(self, audio_data: np.ndarray, sr: int) -> Dict:
         """MIMII 모델로 분석"""
@@ -438,21 +853,36 @@ class UnifiedAIService:
             if features is None:
                 return self._create_error_result("특징 추출 실패")
             
+            return self._analyze_batch_with_mimii(features.reshape(1, -1))[0]
+            
+        except Exception as e:
+            logger.error(f"MIMII 분석 실패: {e}")
+            return self._create_error_result(f"MIMII 분석 실패: {str(e)}")
+
+    def _analyze_batch_with_mimii(self, feature_matrix: np.ndarray,
+                                  snapshot: Optional[ModelSnapshot] = None) -> List[Dict]:
+        """특징 행렬(N x D)을 MIMII 모델로 분석"""
+        snapshot = snapshot or self._snapshot
+        try:
+            if 'mimii_rf' not in snapshot.models:
+                return [self._create_error_result("MIMII 모델이 로드되지 않았습니다") for _ in range(len(feature_matrix))]
+            
             # MIMII 모델 예측
-            features_scaled = self.scalers['mimii_rf'].transform(features.reshape(1, -1))
-            prediction = self.models['mimii_rf'].predict(features_scaled)[0]
-            probability = self.models['mimii_rf'].predict_proba(features_scaled)[0].max()
+            model = snapshot.models['mimii_rf']
+            features_scaled = snapshot.scalers['mimii_rf'].transform(feature_matrix)
+            predictions = model.predict(features_scaled)
+            probabilities = model.predict_proba(features_scaled).max(axis=1)
             
-            return {
-                'is_overload': prediction == 1,
+            return [{
+                'is_overload': bool(prediction == 1),
                 'confidence': float(probability),
                 'message': 'MIMII 이상 감지됨' if prediction == 1 else 'MIMII 정상',
                 'diagnosis_type': 'mimii_analysis'
-            }
+            } for prediction, probability in zip(predictions, probabilities)]
             
         except Exception as e:
             logger.error(f"MIMII 분석 실패: {e}")
-            return self._create_error_result(f"MIMII 분석 실패: {str(e)}")
+            return [self._create_error_result(f"MIMII 분석 실패: {str(e)}") for _ in range(len(feature_matrix))]
 
     def _preprocess_audio_lightweight(self, audio_data: np.ndarray, sr: int) -> np.ndarray:
         """Lightweight AI용 오디오 전처리"""
@@ -568,71 +998,10 @@ class UnifiedAIService:
             return False, 0.0
 
     def _extract_comprehensive_features(self, audio_data: np.ndarray, sr: int) -> Optional[np.ndarray]:
-        """포괄적인 특징 추출 (앙상블용)"""
+        """포괄적인 특징 추출 (앙상블용) - 공유 스펙트로그램 엔진 사용"""
         try:
             y, sr = librosa.load(audio_data, sr=16000) if isinstance(audio_data, str) else (audio_data, sr)
-            features = []
-
-            # 주요 특징들 계산
-            rms = librosa.feature.rms(y=y)[0]
-            zcr = librosa.feature.zero_crossing_rate(y)[0]
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-            fft_magnitude = np.abs(np.fft.fft(y))
-            chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-            tonnetz = librosa.feature.tonnetz(y=y, sr=sr)
-            spectral_contrast = librosa.feature.spectral_contrast(y=y, sr=sr)
-            stft = librosa.stft(y)
-            freqs = librosa.fft_frequencies(sr=sr)
-
-            # 통계적 특징 추출
-            features.extend([np.mean(rms), np.std(rms), np.max(rms), np.min(rms)])
-            features.extend([np.mean(zcr), np.std(zcr), np.max(zcr), np.min(zcr)])
-            features.extend([np.mean(spectral_centroid), np.std(spectral_centroid), np.max(spectral_centroid), np.min(spectral_centroid)])
-            features.extend([np.mean(spectral_rolloff), np.std(spectral_rolloff), np.max(spectral_rolloff), np.min(spectral_rolloff)])
-            features.extend([np.mean(spectral_bandwidth), np.std(spectral_bandwidth), np.max(spectral_bandwidth), np.min(spectral_bandwidth)])
-            features.append(tempo)
-
-            # MFCC 특징
-            for i in range(13):
-                features.extend([np.mean(mfccs[i]), np.std(mfccs[i]), np.max(mfccs[i]), np.min(mfccs[i])])
-
-            # FFT 특징
-            features.extend([np.mean(fft_magnitude), np.std(fft_magnitude), np.max(fft_magnitude), np.min(fft_magnitude)])
-
-            # Chroma 특징
-            for i in range(12):
-                features.extend([np.mean(chroma[i]), np.std(chroma[i])])
-
-            # Tonnetz 특징
-            for i in range(6):
-                features.extend([np.mean(tonnetz[i]), np.std(tonnetz[i])])
-
-            # Spectral Contrast 특징
-            for i in range(7):
-                features.extend([np.mean(spectral_contrast[i]), np.std(spectral_contrast[i])])
-
-            # 냉매 누수 및 과부하 특성
-            leak_freq_range = (2000, 8000)
-            leak_indices = np.where((freqs >= leak_freq_range[0]) & (freqs <= leak_freq_range[1]))[0]
-            if len(leak_indices) > 0:
-                leak_energy = np.sum(np.abs(stft[leak_indices, :]))
-                features.extend([np.mean(leak_energy), np.std(leak_energy), np.max(leak_energy), np.min(leak_energy)])
-            else:
-                features.extend([0, 0, 0, 0])
-
-            overload_freq_range = (50, 500)
-            overload_indices = np.where((freqs >= overload_freq_range[0]) & (freqs <= overload_freq_range[1]))[0]
-            if len(overload_indices) > 0:
-                overload_energy = np.sum(np.abs(stft[overload_indices, :]))
-                features.extend([np.mean(overload_energy), np.std(overload_energy), np.max(overload_energy), np.min(overload_energy)])
-            else:
-                features.extend([0, 0, 0, 0])
-
-            return np.array(features)
+            return spectral_feature_engine.extract(y, sr)
 
         except Exception as e:
             logger.error(f"포괄적 특징 추출 실패: {e}")
@@ -650,51 +1019,197 @@ class UnifiedAIService:
 
     def get_model_info(self) -> Dict:
         """모델 정보 반환"""
+        snapshot = self._snapshot
         return {
             'initialized': self.is_initialized,
-            'models_count': len(self.models),
-            'model_types': list(self.models.keys()),
-            'model_versions': self.model_versions,
+            'models_count': len(snapshot.models),
+            'model_types': list(snapshot.models.keys()),
+            'model_versions': dict(snapshot.versions),
+            'registry_generation': snapshot.generation,
+            'pending_reloads': sorted(self._pending_reloads),
             'last_update': self.last_update.isoformat() if self.last_update else None,
             'metadata': self.model_metadata
         }
 
     def update_model(self, model_name: str, model_data: bytes, version: str) -> bool:
-        """모델 OTA 업데이트"""
+        """모델 OTA 업데이트 (파일 저장 후 로드/워밍업/교체까지 동기 수행)"""
         try:
-            with self.update_lock:
-                # 모델 파일 저장
-                model_path = os.path.join(self.models_dir, f'{model_name}.pkl')
-                os.makedirs(os.path.dirname(model_path), exist_ok=True)
-                
-                with open(model_path, 'wb') as f:
-                    f.write(model_data)
-                
-                # 모델 로드
-                if model_name.endswith('_scaler'):
-                    self.scalers[model_name] = joblib.load(model_path)
-                else:
-                    self.models[model_name] = joblib.load(model_path)
-                
-                # 버전 업데이트
-                self.model_versions[model_name] = version
-                
-                # 메타데이터 업데이트
-                self.model_metadata[model_name] = {
-                    'version': version,
-                    'updated_at': datetime.now().isoformat(),
-                    'file_size': len(model_data)
-                }
-                self._save_model_metadata()
-                
-                self.last_update = datetime.now()
-                logger.info(f"모델 {model_name} v{version} 업데이트 완료")
-                return True
+            # 모델 파일 저장 (다른 워커가 쓰는 중인 파일을 읽지 않도록 임시 파일에서 교체)
+            model_path = os.path.join(self.models_dir, f'{model_name}.pkl')
+            os.makedirs(os.path.dirname(model_path), exist_ok=True)
+            tmp_path = f'{model_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(model_data)
+            os.replace(tmp_path, model_path)
+            
+            return self._load_and_swap(model_name, model_path, version)
 
         except Exception as e:
             logger.error(f"모델 업데이트 실패: {e}")
             return False
 
+    def reload_model(self, model_name: str, model_path: Optional[str] = None,
+                     version: Optional[str] = None) -> Future:
+        """
+        모델 핫 리로드 - 백그라운드에서 로드와 워밍업(테스트 예측)을 마친 뒤 스냅샷을 교체
+        
+        Args:
+            model_name: 모델 키('mimii_rf') 또는 모델 파일 이름('mimii_model', 'mimii_scaler', 'xxx_scaler')
+            model_path: 모델 파일 경로 (기본값: models_dir 의 파일)
+            version: 버전 (기본값: {파일 이름}_version.json 의 버전)
+            
+        Returns:
+            교체 성공 여부(bool)를 돌려주는 Future
+        """
+        key = self._resolve_model_files(model_name)[0]
+        with self.update_lock:
+            if key in self._pending_reloads and model_path is None and version is None:
+                done = Future()
+                done.set_result(True)
+                return done
+            self._pending_reloads.add(key)
+        
+        def job():
+            try:
+                return self._load_and_swap(model_name, model_path, version)
+            finally:
+                with self.update_lock:
+                    self._pending_reloads.discard(key)
+        
+        return self._get_reload_executor().submit(job)
+
+    def _get_reload_executor(self) -> ThreadPoolExecutor:
+        """모델 리로드 전용 단일 스레드 (gunicorn preload 후 fork 된 워커마다 새로 생성)"""
+        pid = os.getpid()
+        if self._reload_executor is None or self._reload_pid != pid:
+            with self.update_lock:
+                if self._reload_executor is None or self._reload_pid != pid:
+                    self._reload_executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix='ai-model-reload'
+                    )
+                    self._reload_pid = pid
+        return self._reload_executor
+
+    def _resolve_model_files(self, model_name: str,
+                             model_path: Optional[str] = None) -> Tuple[str, Optional[str], Optional[str]]:
+        """모델 이름 → (모델 키, 모델 파일, 스케일러 파일), 스케일러 이름이면 모델 파일은 None"""
+        for key, (model_file, scaler_file) in self.MODEL_FILES.items():
+            if model_name in (key, os.path.splitext(model_file)[0]):
+                return (key, model_path or os.path.join(self.models_dir, model_file),
+                        os.path.join(self.models_dir, scaler_file))
+            if model_name == os.path.splitext(scaler_file)[0]:
+                return key, None, model_path or os.path.join(self.models_dir, scaler_file)
+        
+        if model_name.endswith('_scaler'):
+            key = self._resolve_model_files(model_name[:-len('_scaler')])[0]
+            return key, None, model_path or os.path.join(self.models_dir, f'{model_name}.pkl')
+        return (model_name, model_path or os.path.join(self.models_dir, f'{model_name}.pkl'),
+                os.path.join(self.models_dir, f'{model_name}_scaler.pkl'))
+
+    def _load_and_swap(self, model_name: str, model_path: Optional[str] = None,
+                       version: Optional[str] = None) -> bool:
+        """모델(과 스케일러) 로드 → 워밍업 → 새 스냅샷으로 교체, 실패 시 기존 버전 유지"""
+        key, model_file, scaler_file = self._resolve_model_files(model_name, model_path)
+        try:
+            model = scaler = None
+            if model_file:
+                self._record_model_file(key, model_file)
+                model = load_model_file(model_file)
+            if scaler_file and os.path.exists(scaler_file):
+                self._record_model_file(key, scaler_file)
+                scaler = load_model_file(scaler_file)
+            
+            current = self._snapshot
+            self._warm_up(model if model is not None else current.models.get(key),
+                          scaler if scaler is not None else current.scalers.get(key))
+        except Exception as e:
+            logger.error(f"모델 {key} 로드/워밍업 실패, 기존 버전 유지: {e}")
+            return False
+        
+        version = version or self._read_model_version(model_file or scaler_file) or '1.0.0'
+        # 버전 파일이 모델 파일보다 늦게 기록되는 경우도 다시 감지
+        self._record_model_file(key, os.path.splitext(model_file or scaler_file)[0] + '_version.json')
+        with self.update_lock:
+            current = self._snapshot
+            models = dict(current.models)
+            scalers = dict(current.scalers)
+            versions = dict(current.versions)
+            if model is not None:
+                models[key] = model
+            if scaler is not None:
+                scalers[key] = scaler
+            versions[key] = version
+            self._snapshot = ModelSnapshot(current.generation + 1, models, scalers, versions)
+            
+            # 메타데이터 업데이트
+            loaded_file = model_file or scaler_file
+            self.model_metadata[key] = {
+                'version': version,
+                'updated_at': datetime.now().isoformat(),
+                'file_size': os.path.getsize(loaded_file) if os.path.exists(loaded_file) else 0
+            }
+            self._save_model_metadata()
+            self.last_update = datetime.now()
+        
+        logger.info(f"모델 {key} v{version} 교체 완료 (세대 {current.generation + 1})")
+        return True
+
+    def _warm_up(self, model: Any, scaler: Any):
+        """교체 전 테스트 예측 (실패하면 교체하지 않고, 첫 호출 지연도 요청 전에 소모)"""
+        if model is None or not hasattr(model, 'predict'):
+            return
+        n_features = (getattr(scaler, 'n_features_in_', None) or
+                      getattr(model, 'n_features_in_', None) or FEATURE_DIM)
+        sample = np.zeros((1, n_features))
+        if scaler is not None:
+            sample = scaler.transform(sample)
+        model.predict(sample)
+        if hasattr(model, 'predict_proba'):
+            model.predict_proba(sample)
+
+    def _read_model_version(self, model_file: Optional[str]) -> Optional[str]:
+        """모델 관리 서비스가 남긴 {파일 이름}_version.json 의 버전"""
+        if not model_file:
+            return None
+        version_file = os.path.splitext(model_file)[0] + '_version.json'
+        try:
+            with open(version_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('version')
+        except (OSError, ValueError):
+            return None
+
+    def _record_model_file(self, key: str, path: str):
+        """로드한 모델 파일의 (크기, 수정 시각) 기록"""
+        try:
+            stat = os.stat(path)
+            self._model_files[path] = (key, (stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            pass
+
+    def _check_model_files(self):
+        """
+        다른 워커 프로세스(모델 관리 서비스)가 교체한 모델 파일 감지
+        
+        MODEL_CHECK_INTERVAL 마다 기록된 파일만 stat 하고, 바뀐 모델은 백그라운드에서 리로드하므로
+        gunicorn preload 워커도 재시작 없이 새 모델로 넘어갑니다.
+        """
+        now = time.monotonic()
+        if now - self._last_model_check < self.MODEL_CHECK_INTERVAL:
+            return
+        self._last_model_check = now
+        
+        changed = set()
+        for path, (key, signature) in list(self._model_files.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != signature:
+                changed.add(key)
+        for key in changed:
+            logger.info(f"모델 파일 변경 감지: {key}")
+            self.reload_model(key)
+
     def _send_diagnosis_alert(self, diagnosis_result: Dict):
         """진단 경고 알림 전송"""
         try:
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+AI 분석 작업 큐 서비스
+업로드된 오디오 분석을 요청 워커(gunicorn sync)에서 떼어내 별도 프로세스 풀에서 실행합니다.
+
+- 작업 상태는 SQLite(WAL) 테이블에 기록하므로 어느 gunicorn 워커로 조회가 와도 같은 결과를 봅니다
+- 호스트당 하나의 프로세스만 디스패처가 됩니다 (잠금 파일 flock), 디스패처가 큐에서 작업을 꺼내
+  spawn 방식 프로세스 풀(max_workers 개)에 넣고 결과를 테이블에 기록
+- 디스패처 프로세스가 종료되면 잠금이 풀리고, 다음 제출/조회 요청을 받은 프로세스가 이어받아
+  실행 중이던 작업을 다시 대기열에 넣습니다 (max_attempts 회까지)
+- 대기+실행 작업이 max_pending 이상이면 제출을 거절 (입장 제어)
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경: 단일 프로세스 서버로 간주
+    fcntl = None
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'data/analysis_jobs.db'
+# 대기+실행 중 작업 상한, 분석 프로세스 수, 완료 작업 보관 시간(초)
+MAX_PENDING_JOBS = 32
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+JOB_TTL_SECONDS = 3600
+# 디스패처가 다른 워커가 넣은 작업을 확인하는 간격(초)
+POLL_INTERVAL = 0.5
+# 워커 프로세스 비정상 종료 등으로 다시 시도하는 최대 횟수
+MAX_ATTEMPTS = 2
+
+CREATE_JOBS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS analysis_jobs (
+        job_id TEXT PRIMARY KEY,
+        file_path TEXT NOT NULL,
+        model_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        submitted_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        result TEXT,
+        error TEXT
+    )
+'''
+CREATE_JOBS_INDEX = 'CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs(status, submitted_at)'
+
+
+def run_analysis_job(file_path: str, model_type: str) -> Dict:
+    """워커 프로세스에서 실행되는 분석 (프로세스마다 모델은 처음 한 번만 로드)"""
+    from services.ai_service import unified_ai_service
+    return unified_ai_service.analyze_audio(file_path, model_type=model_type)
+
+
+def _init_worker():
+    """워커 시작 시 모델을 미리 로드해 첫 작업 지연을 줄임"""
+    import services.ai_service  # noqa: F401
+
+
+class AnalysisJobService:
+    """SQLite 기반 분석 작업 큐 + 프로세스 풀 디스패처"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_workers: int = MAX_WORKERS,
+                 max_pending: int = MAX_PENDING_JOBS, job_ttl: float = JOB_TTL_SECONDS,
+                 poll_interval: float = POLL_INTERVAL):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.poll_interval = poll_interval
+
+        # 이 프로세스에서 거절한 제출 수
+        self.rejected = 0
+
+        # 디스패처 상태 (잠금을 잡은 프로세스에서만 사용)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._dispatcher_pid = None
+        self._lock_file = None
+        self._lock_file_pid = None
+        self._executor = None
+        self._executor_broken = False
+        self._running: Dict[str, Future] = {}
+        self._last_purge = 0.0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(CREATE_JOBS_TABLE)
+            conn.execute(CREATE_JOBS_INDEX)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, file_path: str, model_type: str = 'auto') -> Optional[str]:
+        """
+        분석 작업 제출
+
+        Returns:
+            작업 ID, 대기열이 가득 차면 None (파일은 호출한 쪽이 정리)
+        """
+        self._ensure_dispatcher()
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM analysis_jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                conn.execute('ROLLBACK')
+                self.rejected += 1
+                return None
+            conn.execute(
+                "INSERT INTO analysis_jobs (job_id, file_path, model_type, status, submitted_at) "
+                "VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, file_path, model_type, time.time())
+            )
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        self._wake.set()
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """작업 상태 및 결과 (없으면 None)"""
+        self._ensure_dispatcher()
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM analysis_jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = {
+                'job_id': row['job_id'],
+                'status': row['status'],
+                'model_type': row['model_type'],
+                'submitted_at': row['submitted_at'],
+                'started_at': row['started_at'],
+                'finished_at': row['finished_at'],
+                'result': json.loads(row['result']) if row['result'] else None,
+                'error': row['error'],
+            }
+            if row['status'] == 'queued':
+                job['queue_position'] = conn.execute(
+                    "SELECT COUNT(*) FROM analysis_jobs WHERE status = 'queued' AND submitted_at <= ?",
+                    (row['submitted_at'],)
+                ).fetchone()[0]
+            return job
+        finally:
+            conn.close()
+
+    def get_metrics(self) -> Dict:
+        """대기열 깊이, 상태별 작업 수, 최근 대기/처리 시간"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute(
+                'SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status'
+            ).fetchall())
+            oldest = conn.execute(
+                "SELECT MIN(submitted_at) FROM analysis_jobs WHERE status = 'queued'"
+            ).fetchone()[0]
+            recent = conn.execute(
+                "SELECT AVG(started_at - submitted_at), AVG(finished_at - started_at) FROM analysis_jobs "
+                "WHERE status IN ('done', 'failed') AND started_at IS NOT NULL AND finished_at >= ?",
+                (now - self.job_ttl,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        return {
+            'queue_depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'max_pending': self.max_pending,
+            'max_workers': self.max_workers,
+            'oldest_queued_seconds': now - oldest if oldest else 0.0,
+            'avg_wait_seconds': recent[0] or 0.0,
+            'avg_run_seconds': recent[1] or 0.0,
+            'rejected': self.rejected,
+            'is_dispatcher': self._dispatcher_pid == os.getpid(),
+        }
+
+    # ------------------------------------------------------------------
+    # 디스패처
+    # ------------------------------------------------------------------
+
+    def _ensure_dispatcher(self):
+        """디스패처가 없으면 잠금을 시도해 이 프로세스에서 시작 (fork 된 워커마다 다시 판단)"""
+        pid = os.getpid()
+        if self._dispatcher_pid == pid:
+            return
+        with self._lock:
+            if self._dispatcher_pid == pid:
+                return
+            if self._lock_file is not None and self._lock_file_pid != pid:
+                # fork 전에 부모가 연 잠금 파일은 버림 (잠금은 부모 것)
+                self._lock_file = None
+            if self._lock_file is None:
+                self._lock_file = open(self.db_path + '.lock', 'a')
+                self._lock_file_pid = pid
+            if fcntl is not None:
+                try:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return  # 다른 프로세스가 디스패처
+
+            self._dispatcher_pid = pid
+            self._running = {}
+            self._requeue_orphans()
+            self._executor = self._create_executor()
+            threading.Thread(target=self._dispatch_loop, name='analysis-job-dispatcher', daemon=True).start()
+            logger.info(f"분석 작업 디스패처 시작 (pid {pid}, 워커 {self.max_workers}개)")
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # fork 하면 부모의 TensorFlow 스레드/모델 상태를 복제하므로 spawn 사용
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=mp.get_context('spawn'),
+            initializer=_init_worker
+        )
+
+    def _requeue_orphans(self):
+        """이전 디스패처가 실행하던 작업을 대기열로 되돌리거나 재시도 한도를 넘으면 실패 처리"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'failed', finished_at = ?, error = ? "
+                "WHERE status = 'running' AND attempts >= ?",
+                (time.time(), '분석 프로세스가 비정상 종료되었습니다', MAX_ATTEMPTS)
+            )
+            requeued = conn.execute(
+                "UPDATE analysis_jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            ).rowcount
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        if requeued:
+            logger.warning(f"이전 디스패처의 실행 중 작업 {requeued}개를 대기열로 되돌림")
+
+    def _dispatch_loop(self):
+        while True:
+            self._wake.clear()
+            try:
+                if self._executor_broken:
+                    # 워커 프로세스가 죽으면 풀 전체가 못 쓰게 되므로 새로 만듦
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._create_executor()
+                    self._executor_broken = False
+                    logger.warning("분석 프로세스 풀 재생성")
+                free = self.max_workers - len(self._running)
+                if free > 0:
+                    for job_id, file_path, model_type in self._claim_jobs(free):
+                        try:
+                            future = self._executor.submit(run_analysis_job, file_path, model_type)
+                        except BrokenProcessPool as e:
+                            self._executor_broken = True
+                            self._retry_or_fail(job_id, file_path, str(e))
+                            continue
+                        self._running[job_id] = future
+                        future.add_done_callback(
+                            lambda f, job_id=job_id, file_path=file_path: self._on_done(job_id, file_path, f)
+                        )
+                if time.monotonic() - self._last_purge > 60:
+                    self._purge_expired()
+            except Exception as e:
+                logger.error(f"분석 작업 디스패치 오류: {e}")
+            self._wake.wait(self.poll_interval)
+
+    def _claim_jobs(self, limit: int):
+        """가장 오래된 대기 작업을 limit 개까지 실행 상태로 전환"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                "SELECT job_id, file_path, model_type FROM analysis_jobs WHERE status = 'queued' "
+                "ORDER BY submitted_at LIMIT ?", (limit,)
+            ).fetchall()
+            now = time.time()
+            conn.executemany(
+                "UPDATE analysis_jobs SET status = 'running', started_at = ?, attempts = attempts + 1 "
+                "WHERE job_id = ?", [(now, row['job_id']) for row in rows]
+            )
+            conn.execute('COMMIT')
+            return [tuple(row) for row in rows]
+        finally:
+            conn.close()
+
+    def _on_done(self, job_id: str, file_path: str, future: Future):
+        """작업 결과 기록 및 업로드 파일 정리"""
+        try:
+            result = future.result()
+            status, result_json, error = 'done', json.dumps(result, ensure_ascii=False, default=str), None
+            if result.get('error'):
+                status, error = 'failed', result.get('message')
+        except BrokenProcessPool as e:
+            logger.error(f"분석 작업 {job_id} 실행 중 워커 프로세스 종료: {e}")
+            self._executor_broken = True
+            self._running.pop(job_id, None)
+            self._retry_or_fail(job_id, file_path, str(e))
+            self._wake.set()
+            return
+        except Exception as e:
+            logger.error(f"분석 작업 {job_id} 실패: {e}")
+            status, result_json, error = 'failed', None, str(e)
+
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'UPDATE analysis_jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE job_id = ?',
+                    (status, time.time(), result_json, error, job_id)
+                )
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"분석 작업 {job_id} 결과 기록 실패: {e}")
+        finally:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            self._running.pop(job_id, None)
+            self._wake.set()
+
+    def _retry_or_fail(self, job_id: str, file_path: str, error: str):
+        """재시도 한도 안이면 대기열로 되돌리고, 넘으면 실패 처리 후 파일 정리"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            attempts = conn.execute(
+                'SELECT attempts FROM analysis_jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()[0]
+            if attempts < MAX_ATTEMPTS:
+                conn.execute(
+                    "UPDATE analysis_jobs SET status = 'queued', started_at = NULL WHERE job_id = ?", (job_id,)
+                )
+            else:
+                conn.execute(
+                    "UPDATE analysis_jobs SET status = 'failed', finished_at = ?, error = ? WHERE job_id = ?",
+                    (time.time(), error, job_id)
+                )
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        if attempts >= MAX_ATTEMPTS:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+    def _purge_expired(self):
+        """보관 시간이 지난 완료/실패 작업 삭제"""
+        self._last_purge = time.monotonic()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "DELETE FROM analysis_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - self.job_ttl,)
+            )
+        finally:
+            conn.close()
+
+
+# 전역 인스턴스
+analysis_job_service = AnalysisJobService()
@@ -18,6 +18,8 @@ from scipy import stats
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 
+from services.sensor_rollups import ROLLUP_METRICS, fetch_series, fetch_summary, metric_mean, metric_std
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,7 +48,12 @@ class AnomalyPattern:
 
 @dataclass
 class PerformanceMetrics:
-    """성능 메트릭"""
+    """
+    성능 메트릭
+
+    average/min/max/standard_deviation 은 원본 측정값 기준 (롤업 합계로 계산),
+    percentile_95/99 는 1시간 평균 값들의 백분위 (percentile_basis) 라 원본 백분위보다 작게 나옴
+    """
     metric_name: str
     current_value: float
     average_value: float
@@ -56,6 +63,7 @@ class PerformanceMetrics:
     percentile_95: float
     percentile_99: float
     trend: str
+    percentile_basis: str = 'hourly_mean'
 
 class AnalyticsService:
     """데이터 분석 및 통계 서비스 (AWS CloudWatch 스타일)"""
@@ -73,7 +81,7 @@ class AnalyticsService:
             # 센서 데이터 조회
             sensor_data = self._get_sensor_data_for_analysis(store_id, days)
             
-            if not sensor_data:
+            if sensor_data.empty:
                 return []
             
             trends = []
@@ -105,46 +113,18 @@ class AnalyticsService:
             return []
     
     def _get_sensor_data_for_analysis(self, store_id: str = None, days: int = 30) -> pd.DataFrame:
-        """분석용 센서 데이터 조회"""
+        """분석용 센서 데이터 조회 (1시간 롤업 평균, store_id 가 없으면 전체 디바이스 합산)"""
         try:
             with connect(self.db_path) as conn:
                 start_timestamp = time.time() - (days * 86400)
+                rows = fetch_series(conn, '1h', start_timestamp, device_id=store_id)
                 
-                if store_id:
-                    query = '''
-                        SELECT 
-                            timestamp,
-                            temperature,
-                            vibration_x,
-                            vibration_y,
-                            vibration_z,
-                            power_consumption,
-                            audio_level,
-                            sensor_quality
-                        FROM sensor_readings 
-                        WHERE device_id = ? AND timestamp > ?
-                        ORDER BY timestamp
-                    '''
-                    df = pd.read_sql_query(query, conn, params=(store_id, start_timestamp))
-                else:
-                    query = '''
-                        SELECT 
-                            timestamp,
-                            temperature,
-                            vibration_x,
-                            vibration_y,
-                            vibration_z,
-                            power_consumption,
-                            audio_level,
-                            sensor_quality
-                        FROM sensor_readings 
-                        WHERE timestamp > ?
-                        ORDER BY timestamp
-                    '''
-                    df = pd.read_sql_query(query, conn, params=(start_timestamp,))
-                
-                # 진동 레벨 계산
-                df['vibration'] = np.sqrt(df['vibration_x']**2 + df['vibration_y']**2 + df['vibration_z']**2)
+                # 시간 버킷별 메트릭 평균 (vibration 은 3축 크기의 평균)
+                df = pd.DataFrame({
+                    'timestamp': [row['bucket'] for row in rows],
+                    'readings': [row['readings'] for row in rows],
+                    **{metric: [metric_mean(row, metric) for row in rows] for metric in ROLLUP_METRICS},
+                }, dtype=float)
                 
                 # 시간 컬럼 추가
                 df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
@@ -198,7 +178,7 @@ class AnalyticsService:
             confidence = max(0, min(1, r2))
             
             # 다음 주 예측
-            next_week_value = model.predict([[len(data) + 7 * 24 * 6]])[0]  # 7일 후 (10분 간격)
+            next_week_value = model.predict([[len(data) + 7 * 24]])[0]  # 7일 후 (1시간 간격)
             
             # 권장사항 생성
             recommendation = self._generate_recommendation(metric, trend_direction, change_percentage, next_week_value)
@@ -454,7 +434,7 @@ class AnalyticsService:
             return []
     
     def calculate_performance_metrics(self, store_id: str = None, days: int = 30) -> List[PerformanceMetrics]:
-        """성능 메트릭 계산"""
+        """성능 메트릭 계산 (백분위는 1시간 평균 기준, PerformanceMetrics 참고)"""
         try:
             # 센서 데이터 조회
             sensor_data = self._get_sensor_data_for_analysis(store_id, days)
@@ -462,6 +442,10 @@ class AnalyticsService:
             if sensor_data.empty:
                 return []
             
+            # 평균/최소/최대/표준편차는 롤업 합계로 원본 기준 값 계산 (백분위는 시간별 평균 기준)
+            with connect(self.db_path) as conn:
+                summary = fetch_summary(conn, '1h', time.time() - (days * 86400), device_id=store_id)
+            
             metrics = []
             
             # 각 메트릭별 성능 지표 계산
@@ -474,10 +458,10 @@ class AnalyticsService:
                     if len(data) > 0:
                         # 기본 통계
                         current_value = data.iloc[-1] if len(data) > 0 else 0
-                        average_value = data.mean()
-                        min_value = data.min()
-                        max_value = data.max()
-                        std_value = data.std()
+                        average_value = metric_mean(summary, metric)
+                        min_value = summary[f'{metric}_min']
+                        max_value = summary[f'{metric}_max']
+                        std_value = metric_std(summary, metric) or 0.0
                         percentile_95 = data.quantile(0.95)
                         percentile_99 = data.quantile(0.99)
                         
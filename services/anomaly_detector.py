@@ -7,6 +7,10 @@ import pandas as pd
 import joblib
 import json
 import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import logging
@@ -16,8 +20,13 @@ from sklearn.metrics import classification_report, confusion_matrix
 import warnings
 warnings.filterwarnings('ignore')
 
+from .esp32_data_processor import ESP32DataProcessor
+
 logger = logging.getLogger(__name__)
 
+# 마이크로배처 종료 토큰
+_STOP = '__stop__'
+
 class CompressorAnomalyDetector:
     """압축기 이상 탐지 모델 클래스"""
     
@@ -40,6 +49,9 @@ class CompressorAnomalyDetector:
         
         # 모델 디렉토리 생성
         os.makedirs(model_dir, exist_ok=True)
+        
+        # 특징 추출기 (예측마다 새로 만들지 않고 상주)
+        self.processor = ESP32DataProcessor()
     
     def train(self, normal_data: List[Dict], contamination: float = 0.1) -> Dict:
         """
@@ -58,12 +70,8 @@ class CompressorAnomalyDetector:
             if len(normal_data) < 10:
                 raise ValueError("학습에 충분한 데이터가 없습니다. 최소 10개 이상 필요합니다.")
             
-            # 데이터 전처리
-            from .esp32_data_processor import ESP32DataProcessor
-            processor = ESP32DataProcessor()
-            
             # 특징 추출
-            features = processor.extract_features(normal_data)
+            features = self.processor.extract_features(normal_data)
             
             if features.size == 0:
                 raise ValueError("특징 추출에 실패했습니다.")
@@ -131,75 +139,24 @@ class CompressorAnomalyDetector:
         Returns:
             예측 결과 딕셔너리
         """
-        try:
-            if not self.is_trained or self.model is None:
-                return {
-                    "is_anomaly": False,
-                    "anomaly_score": 0.0,
-                    "confidence": 0.0,
-                    "error": "모델이 학습되지 않았습니다."
-                }
-            
-            # 단일 데이터를 리스트로 변환
-            data_list = [sensor_data]
-            
-            # 특징 추출
-            from .esp32_data_processor import ESP32DataProcessor
-            processor = ESP32DataProcessor()
-            features = processor.extract_features(data_list)
-            
-            if features.size == 0:
-                return {
-                    "is_anomaly": False,
-                    "anomaly_score": 0.0,
-                    "confidence": 0.0,
-                    "error": "특징 추출 실패"
-                }
-            
-            # 데이터 정규화
-            features_scaled = self.scaler.transform(features)
-            
-            # 이상 탐지 예측
-            prediction = self.model.predict(features_scaled)[0]  # -1: 이상, 1: 정상
-            anomaly_score = self.model.decision_function(features_scaled)[0]  # 이상 점수
-            
-            # 결과 해석
-            is_anomaly = prediction == -1
-            confidence = abs(anomaly_score)  # 절댓값이 클수록 확신도 높음
-            
-            # 이상 점수를 0-1 범위로 정규화
-            normalized_score = self._normalize_anomaly_score(anomaly_score)
-            
-            result = {
-                "is_anomaly": is_anomaly,
-                "anomaly_score": normalized_score,
-                "raw_anomaly_score": float(anomaly_score),
-                "confidence": float(confidence),
-                "prediction": int(prediction),
-                "timestamp": datetime.now().isoformat(),
-                "success": True
-            }
-            
-            # 이상 감지 시 추가 정보
-            if is_anomaly:
-                result["severity"] = self._calculate_severity(normalized_score)
-                result["recommendation"] = self._get_recommendation(sensor_data, normalized_score)
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"이상 탐지 예측 실패: {e}")
+        if not self.is_trained or self.model is None:
             return {
                 "is_anomaly": False,
                 "anomaly_score": 0.0,
                 "confidence": 0.0,
-                "error": str(e),
-                "success": False
+                "error": "모델이 학습되지 않았습니다."
             }
+        
+        result = self.predict_batch([sensor_data])[0]
+        if not result.get("success", False):
+            result.setdefault("is_anomaly", False)
+            result.setdefault("anomaly_score", 0.0)
+            result.setdefault("confidence", 0.0)
+        return result
     
     def predict_batch(self, sensor_data_list: List[Dict]) -> List[Dict]:
         """
-        배치 이상 감지
+        배치 이상 감지 (딕셔너리 → 특징 행렬 → decision_function 1회)
         
         Args:
             sensor_data_list: 센서 데이터 리스트
@@ -211,35 +168,31 @@ class CompressorAnomalyDetector:
             if not self.is_trained or self.model is None:
                 return [{"error": "모델이 학습되지 않았습니다."} for _ in sensor_data_list]
             
-            # 특징 추출
-            from .esp32_data_processor import ESP32DataProcessor
-            processor = ESP32DataProcessor()
-            features = processor.extract_features(sensor_data_list)
-            
-            if features.size == 0:
-                return [{"error": "특징 추출 실패"} for _ in sensor_data_list]
-            
-            # 데이터 정규화
-            features_scaled = self.scaler.transform(features)
-            
-            # 배치 예측
-            predictions = self.model.predict(features_scaled)
-            anomaly_scores = self.model.decision_function(features_scaled)
+            features, valid = self.processor.extract_point_features(sensor_data_list)
+            anomaly_scores = np.zeros(len(sensor_data_list))
+            if valid.any():
+                anomaly_scores[valid] = self._score_features(features[valid])
             
             # 결과 변환
+            timestamp = datetime.now().isoformat()
             results = []
-            for i, (pred, score) in enumerate(zip(predictions, anomaly_scores)):
+            for i, score in enumerate(anomaly_scores):
+                if not valid[i]:
+                    results.append({"error": "특징 추출 실패", "success": False})
+                    continue
+                
+                # IsolationForest.predict 와 같은 규칙: decision_function < 0 이면 이상 (-1)
+                pred = -1 if score < 0 else 1
                 is_anomaly = pred == -1
-                confidence = abs(score)
                 normalized_score = self._normalize_anomaly_score(score)
                 
                 result = {
                     "is_anomaly": is_anomaly,
                     "anomaly_score": normalized_score,
                     "raw_anomaly_score": float(score),
-                    "confidence": float(confidence),
-                    "prediction": int(pred),
-                    "timestamp": datetime.now().isoformat(),
+                    "confidence": float(abs(score)),  # 절댓값이 클수록 확신도 높음
+                    "prediction": pred,
+                    "timestamp": timestamp,
                     "success": True
                 }
                 
@@ -255,6 +208,28 @@ class CompressorAnomalyDetector:
             logger.error(f"배치 이상 탐지 실패: {e}")
             return [{"error": str(e), "success": False} for _ in sensor_data_list]
     
+    def _score_features(self, features: np.ndarray) -> np.ndarray:
+        """
+        단일 포인트 특징 행렬의 decision_function 점수
+        
+        학습 시 extract_features 는 포인트 특징 뒤에 학습 배치 전체에 같은 값으로 복제된
+        통계 특징을 붙입니다. 학습 데이터에서 상수인 열은 IsolationForest 트리가 분할에 쓰지 않으므로
+        해당 열은 학습 시 값(스케일러 평균)으로 채워도 점수가 같습니다.
+        """
+        n_model_features = self.scaler.mean_.shape[0]
+        n_point = features.shape[1]
+        if n_model_features > n_point:
+            X = np.empty((len(features), n_model_features), dtype=np.float64)
+            X[:, :n_point] = features
+            X[:, n_point:] = self.scaler.mean_[n_point:]
+        else:
+            X = features[:, :n_model_features].copy()
+        
+        # StandardScaler.transform 과 같은 계산 (입력 검증 생략)
+        X -= self.scaler.mean_
+        X /= self.scaler.scale_
+        return self.model.decision_function(X)
+    
     def _normalize_anomaly_score(self, raw_score: float) -> float:
         """이상 점수를 0-1 범위로 정규화"""
         # Isolation Forest의 decision_function은 음수 값이 이상을 나타냄
@@ -418,6 +393,99 @@ class CompressorAnomalyDetector:
             logger.error(f"모델 평가 실패: {e}")
             return {"error": str(e)}
 
+class AnomalyMicroBatcher:
+    """
+    측정값 단위 호출용 마이크로배치 채점기
+    
+    측정값마다 submit() 을 호출해도 최대 max_batch 개 또는 max_wait_ms 동안 모은 뒤
+    CompressorAnomalyDetector.predict_batch 한 번으로 채점합니다.
+    여러 스레드가 한 측정값씩 채점을 요청하는 장기 실행 프로세스에서 사용합니다.
+    """
+    
+    def __init__(self, detector: CompressorAnomalyDetector, max_batch: int = 64, max_wait_ms: float = 10.0):
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.requests = queue.Queue()
+        self.stats = {'batches': 0, 'readings': 0, 'max_batch_size': 0, 'cancelled': 0}
+        
+        self.worker = threading.Thread(target=self._batch_worker, daemon=True)
+        self.worker.start()
+    
+    def submit(self, sensor_data: Dict) -> Future:
+        """측정값 채점 요청 (결과는 predict 와 같은 딕셔너리)"""
+        future = Future()
+        self.requests.put((sensor_data, future))
+        return future
+    
+    def predict(self, sensor_data: Dict, timeout: Optional[float] = None) -> Dict:
+        """채점 결과를 기다려 반환 (시간 초과 시 요청을 취소하고 TimeoutError)"""
+        future = self.submit(sensor_data)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+    
+    def _batch_worker(self):
+        while True:
+            item = self.requests.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            # 배치 하나의 오류로 작업 스레드가 끝나면 이후 submit() 이 영원히 대기하므로 여기서 흡수
+            try:
+                self._score_batch(batch)
+            except Exception as e:
+                logger.error(f"마이크로배치 채점 오류: {e}")
+                for _, future in batch:
+                    try:
+                        future.set_exception(e)
+                    except InvalidStateError:
+                        pass  # 이미 결과가 있거나 취소된 요청
+            if stop:
+                return
+    
+    def _score_batch(self, batch: List[Tuple[Dict, Future]]):
+        # 이미 취소된 요청은 채점하지 않음 (이후 cancel() 은 실패하므로 set_result 와 경합하지 않음)
+        pending = [(sensor_data, future) for sensor_data, future in batch
+                   if future.set_running_or_notify_cancel()]
+        self.stats['cancelled'] += len(batch) - len(pending)
+        if not pending:
+            return
+        
+        try:
+            results = self.detector.predict_batch([sensor_data for sensor_data, _ in pending])
+        except Exception as e:
+            results = [{"error": str(e), "success": False}] * len(pending)
+        
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+        
+        self.stats['batches'] += 1
+        self.stats['readings'] += len(pending)
+        self.stats['max_batch_size'] = max(self.stats['max_batch_size'], len(pending))
+    
+    def stop(self, timeout: float = 5.0):
+        """대기 중인 요청을 처리한 뒤 종료"""
+        self.requests.put(_STOP)
+        self.worker.join(timeout)
+
 # 사용 예제
 if __name__ == "__main__":
     # 로깅 설정
@@ -434,9 +502,7 @@ if __name__ == "__main__":
         print("새 모델 학습 필요")
         
         # 정상 데이터 수집 및 학습 (실제 구현에서는 데이터를 수집해야 함)
-        from .esp32_data_processor import ESP32DataProcessor
-        processor = ESP32DataProcessor()
-        normal_data = processor.collect_normal_data(hours=24)
+        normal_data = detector.processor.collect_normal_data(hours=24)
         
         if normal_data:
             result = detector.train(normal_data)
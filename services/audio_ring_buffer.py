@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+디바이스별 오디오 링 버퍼
+미리 할당된 int16 버퍼에 요청 본문을 직접 기록하고, 고정 크기 분석 윈도우 단위로 꺼냅니다.
+"""
+
+import threading
+import time
+import numpy as np
+from typing import Optional
+
+# int16 PCM 샘플당 바이트 수
+SAMPLE_BYTES = 2
+
+
+class RingBufferOverrun(Exception):
+    """링 버퍼 여유 공간 부족"""
+    pass
+
+
+class DeviceAudioRingBuffer:
+    """
+    고정 용량 int16 링 버퍼
+
+    - 쓰기: bytes/memoryview 또는 스트림(readinto)에서 버퍼 메모리로 직접 기록 (중간 복사 없음)
+    - 읽기: 고정 크기 윈도우를 한 번의 연속 복사로 반환
+    - 쓰기 잠금(같은 디바이스의 동시 업로드 직렬화)과 인덱스 잠금을 분리하여
+      네트워크 I/O 중에도 워커가 이미 기록된 구간을 읽을 수 있음
+    """
+
+    def __init__(self, capacity_samples: int, sample_rate: int = 16000):
+        if capacity_samples <= 0:
+            raise ValueError("capacity_samples must be positive")
+        self.capacity = int(capacity_samples)
+        self.sample_rate = sample_rate
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._bytes = memoryview(self._buffer).cast('B')
+        self._write_pos = 0  # 누적 기록 샘플 수
+        self._read_pos = 0   # 누적 소비 샘플 수
+        self._write_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self.overruns = 0
+        self.last_write = time.monotonic()  # 마지막 커밋 시각 (유휴 버퍼 정리용)
+
+    def available(self) -> int:
+        """읽을 수 있는 샘플 수"""
+        with self._state_lock:
+            return self._write_pos - self._read_pos
+
+    def free_space(self) -> int:
+        """기록 가능한 샘플 수"""
+        with self._state_lock:
+            return self.capacity - (self._write_pos - self._read_pos)
+
+    def fill_ratio(self) -> float:
+        return self.available() / self.capacity
+
+    def idle_seconds(self) -> float:
+        """마지막 기록 후 지난 시간 (초)"""
+        return time.monotonic() - self.last_write
+
+    def _segments(self, start: int, n_samples: int):
+        """링 위치 start 부터 n_samples 만큼의 (바이트 오프셋, 바이트 길이) 구간 (최대 2개)"""
+        offset = start % self.capacity
+        first = min(n_samples, self.capacity - offset)
+        segments = [(offset * SAMPLE_BYTES, first * SAMPLE_BYTES)]
+        if n_samples > first:
+            segments.append((0, (n_samples - first) * SAMPLE_BYTES))
+        return segments
+
+    def _reserve(self, n_samples: int) -> int:
+        """쓰기 위치 확인 (쓰기 잠금 보유 상태에서 호출)"""
+        with self._state_lock:
+            if self.capacity - (self._write_pos - self._read_pos) < n_samples:
+                self.overruns += 1
+                raise RingBufferOverrun(
+                    f"ring buffer full: need {n_samples}, free {self.capacity - (self._write_pos - self._read_pos)}"
+                )
+            return self._write_pos
+
+    def _commit(self, n_samples: int):
+        with self._state_lock:
+            self._write_pos += n_samples
+            self.last_write = time.monotonic()
+
+    def write(self, data) -> int:
+        """
+        PCM int16 바이트를 버퍼에 기록
+
+        Args:
+            data: bytes, bytearray 또는 memoryview (리틀 엔디언 int16)
+
+        Returns:
+            기록한 샘플 수
+
+        Raises:
+            RingBufferOverrun: 여유 공간 부족 (아무것도 기록하지 않음)
+        """
+        source = memoryview(data).cast('B')
+        if len(source) % SAMPLE_BYTES:
+            raise ValueError("PCM payload length must be a multiple of 2 bytes")
+        n_samples = len(source) // SAMPLE_BYTES
+        if n_samples == 0:
+            return 0
+
+        with self._write_lock:
+            start = self._reserve(n_samples)
+            consumed = 0
+            for byte_offset, byte_len in self._segments(start, n_samples):
+                self._bytes[byte_offset:byte_offset + byte_len] = source[consumed:consumed + byte_len]
+                consumed += byte_len
+            self._commit(n_samples)
+        return n_samples
+
+    def write_from_stream(self, stream, n_bytes: int) -> int:
+        """
+        스트림(readinto 지원)에서 버퍼 메모리로 직접 읽어 기록
+
+        스트림이 n_bytes 전에 끝나면 아무것도 커밋하지 않고 ValueError 를 발생시킵니다.
+        """
+        if n_bytes % SAMPLE_BYTES:
+            raise ValueError("PCM payload length must be a multiple of 2 bytes")
+        n_samples = n_bytes // SAMPLE_BYTES
+        if n_samples == 0:
+            return 0
+
+        with self._write_lock:
+            start = self._reserve(n_samples)
+            for byte_offset, byte_len in self._segments(start, n_samples):
+                target = self._bytes[byte_offset:byte_offset + byte_len]
+                filled = 0
+                while filled < byte_len:
+                    read = stream.readinto(target[filled:])
+                    if not read:
+                        raise ValueError(f"stream ended after {filled} of {byte_len} bytes")
+                    filled += read
+            self._commit(n_samples)
+        return n_samples
+
+    def read_window(self, n_samples: int) -> Optional[np.ndarray]:
+        """
+        n_samples 크기 윈도우를 꺼냄 (연속 int16 배열 한 번 복사)
+
+        Returns:
+            윈도우 배열, 데이터가 부족하면 None
+        """
+        with self._state_lock:
+            if self._write_pos - self._read_pos < n_samples:
+                return None
+            start = self._read_pos % self.capacity
+            end = start + n_samples
+            if end <= self.capacity:
+                window = self._buffer[start:end].copy()
+            else:
+                window = np.concatenate((self._buffer[start:], self._buffer[:end - self.capacity]))
+            self._read_pos += n_samples
+        return window
+
+    def reset(self):
+        """버퍼 비우기"""
+        with self._write_lock, self._state_lock:
+            self._write_pos = 0
+            self._read_pos = 0
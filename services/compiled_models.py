@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+컴파일된 추론 모델
+sklearn 스케일러/앙상블 멤버(StandardScaler, RandomForest/DecisionTree, LogisticRegression, SVC, MLP)를
+평탄화된 NumPy 배열(트리 노드 배열, 가중치 행렬)로 변환하고 NumPy 만으로 배치 평가합니다.
+
+- predict / predict_proba / transform / classes_ / n_features_in_ 는 sklearn 과 같은 인터페이스
+- 저장 형식은 .npz (allow_pickle=False 로 로드, sklearn 객체 역직렬화 없음)
+- 변환 시 sklearn 결과와 비교하는 check_parity 로 검증한 뒤 저장
+"""
+
+import os
+import json
+import warnings
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# libsvm 확률 추정 하한 (svm.cpp min_prob)
+SVM_MIN_PROB = 1e-7
+PARITY_ATOL = 1e-6
+
+
+def _softmax(values: np.ndarray) -> np.ndarray:
+    values = values - values.max(axis=1, keepdims=True)
+    np.exp(values, out=values)
+    values /= values.sum(axis=1, keepdims=True)
+    return values
+
+
+def _expit(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+ACTIVATIONS = {
+    'identity': lambda values: values,
+    'relu': lambda values: np.maximum(values, 0.0),
+    'tanh': np.tanh,
+    'logistic': _expit,
+    'softmax': _softmax,
+}
+
+
+class CompiledModel:
+    """컴파일된 모델 공통 (배열 + JSON 메타데이터로 저장)"""
+    kind = ''
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.arrays = arrays
+        self.meta = meta
+        self.n_features_in_ = meta['n_features_in']
+        self.classes_ = arrays.get('classes')
+
+    def _check(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X 특징 수 {X.shape[1]} != 모델 특징 수 {self.n_features_in_}")
+        return X
+
+    def _labels(self, proba: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(proba, axis=1)]
+
+    def save(self, path: str):
+        """npz 로 저장 (임시 파일에서 교체)"""
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, __kind__=np.array(self.kind), __meta__=np.array(json.dumps(self.meta)), **self.arrays)
+        os.replace(tmp_path, path)
+
+
+class CompiledScaler(CompiledModel):
+    """StandardScaler"""
+    kind = 'standard_scaler'
+
+    def transform(self, X) -> np.ndarray:
+        X = self._check(X)
+        if 'mean' in self.arrays:
+            X = X - self.arrays['mean']
+        if 'scale' in self.arrays:
+            X = X / self.arrays['scale']
+        return X
+
+
+class CompiledForest(CompiledModel):
+    """
+    RandomForest / DecisionTree 분류기
+
+    모든 트리의 노드를 하나의 배열로 이어 붙이고, 리프는 자기 자신을 가리키게 하여
+    (샘플 수, 트리 수) 노드 인덱스 배열을 최대 깊이만큼 한 번에 진행시킵니다.
+    """
+    kind = 'forest'
+
+    def predict_proba(self, X) -> np.ndarray:
+        # sklearn 트리는 float32 로 변환한 특징을 임계값과 비교
+        X = self._check(X).astype(np.float32)
+        a = self.arrays
+        feature, threshold = a['feature'], a['threshold']
+        left, right = a['left'], a['right']
+        missing_left = a.get('missing_left')
+        has_nan = missing_left is not None and np.isnan(X).any()
+
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.broadcast_to(a['roots'], (len(X), len(a['roots']))).copy()
+        for _ in range(self.meta['max_depth']):
+            values = X[rows, feature[nodes]]
+            go_left = values <= threshold[nodes]
+            if has_nan:
+                go_left = np.where(np.isnan(values), missing_left[nodes], go_left)
+            nodes = np.where(go_left, left[nodes], right[nodes])
+        return a['leaf_proba'][nodes].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self._labels(self.predict_proba(X))
+
+
+class CompiledLogistic(CompiledModel):
+    """LogisticRegression (이진: expit, 다중: softmax)"""
+    kind = 'logistic'
+
+    def decision_function(self, X) -> np.ndarray:
+        scores = self._check(X) @ self.arrays['coef'].T + self.arrays['intercept']
+        return scores[:, 0] if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            positive = _expit(scores)
+            return np.column_stack([1.0 - positive, positive])
+        return _softmax(scores)
+
+    def predict(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[np.argmax(scores, axis=1)]
+
+
+class CompiledSVC(CompiledModel):
+    """이진 SVC (rbf/linear/poly/sigmoid 커널, Platt 확률)"""
+    kind = 'svc'
+
+    def _kernel(self, X: np.ndarray) -> np.ndarray:
+        support = self.arrays['support_vectors']
+        gamma = self.meta['gamma']
+        kernel = self.meta['kernel']
+        if kernel == 'rbf':
+            sq_dist = (np.einsum('ij,ij->i', X, X)[:, np.newaxis] - 2.0 * X @ support.T
+                       + self.arrays['support_sq_norms'])
+            return np.exp(-gamma * np.maximum(sq_dist, 0.0))
+        dot = X @ support.T
+        if kernel == 'linear':
+            return dot
+        if kernel == 'poly':
+            return (gamma * dot + self.meta['coef0']) ** self.meta['degree']
+        return np.tanh(gamma * dot + self.meta['coef0'])
+
+    def decision_function(self, X) -> np.ndarray:
+        X = self._check(X)
+        return self._kernel(X) @ self.arrays['dual_coef'] + self.meta['intercept']
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+    @property
+    def predict_proba(self):
+        """probability=True 로 학습된 경우만 존재 (sklearn SVC 처럼 hasattr 로 확인 가능)"""
+        if 'prob_a' not in self.meta:
+            raise AttributeError("probability=True 로 학습된 SVC 만 predict_proba 를 지원합니다")
+        return self._predict_proba
+
+    def _predict_proba(self, X) -> np.ndarray:
+        # libsvm 결정값은 sklearn 이진 결정값과 부호가 반대, sigmoid 는 classes_[0] 쌍별 확률
+        f = -self.decision_function(X) * self.meta['prob_a'] + self.meta['prob_b']
+        pairwise = np.clip(np.exp(-np.logaddexp(0.0, f)), SVM_MIN_PROB, 1.0 - SVM_MIN_PROB)
+        r = np.zeros((len(pairwise), 2, 2))
+        r[:, 0, 1] = pairwise
+        r[:, 1, 0] = 1.0 - pairwise
+        return _couple_pairwise(r)
+
+
+def _couple_pairwise(r: np.ndarray) -> np.ndarray:
+    """
+    libsvm multiclass_probability (쌍별 확률 r[i][j] → 클래스 확률) 를 샘플 축으로 벡터화
+    libsvm 은 클래스가 둘이어도 같은 반복법을 허용 오차에서 멈추므로 값을 맞추려면 그대로 따라야 함
+    """
+    n, k = r.shape[0], r.shape[1]
+    Q = -r.transpose(0, 2, 1) * r
+    Q[:, np.arange(k), np.arange(k)] = (r ** 2).sum(axis=1)
+    p = np.full((n, k), 1.0 / k)
+    eps = 0.005 / k
+    active = np.ones(n, dtype=bool)
+    for _ in range(max(100, k)):
+        Qp = np.einsum('ntj,nj->nt', Q, p)
+        pQp = np.einsum('nt,nt->n', p, Qp)
+        active &= np.abs(Qp - pQp[:, np.newaxis]).max(axis=1) >= eps
+        if not active.any():
+            break
+        for t in range(k):
+            Q_tt = Q[:, t, t]
+            diff = np.where(active, (pQp - Qp[:, t]) / Q_tt, 0.0)
+            pQp = (pQp + diff * (diff * Q_tt + 2 * Qp[:, t])) / (1 + diff) / (1 + diff)
+            Qp = (Qp + diff[:, np.newaxis] * Q[:, t, :]) / (1 + diff)[:, np.newaxis]
+            p[:, t] += diff
+            p /= (1 + diff)[:, np.newaxis]
+    return p
+
+
+class CompiledMLP(CompiledModel):
+    """MLPClassifier"""
+    kind = 'mlp'
+
+    def predict_proba(self, X) -> np.ndarray:
+        values = self._check(X)
+        n_layers = self.meta['n_layers']
+        hidden = ACTIVATIONS[self.meta['activation']]
+        for i in range(n_layers):
+            values = values @ self.arrays[f'coef_{i}'] + self.arrays[f'intercept_{i}']
+            values = hidden(values) if i < n_layers - 1 else ACTIVATIONS[self.meta['out_activation']](values)
+        if values.shape[1] == 1:
+            return np.column_stack([1.0 - values[:, 0], values[:, 0]])
+        return values
+
+    def predict(self, X) -> np.ndarray:
+        proba = self.predict_proba(X)
+        if len(self.classes_) == 2:
+            return self.classes_[(proba[:, 1] > 0.5).astype(int)]
+        return self._labels(proba)
+
+
+COMPILED_KINDS = {cls.kind: cls for cls in (CompiledScaler, CompiledForest, CompiledLogistic, CompiledSVC, CompiledMLP)}
+
+
+# ----------------------------------------------------------------------
+# sklearn → 컴파일 모델 변환
+# ----------------------------------------------------------------------
+def _classes(model) -> np.ndarray:
+    """classes_ (문자열 레이블은 object 배열이라 pickle 없이 저장되도록 고정 길이 문자열로)"""
+    return np.asarray(np.asarray(model.classes_).tolist())
+
+
+def _compile_scaler(scaler) -> CompiledScaler:
+    arrays = {}
+    if getattr(scaler, 'with_mean', True) and scaler.mean_ is not None:
+        arrays['mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    if getattr(scaler, 'with_std', True) and scaler.scale_ is not None:
+        arrays['scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+    return CompiledScaler(arrays, {'n_features_in': int(scaler.n_features_in_)})
+
+
+def _compile_forest(model) -> CompiledForest:
+    trees = [estimator.tree_ for estimator in getattr(model, 'estimators_', [model])]
+    feature, threshold, left, right, missing_left, leaf_proba, roots = [], [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        n_nodes = tree.node_count
+        node_ids = np.arange(n_nodes)
+        is_leaf = tree.children_left < 0
+        # 리프는 자기 자신을 가리키고 항상 같은 자리에 머무름
+        feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left.append((np.where(is_leaf, node_ids, tree.children_left) + offset).astype(np.int32))
+        right.append((np.where(is_leaf, node_ids, tree.children_right) + offset).astype(np.int32))
+        missing = getattr(tree, 'missing_go_to_left', None)
+        missing_left.append(np.zeros(n_nodes, dtype=bool) if missing is None else np.asarray(missing, dtype=bool))
+        values = tree.value[:, 0, :].astype(np.float64)
+        totals = values.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+        leaf_proba.append(values / totals)
+        roots.append(offset)
+        offset += n_nodes
+
+    arrays = {
+        'classes': _classes(model),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'left': np.concatenate(left),
+        'right': np.concatenate(right),
+        'missing_left': np.concatenate(missing_left),
+        'leaf_proba': np.concatenate(leaf_proba),
+    }
+    meta = {'n_features_in': int(model.n_features_in_),
+            'max_depth': int(max(tree.max_depth for tree in trees))}
+    return CompiledForest(arrays, meta)
+
+
+def _compile_logistic(model) -> CompiledLogistic:
+    arrays = {
+        'classes': _classes(model),
+        'coef': np.asarray(model.coef_, dtype=np.float64),
+        'intercept': np.asarray(model.intercept_, dtype=np.float64),
+    }
+    return CompiledLogistic(arrays, {'n_features_in': int(model.n_features_in_)})
+
+
+def _compile_svc(model) -> CompiledSVC:
+    if len(model.classes_) != 2:
+        raise ValueError("다중 클래스 SVC 는 변환하지 않습니다")
+    if model.kernel not in ('rbf', 'linear', 'poly', 'sigmoid'):
+        raise ValueError(f"지원하지 않는 SVC 커널: {model.kernel}")
+    support = np.asarray(model.support_vectors_, dtype=np.float64)
+    arrays = {
+        'classes': _classes(model),
+        'support_vectors': support,
+        'support_sq_norms': np.einsum('ij,ij->i', support, support),
+        'dual_coef': np.asarray(model.dual_coef_, dtype=np.float64)[0],
+    }
+    meta = {
+        'n_features_in': int(model.n_features_in_),
+        'kernel': model.kernel,
+        'gamma': float(model._gamma),
+        'coef0': float(model.coef0),
+        'degree': int(model.degree),
+        'intercept': float(model.intercept_[0]),
+    }
+    if getattr(model, 'probability', False):
+        with warnings.catch_warnings():
+            # sklearn 1.9 부터 probA_/probB_ 접근 시 FutureWarning
+            warnings.simplefilter('ignore', FutureWarning)
+            prob_a, prob_b = model.probA_, model.probB_
+        if len(prob_a):
+            meta['prob_a'] = float(prob_a[0])
+            meta['prob_b'] = float(prob_b[0])
+    return CompiledSVC(arrays, meta)
+
+
+def _compile_mlp(model) -> CompiledMLP:
+    arrays = {'classes': _classes(model)}
+    for i, (coef, intercept) in enumerate(zip(model.coefs_, model.intercepts_)):
+        arrays[f'coef_{i}'] = np.asarray(coef, dtype=np.float64)
+        arrays[f'intercept_{i}'] = np.asarray(intercept, dtype=np.float64)
+    meta = {
+        'n_features_in': int(model.n_features_in_),
+        'n_layers': len(model.coefs_),
+        'activation': model.activation,
+        'out_activation': model.out_activation_,
+    }
+    return CompiledMLP(arrays, meta)
+
+
+def compile_model(model) -> CompiledModel:
+    """학습된 sklearn 객체 → 컴파일 모델 (지원하지 않으면 ValueError)"""
+    from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    if isinstance(model, StandardScaler):
+        return _compile_scaler(model)
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)):
+        return _compile_forest(model)
+    if isinstance(model, LogisticRegression):
+        return _compile_logistic(model)
+    if isinstance(model, SVC):
+        return _compile_svc(model)
+    if isinstance(model, MLPClassifier):
+        return _compile_mlp(model)
+    raise ValueError(f"변환을 지원하지 않는 모델: {type(model).__name__}")
+
+
+def check_parity(model, compiled: CompiledModel, X: np.ndarray, atol: float = PARITY_ATOL) -> Dict:
+    """
+    sklearn 모델과 컴파일 모델의 출력 비교
+
+    Returns:
+        {'ok', 'max_abs_diff', 'label_mismatches'}
+    """
+    if isinstance(compiled, CompiledScaler):
+        diff = float(np.max(np.abs(model.transform(X) - compiled.transform(X)), initial=0.0))
+        return {'ok': diff <= atol, 'max_abs_diff': diff, 'label_mismatches': 0}
+
+    mismatches = int(np.sum(np.asarray(model.predict(X)) != compiled.predict(X)))
+    diff = 0.0
+    if hasattr(model, 'predict_proba') and hasattr(compiled, 'predict_proba'):
+        diff = float(np.max(np.abs(model.predict_proba(X) - compiled.predict_proba(X)), initial=0.0))
+    return {'ok': mismatches == 0 and diff <= atol, 'max_abs_diff': diff, 'label_mismatches': mismatches}
+
+
+def compiled_path(model_path: str) -> str:
+    """모델 파일 경로 → 컴파일 모델 경로 (xxx.pkl → xxx.npz)"""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def export_model(model_path: str, X: Optional[np.ndarray] = None,
+                 atol: float = PARITY_ATOL) -> Tuple[Optional[str], Dict]:
+    """
+    joblib 모델 파일을 컴파일해 같은 이름의 .npz 로 저장 (패리티 검사를 통과한 경우만)
+
+    Args:
+        model_path: .pkl 경로
+        X: 패리티 검사 입력 (기본값: 표준 정규 난수 256행)
+
+    Returns:
+        (저장 경로 또는 None, 패리티 결과)
+    """
+    import joblib
+
+    model = joblib.load(model_path)
+    compiled = compile_model(model)
+    if X is None:
+        X = np.random.default_rng(0).normal(size=(256, compiled.n_features_in_))
+    parity = check_parity(model, compiled, X, atol)
+    if not parity['ok']:
+        logger.warning(f"컴파일 모델 패리티 실패 {model_path}: {parity}")
+        return None, parity
+
+    path = compiled_path(model_path)
+    compiled.save(path)
+    logger.info(f"컴파일 모델 저장: {path} (max abs diff {parity['max_abs_diff']:.1e})")
+    return path, parity
+
+
+def load_compiled(path: str) -> CompiledModel:
+    """npz 컴파일 모델 로드 (pickle 사용 안 함)"""
+    with np.load(path, allow_pickle=False) as data:
+        kind = str(data['__kind__'])
+        meta = json.loads(str(data['__meta__']))
+        arrays = {name: data[name] for name in data.files if not name.startswith('__')}
+    return COMPILED_KINDS[kind](arrays, meta)
+
+
+def load_model_file(model_path: str):
+    """
+    모델 파일 로드 - 같은 이름의 .npz 가 .pkl 보다 새로우면 컴파일 모델을, 아니면 joblib 으로 로드
+    (모델 관리 서비스가 .pkl 을 교체하면 다시 내보내기 전까지 sklearn 모델 사용)
+    """
+    path = compiled_path(model_path)
+    try:
+        if os.path.exists(path) and (not os.path.exists(model_path) or
+                                     os.path.getmtime(path) >= os.path.getmtime(model_path)):
+            return load_compiled(path)
+    except Exception as e:
+        logger.warning(f"컴파일 모델 로드 실패, joblib 사용 {path}: {e}")
+
+    import joblib
+    return joblib.load(model_path)
@@ -16,6 +16,9 @@ import numpy as np
 from sqlite3 import connect
 import json
 
+from services.sensor_rollups import bucket_start, fetch_series, fetch_summary, metric_mean, rollup_table
+from services.shared_cache import SharedCache, shared_cache
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -64,14 +67,19 @@ class EnergyAnalytics:
     comparison_previous_day: float
     comparison_previous_week: float
 
+def _encode_dataclasses(items: List) -> List[Dict]:
+    """dataclass 목록 → 공유 캐시 저장용 딕셔너리 목록"""
+    return [asdict(item) for item in items]
+
 class DashboardDataService:
     """대시보드 데이터 서비스 (Stripe Dashboard 스타일)"""
     
-    def __init__(self, db_path: str = 'data/sensor_data.db'):
+    def __init__(self, db_path: str = 'data/sensor_data.db', cache: SharedCache = None):
         self.db_path = db_path
-        self.cache = {}
+        # 워커 간 공유 캐시 (TTL + LRU + 단일 계산)
+        self.cache = cache or shared_cache
         self.cache_ttl = 300  # 5분 캐시
-        self.last_cache_update = {}
+        self.refresh_ahead = 60  # 만료 1분 전부터 미리 갱신
         
         # 실시간 데이터 업데이트 스레드
         self.update_thread = None
@@ -106,47 +114,41 @@ class DashboardDataService:
                 time.sleep(60)
     
     def _update_cache(self):
-        """캐시 데이터 업데이트"""
+        """캐시 데이터 미리 갱신 (곧 만료될 키만, 여러 워커가 돌려도 키마다 한 워커만 계산)"""
         try:
-            current_time = time.time()
-            
-            # 매장 메트릭 업데이트
-            self.cache['store_metrics'] = self._get_store_metrics()
-            self.last_cache_update['store_metrics'] = current_time
-            
-            # 압축기 상태 업데이트
-            self.cache['compressor_status'] = self._get_compressor_status()
-            self.last_cache_update['compressor_status'] = current_time
-            
-            # 에너지 분석 업데이트
-            self.cache['energy_analytics'] = self._get_energy_analytics()
-            self.last_cache_update['energy_analytics'] = current_time
+            for cache_key, compute in (
+                ('store_metrics:all', self._get_store_metrics),       # 매장 메트릭
+                ('compressor_status:all', self._get_compressor_status),  # 압축기 상태
+                ('energy_analytics:all:30', self._get_energy_analytics),  # 에너지 분석
+            ):
+                self.cache.refresh(self._cache_key(cache_key), compute, self.cache_ttl,
+                                   ahead=self.refresh_ahead, encode=_encode_dataclasses)
             
         except Exception as e:
             logger.error(f"캐시 업데이트 오류: {e}")
     
-    def _is_cache_valid(self, key: str) -> bool:
-        """캐시 유효성 검사"""
-        if key not in self.cache or key not in self.last_cache_update:
-            return False
-        
-        return time.time() - self.last_cache_update[key] < self.cache_ttl
+    @staticmethod
+    def _cache_key(name: str) -> str:
+        """공유 캐시 키 (다른 서비스 키와 구분)"""
+        return f'dashboard:{name}'
+    
+    def _cached(self, name: str, compute, cls, force_refresh: bool):
+        """공유 캐시 조회 (force_refresh 면 캐시를 거치지 않고 계산)"""
+        if force_refresh:
+            return compute()
+        return self.cache.get_or_compute(self._cache_key(name), compute, self.cache_ttl,
+                                         encode=_encode_dataclasses,
+                                         decode=lambda rows: [cls(**row) for row in rows])
+    
+    def get_cache_metrics(self) -> Dict:
+        """캐시 적중/실패/제거 메트릭"""
+        return self.cache.get_metrics()
     
     def get_store_metrics(self, store_id: str = None, force_refresh: bool = False) -> List[StoreMetrics]:
         """매장 메트릭 조회"""
         try:
-            cache_key = f'store_metrics_{store_id or "all"}'
-            
-            if not force_refresh and self._is_cache_valid(cache_key):
-                return self.cache.get(cache_key, [])
-            
-            metrics = self._get_store_metrics(store_id)
-            
-            if not force_refresh:
-                self.cache[cache_key] = metrics
-                self.last_cache_update[cache_key] = time.time()
-            
-            return metrics
+            return self._cached(f'store_metrics:{store_id or "all"}',
+                                lambda: self._get_store_metrics(store_id), StoreMetrics, force_refresh)
             
         except Exception as e:
             logger.error(f"매장 메트릭 조회 실패: {e}")
@@ -202,18 +204,10 @@ class DashboardDataService:
                     critical_alerts = alerts[0] or 0
                     warning_alerts = alerts[1] or 0
                     
-                    # 에너지 소비량 조회
-                    cursor.execute('''
-                        SELECT 
-                            AVG(power_consumption) as avg_power,
-                            MAX(power_consumption) as max_power
-                        FROM sensor_readings 
-                        WHERE device_id = ? AND timestamp > ?
-                    ''', (store_id, time.time() - 3600))  # 1시간 내
-                    
-                    power_data = cursor.fetchone()
-                    avg_power = power_data[0] or 0
-                    max_power = power_data[1] or 0
+                    # 에너지 소비량 조회 (1분 롤업, 1시간 내)
+                    power_data = fetch_summary(conn, '1m', time.time() - 3600, device_id=store_id)
+                    avg_power = metric_mean(power_data, 'power_consumption') or 0
+                    max_power = power_data['power_consumption_max'] or 0
                     
                     # 에너지 비용 계산 (kWh당 150원 가정)
                     energy_cost = (avg_power * 24 * 30) / 100 * 150  # 월간 비용
@@ -246,18 +240,8 @@ class DashboardDataService:
     def get_compressor_status(self, store_id: str = None, force_refresh: bool = False) -> List[CompressorStatus]:
         """압축기 상태 조회"""
         try:
-            cache_key = f'compressor_status_{store_id or "all"}'
-            
-            if not force_refresh and self._is_cache_valid(cache_key):
-                return self.cache.get(cache_key, [])
-            
-            status_list = self._get_compressor_status(store_id)
-            
-            if not force_refresh:
-                self.cache[cache_key] = status_list
-                self.last_cache_update[cache_key] = time.time()
-            
-            return status_list
+            return self._cached(f'compressor_status:{store_id or "all"}',
+                                lambda: self._get_compressor_status(store_id), CompressorStatus, force_refresh)
             
         except Exception as e:
             logger.error(f"압축기 상태 조회 실패: {e}")
@@ -269,54 +253,42 @@ class DashboardDataService:
             with connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
-                # 압축기별 최신 상태 조회
+                # 압축기별 최신 상태 + 24시간 이상 감지 수 + 가동 시간을 한 번에 조회
+                # (device_latest 디바이스당 한 행, 하위 쿼리는 디바이스별 인덱스 탐색)
                 if store_id:
-                    cursor.execute('''
-                        SELECT 
-                            s.device_id as compressor_id,
-                            s.device_id as store_id,
-                            d.status,
-                            s.temperature,
-                            s.vibration_x,
-                            s.vibration_y,
-                            s.vibration_z,
-                            s.power_consumption,
-                            s.audio_level,
-                            s.sensor_quality,
-                            s.timestamp
-                        FROM sensor_readings s
-                        JOIN devices d ON s.device_id = d.device_id
-                        WHERE s.device_id = ?
-                        ORDER BY s.timestamp DESC
-                        LIMIT 1
-                    ''', (store_id,))
+                    where, params = 'l.device_id = ?', (store_id,)
                 else:
-                    cursor.execute('''
-                        SELECT 
-                            s.device_id as compressor_id,
-                            s.device_id as store_id,
-                            d.status,
-                            s.temperature,
-                            s.vibration_x,
-                            s.vibration_y,
-                            s.vibration_z,
-                            s.power_consumption,
-                            s.audio_level,
-                            s.sensor_quality,
-                            s.timestamp
-                        FROM sensor_readings s
-                        JOIN devices d ON s.device_id = d.device_id
-                        WHERE s.timestamp > ?
-                        GROUP BY s.device_id
-                        HAVING s.timestamp = MAX(s.timestamp)
-                        ORDER BY s.timestamp DESC
-                    ''', (time.time() - 3600,))  # 1시간 내
+                    where, params = 'l.timestamp > ?', (time.time() - 3600,)  # 1시간 내
+                since = time.time() - 86400  # 24시간 내
+                cursor.execute(f'''
+                    SELECT 
+                        l.device_id as compressor_id,
+                        l.device_id as store_id,
+                        d.status,
+                        l.temperature,
+                        l.vibration_x,
+                        l.vibration_y,
+                        l.vibration_z,
+                        l.power_consumption,
+                        l.audio_level,
+                        l.sensor_quality,
+                        l.timestamp,
+                        (SELECT COUNT(*) FROM anomalies a
+                         WHERE a.device_id = l.device_id AND a.timestamp > ?) as anomaly_count,
+                        (SELECT TOTAL(r.good_readings) FROM {rollup_table('1h')} r
+                         WHERE r.device_id = l.device_id AND r.bucket >= ?) as good_readings
+                    FROM device_latest l
+                    JOIN devices d ON l.device_id = d.device_id
+                    WHERE {where}
+                    ORDER BY l.timestamp DESC
+                ''', (since, bucket_start('1h', since), *params))
                 
                 compressors = cursor.fetchall()
                 status_list = []
                 
                 for comp in compressors:
-                    compressor_id, store_id, status, temp, vib_x, vib_y, vib_z, power, audio, quality, timestamp = comp
+                    (compressor_id, store_id, status, temp, vib_x, vib_y, vib_z, power, audio, quality, timestamp,
+                     anomaly_count, good_readings) = comp
                     
                     # 진동 레벨 계산
                     vibration_level = np.sqrt(vib_x**2 + vib_y**2 + vib_z**2)
@@ -324,17 +296,8 @@ class DashboardDataService:
                     # 건강도 점수 계산 (0-100)
                     health_score = self._calculate_health_score(temp, vibration_level, power, audio, quality)
                     
-                    # 이상 감지 수 조회
-                    cursor.execute('''
-                        SELECT COUNT(*) 
-                        FROM anomalies 
-                        WHERE device_id = ? AND timestamp > ?
-                    ''', (compressor_id, time.time() - 86400))  # 24시간 내
-                    
-                    anomaly_count = cursor.fetchone()[0] or 0
-                    
-                    # 가동 시간 계산
-                    uptime_hours = self._calculate_uptime_hours(compressor_id)
+                    # 가동 시간 계산 (품질 양호 측정값당 0.1시간)
+                    uptime_hours = good_readings * 0.1
                     
                     compressor_status = CompressorStatus(
                         compressor_id=compressor_id,
@@ -383,41 +346,11 @@ class DashboardDataService:
             logger.error(f"건강도 점수 계산 실패: {e}")
             return 50.0
     
-    def _calculate_uptime_hours(self, compressor_id: str) -> float:
-        """가동 시간 계산 (시간)"""
-        try:
-            with connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 24시간 내 온라인 상태 시간 계산
-                cursor.execute('''
-                    SELECT COUNT(*) * 0.1 as uptime_hours
-                    FROM sensor_readings 
-                    WHERE device_id = ? AND timestamp > ? AND sensor_quality > 0.8
-                ''', (compressor_id, time.time() - 86400))
-                
-                result = cursor.fetchone()
-                return result[0] if result else 0.0
-                
-        except Exception as e:
-            logger.error(f"가동 시간 계산 실패: {e}")
-            return 0.0
-    
     def get_energy_analytics(self, store_id: str = None, days: int = 30, force_refresh: bool = False) -> List[EnergyAnalytics]:
         """에너지 분석 조회"""
         try:
-            cache_key = f'energy_analytics_{store_id or "all"}_{days}'
-            
-            if not force_refresh and self._is_cache_valid(cache_key):
-                return self.cache.get(cache_key, [])
-            
-            analytics = self._get_energy_analytics(store_id, days)
-            
-            if not force_refresh:
-                self.cache[cache_key] = analytics
-                self.last_cache_update[cache_key] = time.time()
-            
-            return analytics
+            return self._cached(f'energy_analytics:{store_id or "all"}:{days}',
+                                lambda: self._get_energy_analytics(store_id, days), EnergyAnalytics, force_refresh)
             
         except Exception as e:
             logger.error(f"에너지 분석 조회 실패: {e}")
@@ -427,42 +360,24 @@ class DashboardDataService:
         """에너지 분석 데이터 조회"""
         try:
             with connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 일별 에너지 소비량 조회
+                # 일별 에너지 소비량 조회 (1일 롤업, 전주 대비 비교용으로 7일 더 조회)
                 start_date = datetime.now() - timedelta(days=days)
                 start_timestamp = start_date.timestamp()
                 
-                if store_id:
-                    cursor.execute('''
-                        SELECT 
-                            DATE(datetime(timestamp, 'unixepoch')) as date,
-                            AVG(power_consumption) as avg_consumption,
-                            MAX(power_consumption) as peak_consumption,
-                            SUM(power_consumption) as total_consumption
-                        FROM sensor_readings 
-                        WHERE device_id = ? AND timestamp > ?
-                        GROUP BY DATE(datetime(timestamp, 'unixepoch'))
-                        ORDER BY date DESC
-                    ''', (store_id, start_timestamp))
-                else:
-                    cursor.execute('''
-                        SELECT 
-                            DATE(datetime(timestamp, 'unixepoch')) as date,
-                            AVG(power_consumption) as avg_consumption,
-                            MAX(power_consumption) as peak_consumption,
-                            SUM(power_consumption) as total_consumption
-                        FROM sensor_readings 
-                        WHERE timestamp > ?
-                        GROUP BY DATE(datetime(timestamp, 'unixepoch'))
-                        ORDER BY date DESC
-                    ''', (start_timestamp,))
-                
-                energy_data = cursor.fetchall()
+                daily = fetch_series(conn, '1d', start_timestamp - 7 * 86400, device_id=store_id)
+                daily_average = {
+                    self._bucket_date(row['bucket']): metric_mean(row, 'power_consumption') or 0.0
+                    for row in daily
+                }
+                energy_data = [row for row in reversed(daily)
+                               if row['bucket'] + 86400 > start_timestamp and row['power_consumption_count']]
                 analytics_list = []
                 
                 for data in energy_data:
-                    date, avg_consumption, peak_consumption, total_consumption = data
+                    date = self._bucket_date(data['bucket'])
+                    avg_consumption = metric_mean(data, 'power_consumption')
+                    peak_consumption = data['power_consumption_max']
+                    total_consumption = data['power_consumption_sum']
                     
                     # 비용 계산 (kWh당 150원)
                     cost = total_consumption * 0.15  # 0.15원 per unit
@@ -471,11 +386,11 @@ class DashboardDataService:
                     efficiency_score = min(100, max(0, 100 - (avg_consumption - 50) * 2))
                     
                     # 전일 대비 비교
-                    prev_day_consumption = self._get_previous_day_consumption(store_id, date)
+                    prev_day_consumption = daily_average.get(self._shift_date(date, -1), 0.0)
                     comparison_previous_day = ((avg_consumption - prev_day_consumption) / prev_day_consumption * 100) if prev_day_consumption > 0 else 0
                     
                     # 전주 대비 비교
-                    prev_week_consumption = self._get_previous_week_consumption(store_id, date)
+                    prev_week_consumption = daily_average.get(self._shift_date(date, -7), 0.0)
                     comparison_previous_week = ((avg_consumption - prev_week_consumption) / prev_week_consumption * 100) if prev_week_consumption > 0 else 0
                     
                     analytics = EnergyAnalytics(
@@ -498,63 +413,15 @@ class DashboardDataService:
             logger.error(f"에너지 분석 데이터 조회 실패: {e}")
             return []
     
-    def _get_previous_day_consumption(self, store_id: str, current_date: str) -> float:
-        """전일 소비량 조회"""
-        try:
-            with connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 전일 날짜 계산
-                prev_date = (datetime.strptime(current_date, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
-                
-                if store_id:
-                    cursor.execute('''
-                        SELECT AVG(power_consumption)
-                        FROM sensor_readings 
-                        WHERE device_id = ? AND DATE(datetime(timestamp, 'unixepoch')) = ?
-                    ''', (store_id, prev_date))
-                else:
-                    cursor.execute('''
-                        SELECT AVG(power_consumption)
-                        FROM sensor_readings 
-                        WHERE DATE(datetime(timestamp, 'unixepoch')) = ?
-                    ''', (prev_date,))
-                
-                result = cursor.fetchone()
-                return result[0] if result and result[0] else 0.0
-                
-        except Exception as e:
-            logger.error(f"전일 소비량 조회 실패: {e}")
-            return 0.0
+    @staticmethod
+    def _bucket_date(bucket: int) -> str:
+        """1일 롤업 버킷 → UTC 날짜 문자열"""
+        return time.strftime('%Y-%m-%d', time.gmtime(bucket))
     
-    def _get_previous_week_consumption(self, store_id: str, current_date: str) -> float:
-        """전주 소비량 조회"""
-        try:
-            with connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 전주 날짜 계산
-                prev_week_date = (datetime.strptime(current_date, '%Y-%m-%d') - timedelta(days=7)).strftime('%Y-%m-%d')
-                
-                if store_id:
-                    cursor.execute('''
-                        SELECT AVG(power_consumption)
-                        FROM sensor_readings 
-                        WHERE device_id = ? AND DATE(datetime(timestamp, 'unixepoch')) = ?
-                    ''', (store_id, prev_week_date))
-                else:
-                    cursor.execute('''
-                        SELECT AVG(power_consumption)
-                        FROM sensor_readings 
-                        WHERE DATE(datetime(timestamp, 'unixepoch')) = ?
-                    ''', (prev_week_date,))
-                
-                result = cursor.fetchone()
-                return result[0] if result and result[0] else 0.0
-                
-        except Exception as e:
-            logger.error(f"전주 소비량 조회 실패: {e}")
-            return 0.0
+    @staticmethod
+    def _shift_date(date: str, days: int) -> str:
+        """날짜 문자열을 days 일 이동"""
+        return (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
     
     def get_dashboard_summary(self, store_id: str = None) -> Dict:
         """대시보드 요약 정보 조회"""
@@ -216,6 +216,49 @@ class ESP32DataProcessor:
         
         return np.array(features)
     
+    @property
+    def n_point_features(self) -> int:
+        """단일 데이터 포인트 특징 수 (센서 값 + 파생 특징 5개)"""
+        return len(self.feature_columns) + 5
+    
+    def extract_point_features(self, data: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        DataFrame 없이 딕셔너리에서 바로 단일 포인트 특징 추출 (실시간 채점용)
+        
+        _extract_single_features 와 같은 열 순서로 미리 할당한 행렬에 기록합니다.
+        
+        Args:
+            data: 센서 데이터 리스트
+            
+        Returns:
+            (특징 행렬 (n_samples, n_point_features), 유효 행 마스크)
+            숫자로 변환할 수 없는 값이 있는 행은 유효하지 않음으로 표시됩니다.
+        """
+        n_columns = len(self.feature_columns)
+        features = np.zeros((len(data), self.n_point_features), dtype=np.float64)
+        valid = np.ones(len(data), dtype=bool)
+        
+        for i, item in enumerate(data):
+            try:
+                row = features[i]
+                for j, col in enumerate(self.feature_columns):
+                    value = item.get(col)
+                    row[j] = float(value) if value is not None else 0.0
+                np.nan_to_num(row[:n_columns], copy=False, nan=0.0)
+                
+                rms_energy = float(item.get('rms_energy', 0) or 0)
+                decibel_level = float(item.get('decibel_level', 0) or 0)
+                rms_to_db = 20 * np.log10(rms_energy) if rms_energy > 0 else 0
+                row[n_columns] = rms_to_db
+                row[n_columns + 1] = abs(decibel_level - rms_to_db)
+                row[n_columns + 2] = 1 if float(item.get('compressor_state', 0) or 0) > 0.5 else 0
+                row[n_columns + 3] = max(0, min(1, float(item.get('efficiency_score', 0.5))))
+                row[n_columns + 4] = max(0, min(1, float(item.get('anomaly_score', 0.5))))
+            except (TypeError, ValueError):
+                valid[i] = False
+        
+        return features, valid
+    
     def _extract_statistical_features(self, data: List[Dict]) -> Optional[np.ndarray]:
         """통계적 특징 추출 (시계열 데이터 기반)"""
         try:
@@ -8,11 +8,14 @@ import asyncio
 import logging
 import time
 import numpy as np
+from collections import deque
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
-import queue
 import threading
+from services.audio_ring_buffer import DeviceAudioRingBuffer, RingBufferOverrun, SAMPLE_BYTES
+from services.streaming_dsp import StreamingDSP
+from services.esp32_scheduler import FairWindowScheduler, ShardedMetrics
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -35,27 +38,68 @@ class AudioChunk:
     timestamp: float
     data: np.ndarray
     sample_rate: int
-    priority: int = 1  # 1: 정상, 2: 주의, 3: 긴급
+    priority: int = 1  # 1: 정상, 3: 높음, 4: 긴급 (값이 클수록 먼저 처리)
+
+@dataclass
+class IngestResult:
+    """오디오 업로드 수신 결과"""
+    accepted: bool
+    status: str  # 'queued', 'device_overrun', 'server_overloaded', 'invalid'
+    samples: int = 0
+    windows_queued: int = 0
+    retry_after: float = 0.0
+    message: str = ''
+
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 44100, 48000)
+URGENT_PRIORITY = 4
 
 class ESP32Optimizer:
     """ESP32 데이터 처리 최적화 클래스"""
     
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, window_seconds: float = 1.0,
+                 buffer_seconds: float = 32.0, max_devices: int = 512,
+                 max_pending_windows: int = 2048, results_per_device: int = 50,
+                 idle_timeout: float = 300.0, cleanup_interval: float = 30.0):
         self.max_workers = max_workers
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.audio_queue = queue.PriorityQueue()
+        # 스케줄러에는 오디오 데이터가 아니라 (디바이스 ID, 우선순위) 윈도우 토큰만 들어감
+        # 실제 샘플은 디바이스별 링 버퍼에 있으므로 메모리는 링 용량으로 제한됨
+        self.scheduler = FairWindowScheduler()
         self.devices: Dict[str, ESP32Device] = {}
         self.is_processing = False
         self.processing_thread = None
         
-        # 성능 메트릭
-        self.metrics = {
-            'processed_chunks': 0,
-            'failed_chunks': 0,
-            'avg_processing_time': 0.0,
-            'queue_size': 0,
-            'active_devices': 0
-        }
+        # 링 버퍼 설정
+        self.window_seconds = window_seconds
+        self.buffer_seconds = buffer_seconds
+        self.max_devices = max_devices
+        self.max_pending_windows = max_pending_windows
+        self.ring_buffers: Dict[str, DeviceAudioRingBuffer] = {}
+        # idle_timeout 동안 기록이 없는 링 버퍼/필터 상태/결과는 처리 루프가 cleanup_interval 마다 해제
+        self.idle_timeout = idle_timeout
+        self.cleanup_interval = cleanup_interval
+        self._last_cleanup = time.monotonic()
+        # 캐시된 필터 계수 + 디바이스별 필터 상태를 갖는 스트리밍 전처리기
+        self.dsp = StreamingDSP()
+        self._scheduled_windows: Dict[str, int] = {}
+        self._pending_windows = 0
+        self._ingest_lock = threading.Lock()
+        # 워커 슬롯이 빌 때만 큐에서 꺼내도록 하는 세마포어 (실행기 내부 큐 무한 증가 방지)
+        self._worker_slots = threading.Semaphore(max_workers)
+        
+        # 디바이스별 최근 처리 결과 (디바이스당 results_per_device 개로 제한)
+        self.results_per_device = results_per_device
+        self.results: Dict[str, deque] = {}
+        
+        # 성능 메트릭 (고정 개수 샤드에 누적, 조회 시 합산)
+        self.metrics = ShardedMetrics([
+            'processed_chunks', 'failed_chunks', 'rejected_uploads', 'buffer_overruns',
+            'processing_time_total',
+            'urgent_chunks', 'urgent_latency_total', 'max_urgent_latency',
+            'max_latency'
+        ])
+        # 최근 종단 지연 (우선순위별, p50/p99 계산용) - deque.append 는 원자적
+        self._recent_latencies: Dict[int, deque] = {}
         
         # 처리 시작
         self.start_processing()
@@ -71,39 +115,121 @@ class ESP32Optimizer:
                 sample_rate=sample_rate
             )
             self.devices[device_id] = device
-            self.metrics['active_devices'] = len(self.devices)
             logger.info(f"ESP32 디바이스 등록: {device_id} ({ip_address})")
             return True
         except Exception as e:
             logger.error(f"디바이스 등록 실패: {e}")
             return False
     
-    def add_audio_chunk(self, device_id: str, audio_data: bytes, sample_rate: int, priority: int = 1):
-        """오디오 청크 추가 (비동기)"""
+    def _window_samples(self, sample_rate: int) -> int:
+        """분석 윈도우 크기 (샘플 수)"""
+        return max(1, int(self.window_seconds * sample_rate))
+    
+    def _get_ring_buffer(self, device_id: str, sample_rate: int) -> Optional[DeviceAudioRingBuffer]:
+        """디바이스 링 버퍼 조회/생성 (디바이스 수 상한 초과 시 None)"""
+        ring = self.ring_buffers.get(device_id)
+        if ring is not None and ring.sample_rate == sample_rate:
+            return ring
+        
+        with self._ingest_lock:
+            ring = self.ring_buffers.get(device_id)
+            if ring is None and len(self.ring_buffers) >= self.max_devices:
+                # 상한에 도달하면 유휴 버퍼를 먼저 정리하고 다시 확인
+                self._evict_idle_locked(self.idle_timeout)
+                if len(self.ring_buffers) >= self.max_devices:
+                    return None
+            if ring is None or ring.sample_rate != sample_rate:
+                # 샘플링 레이트가 바뀌면 남은 샘플은 의미가 없으므로 새 버퍼로 교체
+                capacity = max(self._window_samples(sample_rate),
+                               int(self.buffer_seconds * sample_rate))
+                ring = DeviceAudioRingBuffer(capacity, sample_rate)
+                self._pending_windows -= self._scheduled_windows.pop(device_id, 0)
+                self.scheduler.discard_device(device_id)
+                self.ring_buffers[device_id] = ring
+        return ring
+    
+    def _retry_after(self, device_id: Optional[str] = None) -> float:
+        """재시도 권장 시간 (초) - 대기 윈도우를 워커가 소화하는 예상 시간"""
+        if device_id is not None:
+            pending = self._scheduled_windows.get(device_id, 0)
+        else:
+            pending = self._pending_windows
+        per_window = self._avg_processing_time() or self.window_seconds
+        return max(1.0, pending * per_window / self.max_workers)
+    
+    def _reject(self, status: str, message: str, device_id: Optional[str] = None) -> IngestResult:
+        self.metrics.incr('rejected_uploads')
+        retry_after = 0.0 if status == 'invalid' else self._retry_after(device_id)
+        return IngestResult(accepted=False, status=status, retry_after=retry_after, message=message)
+    
+    def _admit(self, device_id: str, sample_rate: int, n_bytes: int):
+        """업로드 수락 여부 확인 후 (링 버퍼, None) 또는 (None, 거절 결과) 반환"""
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            return None, self._reject('invalid', f'지원하지 않는 샘플링 레이트: {sample_rate}')
+        if n_bytes <= 0 or n_bytes % SAMPLE_BYTES:
+            return None, self._reject('invalid', '16비트 PCM 데이터 길이가 올바르지 않습니다')
+        if self._pending_windows >= self.max_pending_windows:
+            return None, self._reject('server_overloaded', '서버 처리 대기열이 가득 찼습니다')
+        
+        ring = self._get_ring_buffer(device_id, sample_rate)
+        if ring is None:
+            return None, self._reject('server_overloaded', '연결 가능한 디바이스 수를 초과했습니다')
+        if n_bytes // SAMPLE_BYTES > ring.capacity:
+            return None, self._reject('invalid', f'업로드가 버퍼 용량({ring.capacity} 샘플)보다 큽니다')
+        return ring, None
+    
+    def add_audio_chunk(self, device_id: str, audio_data: bytes, sample_rate: int, priority: int = 1) -> IngestResult:
+        """오디오 청크 추가 (비동기) - 디바이스 링 버퍼에 기록"""
+        ring, rejected = self._admit(device_id, sample_rate, len(audio_data))
+        if rejected:
+            return rejected
         try:
-            # 바이트 데이터를 numpy 배열로 변환
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            chunk = AudioChunk(
-                device_id=device_id,
-                timestamp=time.time(),
-                data=audio_array,
-                sample_rate=sample_rate,
-                priority=priority
-            )
-            
-            # 우선순위 큐에 추가 (우선순위가 높을수록 먼저 처리)
-            self.audio_queue.put((priority, chunk))
-            self.metrics['queue_size'] = self.audio_queue.qsize()
-            
-            # 디바이스 상태 업데이트
-            if device_id in self.devices:
-                self.devices[device_id].last_seen = time.time()
-                self.devices[device_id].status = 'active'
-            
+            samples = ring.write(audio_data)
+        except RingBufferOverrun:
+            self.metrics.incr('buffer_overruns')
+            return self._reject('device_overrun', '디바이스 버퍼가 가득 찼습니다', device_id)
         except Exception as e:
             logger.error(f"오디오 청크 추가 실패: {e}")
-            self.metrics['failed_chunks'] += 1
+            self.metrics.incr('failed_chunks')
+            return self._reject('invalid', str(e))
+        return self._after_write(device_id, ring, samples, priority)
+    
+    def ingest_stream(self, device_id: str, stream, content_length: int,
+                      sample_rate: int, priority: int = 1) -> IngestResult:
+        """요청 본문 스트림을 디바이스 링 버퍼로 직접 읽어들임 (중간 bytes 객체 없음)"""
+        ring, rejected = self._admit(device_id, sample_rate, content_length)
+        if rejected:
+            return rejected
+        try:
+            samples = ring.write_from_stream(stream, content_length)
+        except RingBufferOverrun:
+            self.metrics.incr('buffer_overruns')
+            return self._reject('device_overrun', '디바이스 버퍼가 가득 찼습니다', device_id)
+        except Exception as e:
+            logger.error(f"오디오 스트림 수신 실패: {e}")
+            self.metrics.incr('failed_chunks')
+            return self._reject('invalid', str(e))
+        return self._after_write(device_id, ring, samples, priority)
+    
+    def _after_write(self, device_id: str, ring: DeviceAudioRingBuffer, samples: int, priority: int) -> IngestResult:
+        """기록 후 새로 완성된 분석 윈도우를 큐에 등록"""
+        window = self._window_samples(ring.sample_rate)
+        with self._ingest_lock:
+            scheduled = self._scheduled_windows.get(device_id, 0)
+            new_windows = ring.available() // window - scheduled
+            if new_windows > 0:
+                self._scheduled_windows[device_id] = scheduled + new_windows
+                self._pending_windows += new_windows
+        
+        self.scheduler.put(device_id, priority, new_windows)
+        
+        # 디바이스 상태 업데이트
+        if device_id in self.devices:
+            self.devices[device_id].last_seen = time.time()
+            self.devices[device_id].status = 'active'
+        
+        return IngestResult(accepted=True, status='queued', samples=samples,
+                            windows_queued=max(0, new_windows))
     
     def start_processing(self):
         """오디오 처리 시작"""
@@ -125,23 +251,103 @@ class ESP32Optimizer:
         """오디오 처리 루프 (별도 스레드에서 실행)"""
         while self.is_processing:
             try:
-                # 큐에서 오디오 청크 가져오기 (타임아웃 1초)
-                priority, chunk = self.audio_queue.get(timeout=1.0)
+                if time.monotonic() - self._last_cleanup >= self.cleanup_interval:
+                    self._last_cleanup = time.monotonic()
+                    self.cleanup_old_devices(self.idle_timeout)
+                
+                # 워커 슬롯이 빌 때까지 대기 (나머지는 큐에서 우선순위 순서를 유지)
+                if not self._worker_slots.acquire(timeout=1.0):
+                    continue
                 
-                # 비동기로 처리
-                future = self.executor.submit(self._process_single_chunk, chunk)
+                # 가장 높은 우선순위의 다음 디바이스 윈도우 토큰 (타임아웃 1초)
+                item = self.scheduler.get(timeout=1.0)
+                if item is None:
+                    self._worker_slots.release()
+                    continue
+                device_id, priority, enqueued_at = item
                 
-                # 메트릭 업데이트
-                self.metrics['queue_size'] = self.audio_queue.qsize()
+                # 비동기로 처리, 완료 시 결과 기록
+                dispatched_at = time.time()
+                future = self.executor.submit(self._process_device_window, device_id, priority)
+                future.add_done_callback(
+                    lambda f, d=device_id, p=priority, e=enqueued_at, t=dispatched_at:
+                        self._on_window_done(f, d, p, e, t)
+                )
                 
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"오디오 처리 루프 오류: {e}")
                 time.sleep(0.1)
     
-    def _process_single_chunk(self, chunk: AudioChunk) -> Dict:
-        """단일 오디오 청크 처리"""
+    def _on_window_done(self, future, device_id: str, priority: int,
+                        enqueued_at: float, dispatched_at: float):
+        """윈도우 처리 완료 콜백 - 워커 슬롯 반환, 결과/지연 기록"""
+        self._worker_slots.release()
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"윈도우 처리 실패 ({device_id}): {e}")
+            self.metrics.incr('failed_chunks')
+            result = {'status': 'error', 'device_id': device_id, 'message': str(e)}
+        
+        completed_at = time.time()
+        latency = completed_at - enqueued_at
+        result['priority'] = priority
+        result['queue_wait_ms'] = (dispatched_at - enqueued_at) * 1000
+        result['latency_ms'] = latency * 1000
+        result['completed_at'] = completed_at
+        
+        self.metrics.max('max_latency', latency)
+        if priority >= URGENT_PRIORITY:
+            self.metrics.incr('urgent_chunks')
+            self.metrics.incr('urgent_latency_total', latency)
+            self.metrics.max('max_urgent_latency', latency)
+        self._recent_latencies.setdefault(priority, deque(maxlen=1000)).append(latency)
+        
+        self.results.setdefault(device_id, deque(maxlen=self.results_per_device)).append(result)
+    
+    def get_recent_results(self, device_id: str, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """디바이스의 최근 처리 결과 (최신순), 기록이 없고 미등록 디바이스면 None"""
+        history = self.results.get(device_id)
+        if history is None:
+            return [] if device_id in self.devices else None
+        recent = list(history)[::-1]
+        return recent[:limit] if limit else recent
+    
+    def _process_device_window(self, device_id: str, priority: int) -> Dict:
+        """디바이스 링 버퍼에서 분석 윈도우 하나를 꺼내 처리"""
+        ring = self.ring_buffers.get(device_id)
+        if ring is None:
+            with self._ingest_lock:
+                self._consume_scheduled(device_id)
+            return {'status': 'error', 'message': 'Device buffer released'}
+        
+        # 윈도우 소비와 필터링을 디바이스 단위로 직렬화해야 필터 상태가 순서대로 이어짐
+        with self.dsp.device_lock(device_id, ring.sample_rate):
+            # 예약 카운트 감소와 윈도우 소비를 함께 해야 _after_write 가 윈도우를 중복 예약하지 않음
+            with self._ingest_lock:
+                self._consume_scheduled(device_id)
+                window = ring.read_window(self._window_samples(ring.sample_rate))
+            if window is None:
+                return {'status': 'error', 'message': 'Window not available'}
+            processed_audio = self._preprocess_audio(window, ring.sample_rate, device_id)
+        
+        chunk = AudioChunk(
+            device_id=device_id,
+            timestamp=time.time(),
+            data=window,
+            sample_rate=ring.sample_rate,
+            priority=priority
+        )
+        return self._process_single_chunk(chunk, processed_audio)
+    
+    def _consume_scheduled(self, device_id: str):
+        """예약된 윈도우 카운트 감소 (_ingest_lock 보유 상태에서 호출)"""
+        if self._scheduled_windows.get(device_id, 0) > 0:
+            self._scheduled_windows[device_id] -= 1
+            self._pending_windows -= 1
+    
+    def _process_single_chunk(self, chunk: AudioChunk, processed_audio: Optional[np.ndarray] = None) -> Dict:
+        """단일 오디오 청크 처리 (processed_audio 가 있으면 전처리 생략)"""
         start_time = time.time()
         
         try:
@@ -151,7 +357,8 @@ class ESP32Optimizer:
                 return {'status': 'error', 'message': 'Invalid audio data'}
             
             # 오디오 전처리
-            processed_audio = self._preprocess_audio(chunk.data, chunk.sample_rate)
+            if processed_audio is None:
+                processed_audio = self._preprocess_audio(chunk.data, chunk.sample_rate)
             
             # AI 분석 (간소화된 버전)
             analysis_result = self._quick_analysis(processed_audio)
@@ -166,18 +373,14 @@ class ESP32Optimizer:
             }
             
             # 메트릭 업데이트
-            self.metrics['processed_chunks'] += 1
-            processing_time = time.time() - start_time
-            self.metrics['avg_processing_time'] = (
-                (self.metrics['avg_processing_time'] * (self.metrics['processed_chunks'] - 1) + processing_time) 
-                / self.metrics['processed_chunks']
-            )
+            self.metrics.incr('processed_chunks')
+            self.metrics.incr('processing_time_total', time.time() - start_time)
             
             return result
             
         except Exception as e:
             logger.error(f"오디오 청크 처리 실패: {e}")
-            self.metrics['failed_chunks'] += 1
+            self.metrics.incr('failed_chunks')
             return {'status': 'error', 'message': str(e)}
     
     def _validate_audio_chunk(self, chunk: AudioChunk) -> bool:
@@ -188,7 +391,7 @@ class ESP32Optimizer:
                 return False
             
             # 샘플링 레이트 확인
-            if chunk.sample_rate not in [8000, 16000, 44100, 48000]:
+            if chunk.sample_rate not in SUPPORTED_SAMPLE_RATES:
                 return False
             
             # 데이터 범위 확인 (16비트 오디오)
@@ -199,23 +402,11 @@ class ESP32Optimizer:
         except:
             return False
     
-    def _preprocess_audio(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
-        """오디오 전처리"""
+    def _preprocess_audio(self, audio_data: np.ndarray, sample_rate: int,
+                          device_id: Optional[str] = None) -> np.ndarray:
+        """오디오 전처리 (정규화 → 폴리페이즈 리샘플링 → 상태 유지 고역 통과 필터)"""
         try:
-            # 정규화
-            audio_normalized = audio_data.astype(np.float32) / 32768.0
-            
-            # 리샘플링 (16kHz로 통일)
-            if sample_rate != 16000:
-                from scipy import signal
-                audio_normalized = signal.resample(audio_normalized, int(len(audio_normalized) * 16000 / sample_rate))
-            
-            # 노이즈 제거 (간단한 고역 통과 필터)
-            from scipy import signal
-            b, a = signal.butter(4, 0.01, 'high')
-            audio_filtered = signal.filtfilt(b, a, audio_normalized)
-            
-            return audio_filtered
+            return self.dsp.process(device_id, audio_data, sample_rate)
             
         except Exception as e:
             logger.error(f"오디오 전처리 실패: {e}")
@@ -257,11 +448,40 @@ class ESP32Optimizer:
                 'error': str(e)
             }
     
+    def _avg_processing_time(self) -> float:
+        snapshot = self.metrics.snapshot()
+        return snapshot['processing_time_total'] / snapshot['processed_chunks'] if snapshot['processed_chunks'] else 0.0
+    
+    def _latency_percentiles(self) -> Dict:
+        """우선순위별 최근 종단 지연 p50/p99 (ms)"""
+        percentiles = {}
+        for priority, latencies in list(self._recent_latencies.items()):
+            values = np.array(list(latencies))
+            if len(values):
+                p50, p99 = np.percentile(values, [50, 99]) * 1000
+                percentiles[priority] = {'p50_ms': float(p50), 'p99_ms': float(p99), 'samples': len(values)}
+        return percentiles
+    
     def get_metrics(self) -> Dict:
         """성능 메트릭 반환"""
+        snapshot = self.metrics.snapshot()
+        processed = snapshot['processed_chunks']
+        urgent = snapshot['urgent_chunks']
         return {
-            **self.metrics,
-            'queue_size': self.audio_queue.qsize(),
+            'processed_chunks': int(processed),
+            'failed_chunks': int(snapshot['failed_chunks']),
+            'rejected_uploads': int(snapshot['rejected_uploads']),
+            'buffer_overruns': int(snapshot['buffer_overruns']),
+            'avg_processing_time': snapshot['processing_time_total'] / processed if processed else 0.0,
+            'avg_urgent_latency': snapshot['urgent_latency_total'] / urgent if urgent else 0.0,
+            'max_urgent_latency': snapshot['max_urgent_latency'],
+            'max_latency': snapshot['max_latency'],
+            'latency_by_priority': self._latency_percentiles(),
+            'queue_size': self.scheduler.qsize(),
+            'queue_depth_by_priority': self.scheduler.depth_by_priority(),
+            'pending_windows': self._pending_windows,
+            'buffered_devices': len(self.ring_buffers),
+            'buffered_samples': sum(ring.available() for ring in list(self.ring_buffers.values())),
             'active_devices': len([d for d in self.devices.values() if d.status == 'active'])
         }
     
@@ -280,20 +500,51 @@ class ESP32Optimizer:
             'is_online': time.time() - device.last_seen < 60  # 1분 이내
         }
     
-    def cleanup_old_devices(self, timeout: int = 300):
-        """오래된 디바이스 정리 (5분 이상 비활성)"""
-        current_time = time.time()
-        devices_to_remove = []
+    def cleanup_old_devices(self, timeout: float = 300):
+        """
+        오래된 디바이스 정리 (5분 이상 비활성)
         
-        for device_id, device in self.devices.items():
-            if current_time - device.last_seen > timeout:
-                devices_to_remove.append(device_id)
+        등록 디바이스는 last_seen 기준으로 제거하고, 링 버퍼는 등록 여부와 관계없이
+        마지막 기록 시각 기준으로 해제합니다 (미등록 ID 도 디바이스 수 상한을 차지하므로).
+        """
+        current_time = time.time()
+        devices_to_remove = [device_id for device_id, device in list(self.devices.items())
+                             if current_time - device.last_seen > timeout]
         
         for device_id in devices_to_remove:
-            del self.devices[device_id]
+            self.devices.pop(device_id, None)
+            self._release_ring_buffer(device_id)
+            self.results.pop(device_id, None)
             logger.info(f"비활성 디바이스 제거: {device_id}")
         
-        self.metrics['active_devices'] = len(self.devices)
+        with self._ingest_lock:
+            released = self._evict_idle_locked(timeout)
+        if released:
+            logger.info(f"유휴 링 버퍼 해제: {len(released)}개 디바이스")
+        
+        # 버퍼도 등록 정보도 없는 디바이스의 결과 기록
+        for device_id in list(self.results):
+            if device_id not in self.ring_buffers and device_id not in self.devices:
+                self.results.pop(device_id, None)
+    
+    def _evict_idle_locked(self, timeout: float) -> List[str]:
+        """timeout 동안 기록이 없고 예약된 윈도우도 없는 링 버퍼 해제 (_ingest_lock 보유 상태에서 호출)"""
+        released = [device_id for device_id, ring in list(self.ring_buffers.items())
+                    if ring.idle_seconds() > timeout and not self._scheduled_windows.get(device_id)]
+        for device_id in released:
+            self._release_ring_buffer_locked(device_id)
+        return released
+    
+    def _release_ring_buffer(self, device_id: str):
+        """디바이스 링 버퍼 해제"""
+        with self._ingest_lock:
+            self._release_ring_buffer_locked(device_id)
+    
+    def _release_ring_buffer_locked(self, device_id: str):
+        self.ring_buffers.pop(device_id, None)
+        self._pending_windows -= self._scheduled_windows.pop(device_id, 0)
+        self.scheduler.discard_device(device_id)
+        self.dsp.release(device_id)
 
 # 전역 인스턴스
 esp32_optimizer = ESP32Optimizer()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+ESP32 분석 윈도우 스케줄러 및 샤딩 메트릭
+- 우선순위가 높은 윈도우(긴급=4)를 먼저 처리
+- 같은 우선순위 안에서는 디바이스 단위 라운드 로빈 (한 디바이스의 버스트가 다른 디바이스를 굶기지 않음)
+- 고정 개수 카운터 샤드(스트라이프)로 메트릭 누적, 스레드가 늘어도 샤드 수는 고정
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+
+class FairWindowScheduler:
+    """우선순위 + 디바이스 공정성 스케줄러"""
+
+    def __init__(self):
+        # 우선순위 → (디바이스 ID → 대기 중인 토큰의 등록 시각들), OrderedDict 순서가 라운드 로빈 순서
+        self._levels: Dict[int, "OrderedDict[str, Deque[float]]"] = {}
+        self._size = 0
+        self._condition = threading.Condition()
+
+    def put(self, device_id: str, priority: int, count: int = 1):
+        """디바이스의 분석 윈도우 토큰 count 개 등록"""
+        if count <= 0:
+            return
+        now = time.time()
+        with self._condition:
+            level = self._levels.setdefault(priority, OrderedDict())
+            pending = level.get(device_id)
+            if pending is None:
+                pending = level[device_id] = deque()
+            pending.extend([now] * count)
+            self._size += count
+            self._condition.notify(count)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, int, float]]:
+        """
+        다음 처리할 (디바이스 ID, 우선순위, 등록 시각) 반환
+
+        가장 높은 우선순위 레벨에서 맨 앞 디바이스의 토큰 하나를 꺼내고,
+        남은 토큰이 있으면 그 디바이스를 레벨의 맨 뒤로 보냅니다.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._size > 0, timeout=timeout):
+                return None
+            priority = max(p for p, level in self._levels.items() if level)
+            level = self._levels[priority]
+            device_id, pending = next(iter(level.items()))
+            enqueued_at = pending.popleft()
+            if pending:
+                level.move_to_end(device_id)
+            else:
+                del level[device_id]
+            self._size -= 1
+            return device_id, priority, enqueued_at
+
+    def discard_device(self, device_id: str) -> int:
+        """디바이스의 대기 토큰 전부 제거, 제거한 개수 반환"""
+        removed = 0
+        with self._condition:
+            for level in self._levels.values():
+                pending = level.pop(device_id, None)
+                if pending:
+                    removed += len(pending)
+            self._size -= removed
+        return removed
+
+    def qsize(self) -> int:
+        return self._size
+
+    def depth_by_priority(self) -> Dict[int, int]:
+        with self._condition:
+            return {priority: sum(len(p) for p in level.values())
+                    for priority, level in self._levels.items() if level}
+
+
+class ShardedMetrics:
+    """
+    스트라이프 카운터
+
+    스레드마다 고정 개수(stripes) 샤드 중 하나를 돌아가며 배정하고 샤드 잠금으로 갱신합니다.
+    스레드가 아무리 많이 생겼다 사라져도 샤드 수는 그대로이고, 조회 시에만 모든 샤드를 합산합니다.
+    """
+
+    def __init__(self, keys: Iterable[str], stripes: int = 16):
+        self._keys = tuple(keys)
+        self._local = threading.local()
+        self._shards: List[Dict[str, float]] = [dict.fromkeys(self._keys, 0) for _ in range(stripes)]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._next_stripe = itertools.count()
+
+    def _stripe(self) -> int:
+        stripe = getattr(self._local, 'stripe', None)
+        if stripe is None:
+            stripe = next(self._next_stripe) % len(self._shards)
+            self._local.stripe = stripe
+        return stripe
+
+    def incr(self, key: str, value: float = 1):
+        stripe = self._stripe()
+        with self._locks[stripe]:
+            self._shards[stripe][key] += value
+
+    def max(self, key: str, value: float):
+        stripe = self._stripe()
+        with self._locks[stripe]:
+            shard = self._shards[stripe]
+            if value > shard[key]:
+                shard[key] = value
+
+    def snapshot(self) -> Dict[str, float]:
+        """모든 샤드 합산 (max_ 로 시작하는 키는 최댓값)"""
+        shards = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shards.append(dict(shard))
+        totals = dict.fromkeys(self._keys, 0)
+        for shard in shards:
+            for key in self._keys:
+                if key.startswith('max_'):
+                    totals[key] = max(totals[key], shard[key])
+                else:
+                    totals[key] += shard[key]
+        return totals
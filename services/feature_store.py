@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+콘텐츠 주소 기반 특징 저장소
+(파일 내용 해시, 추출기 이름, 추출기 버전, 파라미터) 를 키로 파일별 특징 행렬을 저장하고,
+훈련/재훈련 파이프라인이 "이 파일들의 특징 행렬" 을 요청하면 저장소에 없는 파일만 새로 계산합니다.
+
+- 특징 행렬은 추출기 스펙별 .npy 샤드에 이어 붙여 저장하고 np.load(mmap_mode='r') 로 읽음
+- 색인(SQLite): 파일 내용 해시 → (샤드, 시작 행, 행 수)
+- 파일 해시는 (경로, 크기, 수정 시각) 으로 캐시하여 변경되지 않은 파일은 다시 읽지 않음
+- 항목이 교체되어 아무도 참조하지 않는 샤드는 바로 삭제, 일부 행만 남은 샤드는 compact() 로 다시 기록
+- 저장소 디렉터리와 색인은 처음 사용할 때 생성, 열린 메모리 맵은 max_open_shards 개까지 (LRU)
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = 'data/feature_store'
+HASH_CHUNK_BYTES = 1 << 20
+# 동시에 열어 두는 샤드 메모리 맵 수
+MAX_OPEN_SHARDS = 64
+# 색인에 없는 샤드 파일을 지우기 전 유예 시간 (다른 프로세스가 기록 후 색인하기 전일 수 있음)
+ORPHAN_GRACE_SECONDS = 3600
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS file_hashes (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        content_hash TEXT NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS feature_specs (
+        spec_key TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        version TEXT NOT NULL,
+        params TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS feature_entries (
+        content_hash TEXT NOT NULL,
+        spec_key TEXT NOT NULL,
+        shard TEXT,
+        row_start INTEGER NOT NULL,
+        n_rows INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (content_hash, spec_key)
+    )''',
+)
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    특징 추출기 식별 정보
+
+    추출 로직이나 출력 레이아웃이 바뀌면 version 을 올려야 이전 결과가 재사용되지 않습니다.
+    """
+    name: str
+    version: str
+    params: Dict[str, Any] = field(default_factory=dict, hash=False, compare=False)
+
+    @property
+    def params_json(self) -> str:
+        return json.dumps(self.params, sort_keys=True, default=str)
+
+    @property
+    def key(self) -> str:
+        digest = hashlib.sha256(f'{self.name}\0{self.version}\0{self.params_json}'.encode('utf-8'))
+        return f'{self.name}-{self.version}-{digest.hexdigest()[:16]}'
+
+
+class FeatureStore:
+    """파일 내용 해시 기반 특징 행렬 저장소"""
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR, max_open_shards: int = MAX_OPEN_SHARDS):
+        self.store_dir = store_dir
+        self.shard_dir = os.path.join(store_dir, 'shards')
+        self.max_open_shards = max_open_shards
+
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        # 샤드 기록~색인 사이에 compact() 가 끼어들지 않도록 put_many / compact 직렬화
+        self._write_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # 샤드 파일별 메모리 맵 (샤드는 한 번 쓰면 변경되지 않음), 최근 사용 순
+        self._shards: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'files_hashed': 0, 'shards_deleted': 0, 'shards_compacted': 0}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """색인 연결 (처음 사용할 때 디렉터리와 스키마 생성)"""
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    os.makedirs(self.shard_dir, exist_ok=True)
+                    conn = sqlite3.connect(os.path.join(self.store_dir, 'index.db'), check_same_thread=False)
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute('PRAGMA synchronous=NORMAL')
+                    with conn:
+                        for statement in SCHEMA:
+                            conn.execute(statement)
+                    self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # 파일 해시
+    # ------------------------------------------------------------------
+    def file_hash(self, path: str) -> str:
+        """파일 내용 SHA-256 (크기/수정 시각이 같으면 색인에 캐시된 값 사용)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT size, mtime_ns, content_hash FROM file_hashes WHERE path = ?', (path,)
+            ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, content_hash)
+            )
+        self.stats['files_hashed'] += 1
+        return content_hash
+
+    # ------------------------------------------------------------------
+    # 조회 / 저장
+    # ------------------------------------------------------------------
+    def _open_shard(self, shard: str) -> np.ndarray:
+        """샤드 메모리 맵 (max_open_shards 를 넘으면 가장 오래 안 쓴 맵을 닫음, 반환된 뷰는 계속 유효)"""
+        with self._lock:
+            array = self._shards.get(shard)
+            if array is not None:
+                self._shards.move_to_end(shard)
+                return array
+        array = np.load(os.path.join(self.shard_dir, shard), mmap_mode='r')
+        with self._lock:
+            self._shards[shard] = array
+            while len(self._shards) > self.max_open_shards:
+                self._shards.popitem(last=False)
+        return array
+
+    def _forget_shard(self, shard: str):
+        with self._lock:
+            self._shards.pop(shard, None)
+
+    def lookup(self, paths: Iterable[str], spec: FeatureSpec) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """
+        저장된 특징 행렬 조회
+
+        Returns:
+            (경로별 특징 행렬, 저장소에 없는 경로 목록). 읽을 수 없는 파일은 누락으로 분류됩니다.
+            행렬은 샤드의 읽기 전용 메모리 맵 뷰입니다.
+        """
+        found = {}
+        missing = []
+        for path in paths:
+            try:
+                content_hash = self.file_hash(path)
+            except OSError as e:
+                logger.warning(f"특징 저장소 파일 해시 실패 {path}: {e}")
+                missing.append(path)
+                continue
+
+            with self._lock:
+                row = self.conn.execute(
+                    'SELECT shard, row_start, n_rows FROM feature_entries WHERE content_hash = ? AND spec_key = ?',
+                    (content_hash, spec.key)
+                ).fetchone()
+            if row is None:
+                missing.append(path)
+                continue
+
+            shard, row_start, n_rows = row
+            if shard is None:
+                found[path] = np.empty((0, 0))
+            else:
+                try:
+                    found[path] = self._open_shard(shard)[row_start:row_start + n_rows]
+                except (OSError, ValueError) as e:
+                    logger.warning(f"특징 샤드 읽기 실패 {shard}: {e}")
+                    missing.append(path)
+
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(missing)
+        return found, missing
+
+    def put_many(self, matrices: Dict[str, np.ndarray], spec: FeatureSpec) -> int:
+        """
+        경로별 특징 행렬 저장 (열 수와 dtype 이 같은 행렬끼리 샤드 하나로 기록)
+
+        Returns:
+            저장된 파일 수
+        """
+        with self._write_lock:
+            return self._put_many(matrices, spec)
+
+    def _put_many(self, matrices: Dict[str, np.ndarray], spec: FeatureSpec) -> int:
+        conn = self.conn
+        entries = []
+        groups: Dict[Tuple[int, str], List[Tuple[str, np.ndarray]]] = {}
+        for path, matrix in matrices.items():
+            matrix = np.asarray(matrix)
+            if matrix.ndim == 1:
+                matrix = matrix[np.newaxis, :]
+            try:
+                content_hash = self.file_hash(path)
+            except OSError as e:
+                logger.warning(f"특징 저장소 파일 해시 실패 {path}: {e}")
+                continue
+            if matrix.shape[0] == 0:
+                entries.append((content_hash, None, 0, 0))
+            else:
+                groups.setdefault((matrix.shape[1], matrix.dtype.str), []).append((content_hash, matrix))
+
+        for items in groups.values():
+            shard = f'{spec.key}-{uuid.uuid4().hex[:12]}.npy'
+            data = np.concatenate([matrix for _, matrix in items], axis=0)
+            shard_path = os.path.join(self.shard_dir, shard)
+            tmp_path = shard_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, data)
+            os.replace(tmp_path, shard_path)
+
+            row_start = 0
+            for content_hash, matrix in items:
+                entries.append((content_hash, shard, row_start, len(matrix)))
+                row_start += len(matrix)
+
+        now = time.time()
+        with self._lock, conn:
+            # 교체될 항목이 가리키던 샤드 (교체 후 참조가 없으면 삭제)
+            replaced = set()
+            for content_hash, _, _, _ in entries:
+                row = conn.execute(
+                    'SELECT shard FROM feature_entries WHERE content_hash = ? AND spec_key = ?',
+                    (content_hash, spec.key)
+                ).fetchone()
+                if row and row[0]:
+                    replaced.add(row[0])
+            conn.execute(
+                'INSERT OR IGNORE INTO feature_specs (spec_key, name, version, params, created_at) VALUES (?, ?, ?, ?, ?)',
+                (spec.key, spec.name, spec.version, spec.params_json, now)
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO feature_entries (content_hash, spec_key, shard, row_start, n_rows, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(content_hash, spec.key, shard, row_start, n_rows, now)
+                 for content_hash, shard, row_start, n_rows in entries]
+            )
+        if replaced:
+            self._delete_unreferenced(replaced)
+        return len(entries)
+
+    # ------------------------------------------------------------------
+    # 정리
+    # ------------------------------------------------------------------
+    def _live_rows(self) -> Dict[str, int]:
+        """샤드별 색인이 참조하는 행 수"""
+        with self._lock:
+            return dict(self.conn.execute(
+                'SELECT shard, SUM(n_rows) FROM feature_entries WHERE shard IS NOT NULL GROUP BY shard'
+            ).fetchall())
+
+    def _delete_shard_file(self, shard: str):
+        self._forget_shard(shard)
+        try:
+            os.remove(os.path.join(self.shard_dir, shard))
+            self.stats['shards_deleted'] += 1
+        except FileNotFoundError:
+            pass
+
+    def _delete_unreferenced(self, shards: Iterable[str]):
+        """색인에서 더 이상 참조하지 않는 샤드 삭제"""
+        live = self._live_rows()
+        for shard in shards:
+            if shard not in live:
+                self._delete_shard_file(shard)
+
+    def compact(self, min_live_ratio: float = 0.5) -> Dict[str, int]:
+        """
+        저장소 정리
+
+        - 색인이 참조하지 않는 샤드 파일 삭제 (ORPHAN_GRACE_SECONDS 보다 오래된 것만)
+        - 참조 행 비율이 min_live_ratio 미만인 샤드는 살아 있는 행만 새 샤드로 다시 기록
+        - 더 이상 존재하지 않는 파일의 해시 캐시 삭제
+
+        Returns:
+            {'deleted_shards', 'compacted_shards', 'reclaimed_rows', 'stale_hashes'}
+        """
+        result = {'deleted_shards': 0, 'compacted_shards': 0, 'reclaimed_rows': 0, 'stale_hashes': 0}
+        with self._write_lock:
+            live = self._live_rows()
+            now = time.time()
+            for entry in os.scandir(self.shard_dir):
+                if (entry.is_file() and entry.name.endswith('.npy') and entry.name not in live
+                        and now - entry.stat().st_mtime > ORPHAN_GRACE_SECONDS):
+                    self._delete_shard_file(entry.name)
+                    result['deleted_shards'] += 1
+
+            for shard, live_rows in live.items():
+                try:
+                    total_rows = len(self._open_shard(shard))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"특징 샤드 읽기 실패 {shard}: {e}")
+                    continue
+                if total_rows and live_rows / total_rows < min_live_ratio:
+                    self._rewrite_shard(shard)
+                    result['compacted_shards'] += 1
+                    result['reclaimed_rows'] += total_rows - live_rows
+
+            with self._lock:
+                paths = [row[0] for row in self.conn.execute('SELECT path FROM file_hashes')]
+            stale = [(path,) for path in paths if not os.path.exists(path)]
+            if stale:
+                with self._lock, self.conn:
+                    self.conn.executemany('DELETE FROM file_hashes WHERE path = ?', stale)
+            result['stale_hashes'] = len(stale)
+
+        self.stats['shards_compacted'] += result['compacted_shards']
+        if any(result.values()):
+            logger.info(f"특징 저장소 정리: {result}")
+        return result
+
+    def _rewrite_shard(self, shard: str):
+        """샤드에서 색인이 참조하는 행만 새 샤드로 옮기고 기존 샤드 삭제 (_write_lock 보유 상태에서 호출)"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT content_hash, spec_key, row_start, n_rows FROM feature_entries '
+                'WHERE shard = ? ORDER BY row_start', (shard,)
+            ).fetchall()
+        source = self._open_shard(shard)
+        new_shard = f'{rows[0][1]}-{uuid.uuid4().hex[:12]}.npy'
+        data = np.concatenate([source[row_start:row_start + n_rows] for _, _, row_start, n_rows in rows], axis=0)
+        shard_path = os.path.join(self.shard_dir, new_shard)
+        tmp_path = shard_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, shard_path)
+
+        updates = []
+        row_start = 0
+        for content_hash, spec_key, _, n_rows in rows:
+            updates.append((new_shard, row_start, content_hash, spec_key))
+            row_start += n_rows
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'UPDATE feature_entries SET shard = ?, row_start = ? WHERE content_hash = ? AND spec_key = ?',
+                updates
+            )
+        self._delete_shard_file(shard)
+
+    def get_or_compute(self, paths: List[str], spec: FeatureSpec,
+                       compute: Callable[[str], Optional[np.ndarray]]) -> Dict[str, np.ndarray]:
+        """
+        경로별 특징 행렬 반환, 저장소에 없는 파일만 compute(path) 로 계산 후 저장
+
+        compute 가 None 을 반환하거나 예외를 던진 파일은 결과에서 제외되고 저장되지 않습니다.
+        """
+        found, missing = self.lookup(paths, spec)
+        computed = {}
+        for path in missing:
+            try:
+                matrix = compute(path)
+            except Exception as e:
+                logger.warning(f"특징 계산 실패 {path}: {e}")
+                continue
+            if matrix is not None:
+                computed[path] = matrix
+        if computed:
+            self.put_many(computed, spec)
+            logger.info(f"특징 저장소 [{spec.name}] 재사용 {len(found)}개, 신규 계산 {len(computed)}개")
+        found.update(computed)
+        return {path: found[path] for path in paths if path in found}
+
+    def get_status(self) -> Dict:
+        """저장소 상태"""
+        with self._lock:
+            specs = self.conn.execute(
+                'SELECT s.name, s.version, COUNT(e.content_hash), COALESCE(SUM(e.n_rows), 0) '
+                'FROM feature_specs s LEFT JOIN feature_entries e ON e.spec_key = s.spec_key '
+                'GROUP BY s.spec_key'
+            ).fetchall()
+        shard_bytes = sum(entry.stat().st_size for entry in os.scandir(self.shard_dir) if entry.is_file())
+        return {
+            'store_dir': self.store_dir,
+            'specs': [{'name': name, 'version': version, 'files': files, 'rows': rows}
+                      for name, version, files, rows in specs],
+            'shard_bytes': shard_bytes,
+            'open_shards': len(self._shards),
+            **self.stats
+        }
+
+
+# 전역 인스턴스
+feature_store = FeatureStore()
@@ -423,15 +423,15 @@ class ModelManagementService:
             # 최종 모델 경로
             final_path = self.models_dir / f"{model_name}.pkl"
             
-            # 모델 파일 복사
-            shutil.copy2(source_path, final_path)
+            # 모델 파일 복사 (AI 서비스 워커가 복사 중인 파일을 읽지 않도록 임시 파일에서 교체)
+            self._atomic_copy(source_path, final_path)
             
             # 스케일러 파일도 확인
             scaler_name = f"{model_name}_scaler"
             scaler_source = source_path.replace('.pkl', '_scaler.pkl')
             if os.path.exists(scaler_source):
                 scaler_dest = self.models_dir / f"{scaler_name}.pkl"
-                shutil.copy2(scaler_source, scaler_dest)
+                self._atomic_copy(scaler_source, scaler_dest)
                 logger.info(f"스케일러 파일 설치: {scaler_dest}")
             
             logger.info(f"모델 설치 완료: {final_path}")
@@ -441,6 +441,12 @@ class ModelManagementService:
             logger.error(f"모델 설치 실패: {e}")
             raise
     
+    def _atomic_copy(self, source_path, dest_path):
+        """임시 파일로 복사한 뒤 os.replace 로 교체"""
+        tmp_path = f"{dest_path}.tmp"
+        shutil.copy2(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    
     def _save_version_info(self, model_name: str, version: str):
         """버전 정보 저장"""
         try:
@@ -466,8 +472,9 @@ class ModelManagementService:
             # AI 서비스에 모델 업데이트 알림
             logger.info(f"AI 서비스에 모델 업데이트 알림: {model_name} v{version}")
             
-            # 실제로는 AI 서비스의 모델 리로드 메서드 호출
-            # unified_ai_service.reload_model(model_name, model_path)
+            # 백그라운드에서 로드/워밍업 후 교체 (처리 중인 요청은 이전 버전으로 완료)
+            # 다른 워커 프로세스는 모델 파일 변경을 감지해 각자 리로드
+            unified_ai_service.reload_model(model_name, model_path, version)
             
         except Exception as e:
             logger.error(f"AI 서비스 알림 실패: {e}")
@@ -554,7 +561,7 @@ class ModelManagementService:
             
             # 모델 파일 복사
             current_model_path = self.models_dir / f"{model_name}.pkl"
-            shutil.copy2(target_model.file_path, current_model_path)
+            self._atomic_copy(target_model.file_path, current_model_path)
             
             # 버전 정보 저장
             self._save_version_info(model_name, target_model.version)
@@ -20,9 +20,19 @@ from sklearn.preprocessing import StandardScaler
 import joblib
 import librosa
 from services.field_data_collection import field_data_collector
+from services.feature_store import FeatureSpec, feature_store
 
 logger = logging.getLogger(__name__)
 
+# _extract_audio_features 출력 순서 (특징 저장소 행 레이아웃)
+RETRAINING_FEATURE_NAMES = (
+    ['rms_energy', 'zero_crossing_rate', 'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth'] +
+    [name for i in range(13) for name in (f'mfcc_{i}', f'mfcc_{i}_std')] +
+    ['low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio', 'compressor_freq_energy', 'leak_freq_energy']
+)
+# 특징 추출 로직을 바꾸면 버전을 올려야 저장소의 이전 특징이 재사용되지 않음
+RETRAINING_FEATURE_SPEC = FeatureSpec('retraining_audio_features', '1', {'sr': 16000, 'n_mfcc': 13})
+
 class ModelRetrainingService:
     """모델 재훈련 서비스"""
     
@@ -98,36 +108,32 @@ class ModelRetrainingService:
             if len(verified_data) < 10:
                 raise ValueError(f"훈련 데이터 부족: {len(verified_data)}개")
             
+            audio_paths = []
+            for data in verified_data:
+                audio_path = data['audio_file_path']
+                if not os.path.exists(audio_path):
+                    logger.warning(f"오디오 파일 없음: {audio_path}")
+                    continue
+                audio_paths.append(audio_path)
+            
+            # 특징 저장소에 없는 파일만 새로 추출
+            matrices = feature_store.get_or_compute(
+                list(dict.fromkeys(audio_paths)), RETRAINING_FEATURE_SPEC, self._extract_audio_feature_vector
+            )
+            
             X = []
             y = []
-            feature_names = []
-            
             for data in verified_data:
-                try:
-                    # 오디오 파일에서 특징 추출
-                    audio_path = data['audio_file_path']
-                    if not os.path.exists(audio_path):
-                        logger.warning(f"오디오 파일 없음: {audio_path}")
-                        continue
-                    
-                    features = self._extract_audio_features(audio_path)
-                    if features is not None:
-                        X.append(features)
-                        y.append(data['ground_truth_label'])
-                        
-                        # 첫 번째 샘플에서 특징 이름 추출
-                        if not feature_names:
-                            feature_names = list(features.keys())
-                            
-                except Exception as e:
-                    logger.warning(f"특징 추출 실패: {e}")
-                    continue
+                matrix = matrices.get(data['audio_file_path'])
+                if matrix is not None and len(matrix):
+                    X.append(matrix[0])
+                    y.append(data['ground_truth_label'])
             
             if len(X) < 10:
                 raise ValueError(f"유효한 훈련 데이터 부족: {len(X)}개")
             
-            # 특징을 배열로 변환
-            X_array = np.array([[features[f] for f in feature_names] for features in X])
+            feature_names = list(RETRAINING_FEATURE_NAMES)
+            X_array = np.array(X, dtype=np.float64)
             y_array = np.array(y)
             
             logger.info(f"훈련 데이터 준비 완료: {len(X_array)}개 샘플, {len(feature_names)}개 특징")
@@ -138,6 +144,13 @@ class ModelRetrainingService:
             logger.error(f"훈련 데이터 준비 실패: {e}")
             raise
     
+    def _extract_audio_feature_vector(self, audio_path: str) -> Optional[np.ndarray]:
+        """특징 저장소용 고정 순서 특징 벡터 (RETRAINING_FEATURE_NAMES)"""
+        features = self._extract_audio_features(audio_path)
+        if features is None:
+            return None
+        return np.array([[features[name] for name in RETRAINING_FEATURE_NAMES]], dtype=np.float64)
+    
     def _extract_audio_features(self, audio_path: str) -> Optional[Dict]:
         """오디오 특징 추출"""
         try:
@@ -2,6 +2,11 @@
 """
 실시간 스트리밍 서비스
 Tesla 스타일의 WebSocket 기반 실시간 데이터 스트리밍
+
+- 수집 스레드는 IngestBridge 유한 큐에 넣기만 하고, 스트리밍 루프가 틱마다 한꺼번에 꺼내
+  디바이스별 마지막 값 하나로 합쳐 변경된 디바이스만 푸시
+- 브로드캐스트 메시지는 한 번만 직렬화하여 모든 구독자에게 공유
+- 클라이언트마다 유한 전송 큐와 전송 태스크를 두어 느린 클라이언트는 끊고 나머지는 지연 없이 전송
 """
 
 import asyncio
@@ -9,7 +14,8 @@ import json
 import time
 import logging
 import threading
-from typing import Dict, List, Set, Optional, Callable
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Set, Optional, Callable, Tuple
 from datetime import datetime, timedelta
 import websockets
 import websockets.exceptions
@@ -20,19 +26,185 @@ import numpy as np
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 느린 소비자 종료 코드 (RFC 6455: 1013 Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class LatestValueStore:
+    """
+    디바이스별 최신 센서 값 저장소 (스레드 안전)
+
+    갱신마다 전역 버전이 증가하므로, 스트리밍 루프는 마지막으로 보낸 버전 이후에
+    바뀐 디바이스만 꺼내 보낼 수 있습니다 (같은 틱 안의 여러 갱신은 최신 값 하나로 합쳐짐).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[int, float, Dict]] = {}  # device_id -> (버전, 수신 시각, 데이터)
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def update(self, device_id: str, data: Dict, received_at: float = None) -> int:
+        with self._lock:
+            self._version += 1
+            self._values[device_id] = (self._version, received_at or time.time(), data)
+            return self._version
+
+    def update_many(self, items: Iterable[Tuple[str, Dict, float]]) -> int:
+        """여러 디바이스 최신 값을 한 번의 잠금으로 갱신 ((device_id, 데이터, 수신 시각) 목록)"""
+        with self._lock:
+            for device_id, data, received_at in items:
+                self._version += 1
+                self._values[device_id] = (self._version, received_at, data)
+            return self._version
+
+    def get(self, device_id: str) -> Optional[Dict]:
+        entry = self._values.get(device_id)
+        if entry is None:
+            return None
+        return {'timestamp': entry[1], 'data': entry[2]}
+
+    def changed_since(self, version: int) -> Tuple[int, Dict[str, Dict]]:
+        """version 이후 갱신된 디바이스의 최신 값과 현재 버전"""
+        with self._lock:
+            current = self._version
+            if current == version:
+                return current, {}
+            changed = {device_id: {'timestamp': received_at, 'data': data}
+                       for device_id, (entry_version, received_at, data) in self._values.items()
+                       if entry_version > version}
+        return current, changed
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class IngestBridge:
+    """
+    동기 수집 스레드(Flask 워커) → 스트리밍 이벤트 루프 브리지
+
+    - 생산자는 유한 deque 에 (device_id, 수신 시각, 데이터) 를 append 만 함 (GIL 아래 원자적, 잠금 없음)
+    - 큐가 가득 차면 가장 오래된 항목이 밀려나고 dropped 가 증가 (잠금은 이 넘침 경로에서만)
+    - 루프가 연결되어 있으면 루프가 마지막으로 꺼낸 뒤 첫 항목에서만 call_soon_threadsafe 로 깨움
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._queue = deque(maxlen=capacity)
+        self._overflow_lock = threading.Lock()
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._wake_pending = False
+
+    @property
+    def attached(self) -> bool:
+        return self._loop is not None
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """스트리밍 루프 연결 (루프 안에서 호출)"""
+        self._wakeup = asyncio.Event()
+        self._wake_pending = False
+        self._loop = loop
+
+    def detach(self):
+        self._loop = None
+
+    def put(self, device_id: str, data: Dict, received_at: float):
+        """측정값 하나 추가 (어느 스레드에서나 호출 가능)"""
+        if len(self._queue) >= self.capacity:
+            with self._overflow_lock:
+                self.dropped += 1
+        self._queue.append((device_id, received_at, data))
+        self._notify()
+
+    def put_many(self, items: Iterable[Tuple[str, float, Dict]]):
+        """(device_id, 수신 시각, 데이터) 여러 개 추가"""
+        items = list(items)
+        overflow = len(self._queue) + len(items) - self.capacity
+        if overflow > 0:
+            with self._overflow_lock:
+                self.dropped += overflow
+        self._queue.extend(items)
+        self._notify()
+
+    def _notify(self):
+        loop = self._loop
+        if loop is None or self._wake_pending:
+            return
+        self._wake_pending = True
+        try:
+            loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # 루프가 이미 닫힘
+            self._loop = None
+
+    async def wait(self):
+        """새 항목이 들어올 때까지 대기 (루프 안에서 호출)"""
+        if not self._queue:
+            await self._wakeup.wait()
+        self._wakeup.clear()
+
+    def drain(self) -> List[Tuple[str, float, Dict]]:
+        """지금까지 쌓인 항목을 모두 꺼냄 (루프 안에서 호출)"""
+        self._wake_pending = False
+        items = []
+        popleft = self._queue.popleft
+        try:
+            while True:
+                items.append(popleft())
+        except IndexError:
+            pass
+        return items
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+@dataclass
+class ClientChannel:
+    """클라이언트별 전송 채널 (유한 큐 + 전송 태스크)"""
+    client_id: str
+    websocket: Any
+    queue: asyncio.Queue
+    sender: Optional[asyncio.Task] = None
+    sent: int = 0
+
+
 class RealtimeStreamingService:
     """실시간 스트리밍 서비스 (Tesla 스타일)"""
-    
-    def __init__(self, host: str = '0.0.0.0', port: int = 8080):
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 8080,
+                 send_queue_size: int = 64, send_timeout: float = 5.0,
+                 ingest_queue_size: int = 10000):
         self.host = host
         self.port = port
         self.websocket_server = None
         self.connected_clients = {}  # client_id -> websocket
+        self.client_channels: Dict[str, ClientChannel] = {}  # client_id -> 전송 채널
         self.device_subscriptions = defaultdict(set)  # device_id -> set of client_ids
         self.client_subscriptions = defaultdict(set)  # client_id -> set of device_ids
-        self.data_buffers = defaultdict(lambda: deque(maxlen=1000))  # device_id -> data buffer
+        self.data_buffer_size = 1000
+        self.data_buffers = defaultdict(lambda: deque(maxlen=self.data_buffer_size))  # device_id -> data buffer
+        self.latest_values = LatestValueStore()
+        self.ingest = IngestBridge(capacity=ingest_queue_size)
+        self.send_queue_size = send_queue_size
+        self.send_timeout = send_timeout
         self.is_running = False
-        
+
+        # 전송 통계 (이벤트 루프 스레드에서만 갱신)
+        self.stream_stats = {
+            'frames_serialized': 0,
+            'messages_enqueued': 0,
+            'slow_consumers_dropped': 0,
+            'send_failures': 0,
+            'ingest_received': 0,
+            'ingest_coalesced': 0
+        }
+
         # 스트리밍 설정
         self.streaming_intervals = {
             'sensor_data': 1.0,  # 1초마다
@@ -59,6 +231,7 @@ class RealtimeStreamingService:
             )
             
             self.is_running = True
+            self.ingest.attach(asyncio.get_running_loop())
             logger.info(f"WebSocket 서버 시작: {self.host}:{self.port}")
             
             # 스트리밍 태스크 시작
@@ -79,9 +252,13 @@ class RealtimeStreamingService:
         try:
             # 클라이언트 등록
             self.connected_clients[client_id] = websocket
-            
+            channel = ClientChannel(client_id=client_id, websocket=websocket,
+                                    queue=asyncio.Queue(maxsize=self.send_queue_size))
+            channel.sender = asyncio.create_task(self._client_sender(channel))
+            self.client_channels[client_id] = channel
+
             # 연결 확인 메시지 전송
-            await self._send_message(websocket, {
+            await self._send_message(client_id, {
                 'type': 'connection_established',
                 'client_id': client_id,
                 'timestamp': time.time(),
@@ -122,10 +299,10 @@ class RealtimeStreamingService:
                 
         except json.JSONDecodeError as e:
             logger.error(f"JSON 파싱 오류: {e}")
-            await self._send_error(websocket, "Invalid JSON format")
+            await self._send_error(client_id, "Invalid JSON format")
         except Exception as e:
             logger.error(f"메시지 처리 오류: {e}")
-            await self._send_error(websocket, str(e))
+            await self._send_error(client_id, str(e))
     
     async def _handle_subscribe(self, client_id: str, data: Dict):
         """구독 요청 처리"""
@@ -134,7 +311,7 @@ class RealtimeStreamingService:
             stream_types = data.get('stream_types', ['sensor_data'])
             
             if not device_ids:
-                await self._send_error(self.connected_clients[client_id], "No device IDs specified")
+                await self._send_error(client_id, "No device IDs specified")
                 return
             
             # 구독 등록
@@ -143,19 +320,25 @@ class RealtimeStreamingService:
                 self.client_subscriptions[client_id].add(device_id)
             
             # 구독 확인 응답
-            await self._send_message(self.connected_clients[client_id], {
+            await self._send_message(client_id, {
                 'type': 'subscription_confirmed',
                 'client_id': client_id,
                 'device_ids': device_ids,
                 'stream_types': stream_types,
                 'timestamp': time.time()
             })
-            
+
+            # 다음 갱신을 기다리지 않도록 현재 최신 값을 바로 전송
+            for device_id in device_ids:
+                latest = self.latest_values.get(device_id)
+                if latest is not None:
+                    await self._send_message(client_id, self._sensor_frame(device_id, latest['data']))
+
             logger.info(f"클라이언트 {client_id} 구독: {device_ids}")
             
         except Exception as e:
             logger.error(f"구독 처리 오류: {e}")
-            await self._send_error(self.connected_clients[client_id], str(e))
+            await self._send_error(client_id, str(e))
     
     async def _handle_unsubscribe(self, client_id: str, data: Dict):
         """구독 해제 요청 처리"""
@@ -172,7 +355,7 @@ class RealtimeStreamingService:
                 self.client_subscriptions[client_id].discard(device_id)
             
             # 구독 해제 확인 응답
-            await self._send_message(self.connected_clients[client_id], {
+            await self._send_message(client_id, {
                 'type': 'unsubscription_confirmed',
                 'client_id': client_id,
                 'device_ids': device_ids,
@@ -183,7 +366,7 @@ class RealtimeStreamingService:
             
         except Exception as e:
             logger.error(f"구독 해제 처리 오류: {e}")
-            await self._send_error(self.connected_clients[client_id], str(e))
+            await self._send_error(client_id, str(e))
     
     async def _handle_get_data(self, client_id: str, data: Dict):
         """데이터 요청 처리"""
@@ -193,14 +376,14 @@ class RealtimeStreamingService:
             limit = data.get('limit', 100)
             
             if not device_id:
-                await self._send_error(self.connected_clients[client_id], "Device ID required")
+                await self._send_error(client_id, "Device ID required")
                 return
             
             # 데이터 조회
             if device_id in self.data_buffers:
                 buffer_data = list(self.data_buffers[device_id])[-limit:]
                 
-                await self._send_message(self.connected_clients[client_id], {
+                await self._send_message(client_id, {
                     'type': 'data_response',
                     'device_id': device_id,
                     'data_type': data_type,
@@ -209,16 +392,16 @@ class RealtimeStreamingService:
                     'timestamp': time.time()
                 })
             else:
-                await self._send_error(self.connected_clients[client_id], f"Device {device_id} not found")
+                await self._send_error(client_id, f"Device {device_id} not found")
             
         except Exception as e:
             logger.error(f"데이터 요청 처리 오류: {e}")
-            await self._send_error(self.connected_clients[client_id], str(e))
+            await self._send_error(client_id, str(e))
     
     async def _handle_ping(self, client_id: str, data: Dict):
         """핑 요청 처리"""
         try:
-            await self._send_message(self.connected_clients[client_id], {
+            await self._send_message(client_id, {
                 'type': 'pong',
                 'client_id': client_id,
                 'timestamp': time.time()
@@ -251,29 +434,23 @@ class RealtimeStreamingService:
             logger.error(f"스트리밍 태스크 시작 실패: {e}")
     
     async def _stream_sensor_data(self):
-        """센서 데이터 스트리밍"""
+        """
+        센서 데이터 스트리밍
+
+        수집 큐에 항목이 들어오면 깨어나 한꺼번에 꺼내고, 디바이스별 마지막 값만 푸시한 뒤
+        sensor_data 간격만큼 쉽니다 (그 사이 들어온 갱신은 다음 틱에 하나로 합쳐짐).
+        """
         while self.is_running:
             try:
-                # 센서 데이터 서비스에서 최신 데이터 가져오기
-                from services.sensor_data_service import sensor_data_service
-                
-                # 연결된 디바이스들의 최신 데이터 전송
-                for device_id, subscribers in self.device_subscriptions.items():
+                await self.ingest.wait()
+                changed = self._apply_ingest(self.ingest.drain())
+
+                for device_id, data in changed.items():
+                    subscribers = self.device_subscriptions.get(device_id)
                     if not subscribers:
                         continue
-                    
-                    # 최신 센서 데이터 조회
-                    latest_data = sensor_data_service.get_sensor_data(device_id, hours=1)
-                    
-                    if latest_data:
-                        # 구독자들에게 전송
-                        await self._broadcast_to_subscribers(device_id, {
-                            'type': 'sensor_data',
-                            'device_id': device_id,
-                            'data': latest_data[0],  # 최신 데이터
-                            'timestamp': time.time()
-                        })
-                
+                    await self._fan_out(subscribers, self._serialize(self._sensor_frame(device_id, data)))
+
                 await asyncio.sleep(self.streaming_intervals['sensor_data'])
                 
             except Exception as e:
@@ -284,17 +461,14 @@ class RealtimeStreamingService:
         """하트비트 스트리밍"""
         while self.is_running:
             try:
-                # 모든 연결된 클라이언트에게 하트비트 전송
-                for client_id, websocket in self.connected_clients.items():
-                    try:
-                        await self._send_message(websocket, {
-                            'type': 'heartbeat',
-                            'client_id': client_id,
-                            'timestamp': time.time(),
-                            'server_status': 'running'
-                        })
-                    except Exception as e:
-                        logger.warning(f"하트비트 전송 실패 {client_id}: {e}")
+                # 모든 연결된 클라이언트에게 하트비트 전송 (client_id 가 다르므로 클라이언트별 직렬화)
+                for client_id in list(self.client_channels):
+                    await self._send_message(client_id, {
+                        'type': 'heartbeat',
+                        'client_id': client_id,
+                        'timestamp': time.time(),
+                        'server_status': 'running'
+                    })
                 
                 await asyncio.sleep(self.streaming_intervals['heartbeat'])
                 
@@ -317,38 +491,82 @@ class RealtimeStreamingService:
                 }
                 
                 # 모든 연결된 클라이언트에게 상태 전송
-                for client_id, websocket in self.connected_clients.items():
-                    try:
-                        await self._send_message(websocket, status_info)
-                    except Exception as e:
-                        logger.warning(f"상태 전송 실패 {client_id}: {e}")
+                await self._fan_out(self.client_channels, self._serialize(status_info))
                 
                 await asyncio.sleep(self.streaming_intervals['status'])
                 
             except Exception as e:
                 logger.error(f"상태 스트리밍 오류: {e}")
                 await asyncio.sleep(1)
-    
+
+    @staticmethod
+    def _sensor_frame(device_id: str, data: Dict) -> Dict:
+        return {
+            'type': 'sensor_data',
+            'device_id': device_id,
+            'data': data,
+            'timestamp': time.time()
+        }
+
+    def _serialize(self, message: Dict) -> str:
+        """브로드캐스트 메시지 직렬화 (구독자 수와 무관하게 한 번)"""
+        self.stream_stats['frames_serialized'] += 1
+        return json.dumps(message, ensure_ascii=False)
+
+    def _enqueue(self, client_id: str, payload: str) -> bool:
+        """클라이언트 전송 큐에 추가, 큐가 가득 차면 False (느린 소비자)"""
+        channel = self.client_channels.get(client_id)
+        if channel is None:
+            return True
+        try:
+            channel.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            return False
+        self.stream_stats['messages_enqueued'] += 1
+        return True
+
+    async def _fan_out(self, client_ids: Iterable[str], payload: str):
+        """직렬화된 메시지를 클라이언트들의 전송 큐에 넣고, 큐가 가득 찬 클라이언트는 동시에 종료"""
+        slow_clients = [client_id for client_id in list(client_ids) if not self._enqueue(client_id, payload)]
+        if slow_clients:
+            self.stream_stats['slow_consumers_dropped'] += len(slow_clients)
+            logger.warning(f"느린 클라이언트 연결 종료: {slow_clients}")
+            await asyncio.gather(*(self._drop_client(client_id, 'send queue full') for client_id in slow_clients),
+                                 return_exceptions=True)
+
+    async def _client_sender(self, channel: ClientChannel):
+        """클라이언트 전송 태스크 (큐 순서대로 전송, 전송이 send_timeout 을 넘기면 연결 종료)"""
+        try:
+            while True:
+                payload = await channel.queue.get()
+                await asyncio.wait_for(channel.websocket.send(payload), timeout=self.send_timeout)
+                channel.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stream_stats['send_failures'] += 1
+            logger.warning(f"메시지 전송 실패 {channel.client_id}: {e}")
+            await self._drop_client(channel.client_id, 'send failed')
+
+    async def _drop_client(self, client_id: str, reason: str):
+        """클라이언트 정리 후 WebSocket 종료"""
+        channel = self.client_channels.get(client_id)
+        await self._cleanup_client(client_id)
+        if channel is not None:
+            try:
+                await asyncio.wait_for(channel.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason=reason),
+                                       timeout=self.send_timeout)
+            except Exception as e:
+                logger.debug(f"WebSocket 종료 오류 {client_id}: {e}")
+
     async def _broadcast_to_subscribers(self, device_id: str, message: Dict):
         """구독자들에게 메시지 브로드캐스트"""
         try:
-            if device_id not in self.device_subscriptions:
-                return
-            
-            subscribers = self.device_subscriptions[device_id]
+            subscribers = self.device_subscriptions.get(device_id)
             if not subscribers:
                 return
             
-            # 구독자들에게 전송
-            for client_id in subscribers:
-                if client_id in self.connected_clients:
-                    try:
-                        websocket = self.connected_clients[client_id]
-                        await self._send_message(websocket, message)
-                    except Exception as e:
-                        logger.warning(f"브로드캐스트 실패 {client_id}: {e}")
-                        # 연결이 끊어진 클라이언트 정리
-                        await self._cleanup_client(client_id)
+            await self._fan_out(subscribers, self._serialize(message))
             
         except Exception as e:
             logger.error(f"브로드캐스트 오류: {e}")
@@ -371,39 +589,74 @@ class RealtimeStreamingService:
             
         except Exception as e:
             logger.error(f"이상 감지 브로드캐스트 오류: {e}")
-    
-    async def add_sensor_data(self, device_id: str, data: Dict):
-        """센서 데이터 추가"""
+
+    def publish_sensor_data(self, device_id: str, data: Dict):
+        """
+        센서 데이터 수집 (어느 스레드에서나 호출 가능)
+
+        스트리밍 루프가 돌고 있으면 수집 큐에 넣기만 하고, 버퍼/최신 값 갱신과 구독자 전송은
+        루프가 다음 틱에 수행합니다. 루프가 없으면 바로 반영합니다.
+        """
         try:
-            # 데이터 버퍼에 추가
-            self.data_buffers[device_id].append({
-                'timestamp': time.time(),
-                'data': data
-            })
-            
-            # 실시간 스트리밍
-            await self._broadcast_to_subscribers(device_id, {
-                'type': 'sensor_data',
-                'device_id': device_id,
-                'data': data,
-                'timestamp': time.time()
-            })
-            
+            received_at = time.time()
+            if self.ingest.attached:
+                self.ingest.put(device_id, data, received_at)
+            else:
+                self._apply_ingest([(device_id, received_at, data)])
         except Exception as e:
             logger.error(f"센서 데이터 추가 오류: {e}")
-    
-    async def _send_message(self, websocket, message: Dict):
-        """메시지 전송"""
+
+    def publish_sensor_batch(self, batch):
+        """
+        센서 데이터 일괄 수집 (services.sensor_ingest.SensorBatch, 어느 스레드에서나 호출 가능)
+
+        디바이스마다 버퍼에 남을 만큼의 측정값만 타임스탬프 순으로 변환해 한 번에 넣습니다.
+        """
         try:
-            await websocket.send(json.dumps(message, ensure_ascii=False))
+            received_at = time.time()
+            items = []
+            for device_id, rows in batch.device_rows():
+                rows = rows[-self.data_buffer_size:]
+                items.extend((device_id, received_at, batch.payload(row)) for row in rows)
+            if self.ingest.attached:
+                self.ingest.put_many(items)
+            else:
+                self._apply_ingest(items)
         except Exception as e:
-            logger.error(f"메시지 전송 오류: {e}")
-            raise
+            logger.error(f"센서 데이터 일괄 추가 오류: {e}")
+
+    def _apply_ingest(self, items: List[Tuple[str, float, Dict]]) -> Dict[str, Dict]:
+        """
+        수집 항목을 디바이스 버퍼에 추가하고 디바이스별 마지막 값으로 최신 값 저장소 갱신
+
+        Returns:
+            device_id → 마지막 데이터 (같은 디바이스의 이전 갱신은 합쳐져 ingest_coalesced 로 집계)
+        """
+        latest: Dict[str, Tuple[float, Dict]] = {}
+        for device_id, received_at, data in items:
+            self.data_buffers[device_id].append({'timestamp': received_at, 'data': data})
+            latest[device_id] = (received_at, data)
+        self.stream_stats['ingest_received'] += len(items)
+        self.stream_stats['ingest_coalesced'] += len(items) - len(latest)
+        self.latest_values.update_many(
+            (device_id, data, received_at) for device_id, (received_at, data) in latest.items()
+        )
+        return {device_id: data for device_id, (_, data) in latest.items()}
+
+    async def add_sensor_data(self, device_id: str, data: Dict):
+        """센서 데이터 추가"""
+        self.publish_sensor_data(device_id, data)
+
+    async def _send_message(self, client_id: str, message: Dict):
+        """단일 클라이언트 메시지 전송 (전송 큐 경유로 브로드캐스트와 순서 유지)"""
+        if not self._enqueue(client_id, json.dumps(message, ensure_ascii=False)):
+            self.stream_stats['slow_consumers_dropped'] += 1
+            await self._drop_client(client_id, 'send queue full')
     
-    async def _send_error(self, websocket, error_message: str):
+    async def _send_error(self, client_id: str, error_message: str):
         """오류 메시지 전송"""
         try:
-            await self._send_message(websocket, {
+            await self._send_message(client_id, {
                 'type': 'error',
                 'message': error_message,
                 'timestamp': time.time()
@@ -417,12 +670,19 @@ class RealtimeStreamingService:
             # 연결된 클라이언트에서 제거
             if client_id in self.connected_clients:
                 del self.connected_clients[client_id]
+
+            # 전송 태스크 종료 (전송 태스크 자신이 정리하는 경우 제외)
+            channel = self.client_channels.pop(client_id, None)
+            if channel is not None and channel.sender is not None and channel.sender is not asyncio.current_task():
+                channel.sender.cancel()
             
             # 구독 정보 정리
             if client_id in self.client_subscriptions:
                 subscribed_devices = list(self.client_subscriptions[client_id])
                 for device_id in subscribed_devices:
                     self.device_subscriptions[device_id].discard(client_id)
+                    if not self.device_subscriptions[device_id]:
+                        del self.device_subscriptions[device_id]
                 del self.client_subscriptions[client_id]
             
             logger.info(f"클라이언트 정리 완료: {client_id}")
@@ -438,6 +698,12 @@ class RealtimeStreamingService:
             'active_devices': len(self.device_subscriptions),
             'total_subscriptions': sum(len(subs) for subs in self.device_subscriptions.values()),
             'streaming_intervals': self.streaming_intervals,
+            'latest_devices': len(self.latest_values),
+            'send_queue_size': self.send_queue_size,
+            'queued_messages': sum(channel.queue.qsize() for channel in list(self.client_channels.values())),
+            'stream_stats': dict(self.stream_stats, ingest_dropped=self.ingest.dropped),
+            'ingest_queue_depth': len(self.ingest),
+            'ingest_queue_size': self.ingest.capacity,
             'host': self.host,
             'port': self.port
         }
@@ -446,10 +712,16 @@ class RealtimeStreamingService:
         """서비스 중지"""
         try:
             self.is_running = False
+            self.ingest.detach()
             
             # 스트리밍 태스크 중지
             for task in self.streaming_tasks.values():
                 task.cancel()
+
+            # 클라이언트 전송 태스크 중지
+            for channel in list(self.client_channels.values()):
+                if channel.sender is not None:
+                    channel.sender.cancel()
             
             # WebSocket 서버 중지
             if self.websocket_server:
@@ -12,14 +12,17 @@ import threading
 from typing import Dict, List, Optional, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
-from collections import deque
 import numpy as np
 from scipy import signal
 import websockets
 import websockets.exceptions
-# import sqlite3
 import queue
 
+from services.sensor_database_service import sensor_database_service
+from services.sensor_window_stats import (
+    DeviceSensorWindow, SENSOR_COLUMNS, COL_TEMPERATURE, COL_VIBRATION, PATTERN_WINDOW, batch_pattern_stats
+)
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -56,7 +59,7 @@ class SensorDataProcessor:
     
     def __init__(self, window_size: int = 100):
         self.window_size = window_size
-        self.data_windows = {}  # device_id -> deque
+        self.data_windows: Dict[str, DeviceSensorWindow] = {}  # device_id -> 열 링 버퍼
         self.baseline_data = {}  # device_id -> baseline values
         self.anomaly_thresholds = {
             'temperature': {'low': -25, 'high': 5, 'critical': 10},
@@ -67,19 +70,99 @@ class SensorDataProcessor:
     
     def add_reading(self, reading: SensorReading) -> List[AnomalyDetection]:
         """센서 데이터 추가 및 이상 감지"""
-        device_id = reading.device_id
-        
-        # 데이터 윈도우 관리
-        if device_id not in self.data_windows:
-            self.data_windows[device_id] = deque(maxlen=self.window_size)
-        
-        self.data_windows[device_id].append(reading)
-        
+        # 데이터 윈도우 관리 (통계는 O(1) 증분 갱신)
+        self._get_window(reading.device_id).append(self._reading_row(reading))
+
         # 이상 감지 수행
         anomalies = self._detect_anomalies(reading)
-        
+
         return anomalies
-    
+
+    def add_readings(self, readings: List[SensorReading]) -> List[AnomalyDetection]:
+        """
+        여러 디바이스의 센서 데이터 일괄 추가 및 이상 감지
+
+        임계값 검사와 패턴 검사를 배치 전체에 대해 NumPy 연산 한 번으로 수행하고,
+        이상이 있는 측정값에 대해서만 AnomalyDetection 을 생성합니다.
+        결과는 add_reading 을 입력 순서대로 호출한 것과 같은 순서입니다.
+        """
+        if not readings:
+            return []
+
+        rows = np.array([self._reading_row(r) for r in readings], dtype=np.float64)
+        temperature = rows[:, COL_TEMPERATURE]
+        magnitude = np.sqrt(np.sum(rows[:, COL_VIBRATION] ** 2, axis=1))
+        power = rows[:, SENSOR_COLUMNS.index('power_consumption')]
+        audio = rows[:, SENSOR_COLUMNS.index('audio_level')]
+
+        t = self.anomaly_thresholds
+        flagged = ((temperature > t['temperature']['high']) | (temperature < t['temperature']['low']) |
+                   (magnitude > t['vibration']['high']) |
+                   (power > t['power']['high']) |
+                   (audio > t['audio']['high']))
+
+        # 디바이스별 구간 = 기존 윈도우의 최근 (PATTERN_WINDOW - 1) 개 + 이번 배치 측정값
+        device_indices: Dict[str, List[int]] = {}
+        for i, reading in enumerate(readings):
+            device_indices.setdefault(reading.device_id, []).append(i)
+
+        temp_segments, mag_segments, positions = [], [], []
+        for device_id, indices in device_indices.items():
+            window = self._get_window(device_id)
+            if window.capacity < PATTERN_WINDOW:
+                continue  # 윈도우가 패턴 길이보다 짧으면 패턴 검사 없음
+            history, history_mag = window.recent(PATTERN_WINDOW - 1)
+            temp_segments.append(np.concatenate((history[:, COL_TEMPERATURE], temperature[indices])))
+            mag_segments.append(np.concatenate((history_mag, magnitude[indices])))
+            positions.extend([-1] * len(history))
+            positions.extend(indices)
+
+        ends, trends, variances = batch_pattern_stats(temp_segments, mag_segments, PATTERN_WINDOW)
+        pattern_stats: Dict[int, tuple] = {}
+        if len(ends):
+            reading_index = np.asarray(positions, dtype=np.int64)[ends]
+            pattern_hit = (trends > 0.5) | (variances > 2.0)
+            for i, trend, variance in zip(reading_index[pattern_hit], trends[pattern_hit], variances[pattern_hit]):
+                pattern_stats[int(i)] = (float(trend), float(variance))
+
+        # 윈도우 갱신 (디바이스당 블록 기록 1회)
+        for device_id, indices in device_indices.items():
+            self.data_windows[device_id].extend(rows[indices])
+
+        anomalies = []
+        for i in sorted(set(np.flatnonzero(flagged).tolist()) | pattern_stats.keys()):
+            reading = readings[i]
+            if flagged[i]:
+                for check in (self._check_temperature_anomaly, self._check_vibration_anomaly,
+                              self._check_power_anomaly, self._check_audio_anomaly):
+                    anomaly = check(reading)
+                    if anomaly:
+                        anomalies.append(anomaly)
+            if i in pattern_stats:
+                anomaly = self._pattern_anomaly(reading, *pattern_stats[i])
+                if anomaly:
+                    anomalies.append(anomaly)
+        return anomalies
+
+    def _get_window(self, device_id: str) -> DeviceSensorWindow:
+        window = self.data_windows.get(device_id)
+        if window is None:
+            window = self.data_windows[device_id] = DeviceSensorWindow(self.window_size, PATTERN_WINDOW)
+        return window
+
+    @staticmethod
+    def _reading_row(reading: SensorReading) -> tuple:
+        """SensorReading → SENSOR_COLUMNS 순서 튜플"""
+        return (reading.temperature, reading.vibration_x, reading.vibration_y, reading.vibration_z,
+                reading.power_consumption, reading.audio_level)
+
+    def get_window_statistics(self, device_id: str) -> Optional[Dict]:
+        """디바이스 윈도우의 열별 평균/표준편차/EWMA (알 수 없는 디바이스는 None)"""
+        window = self.data_windows.get(device_id)
+        if window is None:
+            return None
+        return {'samples': len(window), 'columns': window.statistics()}
+
     def _detect_anomalies(self, reading: SensorReading) -> List[AnomalyDetection]:
         """이상 감지 로직 (Tesla 스타일)"""
         anomalies = []
@@ -250,18 +333,19 @@ class SensorDataProcessor:
     
     def _check_pattern_anomaly(self, reading: SensorReading) -> Optional[AnomalyDetection]:
         """패턴 기반 이상 감지 (고급 분석)"""
-        device_id = reading.device_id
-        
-        if device_id not in self.data_windows or len(self.data_windows[device_id]) < 10:
+        window = self.data_windows.get(reading.device_id)
+        if window is None or not window.pattern_ready:
             return None
-        
-        # 최근 데이터 윈도우 분석
-        recent_data = list(self.data_windows[device_id])[-10:]
-        
+
+        # 최근 데이터 윈도우 통계 (링 버퍼에서 증분 유지)
+        return self._pattern_anomaly(reading, window.temperature_trend(), window.vibration_variance())
+
+    def _pattern_anomaly(self, reading: SensorReading, temp_trend: float,
+                         vibration_variance: float) -> Optional[AnomalyDetection]:
+        """최근 윈도우의 온도 추세/진동 분산으로 패턴 이상 판정"""
+        device_id = reading.device_id
+
         # 온도 트렌드 분석
-        temperatures = [r.temperature for r in recent_data]
-        temp_trend = np.polyfit(range(len(temperatures)), temperatures, 1)[0]
-        
         if temp_trend > 0.5:  # 온도가 빠르게 상승
             return AnomalyDetection(
                 device_id=device_id,
@@ -274,9 +358,6 @@ class SensorDataProcessor:
             )
         
         # 진동 패턴 분석
-        vibrations = [np.sqrt(r.vibration_x**2 + r.vibration_y**2 + r.vibration_z**2) for r in recent_data]
-        vibration_variance = np.var(vibrations)
-        
         if vibration_variance > 2.0:  # 진동이 불규칙
             return AnomalyDetection(
                 device_id=device_id,
@@ -298,6 +379,7 @@ class SensorDataService:
         self.processor = SensorDataProcessor()
         self.connected_devices = {}
         self.data_queue = queue.Queue()
+        self.max_batch_readings = 512  # 워커가 한 번에 처리하는 최대 측정값 수
         self.is_running = False
         self.websocket_server = None
         self.anomaly_callbacks = []
@@ -532,19 +614,25 @@ class SensorDataService:
         pass
 
     def _worker_loop(self):
-        """데이터 처리 워커 루프"""
+        """데이터 처리 워커 루프 (대기 중인 측정값을 모아 한 번에 이상 감지)"""
         self.is_running = True
         
         while self.is_running:
             try:
                 # 큐에서 데이터 가져오기
-                item = self.data_queue.get(timeout=1)
-                data_type, data = item
-                
-                if data_type == 'sensor_data':
-                    self._process_sensor_data(data)
+                items = [self.data_queue.get(timeout=1)]
+                while len(items) < self.max_batch_readings:
+                    try:
+                        items.append(self.data_queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                readings = [data for data_type, data in items if data_type == 'sensor_data']
+                if readings:
+                    self._process_sensor_batch(readings)
                 
-                self.data_queue.task_done()
+                for _ in items:
+                    self.data_queue.task_done()
                 
             except queue.Empty:
                 continue
@@ -553,12 +641,20 @@ class SensorDataService:
     
     def _process_sensor_data(self, reading: SensorReading):
         """센서 데이터 처리"""
+        self._process_sensor_batch([reading])
+
+    def _process_sensor_batch(self, readings: List[SensorReading]):
+        """센서 데이터 일괄 처리"""
         try:
             # 이상 감지
-            anomalies = self.processor.add_reading(reading)
+            if len(readings) == 1:
+                anomalies = self.processor.add_reading(readings[0])
+            else:
+                anomalies = self.processor.add_readings(readings)
             
             # 데이터베이스에 저장
-            self._save_sensor_reading(reading)
+            for reading in readings:
+                self._save_sensor_reading(reading)
             
             # 이상 감지 결과 처리
             for anomaly in anomalies:
@@ -569,69 +665,13 @@ class SensorDataService:
             logger.error(f"센서 데이터 처리 오류: {e}")
     
     def _save_sensor_reading(self, reading: SensorReading):
-        """센서 데이터 저장"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO sensor_readings 
-                (device_id, timestamp, temperature, vibration_x, vibration_y, vibration_z, 
-                 power_consumption, audio_level, sensor_quality)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                reading.device_id,
-                reading.timestamp,
-                reading.temperature,
-                reading.vibration_x,
-                reading.vibration_y,
-                reading.vibration_z,
-                reading.power_consumption,
-                reading.audio_level,
-                reading.sensor_quality
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            logger.error(f"센서 데이터 저장 오류: {e}")
-        """
-        pass
+        """센서 데이터 저장 (단일 쓰기 연결의 배치 큐로 전달)"""
+        sensor_database_service.add_sensor_reading(asdict(reading))
 
     def _save_anomaly(self, anomaly: AnomalyDetection):
         """이상 감지 결과 저장"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO anomalies 
-                (device_id, timestamp, anomaly_type, severity, confidence, description, sensor_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                anomaly.device_id,
-                anomaly.timestamp,
-                anomaly.anomaly_type,
-                anomaly.severity,
-                anomaly.confidence,
-                anomaly.description,
-                json.dumps(anomaly.sensor_data)
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"이상 감지 저장: {anomaly.anomaly_type} - {anomaly.description}")
-            
-        except Exception as e:
-            logger.error(f"이상 감지 저장 오류: {e}")
-        """
-        pass
+        sensor_database_service.add_anomaly(asdict(anomaly))
+        logger.info(f"이상 감지 저장: {anomaly.anomaly_type} - {anomaly.description}")
 
     def _notify_anomaly(self, anomaly: AnomalyDetection):
         """이상 감지 알림"""
@@ -678,132 +718,22 @@ class SensorDataService:
     
     def get_device_status(self) -> Dict:
         """디바이스 상태 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT device_id, device_name, status, last_seen, firmware_version
-                FROM devices
-                ORDER BY last_seen DESC
-            ''')
-            
-            devices = []
-            for row in cursor.fetchall():
-                devices.append({
-                    'device_id': row[0],
-                    'device_name': row[1],
-                    'status': row[2],
-                    'last_seen': row[3],
-                    'firmware_version': row[4],
-                    'is_online': time.time() - row[3] < 300  # 5분 이내
-                })
-            
-            conn.close()
-            
-            return {
-                'total_devices': len(devices),
-                'online_devices': len([d for d in devices if d['is_online']]),
-                'devices': devices
-            }
-            
-        except Exception as e:
-            logger.error(f"디바이스 상태 조회 오류: {e}")
-            return {'error': str(e)}
-        """
-        return {'error': '데이터베이스 연결이 구현되지 않았습니다.'}
+        devices = sensor_database_service.get_device_status()
+        return {
+            'total_devices': len(devices),
+            'online_devices': len([d for d in devices if d['is_online']]),
+            'devices': devices
+        }
 
     def get_sensor_data(self, device_id: str, hours: int = 24) -> List[Dict]:
         """센서 데이터 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            since_timestamp = time.time() - (hours * 3600)
-            
-            cursor.execute('''
-                SELECT * FROM sensor_readings 
-                WHERE device_id = ? AND timestamp > ?
-                ORDER BY timestamp DESC
-                LIMIT 1000
-            ''', (device_id, since_timestamp))
-            
-            data = []
-            for row in cursor.fetchall():
-                data.append({
-                    'id': row[0],
-                    'device_id': row[1],
-                    'timestamp': row[2],
-                    'temperature': row[3],
-                    'vibration_x': row[4],
-                    'vibration_y': row[5],
-                    'vibration_z': row[6],
-                    'power_consumption': row[7],
-                    'audio_level': row[8],
-                    'sensor_quality': row[9],
-                    'created_at': row[10]
-                })
-            
-            conn.close()
-            return data
-            
-        except Exception as e:
-            logger.error(f"센서 데이터 조회 오류: {e}")
-            return []
-        """
-        return []
+        since_timestamp = time.time() - (hours * 3600)
+        return sensor_database_service.get_sensor_data(device_id, start_time=since_timestamp, limit=1000)
 
     def get_anomalies(self, device_id: str = None, hours: int = 24) -> List[Dict]:
         """이상 감지 결과 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            since_timestamp = time.time() - (hours * 3600)
-            
-            if device_id:
-                cursor.execute('''
-                    SELECT * FROM anomalies 
-                    WHERE device_id = ? AND timestamp > ?
-                    ORDER BY timestamp DESC
-                    LIMIT 100
-                ''', (device_id, since_timestamp))
-            else:
-                cursor.execute('''
-                    SELECT * FROM anomalies 
-                    WHERE timestamp > ?
-                    ORDER BY timestamp DESC
-                    LIMIT 100
-                ''', (since_timestamp,))
-            
-            anomalies = []
-            for row in cursor.fetchall():
-                anomalies.append({
-                    'id': row[0],
-                    'device_id': row[1],
-                    'timestamp': row[2],
-                    'anomaly_type': row[3],
-                    'severity': row[4],
-                    'confidence': row[5],
-                    'description': row[6],
-                    'sensor_data': json.loads(row[7]) if row[7] else {},
-                    'created_at': row[8]
-                })
-            
-            conn.close()
-            return anomalies
-            
-        except Exception as e:
-            logger.error(f"이상 감지 결과 조회 오류: {e}")
-            return []
-        """
-        return []
+        since_timestamp = time.time() - (hours * 3600)
+        return sensor_database_service.get_anomalies(device_id, start_time=since_timestamp, limit=100)
 
     def stop(self):
         """서비스 중지"""
@@ -2,613 +2,853 @@
 """
 센서 데이터베이스 서비스
 Nest 스타일의 시계열 데이터 저장 및 관리
+
+- 쓰기: 배치 스레드가 소유한 단일 장기 연결 (WAL), batch_size/batch_timeout 단위 executemany
+  (연결과 스레드는 프로세스별로 처음 사용할 때 생성, gunicorn preload 후 fork 된 워커도 각자 기록)
+- 읽기: 읽기 전용(mode=ro) 연결 풀, WAL 덕분에 쓰기와 동시에 조회 가능
+- 롤업: 배치 INSERT 와 같은 트랜잭션에서 1분/1시간/1일 집계 테이블 갱신 (services.sensor_rollups),
+  통계 조회는 원본 대신 롤업을 읽음
+- 최신값: 같은 트랜잭션에서 디바이스별 마지막 측정값(device_latest) UPSERT, 상태 조회는 디바이스당 한 행
+- 종료 시 대기 중인 배치를 모두 기록
 """
 
 import os
 import json
+import math
 import time
+import atexit
 import logging
-# import sqlite3
+import sqlite3
 import threading
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from collections import defaultdict
 import queue
 
+from services.sensor_rollups import (
+    ROLLUP_SCHEMA, apply_rollups, prune_rollups, get_watermark, fetch_series, fetch_summary, metric_mean,
+    bucket_start
+)
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SensorDatabaseService:
-    """센서 데이터베이스 서비스 (Nest 스타일)"""
-    
-    def __init__(self):
-        self.conn = None # 데이터베이스 연결 객체 (PostgreSQL)
-        self.db_lock = threading.Lock()
-        self.batch_queue = queue.Queue()
-        self.batch_size = 100
-        self.batch_timeout = 5.0  # 5초
-        
-        # 배치 처리 스레드 시작
-        self.batch_thread = threading.Thread(target=self._batch_processor, daemon=True)
-        self.batch_thread.start()
-        
-        logger.info("센서 데이터베이스 서비스 초기화 완료")
-    
-    def _init_database(self):
-        """데이터베이스 초기화 (SQLite) - PostgreSQL로 마이그레이션 필요"""
-        logger.warning("이 함수는 더 이상 사용되지 않습니다. PostgreSQL 연결을 사용해야 합니다.")
-        """
+DEFAULT_DB_PATH = 'data/sensor_data.db'
+# 시작 시 롤업 따라잡기를 한 트랜잭션에 반영하는 최대 원본 행 수 (쓰기 잠금을 오래 잡지 않도록)
+ROLLUP_CATCH_UP_ROWS = 100000
+# 잠금/디스크 오류로 기록하지 못한 배치를 보관하며 다시 시도하는 횟수와 최대 대기(초)
+BATCH_MAX_ATTEMPTS = 5
+BATCH_RETRY_MAX_DELAY = 30.0
+
+# 쓰기 연결 PRAGMA: WAL + synchronous=NORMAL 이면 커밋마다 fsync 하지 않고 체크포인트 시에만 동기화
+WRITER_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-16000',        # 약 16MB
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA wal_autocheckpoint=1000',
+)
+READER_PRAGMAS = (
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-8000',
+    'PRAGMA busy_timeout=5000',
+)
+
+SENSOR_READING_COLUMNS = (
+    'device_id', 'timestamp', 'temperature', 'vibration_x', 'vibration_y', 'vibration_z',
+    'power_consumption', 'audio_level', 'sensor_quality'
+)
+INSERT_SENSOR_READING = f'''
+    INSERT INTO sensor_readings ({', '.join(SENSOR_READING_COLUMNS)})
+    VALUES ({', '.join('?' * len(SENSOR_READING_COLUMNS))})
+'''
+INSERT_ANOMALY = '''
+    INSERT INTO anomalies
+    (device_id, timestamp, anomaly_type, severity, confidence, description, sensor_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+# 타임스탬프가 더 최신일 때만 교체 (늦게 도착한 과거 측정값은 무시)
+UPSERT_DEVICE_LATEST = f'''
+    INSERT INTO device_latest ({', '.join(SENSOR_READING_COLUMNS)})
+    VALUES ({', '.join('?' * len(SENSOR_READING_COLUMNS))})
+    ON CONFLICT (device_id) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column in SENSOR_READING_COLUMNS[1:])}
+    WHERE excluded.timestamp >= device_latest.timestamp
+'''
+# 기존 원본에서 디바이스별 최신 행 채우기 (MAX 와 함께 선택한 열은 최대 타임스탬프 행의 값)
+BACKFILL_DEVICE_LATEST = f'''
+    INSERT OR IGNORE INTO device_latest ({', '.join(SENSOR_READING_COLUMNS)})
+    SELECT device_id, MAX(timestamp), {', '.join(SENSOR_READING_COLUMNS[2:])}
+    FROM sensor_readings
+    GROUP BY device_id
+'''
+UPSERT_DEVICE = '''
+    INSERT OR REPLACE INTO devices
+    (device_id, device_name, location, firmware_version, hardware_version, last_seen, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+SCHEMA = (
+    # 센서 데이터 테이블 (시계열 데이터)
+    '''
+    CREATE TABLE IF NOT EXISTS sensor_readings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        temperature REAL,
+        vibration_x REAL,
+        vibration_y REAL,
+        vibration_z REAL,
+        power_consumption REAL,
+        audio_level INTEGER,
+        sensor_quality REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # 디바이스별 최신 측정값 (sensor_readings 와 같은 열, 디바이스당 한 행)
+    '''
+    CREATE TABLE IF NOT EXISTS device_latest (
+        device_id TEXT PRIMARY KEY,
+        timestamp REAL NOT NULL,
+        temperature REAL,
+        vibration_x REAL,
+        vibration_y REAL,
+        vibration_z REAL,
+        power_consumption REAL,
+        audio_level INTEGER,
+        sensor_quality REAL
+    )
+    ''',
+    # 이상 감지 테이블
+    '''
+    CREATE TABLE IF NOT EXISTS anomalies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        anomaly_type TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        confidence REAL NOT NULL,
+        description TEXT,
+        sensor_data TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # 디바이스 정보 테이블
+    '''
+    CREATE TABLE IF NOT EXISTS devices (
+        device_id TEXT PRIMARY KEY,
+        device_name TEXT,
+        location TEXT,
+        firmware_version TEXT,
+        hardware_version TEXT,
+        last_seen REAL,
+        status TEXT DEFAULT 'offline',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # 센서 통계 테이블 (집계 데이터)
+    '''
+    CREATE TABLE IF NOT EXISTS sensor_statistics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        hour INTEGER NOT NULL,
+        avg_temperature REAL,
+        max_temperature REAL,
+        min_temperature REAL,
+        avg_vibration REAL,
+        max_vibration REAL,
+        avg_power_consumption REAL,
+        max_power_consumption REAL,
+        anomaly_count INTEGER DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(device_id, date, hour)
+    )
+    ''',
+    # 인덱스 생성 (device_id 단독 조회는 복합 인덱스의 접두사로 처리)
+    'CREATE INDEX IF NOT EXISTS idx_sensor_timestamp ON sensor_readings(timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_sensor_device_timestamp ON sensor_readings(device_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_device_latest_timestamp ON device_latest(timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_anomaly_timestamp ON anomalies(timestamp)',
+    'DROP INDEX IF EXISTS idx_anomaly_device',
+    'CREATE INDEX IF NOT EXISTS idx_anomaly_device_timestamp ON anomalies(device_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_anomaly_type ON anomalies(anomaly_type)',
+    'CREATE INDEX IF NOT EXISTS idx_statistics_device_date ON sensor_statistics(device_id, date)',
+)
+
+def _sql_sqrt(value):
+    return math.sqrt(value) if value is not None and value >= 0 else None
+
+
+def register_sql_functions(conn: sqlite3.Connection):
+    """수학 함수 확장 없이 빌드된 SQLite 에서도 통계 쿼리가 동작하도록 SQRT 등록"""
+    conn.create_function('SQRT', 1, _sql_sqrt, deterministic=True)
+
+
+# 배치 스레드 제어 메시지 (데이터 항목과 같은 큐로 전달되어 순서가 보장됨)
+_FLUSH = '__flush__'
+_STOP = '__stop__'
+
+
+class ReadConnectionPool:
+    """읽기 전용 SQLite 연결 풀"""
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 5.0):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, timeout=self.timeout)
+        for pragma in READER_PRAGMAS:
+            conn.execute(pragma)
+        register_sql_functions(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """풀에서 연결을 빌려 사용 후 반납 (모두 사용 중이면 최대 size 개까지 새로 생성)"""
+        conn = None
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # 센서 데이터 테이블 (시계열 데이터)
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS sensor_readings (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        device_id TEXT NOT NULL,
-                        timestamp REAL NOT NULL,
-                        temperature REAL,
-                        vibration_x REAL,
-                        vibration_y REAL,
-                        vibration_z REAL,
-                        power_consumption REAL,
-                        audio_level INTEGER,
-                        sensor_quality REAL,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # 이상 감지 테이블
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS anomalies (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        device_id TEXT NOT NULL,
-                        timestamp REAL NOT NULL,
-                        anomaly_type TEXT NOT NULL,
-                        severity TEXT NOT NULL,
-                        confidence REAL NOT NULL,
-                        description TEXT,
-                        sensor_data TEXT,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # 디바이스 정보 테이블
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS devices (
-                        device_id TEXT PRIMARY KEY,
-                        device_name TEXT,
-                        location TEXT,
-                        firmware_version TEXT,
-                        hardware_version TEXT,
-                        last_seen REAL,
-                        status TEXT DEFAULT 'offline',
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # 센서 통계 테이블 (집계 데이터)
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS sensor_statistics (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        device_id TEXT NOT NULL,
-                        date TEXT NOT NULL,
-                        hour INTEGER NOT NULL,
-                        avg_temperature REAL,
-                        max_temperature REAL,
-                        min_temperature REAL,
-                        avg_vibration REAL,
-                        max_vibration REAL,
-                        avg_power_consumption REAL,
-                        max_power_consumption REAL,
-                        anomaly_count INTEGER DEFAULT 0,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(device_id, date, hour)
-                    )
-                ''')
-                
-                # 인덱스 생성
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_timestamp ON sensor_readings(timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_device ON sensor_readings(device_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_device_timestamp ON sensor_readings(device_id, timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_anomaly_timestamp ON anomalies(timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_anomaly_device ON anomalies(device_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_anomaly_type ON anomalies(anomaly_type)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_statistics_device_date ON sensor_statistics(device_id, date)')
-                
-                conn.commit()
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            if self._closed:
                 conn.close()
-                
-                logger.info("데이터베이스 초기화 완료")
-                
-        except Exception as e:
-            logger.error(f"데이터베이스 초기화 실패: {e}")
-        """
-        pass
+            else:
+                self._pool.put(conn)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SensorDatabaseService:
+    """센서 데이터베이스 서비스 (Nest 스타일)"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, batch_size: int = 100,
+                 batch_timeout: float = 5.0, read_pool_size: int = 4):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout  # 초
+        self.read_pool_size = read_pool_size
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.batches_written = 0
+
+        # 쓰기 연결/배치 스레드는 프로세스별로 처음 사용할 때 생성 (start)
+        # gunicorn preload_app 에서 마스터가 import 한 뒤 fork 해도 각 워커가 자기 스레드를 가짐
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+        self._inherited = []  # fork 이전 프로세스의 연결 (자식에서 닫으면 부모의 WAL 을 건드리므로 보관만)
+        self.conn = None
+        self.read_pool = None
+        self.db_lock = None
+        self.batch_queue = None
+        self.batch_thread = None
+        atexit.register(self.shutdown)
+
+    def start(self):
+        """현재 프로세스의 쓰기 연결, 읽기 풀, 배치 스레드 준비 (이미 있으면 아무것도 하지 않음)"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                logger.info(f"fork 감지 (pid {self._pid} → {pid}): 쓰기 연결과 배치 스레드 재생성")
+                self._inherited.append((self.conn, self.read_pool))
+                self.rows_written = self.rows_rejected = self.batches_written = 0
+
+            self.db_lock = threading.Lock()  # 단일 쓰기 연결 직렬화
+            self.batch_queue = queue.Queue()
+            self._stopped = False
+            self.conn = self._init_database()
+            self.read_pool = ReadConnectionPool(self.db_path, size=self.read_pool_size)
+
+            # 배치 처리 스레드 시작
+            self.batch_thread = threading.Thread(target=self._batch_processor, daemon=True)
+            self.batch_thread.start()
+            self._pid = pid
+
+        logger.info(f"센서 데이터베이스 서비스 초기화 완료 (pid {pid})")
+
+    def _init_database(self) -> sqlite3.Connection:
+        """쓰기 연결 생성 및 스키마 초기화 (SQLite WAL)"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+        for pragma in WRITER_PRAGMAS:
+            conn.execute(pragma)
+        register_sql_functions(conn)
+        with conn:
+            for statement in SCHEMA + ROLLUP_SCHEMA:
+                conn.execute(statement)
+            if conn.execute('SELECT 1 FROM device_latest LIMIT 1').fetchone() is None:
+                conn.execute(BACKFILL_DEVICE_LATEST)
+        logger.info(f"데이터베이스 초기화 완료: {self.db_path}")
+        return conn
+
+    @staticmethod
+    def _reading_row(reading_data: Dict) -> Tuple:
+        """센서 데이터 딕셔너리 → INSERT 파라미터 튜플"""
+        return (
+            reading_data['device_id'],
+            reading_data['timestamp'],
+            reading_data['temperature'],
+            reading_data['vibration_x'],
+            reading_data['vibration_y'],
+            reading_data['vibration_z'],
+            reading_data['power_consumption'],
+            reading_data['audio_level'],
+            reading_data.get('sensor_quality', 1.0)
+        )
+
+    @staticmethod
+    def _latest_rows(rows: List[Tuple]) -> List[Tuple]:
+        """INSERT 파라미터 튜플 중 디바이스별 최신 타임스탬프 행"""
+        latest = {}
+        for row in rows:
+            current = latest.get(row[0])
+            if current is None or row[1] >= current[1]:
+                latest[row[0]] = row
+        return list(latest.values())
 
     def add_sensor_reading(self, reading_data: Dict):
         """센서 데이터 추가 (배치 처리)"""
+        self.start()
         try:
-            self.batch_queue.put(('sensor_reading', reading_data))
+            # 호출 스레드에서 튜플로 변환해 두면 쓰기 스레드는 executemany 만 수행
+            self.batch_queue.put(('sensor_reading', self._reading_row(reading_data)))
         except Exception as e:
             logger.error(f"센서 데이터 추가 실패: {e}")
-    
+
+    def add_sensor_readings(self, rows: List[Tuple]):
+        """센서 데이터 여러 개 추가 (일괄 수집, INSERT 파라미터 튜플 목록을 큐 항목 하나로 전달)"""
+        self.start()
+        if rows:
+            self.batch_queue.put(('sensor_readings', rows))
+
     def add_anomaly(self, anomaly_data: Dict):
-        """이상 감지 결과 추가 (즉시 처리)"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        """이상 감지 결과 추가 (다음 배치 경계를 기다리지 않고 즉시 기록)"""
+        self.start()
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO anomalies 
-                    (device_id, timestamp, anomaly_type, severity, confidence, description, sensor_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    anomaly_data['device_id'],
-                    anomaly_data['timestamp'],
-                    anomaly_data['anomaly_type'],
-                    anomaly_data['severity'],
-                    anomaly_data['confidence'],
-                    anomaly_data['description'],
-                    json.dumps(anomaly_data['sensor_data'])
-                ))
-                
-                conn.commit()
-                conn.close()
-                
-                logger.info(f"이상 감지 결과 저장: {anomaly_data['anomaly_type']}")
-                
+            row = (
+                anomaly_data['device_id'],
+                anomaly_data['timestamp'],
+                anomaly_data['anomaly_type'],
+                anomaly_data['severity'],
+                anomaly_data['confidence'],
+                anomaly_data['description'],
+                json.dumps(anomaly_data['sensor_data'], default=float)
+            )
+            self.batch_queue.put(('anomaly', row))
+            self.batch_queue.put((_FLUSH, None))
         except Exception as e:
             logger.error(f"이상 감지 결과 저장 실패: {e}")
-        """
-        pass
 
     def update_device_info(self, device_info: Dict):
         """디바이스 정보 업데이트"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO devices 
-                    (device_id, device_name, location, firmware_version, hardware_version, last_seen, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    device_info['device_id'],
-                    device_info.get('device_name', 'Unknown'),
-                    device_info.get('location', 'Unknown'),
-                    device_info.get('firmware_version', 'Unknown'),
-                    device_info.get('hardware_version', 'Unknown'),
-                    device_info.get('last_seen', time.time()),
-                    device_info.get('status', 'online')
-                ))
-                
-                conn.commit()
-                conn.close()
-                
+            row = (
+                device_info['device_id'],
+                device_info.get('device_name', 'Unknown'),
+                device_info.get('location', 'Unknown'),
+                device_info.get('firmware_version', 'Unknown'),
+                device_info.get('hardware_version', 'Unknown'),
+                device_info.get('last_seen', time.time()),
+                device_info.get('status', 'online')
+            )
+            self.batch_queue.put(('device_info', row))
         except Exception as e:
             logger.error(f"디바이스 정보 업데이트 실패: {e}")
-        """
-        pass
 
     def _batch_processor(self):
-        """배치 처리 스레드"""
+        """배치 처리 스레드 (batch_size 개가 모이거나 첫 항목 후 batch_timeout 이 지나면 기록)"""
+        self._catch_up_rollups()
+
         batch_data = []
-        last_process_time = time.time()
-        
+        pending_rows = 0
+        deadline = None
+        attempts = 0  # 현재 batch_data 의 기록 실패 횟수 (0 이 아니면 deadline 은 재시도 시각)
+
         while True:
             try:
-                # 큐에서 데이터 가져오기
+                timeout = self.batch_timeout if deadline is None else max(0.0, deadline - time.time())
                 try:
-                    item = self.batch_queue.get(timeout=1)
-                    batch_data.append(item)
+                    item_type, data = self.batch_queue.get(timeout=timeout)
                 except queue.Empty:
-                    pass
-                
-                current_time = time.time()
-                
-                # 배치 크기 또는 시간 초과 시 처리
-                if (len(batch_data) >= self.batch_size or 
-                    (batch_data and current_time - last_process_time >= self.batch_timeout)):
-                    
+                    item_type, data = None, None
+
+                if item_type == _FLUSH or item_type == _STOP:
                     if batch_data:
-                        self._process_batch(batch_data)
+                        # 종료 시에는 재시도를 기다리지 않음
+                        attempts = self._write_pending(batch_data, attempts, give_up=item_type == _STOP)
+                        if not attempts:
+                            batch_data = []
+                            pending_rows = 0
+                    deadline = None if not attempts else time.time() + self._retry_delay(attempts)
+                    if data is not None:
+                        data.set()
+                    if item_type == _STOP:
+                        return
+                    continue
+
+                if item_type is not None:
+                    if not batch_data:
+                        deadline = time.time() + self.batch_timeout
+                    batch_data.append((item_type, data))
+                    pending_rows += len(data) if item_type == 'sensor_readings' else 1
+
+                # 배치 크기(행 수) 또는 시간 초과 시 처리 (재시도 대기 중이면 재시도 시각까지 모으기만 함)
+                if batch_data and ((not attempts and pending_rows >= self.batch_size) or time.time() >= deadline):
+                    attempts = self._write_pending(batch_data, attempts)
+                    if attempts:
+                        deadline = time.time() + self._retry_delay(attempts)
+                    else:
                         batch_data = []
-                        last_process_time = current_time
-                
+                        pending_rows = 0
+                        deadline = None
+
             except Exception as e:
                 logger.error(f"배치 처리 오류: {e}")
                 time.sleep(1)
-    
-    def _process_batch(self, batch_data: List[Tuple]):
-        """배치 데이터 처리"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.batch_timeout * attempts, BATCH_RETRY_MAX_DELAY)
+
+    def _write_pending(self, batch_data: List[Tuple], attempts: int, give_up: bool = False) -> int:
+        """배치 기록 시도, 기록했거나 포기하면 0, 다시 시도할 배치면 누적 실패 횟수"""
+        if self._process_batch(batch_data):
+            return 0
+        attempts += 1
+        if give_up or attempts >= BATCH_MAX_ATTEMPTS:
+            logger.error(f"배치 기록 {attempts}회 실패, {len(batch_data)}개 큐 항목 포기")
+            return 0
+        return attempts
+
+    def _process_batch(self, batch_data: List[Tuple]) -> bool:
         """
+        배치 데이터 처리 (유형별 executemany, 한 트랜잭션)
+
+        Returns:
+            기록했으면 True, 잠금/디스크 오류처럼 다시 시도해야 하면 False
+            (잘못된 행이 섞여 실패하면 행 단위로 다시 기록하고 그 행만 제외)
+        """
+        rows = defaultdict(list)
+        for item_type, row in batch_data:
+            if item_type == 'sensor_readings':
+                rows['sensor_reading'].extend(row)
+            else:
+                rows[item_type].append(row)
+        n_rows = sum(len(item_rows) for item_rows in rows.values())
+
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                for item_type, data in batch_data:
-                    if item_type == 'sensor_reading':
-                        cursor.execute('''
-                            INSERT INTO sensor_readings 
-                            (device_id, timestamp, temperature, vibration_x, vibration_y, vibration_z, 
-                             power_consumption, audio_level, sensor_quality)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            data['device_id'],
-                            data['timestamp'],
-                            data['temperature'],
-                            data['vibration_x'],
-                            data['vibration_y'],
-                            data['vibration_z'],
-                            data['power_consumption'],
-                            data['audio_level'],
-                            data.get('sensor_quality', 1.0)
-                        ))
-                
-                conn.commit()
-                conn.close()
-                
-                logger.info(f"배치 처리 완료: {len(batch_data)}개 항목")
-                
+            with self.db_lock, self.conn:
+                if rows['sensor_reading']:
+                    self.conn.executemany(INSERT_SENSOR_READING, rows['sensor_reading'])
+                    self.conn.executemany(UPSERT_DEVICE_LATEST, self._latest_rows(rows['sensor_reading']))
+                    apply_rollups(self.conn, now=time.time())
+                if rows['anomaly']:
+                    self.conn.executemany(INSERT_ANOMALY, rows['anomaly'])
+                if rows['device_info']:
+                    self.conn.executemany(UPSERT_DEVICE, rows['device_info'])
+        except sqlite3.OperationalError as e:
+            logger.warning(f"배치 처리 실패, 재시도 예정 ({n_rows}개 항목): {e}")
+            return False
         except Exception as e:
-            logger.error(f"배치 처리 실패: {e}")
-        """
-        pass
+            logger.warning(f"배치 처리 실패, 행 단위로 재시도 ({n_rows}개 항목): {e}")
+            return self._process_rows_individually(rows)
+
+        self.rows_written += n_rows
+        self.batches_written += 1
+        logger.debug(f"배치 처리 완료: {n_rows}개 항목")
+        return True
+
+    def _process_rows_individually(self, rows: Dict[str, List[Tuple]]) -> bool:
+        """행마다 execute 해서 기록할 수 없는 행만 제외 (한 트랜잭션)"""
+        statements = (
+            ('sensor_reading', INSERT_SENSOR_READING),
+            ('anomaly', INSERT_ANOMALY),
+            ('device_info', UPSERT_DEVICE),
+        )
+        written = defaultdict(list)
+        rejected = 0
+        first_error = None
+        try:
+            with self.db_lock, self.conn:
+                for item_type, sql in statements:
+                    for row in rows[item_type]:
+                        try:
+                            self.conn.execute(sql, row)
+                        except sqlite3.OperationalError:
+                            raise
+                        except Exception as e:
+                            rejected += 1
+                            first_error = first_error or e
+                        else:
+                            written[item_type].append(row)
+                if written['sensor_reading']:
+                    self.conn.executemany(UPSERT_DEVICE_LATEST, self._latest_rows(written['sensor_reading']))
+                    apply_rollups(self.conn, now=time.time())
+        except sqlite3.OperationalError as e:
+            logger.warning(f"행 단위 기록 실패, 재시도 예정: {e}")
+            return False
+
+        n_written = sum(len(item_rows) for item_rows in written.values())
+        self.rows_written += n_written
+        self.rows_rejected += rejected
+        self.batches_written += 1
+        if rejected:
+            logger.error(f"배치 중 {rejected}개 행 기록 불가로 제외 ({n_written}개 기록): {first_error}")
+        return True
+
+    def _catch_up_rollups(self):
+        """워터마크 이후 기존 원본 행을 롤업에 반영 (ROLLUP_CATCH_UP_ROWS 단위 트랜잭션)"""
+        total = 0
+        try:
+            while True:
+                with self.db_lock, self.conn:
+                    # 워커마다 시작 시 따라잡기를 하므로 워터마크를 읽기 전에 쓰기 잠금을 잡아 중복 반영 방지
+                    self.conn.execute('BEGIN IMMEDIATE')
+                    applied = apply_rollups(self.conn, max_rows=ROLLUP_CATCH_UP_ROWS, now=time.time())
+                if not applied:
+                    break
+                total += applied
+            if total:
+                logger.info(f"롤업 따라잡기 완료: 원본 {total}개 id 범위 반영")
+        except Exception as e:
+            logger.error(f"롤업 따라잡기 실패: {e}")
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """지금까지 큐에 들어간 항목을 모두 기록할 때까지 대기"""
+        self.start()
+        if self._stopped:
+            return True
+        done = threading.Event()
+        self.batch_queue.put((_FLUSH, done))
+        return done.wait(timeout)
 
-    def get_sensor_data(self, device_id: str, start_time: float = None, 
+    def shutdown(self, timeout: Optional[float] = 10.0):
+        """대기 중인 배치를 기록하고 연결 종료 (현재 프로세스가 시작한 경우만)"""
+        if self._stopped or self._pid != os.getpid():
+            return
+        done = threading.Event()
+        self.batch_queue.put((_STOP, done))
+        if not done.wait(timeout):
+            logger.warning("센서 데이터베이스 종료 시 배치 기록 시간 초과")
+        self._stopped = True
+        self.read_pool.close()
+        with self.db_lock:
+            try:
+                self.conn.execute('PRAGMA optimize')
+                self.conn.close()
+            except Exception as e:
+                logger.error(f"데이터베이스 연결 종료 실패: {e}")
+        logger.info(f"센서 데이터베이스 서비스 종료: 누적 {self.rows_written}개 기록")
+
+    def get_sensor_data(self, device_id: str, start_time: float = None,
                        end_time: float = None, limit: int = 1000) -> List[Dict]:
         """센서 데이터 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # 기본 시간 범위 설정
-                if start_time is None:
-                    start_time = time.time() - (24 * 3600)  # 24시간 전
-                if end_time is None:
-                    end_time = time.time()
-                
-                cursor.execute('''
-                    SELECT * FROM sensor_readings 
+            # 기본 시간 범위 설정
+            if start_time is None:
+                start_time = time.time() - (24 * 3600)  # 24시간 전
+            if end_time is None:
+                end_time = time.time()
+
+            with self.read_pool.connection() as conn:
+                cursor = conn.execute('''
+                    SELECT * FROM sensor_readings
                     WHERE device_id = ? AND timestamp BETWEEN ? AND ?
                     ORDER BY timestamp DESC
                     LIMIT ?
                 ''', (device_id, start_time, end_time, limit))
-                
-                data = []
-                for row in cursor.fetchall():
-                    data.append({
-                        'id': row[0],
-                        'device_id': row[1],
-                        'timestamp': row[2],
-                        'temperature': row[3],
-                        'vibration_x': row[4],
-                        'vibration_y': row[5],
-                        'vibration_z': row[6],
-                        'power_consumption': row[7],
-                        'audio_level': row[8],
-                        'sensor_quality': row[9],
-                        'created_at': row[10]
-                    })
-                
-                conn.close()
-                return data
-                
+                rows = cursor.fetchall()
+
+            return [{
+                'id': row[0],
+                'device_id': row[1],
+                'timestamp': row[2],
+                'temperature': row[3],
+                'vibration_x': row[4],
+                'vibration_y': row[5],
+                'vibration_z': row[6],
+                'power_consumption': row[7],
+                'audio_level': row[8],
+                'sensor_quality': row[9],
+                'created_at': row[10]
+            } for row in rows]
+
         except Exception as e:
             logger.error(f"센서 데이터 조회 실패: {e}")
             return []
-        """
-        return []
 
-    def get_anomalies(self, device_id: str = None, start_time: float = None, 
+    def get_anomalies(self, device_id: str = None, start_time: float = None,
                      end_time: float = None, limit: int = 100) -> List[Dict]:
         """이상 감지 결과 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # 기본 시간 범위 설정
-                if start_time is None:
-                    start_time = time.time() - (24 * 3600)  # 24시간 전
-                if end_time is None:
-                    end_time = time.time()
-                
+            # 기본 시간 범위 설정
+            if start_time is None:
+                start_time = time.time() - (24 * 3600)  # 24시간 전
+            if end_time is None:
+                end_time = time.time()
+
+            with self.read_pool.connection() as conn:
                 if device_id:
-                    cursor.execute('''
-                        SELECT * FROM anomalies 
+                    cursor = conn.execute('''
+                        SELECT * FROM anomalies
                         WHERE device_id = ? AND timestamp BETWEEN ? AND ?
                         ORDER BY timestamp DESC
                         LIMIT ?
                     ''', (device_id, start_time, end_time, limit))
                 else:
-                    cursor.execute('''
-                        SELECT * FROM anomalies 
+                    cursor = conn.execute('''
+                        SELECT * FROM anomalies
                         WHERE timestamp BETWEEN ? AND ?
                         ORDER BY timestamp DESC
                         LIMIT ?
                     ''', (start_time, end_time, limit))
-                
-                anomalies = []
-                for row in cursor.fetchall():
-                    anomalies.append({
-                        'id': row[0],
-                        'device_id': row[1],
-                        'timestamp': row[2],
-                        'anomaly_type': row[3],
-                        'severity': row[4],
-                        'confidence': row[5],
-                        'description': row[6],
-                        'sensor_data': json.loads(row[7]) if row[7] else {},
-                        'created_at': row[8]
-                    })
-                
-                conn.close()
-                return anomalies
-                
+                rows = cursor.fetchall()
+
+            return [{
+                'id': row[0],
+                'device_id': row[1],
+                'timestamp': row[2],
+                'anomaly_type': row[3],
+                'severity': row[4],
+                'confidence': row[5],
+                'description': row[6],
+                'sensor_data': json.loads(row[7]) if row[7] else {},
+                'created_at': row[8]
+            } for row in rows]
+
         except Exception as e:
             logger.error(f"이상 감지 결과 조회 실패: {e}")
             return []
-        """
-        return []
 
     def get_device_status(self) -> List[Dict]:
         """디바이스 상태 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
+            with self.read_pool.connection() as conn:
+                rows = conn.execute('''
                     SELECT device_id, device_name, status, last_seen, firmware_version
                     FROM devices
                     ORDER BY last_seen DESC
-                ''')
-                
-                devices = []
-                current_time = time.time()
-                
-                for row in cursor.fetchall():
-                    devices.append({
-                        'device_id': row[0],
-                        'device_name': row[1],
-                        'status': row[2],
-                        'last_seen': row[3],
-                        'firmware_version': row[4],
-                        'is_online': current_time - row[3] < 300  # 5분 이내
-                    })
-                
-                conn.close()
-                return devices
-                
+                ''').fetchall()
+
+            current_time = time.time()
+            return [{
+                'device_id': row[0],
+                'device_name': row[1],
+                'status': row[2],
+                'last_seen': row[3],
+                'firmware_version': row[4],
+                'is_online': row[3] is not None and current_time - row[3] < 300  # 5분 이내
+            } for row in rows]
+
         except Exception as e:
             logger.error(f"디바이스 상태 조회 실패: {e}")
             return []
-        """
-        return []
 
     def get_statistics(self, device_id: str, date: str = None) -> Dict:
         """센서 통계 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
             if date is None:
                 date = datetime.now().strftime('%Y-%m-%d')
-            
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # 일별 통계 조회
-                cursor.execute('''
-                    SELECT 
-                        AVG(temperature) as avg_temp,
-                        MAX(temperature) as max_temp,
-                        MIN(temperature) as min_temp,
-                        AVG(SQRT(vibration_x*vibration_x + vibration_y*vibration_y + vibration_z*vibration_z)) as avg_vibration,
-                        MAX(SQRT(vibration_x*vibration_x + vibration_y*vibration_y + vibration_z*vibration_z)) as max_vibration,
-                        AVG(power_consumption) as avg_power,
-                        MAX(power_consumption) as max_power,
-                        COUNT(*) as total_readings
-                    FROM sensor_readings 
-                    WHERE device_id = ? AND DATE(datetime(timestamp, 'unixepoch')) = ?
-                ''', (device_id, date))
-                
-                stats = cursor.fetchone()
-                
+
+            # 날짜 문자열 비교 대신 시간 범위로 조회해야 (device_id, timestamp) 인덱스를 사용
+            day = datetime.strptime(date, '%Y-%m-%d')
+            start_timestamp = day.timestamp()
+            # 다음 날 0시 (서머타임 전환일은 23/25시간)
+            end_timestamp = (day + timedelta(days=1)).timestamp()
+
+            with self.read_pool.connection() as conn:
+                # 일별 통계 조회 (1시간 롤업 24행)
+                stats = fetch_summary(conn, '1h', start_timestamp, end_timestamp, device_id=device_id)
+
                 # 이상 감지 수 조회
-                cursor.execute('''
+                anomaly_count = conn.execute('''
                     SELECT COUNT(*) as anomaly_count
-                    FROM anomalies 
-                    WHERE device_id = ? AND DATE(datetime(timestamp, 'unixepoch')) = ?
-                ''', (device_id, date))
-                
-                anomaly_count = cursor.fetchone()[0]
-                
-                conn.close()
-                
-                return {
-                    'device_id': device_id,
-                    'date': date,
-                    'avg_temperature': stats[0] if stats[0] else 0,
-                    'max_temperature': stats[1] if stats[1] else 0,
-                    'min_temperature': stats[2] if stats[2] else 0,
-                    'avg_vibration': stats[3] if stats[3] else 0,
-                    'max_vibration': stats[4] if stats[4] else 0,
-                    'avg_power_consumption': stats[5] if stats[5] else 0,
-                    'max_power_consumption': stats[6] if stats[6] else 0,
-                    'total_readings': stats[7] if stats[7] else 0,
-                    'anomaly_count': anomaly_count
-                }
-                
+                    FROM anomalies
+                    WHERE device_id = ? AND timestamp >= ? AND timestamp < ?
+                ''', (device_id, start_timestamp, end_timestamp)).fetchone()[0]
+
+            return {
+                'device_id': device_id,
+                'date': date,
+                'avg_temperature': metric_mean(stats, 'temperature') or 0,
+                'max_temperature': stats['temperature_max'] or 0,
+                'min_temperature': stats['temperature_min'] or 0,
+                'avg_vibration': metric_mean(stats, 'vibration') or 0,
+                'max_vibration': stats['vibration_max'] or 0,
+                'avg_power_consumption': metric_mean(stats, 'power_consumption') or 0,
+                'max_power_consumption': stats['power_consumption_max'] or 0,
+                'total_readings': stats['readings'],
+                'anomaly_count': anomaly_count
+            }
+
         except Exception as e:
             logger.error(f"통계 조회 실패: {e}")
             return {}
-        """
-        return {}
 
     def generate_hourly_statistics(self, device_id: str, date: str = None):
         """시간별 통계 생성"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
             if date is None:
                 date = datetime.now().strftime('%Y-%m-%d')
-            
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # 시간별 통계 생성
+
+            rows = []
+            day = datetime.strptime(date, '%Y-%m-%d')
+            day_start = day.timestamp()
+            day_end = (day + timedelta(days=1)).timestamp()  # 서머타임 전환일은 23/25시간
+            with self.read_pool.connection() as conn:
+                # 1시간 롤업을 한 번에 조회
+                hourly = {row['bucket']: row
+                          for row in fetch_series(conn, '1h', day_start, day_end, device_id=device_id)}
+
+                # 시간별 통계 계산
                 for hour in range(24):
                     start_timestamp = datetime.strptime(f"{date} {hour:02d}:00:00", '%Y-%m-%d %H:%M:%S').timestamp()
                     end_timestamp = start_timestamp + 3600
-                    
-                    # 센서 데이터 통계
-                    cursor.execute('''
-                        SELECT 
-                            AVG(temperature) as avg_temp,
-                            MAX(temperature) as max_temp,
-                            MIN(temperature) as min_temp,
-                            AVG(SQRT(vibration_x*vibration_x + vibration_y*vibration_y + vibration_z*vibration_z)) as avg_vibration,
-                            MAX(SQRT(vibration_x*vibration_x + vibration_y*vibration_y + vibration_z*vibration_z)) as max_vibration,
-                            AVG(power_consumption) as avg_power,
-                            MAX(power_consumption) as max_power
-                        FROM sensor_readings 
-                        WHERE device_id = ? AND timestamp BETWEEN ? AND ?
-                    ''', (device_id, start_timestamp, end_timestamp))
-                    
-                    stats = cursor.fetchone()
-                    
+
+                    # 센서 데이터 통계 (롤업 버킷은 UTC 정시 기준, UTC 오프셋이 정시가 아닌 지역은 시작 시각이 속한 버킷)
+                    bucket = hourly.get(bucket_start('1h', start_timestamp), {})
+                    stats = (
+                        metric_mean(bucket, 'temperature'),
+                        bucket.get('temperature_max'),
+                        bucket.get('temperature_min'),
+                        metric_mean(bucket, 'vibration'),
+                        bucket.get('vibration_max'),
+                        metric_mean(bucket, 'power_consumption'),
+                        bucket.get('power_consumption_max'),
+                    )
+
                     # 이상 감지 수
-                    cursor.execute('''
+                    anomaly_count = conn.execute('''
                         SELECT COUNT(*) as anomaly_count
-                        FROM anomalies 
-                        WHERE device_id = ? AND timestamp BETWEEN ? AND ?
-                    ''', (device_id, start_timestamp, end_timestamp))
-                    
-                    anomaly_count = cursor.fetchone()[0]
-                    
-                    # 통계 저장
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO sensor_statistics 
-                        (device_id, date, hour, avg_temperature, max_temperature, min_temperature,
-                         avg_vibration, max_vibration, avg_power_consumption, max_power_consumption, anomaly_count)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        device_id, date, hour,
-                        stats[0] if stats[0] else 0,
-                        stats[1] if stats[1] else 0,
-                        stats[2] if stats[2] else 0,
-                        stats[3] if stats[3] else 0,
-                        stats[4] if stats[4] else 0,
-                        stats[5] if stats[5] else 0,
-                        stats[6] if stats[6] else 0,
-                        anomaly_count
-                    ))
-                
-                conn.commit()
-                conn.close()
-                
-                logger.info(f"시간별 통계 생성 완료: {device_id} - {date}")
-                
+                        FROM anomalies
+                        WHERE device_id = ? AND timestamp >= ? AND timestamp < ?
+                    ''', (device_id, start_timestamp, end_timestamp)).fetchone()[0]
+
+                    rows.append((device_id, date, hour, *[value if value else 0 for value in stats], anomaly_count))
+
+            # 통계 저장
+            with self.db_lock, self.conn:
+                self.conn.executemany('''
+                    INSERT OR REPLACE INTO sensor_statistics
+                    (device_id, date, hour, avg_temperature, max_temperature, min_temperature,
+                     avg_vibration, max_vibration, avg_power_consumption, max_power_consumption, anomaly_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+
+            logger.info(f"시간별 통계 생성 완료: {device_id} - {date}")
+
         except Exception as e:
             logger.error(f"시간별 통계 생성 실패: {e}")
-        """
-        pass
 
     def cleanup_old_data(self, days: int = 30):
         """오래된 데이터 정리"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
             cutoff_time = time.time() - (days * 24 * 3600)
-            
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
+
+            with self.db_lock, self.conn:
                 # 오래된 센서 데이터 삭제
-                cursor.execute('DELETE FROM sensor_readings WHERE timestamp < ?', (cutoff_time,))
-                sensor_deleted = cursor.rowcount
-                
+                sensor_deleted = self.conn.execute(
+                    'DELETE FROM sensor_readings WHERE timestamp < ?', (cutoff_time,)).rowcount
+
                 # 오래된 이상 감지 데이터 삭제
-                cursor.execute('DELETE FROM anomalies WHERE timestamp < ?', (cutoff_time,))
-                anomaly_deleted = cursor.rowcount
-                
-                conn.commit()
-                conn.close()
-                
-                logger.info(f"데이터 정리 완료: 센서 {sensor_deleted}개, 이상 {anomaly_deleted}개 삭제")
-                
+                anomaly_deleted = self.conn.execute(
+                    'DELETE FROM anomalies WHERE timestamp < ?', (cutoff_time,)).rowcount
+
+                # 롤업은 단위별 보관 기간(ROLLUP_RETENTION)으로 따로 정리
+                rollup_deleted = prune_rollups(self.conn, time.time())
+
+            logger.info(f"데이터 정리 완료: 센서 {sensor_deleted}개, 이상 {anomaly_deleted}개, "
+                        f"롤업 {sum(rollup_deleted.values())}개 삭제")
+
         except Exception as e:
             logger.error(f"데이터 정리 실패: {e}")
-        """
-        pass
 
     def get_database_status(self) -> Dict:
         """데이터베이스 상태 조회"""
-        logger.warning("데이터베이스 연결이 구현되지 않았습니다. 아래는 이전 SQLite 로직입니다.")
-        """
+        self.start()
         try:
-            with self.db_lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
+            with self.read_pool.connection() as conn:
                 # 테이블별 레코드 수
-                cursor.execute('SELECT COUNT(*) FROM sensor_readings')
-                sensor_count = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM anomalies')
-                anomaly_count = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM devices')
-                device_count = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM sensor_statistics')
-                stats_count = cursor.fetchone()[0]
-                
+                sensor_count = conn.execute('SELECT COUNT(*) FROM sensor_readings').fetchone()[0]
+                anomaly_count = conn.execute('SELECT COUNT(*) FROM anomalies').fetchone()[0]
+                device_count = conn.execute('SELECT COUNT(*) FROM devices').fetchone()[0]
+                stats_count = conn.execute('SELECT COUNT(*) FROM sensor_statistics').fetchone()[0]
+                max_id = conn.execute('SELECT MAX(id) FROM sensor_readings').fetchone()[0] or 0
+                rollup_watermark = get_watermark(conn)
+
                 # 데이터베이스 크기
-                cursor.execute('SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()')
-                db_size = cursor.fetchone()[0]
-                
-                conn.close()
-                
-                return {
-                    'sensor_readings': sensor_count,
-                    'anomalies': anomaly_count,
-                    'devices': device_count,
-                    'statistics': stats_count,
-                    'database_size_bytes': db_size,
-                    'database_size_mb': round(db_size / (1024 * 1024), 2),
-                    'queue_size': self.batch_queue.qsize()
-                }
-                
+                db_size = conn.execute(
+                    'SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()'
+                ).fetchone()[0]
+                journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+
+            return {
+                'sensor_readings': sensor_count,
+                'anomalies': anomaly_count,
+                'devices': device_count,
+                'statistics': stats_count,
+                'rollup_watermark': rollup_watermark,
+                'rollup_lag_rows': max_id - rollup_watermark,
+                'database_size_bytes': db_size,
+                'database_size_mb': round(db_size / (1024 * 1024), 2),
+                'journal_mode': journal_mode,
+                'queue_size': self.batch_queue.qsize(),
+                'rows_written': self.rows_written,
+                'rows_rejected': self.rows_rejected,
+                'batches_written': self.batches_written
+            }
+
         except Exception as e:
             logger.error(f"데이터베이스 상태 조회 실패: {e}")
             return {}
-        """
-        return {}
 
 # 전역 서비스 인스턴스
 sensor_database_service = SensorDatabaseService()
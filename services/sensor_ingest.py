@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+센서 데이터 일괄 수집 (bulk ingest)
+ESP32 가 버퍼링한 측정값 수백 개를 한 요청으로 받아 열(column) 배열로 디코딩하고 벡터화 검증합니다.
+
+지원 형식
+- NDJSON (application/x-ndjson): 한 줄에 /api/iot/sensors/data 와 같은 JSON 측정값 하나
+- 패킹 바이너리 (application/octet-stream):
+    헤더   magic b'SCB1' | u16 디바이스 수 D | D × (u8 길이 + UTF-8 device_id) | u32 레코드 수 N
+    레코드 N × 32바이트 (little-endian, 패딩 없음, PACKED_READING)
+           u16 device_index | f64 timestamp | f32 temperature | f32 vibration_x/y/z
+           | f32 power_consumption | u16 audio_level
+"""
+
+import json
+import struct
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+PACKED_MAGIC = b'SCB1'
+PACKED_READING = np.dtype([
+    ('device_index', '<u2'),
+    ('timestamp', '<f8'),
+    ('temperature', '<f4'),
+    ('vibration_x', '<f4'),
+    ('vibration_y', '<f4'),
+    ('vibration_z', '<f4'),
+    ('power_consumption', '<f4'),
+    ('audio_level', '<u2'),
+])
+
+# 열 순서 (sensor_readings 테이블 INSERT 순서와 동일, device_id 제외)
+READING_COLUMNS = (
+    'timestamp', 'temperature', 'vibration_x', 'vibration_y', 'vibration_z',
+    'power_consumption', 'audio_level', 'sensor_quality'
+)
+
+# 한 요청에 허용하는 최대 측정값 수
+MAX_BATCH_READINGS = 5000
+# 허용 범위 (센서 물리 범위 밖이면 거절)
+VALID_RANGES = {
+    'temperature': (-80.0, 150.0),
+    'vibration_x': (-100.0, 100.0),
+    'vibration_y': (-100.0, 100.0),
+    'vibration_z': (-100.0, 100.0),
+    'power_consumption': (0.0, 1000.0),
+    'audio_level': (0.0, 65535.0),
+    'sensor_quality': (0.0, 1.0),
+}
+# 2017-07 이전 또는 현재보다 5분 이상 미래의 타임스탬프는 거절
+MIN_TIMESTAMP = 1.5e9
+MAX_CLOCK_SKEW = 300.0
+
+
+class SensorBatchError(ValueError):
+    """요청 전체를 해석할 수 없는 경우 (형식 오류, 크기 초과)"""
+
+
+@dataclass
+class SensorBatch:
+    """
+    측정값 묶음 (열 배열)
+
+    device_ids 는 배치 안의 디바이스 목록, device_index 는 측정값별 device_ids 인덱스
+    """
+    device_ids: List[str]
+    device_index: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.device_index)
+
+    def select(self, mask: np.ndarray) -> 'SensorBatch':
+        return SensorBatch(self.device_ids, self.device_index[mask],
+                           {name: values[mask] for name, values in self.columns.items()})
+
+    def device_rows(self) -> List[Tuple[str, np.ndarray]]:
+        """디바이스별 측정값 행 인덱스 (타임스탬프 순)"""
+        order = np.lexsort((self.columns['timestamp'], self.device_index))
+        indices = self.device_index[order]
+        boundaries = np.flatnonzero(np.diff(indices)) + 1
+        return [(self.device_ids[indices[group[0]]], order[group[0]:group[-1] + 1])
+                for group in np.split(np.arange(len(order)), boundaries) if len(group)]
+
+    def db_rows(self) -> List[Tuple]:
+        """sensor_readings INSERT 파라미터 튜플 목록"""
+        device_ids = [self.device_ids[index] for index in self.device_index.tolist()]
+        values = [self.columns[name].tolist() for name in READING_COLUMNS]
+        values[READING_COLUMNS.index('audio_level')] = self.columns['audio_level'].astype(np.int64).tolist()
+        return list(zip(device_ids, *values))
+
+    def reading(self, row: int) -> Dict:
+        """측정값 하나 (평탄화된 sensor_reading 딕셔너리)"""
+        reading = {name: values[row].item() for name, values in self.columns.items()}
+        reading['audio_level'] = int(reading['audio_level'])
+        reading['device_id'] = self.device_ids[self.device_index[row]]
+        return reading
+
+    def payload(self, row: int) -> Dict:
+        """측정값 하나 (/api/iot/sensors/data 요청과 같은 형태)"""
+        reading = self.reading(row)
+        reading['vibration'] = {axis: reading.pop(f'vibration_{axis}') for axis in 'xyz'}
+        return reading
+
+
+def _number(value) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.nan
+
+
+def parse_ndjson(body: bytes) -> SensorBatch:
+    """NDJSON 본문 → SensorBatch (줄 i 가 측정값 i, 해석할 수 없는 줄은 device_id 가 빈 무효 측정값)"""
+    lines = [line for line in body.decode('utf-8').splitlines() if line.strip()]
+    if len(lines) > MAX_BATCH_READINGS:
+        raise SensorBatchError(f'한 번에 최대 {MAX_BATCH_READINGS}개 측정값까지 보낼 수 있습니다')
+    try:
+        # 줄마다 json.loads 를 호출하지 않고 배열 하나로 한 번에 파싱
+        records = json.loads('[' + ','.join(lines) + ']')
+    except ValueError:
+        records = None
+    if records is None or len(records) != len(lines):
+        # 한 줄에 값이 여러 개(`{...},{...}`)이거나 빈 값이 섞이면 줄 번호와 어긋나므로 줄 단위로 다시 파싱
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                records.append(None)
+    if len(records) > MAX_BATCH_READINGS:
+        raise SensorBatchError(f'한 번에 최대 {MAX_BATCH_READINGS}개 측정값까지 보낼 수 있습니다')
+    records = [record if isinstance(record, dict) else {} for record in records]
+
+    n = len(records)
+    vibrations = [record.get('vibration') if isinstance(record.get('vibration'), dict) else {}
+                  for record in records]
+    columns = {
+        'timestamp': np.fromiter((_number(r.get('timestamp')) for r in records), np.float64, n),
+        'temperature': np.fromiter((_number(r.get('temperature')) for r in records), np.float64, n),
+        'vibration_x': np.fromiter((_number(v.get('x')) for v in vibrations), np.float64, n),
+        'vibration_y': np.fromiter((_number(v.get('y')) for v in vibrations), np.float64, n),
+        'vibration_z': np.fromiter((_number(v.get('z')) for v in vibrations), np.float64, n),
+        'power_consumption': np.fromiter((_number(r.get('power_consumption')) for r in records), np.float64, n),
+        'audio_level': np.fromiter((_number(r.get('audio_level')) for r in records), np.float64, n),
+        'sensor_quality': np.fromiter((_number(r.get('sensor_quality', 1.0)) for r in records), np.float64, n),
+    }
+
+    device_ids = [r.get('device_id') if isinstance(r.get('device_id'), str) else '' for r in records]
+    table: Dict[str, int] = {}
+    device_index = np.fromiter((table.setdefault(device_id, len(table)) for device_id in device_ids),
+                               np.int64, n)
+    return SensorBatch(list(table), device_index, columns)
+
+
+def parse_packed(body: bytes) -> SensorBatch:
+    """패킹 바이너리 본문 → SensorBatch"""
+    try:
+        if body[:4] != PACKED_MAGIC:
+            raise SensorBatchError('잘못된 바이너리 프레임 (magic 불일치)')
+        offset = 4
+        (n_devices,) = struct.unpack_from('<H', body, offset)
+        offset += 2
+        device_ids = []
+        for _ in range(n_devices):
+            length = body[offset]
+            device_ids.append(body[offset + 1:offset + 1 + length].decode('utf-8'))
+            offset += 1 + length
+        (n,) = struct.unpack_from('<I', body, offset)
+        offset += 4
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SensorBatchError(f'잘못된 바이너리 프레임 헤더: {e}')
+
+    if n > MAX_BATCH_READINGS:
+        raise SensorBatchError(f'한 번에 최대 {MAX_BATCH_READINGS}개 측정값까지 보낼 수 있습니다')
+    if len(body) - offset != n * PACKED_READING.itemsize:
+        raise SensorBatchError(
+            f'레코드 길이 불일치: {n}개 × {PACKED_READING.itemsize}바이트 != {len(body) - offset}바이트'
+        )
+
+    records = np.frombuffer(body, dtype=PACKED_READING, count=n, offset=offset)
+    columns = {name: records[name].astype(np.float64) for name in READING_COLUMNS if name != 'sensor_quality'}
+    columns['sensor_quality'] = np.ones(n)
+    return SensorBatch(device_ids, records['device_index'].astype(np.int64), columns)
+
+
+def pack_readings(readings: Sequence[Dict]) -> bytes:
+    """측정값 딕셔너리 목록 (/api/iot/sensors/data 형식) → 패킹 바이너리 프레임 (시뮬레이터/테스트용)"""
+    table: Dict[str, int] = {}
+    records = np.zeros(len(readings), dtype=PACKED_READING)
+    for row, reading in enumerate(readings):
+        records[row] = (
+            table.setdefault(reading['device_id'], len(table)),
+            reading['timestamp'],
+            reading['temperature'],
+            reading['vibration']['x'],
+            reading['vibration']['y'],
+            reading['vibration']['z'],
+            reading['power_consumption'],
+            reading['audio_level'],
+        )
+    header = [PACKED_MAGIC, struct.pack('<H', len(table))]
+    for device_id in table:
+        encoded = device_id.encode('utf-8')
+        header.append(struct.pack('<B', len(encoded)) + encoded)
+    header.append(struct.pack('<I', len(records)))
+    return b''.join(header) + records.tobytes()
+
+
+def validate_batch(batch: SensorBatch, now: float = None) -> Tuple[np.ndarray, List[Dict]]:
+    """
+    벡터화 검증
+
+    Returns:
+        (유효 측정값 마스크, 무효 측정값 [{'index': 행, 'reason': 사유}] 목록)
+    """
+    now = now or time.time()
+    n = len(batch)
+    reasons = np.full(n, '', dtype=object)
+
+    def reject(mask: np.ndarray, reason: str):
+        reasons[mask & (reasons == '')] = reason
+
+    device_ids = np.array(batch.device_ids + [''], dtype=object)
+    in_table = (batch.device_index >= 0) & (batch.device_index < len(batch.device_ids))
+    reject(~in_table, 'device_index 범위 초과')
+    reject(device_ids[np.where(in_table, batch.device_index, len(batch.device_ids))] == '', 'device_id 누락')
+
+    timestamps = batch.columns['timestamp']
+    reject(~np.isfinite(timestamps), 'timestamp 누락')
+    reject((timestamps < MIN_TIMESTAMP) | (timestamps > now + MAX_CLOCK_SKEW), 'timestamp 범위 초과')
+    for name, (low, high) in VALID_RANGES.items():
+        values = batch.columns[name]
+        reject(~np.isfinite(values), f'{name} 누락')
+        reject((values < low) | (values > high), f'{name} 범위 초과')
+
+    valid = reasons == ''
+    errors = [{'index': int(index), 'reason': reasons[index]} for index in np.flatnonzero(~valid)]
+    return valid, errors
@@ -33,6 +33,9 @@ class AnomalySeverity(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# 벡터화 상태 평가 수준 → 상태 (0 정상, 1 경고, 2 위험)
+STATUS_BY_LEVEL = (SensorStatus.NORMAL, SensorStatus.WARNING, SensorStatus.CRITICAL)
+
 @dataclass
 class SensorHealth:
     """센서 건강 상태"""
@@ -133,22 +136,7 @@ class SensorMonitoringService:
             current_time = time.time()
             
             # 디바이스 건강 상태 업데이트
-            if device_id not in self.device_health:
-                self.device_health[device_id] = SensorHealth(
-                    device_id=device_id,
-                    status=SensorStatus.NORMAL,
-                    last_seen=current_time,
-                    uptime=0,
-                    data_quality=1.0,
-                    anomaly_count=0,
-                    temperature_status=SensorStatus.NORMAL,
-                    vibration_status=SensorStatus.NORMAL,
-                    power_status=SensorStatus.NORMAL,
-                    audio_status=SensorStatus.NORMAL,
-                    overall_health=100.0
-                )
-            
-            health = self.device_health[device_id]
+            health = self._get_device_health_entry(device_id, current_time)
             health.last_seen = current_time
             
             # 개별 센서 상태 평가
@@ -173,6 +161,82 @@ class SensorMonitoringService:
         except Exception as e:
             logger.error(f"센서 데이터 업데이트 실패: {e}")
     
+    def update_sensor_batch(self, batch):
+        """
+        센서 데이터 일괄 업데이트 (services.sensor_ingest.SensorBatch)
+        
+        측정값별 센서 상태를 열 단위로 한 번에 평가하고, 디바이스 상태는 가장 최근 측정값으로 갱신합니다.
+        알림은 디바이스·센서 유형마다 배치에서 가장 심각한 측정값 하나로만 생성합니다.
+        """
+        try:
+            current_time = time.time()
+            columns = batch.columns
+            rules = self.monitoring_rules
+            vibration_magnitude = np.sqrt(
+                columns['vibration_x']**2 + columns['vibration_y']**2 + columns['vibration_z']**2
+            )
+            levels = {
+                'temperature': self._status_levels(columns['temperature'], rules['temperature']['normal_range'][1],
+                                                   rules['temperature']['warning_range'][1]),
+                'vibration': self._status_levels(vibration_magnitude, rules['vibration']['normal_max'],
+                                                 rules['vibration']['warning_max']),
+                'power': self._status_levels(columns['power_consumption'], rules['power']['normal_max'],
+                                             rules['power']['warning_max']),
+                'audio': self._status_levels(columns['audio_level'], rules['audio']['normal_max'],
+                                             rules['audio']['warning_max']),
+            }
+            
+            for device_id, rows in batch.device_rows():
+                health = self._get_device_health_entry(device_id, current_time)
+                health.last_seen = current_time
+                
+                latest = rows[-1]
+                health.temperature_status = STATUS_BY_LEVEL[levels['temperature'][latest]]
+                health.vibration_status = STATUS_BY_LEVEL[levels['vibration'][latest]]
+                health.power_status = STATUS_BY_LEVEL[levels['power'][latest]]
+                health.audio_status = STATUS_BY_LEVEL[levels['audio'][latest]]
+                health.status = self._evaluate_overall_status([
+                    health.temperature_status, health.vibration_status, health.power_status, health.audio_status
+                ])
+                health.overall_health = self._calculate_overall_health(health)
+                
+                # 센서 유형별 가장 심각한 측정값 (같은 수준이면 최근 측정값)
+                for sensor_type, sensor_levels in levels.items():
+                    device_levels = sensor_levels[rows]
+                    worst = len(rows) - 1 - int(np.argmax(device_levels[::-1]))
+                    if device_levels[worst] > 0:
+                        self._create_sensor_alert(device_id, sensor_type, STATUS_BY_LEVEL[device_levels[worst]],
+                                                  batch.reading(rows[worst]))
+                
+                if health.overall_health < 50:
+                    self._create_health_alert(device_id, health, batch.reading(latest))
+            
+        except Exception as e:
+            logger.error(f"센서 데이터 일괄 업데이트 실패: {e}")
+    
+    def _get_device_health_entry(self, device_id: str, current_time: float) -> SensorHealth:
+        """디바이스 건강 상태 (처음 보는 디바이스면 생성)"""
+        if device_id not in self.device_health:
+            self.device_health[device_id] = SensorHealth(
+                device_id=device_id,
+                status=SensorStatus.NORMAL,
+                last_seen=current_time,
+                uptime=0,
+                data_quality=1.0,
+                anomaly_count=0,
+                temperature_status=SensorStatus.NORMAL,
+                vibration_status=SensorStatus.NORMAL,
+                power_status=SensorStatus.NORMAL,
+                audio_status=SensorStatus.NORMAL,
+                overall_health=100.0
+            )
+        return self.device_health[device_id]
+    
+    @staticmethod
+    def _status_levels(values: np.ndarray, normal_max: float, warning_max: float) -> np.ndarray:
+        """측정값 배열 → 상태 수준 배열 (0 정상, 1 경고, 2 위험)"""
+        return np.where(values <= normal_max, 0, np.where(values <= warning_max, 1, 2))
+    
     def _evaluate_temperature_status(self, temperature: float) -> SensorStatus:
         """온도 상태 평가"""
         rules = self.monitoring_rules['temperature']
@@ -279,66 +343,57 @@ class SensorMonitoringService:
     def _check_for_alerts(self, device_id: str, sensor_data: Dict, health: SensorHealth):
         """알림 확인"""
         try:
-            current_time = time.time()
-            
-            # 온도 알림
-            if health.temperature_status in [SensorStatus.WARNING, SensorStatus.CRITICAL]:
-                self._create_alert(
-                    device_id=device_id,
-                    alert_type='temperature_alert',
-                    severity=AnomalySeverity.HIGH if health.temperature_status == SensorStatus.CRITICAL else AnomalySeverity.MEDIUM,
-                    message=f'냉동고 온도 이상: {sensor_data.get("temperature", 0):.1f}°C',
-                    sensor_data=sensor_data
-                )
-            
-            # 진동 알림
-            if health.vibration_status in [SensorStatus.WARNING, SensorStatus.CRITICAL]:
-                vibration_magnitude = np.sqrt(
-                    sensor_data.get('vibration_x', 0)**2 +
-                    sensor_data.get('vibration_y', 0)**2 +
-                    sensor_data.get('vibration_z', 0)**2
-                )
-                self._create_alert(
-                    device_id=device_id,
-                    alert_type='vibration_alert',
-                    severity=AnomalySeverity.HIGH if health.vibration_status == SensorStatus.CRITICAL else AnomalySeverity.MEDIUM,
-                    message=f'압축기 진동 이상: {vibration_magnitude:.2f}g',
-                    sensor_data=sensor_data
-                )
-            
-            # 전력 알림
-            if health.power_status in [SensorStatus.WARNING, SensorStatus.CRITICAL]:
-                self._create_alert(
-                    device_id=device_id,
-                    alert_type='power_alert',
-                    severity=AnomalySeverity.HIGH if health.power_status == SensorStatus.CRITICAL else AnomalySeverity.MEDIUM,
-                    message=f'전력 소비 이상: {sensor_data.get("power_consumption", 0):.1f}%',
-                    sensor_data=sensor_data
-                )
-            
-            # 오디오 알림
-            if health.audio_status in [SensorStatus.WARNING, SensorStatus.CRITICAL]:
-                self._create_alert(
-                    device_id=device_id,
-                    alert_type='audio_alert',
-                    severity=AnomalySeverity.HIGH if health.audio_status == SensorStatus.CRITICAL else AnomalySeverity.MEDIUM,
-                    message=f'압축기 소음 이상: {sensor_data.get("audio_level", 0)}',
-                    sensor_data=sensor_data
-                )
+            sensor_statuses = {
+                'temperature': health.temperature_status,
+                'vibration': health.vibration_status,
+                'power': health.power_status,
+                'audio': health.audio_status
+            }
+            for sensor_type, status in sensor_statuses.items():
+                if status in [SensorStatus.WARNING, SensorStatus.CRITICAL]:
+                    self._create_sensor_alert(device_id, sensor_type, status, sensor_data)
             
             # 전체 건강도 알림
             if health.overall_health < 50:
-                self._create_alert(
-                    device_id=device_id,
-                    alert_type='health_alert',
-                    severity=AnomalySeverity.CRITICAL if health.overall_health < 30 else AnomalySeverity.HIGH,
-                    message=f'센서 전체 건강도 저하: {health.overall_health:.1f}%',
-                    sensor_data=sensor_data
-                )
+                self._create_health_alert(device_id, health, sensor_data)
             
         except Exception as e:
             logger.error(f"알림 확인 실패: {e}")
     
+    def _create_sensor_alert(self, device_id: str, sensor_type: str, status: SensorStatus, sensor_data: Dict):
+        """센서 유형별 알림 생성 (온도/진동/전력/오디오)"""
+        if sensor_type == 'temperature':
+            message = f'냉동고 온도 이상: {sensor_data.get("temperature", 0):.1f}°C'
+        elif sensor_type == 'vibration':
+            vibration_magnitude = np.sqrt(
+                sensor_data.get('vibration_x', 0)**2 +
+                sensor_data.get('vibration_y', 0)**2 +
+                sensor_data.get('vibration_z', 0)**2
+            )
+            message = f'압축기 진동 이상: {vibration_magnitude:.2f}g'
+        elif sensor_type == 'power':
+            message = f'전력 소비 이상: {sensor_data.get("power_consumption", 0):.1f}%'
+        else:
+            message = f'압축기 소음 이상: {sensor_data.get("audio_level", 0)}'
+        
+        self._create_alert(
+            device_id=device_id,
+            alert_type=f'{sensor_type}_alert',
+            severity=AnomalySeverity.HIGH if status == SensorStatus.CRITICAL else AnomalySeverity.MEDIUM,
+            message=message,
+            sensor_data=sensor_data
+        )
+    
+    def _create_health_alert(self, device_id: str, health: SensorHealth, sensor_data: Dict):
+        """전체 건강도 저하 알림 생성"""
+        self._create_alert(
+            device_id=device_id,
+            alert_type='health_alert',
+            severity=AnomalySeverity.CRITICAL if health.overall_health < 30 else AnomalySeverity.HIGH,
+            message=f'센서 전체 건강도 저하: {health.overall_health:.1f}%',
+            sensor_data=sensor_data
+        )
+    
     def _create_alert(self, device_id: str, alert_type: str, severity: AnomalySeverity, 
                      message: str, sensor_data: Dict):
         """알림 생성"""
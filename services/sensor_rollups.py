@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+센서 데이터 롤업 (1분 / 1시간 / 1일 집계 테이블)
+sensor_readings 원본 행을 디바이스·버킷별 count/sum/min/max/sumsq 로 미리 집계해 두고,
+대시보드와 분석 쿼리는 원본 대신 롤업을 읽습니다 (30일 추세 = 디바이스당 1시간 롤업 720행).
+
+- 갱신: sensor_readings.id 워터마크 이후 행을 GROUP BY 해 UPSERT (새 배치 INSERT 와 같은 트랜잭션)
+- 따라잡기: 서비스 시작 시 워터마크 이후의 기존 행을 max_rows 단위로 나눠 반영
+- id 기준이므로 늦게 도착한 과거 타임스탬프도 해당 버킷에 합산되고,
+  원본 정리(cleanup_old_data) 후에도 롤업은 남음
+- 버킷은 UTC 기준 (1일 버킷 = DATE(timestamp, 'unixepoch'))
+- 평균 = sum / count, 표준편차 = sumsq 에서 계산 (표본 표준편차)
+"""
+
+import math
+import sqlite3
+from typing import Dict, List, Optional
+
+# 롤업 단위 → 버킷 폭(초)
+ROLLUP_LEVELS = {
+    '1m': 60,
+    '1h': 3600,
+    '1d': 86400,
+}
+
+# 롤업 메트릭 → (값 식, 제곱 식), vibration 은 3축 크기
+ROLLUP_METRICS = {
+    'temperature': ('temperature', 'temperature * temperature'),
+    'vibration': (
+        'SQRT(vibration_x * vibration_x + vibration_y * vibration_y + vibration_z * vibration_z)',
+        '(vibration_x * vibration_x + vibration_y * vibration_y + vibration_z * vibration_z)',
+    ),
+    'power_consumption': ('power_consumption', 'power_consumption * power_consumption'),
+    'audio_level': ('audio_level', 'audio_level * audio_level'),
+    'sensor_quality': ('sensor_quality', 'sensor_quality * sensor_quality'),
+}
+
+# 가동 시간 계산에 쓰는 품질 기준 (good_readings = sensor_quality > GOOD_QUALITY 인 측정값 수)
+GOOD_QUALITY = 0.8
+
+# 워터마크 이름 (sensor_rollup_state 행)
+WATERMARK = 'sensor_readings'
+
+# 보관 기간(초), None 이면 삭제하지 않음
+ROLLUP_RETENTION = {
+    '1m': 7 * 86400,
+    '1h': 400 * 86400,
+    '1d': None,
+}
+
+STATS = ('count', 'sum', 'min', 'max', 'sumsq')
+
+
+def rollup_table(level: str) -> str:
+    if level not in ROLLUP_LEVELS:
+        raise ValueError(f"알 수 없는 롤업 단위: {level}")
+    return f'sensor_rollup_{level}'
+
+
+def _metric_columns() -> List[str]:
+    return [f'{metric}_{stat}' for metric in ROLLUP_METRICS for stat in STATS]
+
+
+def _create_table(level: str) -> str:
+    table = rollup_table(level)
+    metric_columns = ',\n'.join(
+        f'        {metric}_count INTEGER NOT NULL DEFAULT 0,\n'
+        f'        {metric}_sum REAL NOT NULL DEFAULT 0,\n'
+        f'        {metric}_min REAL,\n'
+        f'        {metric}_max REAL,\n'
+        f'        {metric}_sumsq REAL NOT NULL DEFAULT 0'
+        for metric in ROLLUP_METRICS
+    )
+    return f'''
+    CREATE TABLE IF NOT EXISTS {table} (
+        device_id TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        readings INTEGER NOT NULL DEFAULT 0,
+        good_readings INTEGER NOT NULL DEFAULT 0,
+{metric_columns},
+        PRIMARY KEY (device_id, bucket)
+    ) WITHOUT ROWID
+    '''
+
+
+ROLLUP_SCHEMA = (
+    *[_create_table(level) for level in ROLLUP_LEVELS],
+    # 전체 디바이스 합산 조회용
+    *[f'CREATE INDEX IF NOT EXISTS idx_{rollup_table(level)}_bucket ON {rollup_table(level)}(bucket)'
+      for level in ROLLUP_LEVELS],
+    '''
+    CREATE TABLE IF NOT EXISTS sensor_rollup_state (
+        name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        updated_at REAL
+    )
+    ''',
+)
+
+
+def _upsert_sql(level: str) -> str:
+    """워터마크 (?, ?] 범위의 원본 행을 버킷별로 집계해 UPSERT"""
+    width = ROLLUP_LEVELS[level]
+    select = ['COUNT(*)', f'COUNT(CASE WHEN sensor_quality > {GOOD_QUALITY} THEN 1 END)']
+    update = ['readings = readings + excluded.readings',
+              'good_readings = good_readings + excluded.good_readings']
+    for metric, (value, square) in ROLLUP_METRICS.items():
+        select += [f'COUNT({value})', f'TOTAL({value})', f'MIN({value})', f'MAX({value})', f'TOTAL({square})']
+        update += [
+            f'{metric}_count = {metric}_count + excluded.{metric}_count',
+            f'{metric}_sum = {metric}_sum + excluded.{metric}_sum',
+            f'{metric}_min = MIN(COALESCE({metric}_min, excluded.{metric}_min), '
+            f'COALESCE(excluded.{metric}_min, {metric}_min))',
+            f'{metric}_max = MAX(COALESCE({metric}_max, excluded.{metric}_max), '
+            f'COALESCE(excluded.{metric}_max, {metric}_max))',
+            f'{metric}_sumsq = {metric}_sumsq + excluded.{metric}_sumsq',
+        ]
+    columns = ['device_id', 'bucket', 'readings', 'good_readings'] + _metric_columns()
+    return f'''
+        INSERT INTO {rollup_table(level)} ({', '.join(columns)})
+        SELECT device_id, CAST(timestamp / {width} AS INTEGER) * {width} AS bucket, {', '.join(select)}
+        FROM sensor_readings
+        WHERE id > ? AND id <= ?
+        GROUP BY device_id, bucket
+        ON CONFLICT (device_id, bucket) DO UPDATE SET {', '.join(update)}
+    '''
+
+
+UPSERT_ROLLUPS = {level: _upsert_sql(level) for level in ROLLUP_LEVELS}
+
+
+def get_watermark(conn: sqlite3.Connection) -> int:
+    """롤업에 반영된 마지막 sensor_readings.id"""
+    row = conn.execute('SELECT last_id FROM sensor_rollup_state WHERE name = ?', (WATERMARK,)).fetchone()
+    return row[0] if row else 0
+
+
+def apply_rollups(conn: sqlite3.Connection, max_rows: Optional[int] = None, now: float = None) -> int:
+    """
+    워터마크 이후 원본 행을 모든 롤업 테이블에 반영하고 워터마크 전진
+    (호출한 쪽의 트랜잭션 안에서 실행해야 원본 INSERT 와 원자적으로 반영됨, SQRT 함수 등록 필요)
+
+    Args:
+        max_rows: 한 번에 반영할 최대 id 범위 (None 이면 전부)
+
+    Returns:
+        반영한 id 범위 크기 (0 이면 이미 최신)
+    """
+    last_id = get_watermark(conn)
+    high = conn.execute('SELECT MAX(id) FROM sensor_readings').fetchone()[0]
+    if high is None or high <= last_id:
+        return 0
+    if max_rows is not None:
+        high = min(high, last_id + max_rows)
+
+    for sql in UPSERT_ROLLUPS.values():
+        conn.execute(sql, (last_id, high))
+    conn.execute(
+        'INSERT INTO sensor_rollup_state (name, last_id, updated_at) VALUES (?, ?, ?) '
+        'ON CONFLICT (name) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at',
+        (WATERMARK, high, now)
+    )
+    return high - last_id
+
+
+def prune_rollups(conn: sqlite3.Connection, now: float) -> Dict[str, int]:
+    """보관 기간이 지난 롤업 버킷 삭제, 단위별 삭제 행 수"""
+    deleted = {}
+    for level, retention in ROLLUP_RETENTION.items():
+        if retention is not None:
+            deleted[level] = conn.execute(
+                f'DELETE FROM {rollup_table(level)} WHERE bucket < ?', (now - retention,)
+            ).rowcount
+    return deleted
+
+
+# ----------------------------------------------------------------------
+# 조회
+# ----------------------------------------------------------------------
+def _combined_columns() -> str:
+    """여러 행(디바이스/버킷)을 합치는 집계식"""
+    columns = ['SUM(readings) AS readings', 'SUM(good_readings) AS good_readings']
+    for metric in ROLLUP_METRICS:
+        columns += [f'SUM({metric}_count) AS {metric}_count', f'SUM({metric}_sum) AS {metric}_sum',
+                    f'MIN({metric}_min) AS {metric}_min', f'MAX({metric}_max) AS {metric}_max',
+                    f'SUM({metric}_sumsq) AS {metric}_sumsq']
+    return ', '.join(columns)
+
+
+def bucket_start(level: str, timestamp: float) -> int:
+    """timestamp 가 속한 버킷의 시작 시각"""
+    width = ROLLUP_LEVELS[level]
+    return int(timestamp // width) * width
+
+
+def _range_filter(level: str, start: float, end: Optional[float], device_id: Optional[str]):
+    """[start, end) 와 겹치는 버킷 (start 가 속한 버킷부터 포함)"""
+    clauses, params = ['bucket >= ?'], [bucket_start(level, start)]
+    if end is not None:
+        clauses.append('bucket < ?')
+        params.append(end)
+    if device_id is not None:
+        clauses.append('device_id = ?')
+        params.append(device_id)
+    return ' AND '.join(clauses), params
+
+
+def _rows(cursor: sqlite3.Cursor) -> List[Dict]:
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def fetch_series(conn: sqlite3.Connection, level: str, start: float, end: Optional[float] = None,
+                 device_id: Optional[str] = None) -> List[Dict]:
+    """
+    버킷별 집계 (device_id 가 없으면 버킷마다 모든 디바이스 합산), 버킷 시간순
+
+    Returns:
+        [{'bucket', 'readings', 'good_readings', '<metric>_count|sum|min|max|sumsq', ...}]
+    """
+    where, params = _range_filter(level, start, end, device_id)
+    cursor = conn.execute(
+        f'SELECT bucket, {_combined_columns()} FROM {rollup_table(level)} '
+        f'WHERE {where} GROUP BY bucket ORDER BY bucket',
+        params
+    )
+    return _rows(cursor)
+
+
+def fetch_summary(conn: sqlite3.Connection, level: str, start: float, end: Optional[float] = None,
+                  device_id: Optional[str] = None) -> Dict:
+    """구간 전체를 합친 집계 한 행 (데이터가 없으면 readings 0)"""
+    where, params = _range_filter(level, start, end, device_id)
+    cursor = conn.execute(f'SELECT {_combined_columns()} FROM {rollup_table(level)} WHERE {where}', params)
+    summary = _rows(cursor)[0]
+    summary['readings'] = summary['readings'] or 0
+    summary['good_readings'] = summary['good_readings'] or 0
+    return summary
+
+
+def metric_mean(row: Dict, metric: str) -> Optional[float]:
+    count = row.get(f'{metric}_count')
+    return row[f'{metric}_sum'] / count if count else None
+
+
+def metric_std(row: Dict, metric: str) -> Optional[float]:
+    """표본 표준편차 (count < 2 이면 None)"""
+    count = row.get(f'{metric}_count')
+    if not count or count < 2:
+        return None
+    mean = row[f'{metric}_sum'] / count
+    variance = (row[f'{metric}_sumsq'] - count * mean * mean) / (count - 1)
+    return math.sqrt(max(variance, 0.0))
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+디바이스별 센서 슬라이딩 윈도우 통계
+SensorReading 객체 deque 대신 float64 열(column) 링 버퍼에 측정값을 보관하고,
+평균/분산(Welford)·EWMA·패턴 윈도우 통계를 측정값마다 O(1) 로 갱신합니다.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+# 링 버퍼 열 순서
+SENSOR_COLUMNS = ('temperature', 'vibration_x', 'vibration_y', 'vibration_z', 'power_consumption', 'audio_level')
+COL_TEMPERATURE = 0
+COL_VIBRATION = slice(1, 4)
+N_COLUMNS = len(SENSOR_COLUMNS)
+
+# 패턴 기반 이상 감지에 사용하는 최근 측정값 수
+PATTERN_WINDOW = 10
+# 누적 부동소수점 오차 제거를 위해 링 버퍼로부터 통계를 다시 계산하는 주기 (측정값 수)
+RESYNC_INTERVAL = 4096
+
+
+def trend_weights(n: int) -> np.ndarray:
+    """x = 0..n-1 에 대한 최소제곱 기울기 가중치 (np.polyfit(x, y, 1)[0] == weights @ y)"""
+    x = np.arange(n, dtype=np.float64)
+    centered = x - x.mean()
+    return centered / np.sum(centered ** 2)
+
+
+class DeviceSensorWindow:
+    """
+    디바이스 하나의 센서 열 링 버퍼
+
+    - 전체 윈도우(capacity) 열별 평균/분산: 슬라이딩 Welford (들어온 값과 밀려난 값으로 갱신)
+    - 열별 EWMA
+    - 최근 PATTERN_WINDOW 개 온도의 선형 추세(누적 합 S, 인덱스 가중 합 T)와 진동 크기 분산
+    """
+
+    def __init__(self, capacity: int = 100, pattern_window: int = PATTERN_WINDOW, ewma_alpha: float = 0.1):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.pattern_window = pattern_window
+        self.ewma_alpha = ewma_alpha
+        self.values = np.zeros((capacity, N_COLUMNS), dtype=np.float64)
+        self.magnitudes = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # 누적 측정값 수 (다음 기록 위치 = count % capacity)
+
+        # 전체 윈도우 Welford 상태
+        self._mean = np.zeros(N_COLUMNS, dtype=np.float64)
+        self._m2 = np.zeros(N_COLUMNS, dtype=np.float64)
+        self.ewma = np.zeros(N_COLUMNS, dtype=np.float64)
+
+        # 패턴 윈도우 상태
+        self._temp_sum = 0.0
+        self._temp_weighted_sum = 0.0
+        self._vib_mean = 0.0
+        self._vib_m2 = 0.0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def pattern_ready(self) -> bool:
+        """패턴 윈도우가 가득 찼는지 (링 용량이 패턴 윈도우보다 작으면 항상 False)"""
+        return self.capacity >= self.pattern_window and self.count >= self.pattern_window
+
+    def _at(self, age: int) -> int:
+        """age 번째 이전 측정값의 링 인덱스 (age=1 이 가장 최근)"""
+        return (self.count - age) % self.capacity
+
+    def append(self, row: np.ndarray):
+        """측정값 한 행 추가 (열 순서는 SENSOR_COLUMNS)"""
+        magnitude = float(np.sqrt(row[1] ** 2 + row[2] ** 2 + row[3] ** 2))
+        temperature = float(row[COL_TEMPERATURE])
+        n_window = len(self)
+        slot = self.count % self.capacity
+
+        # 전체 윈도우 Welford
+        if n_window < self.capacity:
+            n = n_window + 1
+            delta = row - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (row - self._mean)
+        else:
+            outgoing = self.values[slot]
+            delta = row - outgoing
+            new_mean = self._mean + delta / self.capacity
+            self._m2 += delta * (row - new_mean + outgoing - self._mean)
+            self._mean = new_mean
+
+        # EWMA
+        if self.count == 0:
+            self.ewma[:] = row
+        else:
+            self.ewma += self.ewma_alpha * (row - self.ewma)
+
+        # 패턴 윈도우 (최근 pattern_window 개)
+        p = self.pattern_window
+        if self.count < p:
+            self._temp_weighted_sum += self.count * temperature
+            self._temp_sum += temperature
+            n = self.count + 1
+            delta = magnitude - self._vib_mean
+            self._vib_mean += delta / n
+            self._vib_m2 += delta * (magnitude - self._vib_mean)
+        elif self.capacity >= p:
+            old_idx = self._at(p)
+            old_temp = self.values[old_idx, COL_TEMPERATURE]
+            old_mag = self.magnitudes[old_idx]
+            self._temp_weighted_sum += -(self._temp_sum - old_temp) + (p - 1) * temperature
+            self._temp_sum += temperature - old_temp
+            delta = magnitude - old_mag
+            new_mean = self._vib_mean + delta / p
+            self._vib_m2 += delta * (magnitude - new_mean + old_mag - self._vib_mean)
+            self._vib_mean = new_mean
+
+        self.values[slot] = row
+        self.magnitudes[slot] = magnitude
+        self.count += 1
+
+        if self.count % RESYNC_INTERVAL == 0:
+            self._resync()
+
+    def extend(self, rows: np.ndarray):
+        """
+        여러 행을 한 번에 추가 (배치 경로)
+
+        링에 블록 단위로 기록한 뒤 통계를 링 내용으로부터 다시 계산하므로
+        비용은 배치당 O(capacity) 이고 측정값 개수와 무관합니다.
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, N_COLUMNS)
+        if len(rows) == 0:
+            return
+        magnitudes = np.sqrt(np.sum(rows[:, COL_VIBRATION] ** 2, axis=1))
+
+        # EWMA 는 순차 재귀이므로 가중치 합으로 한 번에 계산
+        alpha = self.ewma_alpha
+        if self.count == 0:
+            start_ewma, rows_for_ewma = rows[0], rows[1:]
+        else:
+            start_ewma, rows_for_ewma = self.ewma, rows
+        k = len(rows_for_ewma)
+        if k:
+            decay = (1 - alpha) ** np.arange(k - 1, -1, -1, dtype=np.float64)
+            self.ewma = (1 - alpha) ** k * start_ewma + alpha * (decay @ rows_for_ewma)
+        else:
+            self.ewma = np.array(start_ewma, dtype=np.float64)
+
+        # 용량보다 많으면 마지막 capacity 개만 남음
+        tail = rows[-self.capacity:]
+        tail_mag = magnitudes[-self.capacity:]
+        start = (self.count + len(rows) - len(tail)) % self.capacity
+        first = min(len(tail), self.capacity - start)
+        self.values[start:start + first] = tail[:first]
+        self.magnitudes[start:start + first] = tail_mag[:first]
+        if first < len(tail):
+            self.values[:len(tail) - first] = tail[first:]
+            self.magnitudes[:len(tail) - first] = tail_mag[first:]
+        self.count += len(rows)
+        self._resync()
+
+    def recent(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """최근 n 개 (오래된 순) 측정값 행과 진동 크기"""
+        n = min(n, len(self))
+        if n == 0:
+            return np.empty((0, N_COLUMNS)), np.empty(0)
+        idx = (np.arange(self.count - n, self.count)) % self.capacity
+        return self.values[idx], self.magnitudes[idx]
+
+    def _resync(self):
+        """링 내용으로부터 Welford/패턴 상태를 정확히 다시 계산 (EWMA 는 유지)"""
+        rows, mags = self.recent(self.capacity)
+        if len(rows):
+            self._mean = rows.mean(axis=0)
+            self._m2 = np.sum((rows - self._mean) ** 2, axis=0)
+        p = min(self.pattern_window, len(rows))
+        temps = rows[len(rows) - p:, COL_TEMPERATURE]
+        recent_mags = mags[len(mags) - p:]
+        self._temp_sum = float(np.sum(temps))
+        self._temp_weighted_sum = float(np.arange(p) @ temps) if p else 0.0
+        self._vib_mean = float(np.mean(recent_mags)) if p else 0.0
+        self._vib_m2 = float(np.sum((recent_mags - self._vib_mean) ** 2)) if p else 0.0
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def temperature_trend(self) -> Optional[float]:
+        """최근 pattern_window 개 온도의 선형 추세 (측정값당 °C), 데이터 부족 시 None"""
+        if not self.pattern_ready:
+            return None
+        p = self.pattern_window
+        centered_x = (p - 1) / 2.0
+        sxx = p * (p * p - 1) / 12.0
+        return (self._temp_weighted_sum - centered_x * self._temp_sum) / sxx
+
+    def vibration_variance(self) -> Optional[float]:
+        """최근 pattern_window 개 진동 크기의 모분산, 데이터 부족 시 None"""
+        if not self.pattern_ready:
+            return None
+        return max(self._vib_m2 / self.pattern_window, 0.0)
+
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        """열별 윈도우 평균/표준편차/EWMA"""
+        n = len(self)
+        variance = self._m2 / n if n else np.zeros(N_COLUMNS)
+        return {
+            column: {
+                'mean': float(self._mean[i]),
+                'std': float(np.sqrt(max(variance[i], 0.0))),
+                'ewma': float(self.ewma[i])
+            }
+            for i, column in enumerate(SENSOR_COLUMNS)
+        }
+
+
+def batch_pattern_stats(segments: Sequence[np.ndarray], magnitude_segments: Sequence[np.ndarray],
+                        pattern_window: int = PATTERN_WINDOW) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    여러 디바이스 구간의 패턴 통계를 한 번의 NumPy 연산으로 계산
+
+    Args:
+        segments: 디바이스별 온도 배열 (이전 윈도우 꼬리 + 새 측정값, 오래된 순)
+        magnitude_segments: 같은 구조의 진동 크기 배열
+        pattern_window: 패턴 윈도우 길이
+
+    Returns:
+        (끝 위치, 온도 추세, 진동 분산): 연결 배열에서 윈도우가 끝나는 위치와 그 윈도우의 통계.
+        디바이스 경계를 넘는 윈도우는 제외됩니다.
+    """
+    p = pattern_window
+    temps = np.concatenate(segments) if segments else np.empty(0)
+    mags = np.concatenate(magnitude_segments) if magnitude_segments else np.empty(0)
+    if len(temps) < p:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+
+    lengths = np.array([len(s) for s in segments], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    # 각 위치가 속한 구간의 시작 → 구간 안에서 p 개가 모인 위치만 유효
+    segment_start = np.repeat(starts, lengths)
+    ends = np.arange(p - 1, len(temps))
+    ends = ends[ends - segment_start[ends] >= p - 1]
+
+    temp_windows = np.lib.stride_tricks.sliding_window_view(temps, p)[ends - (p - 1)]
+    mag_windows = np.lib.stride_tricks.sliding_window_view(mags, p)[ends - (p - 1)]
+    trends = temp_windows @ trend_weights(p)
+    variances = mag_windows.var(axis=1)
+    return ends, trends, variances
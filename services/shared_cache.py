@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+공유 캐시 서비스
+gunicorn 워커마다 따로 계산하던 대시보드 집계를 워커 간에 공유하고, 만료된 키는 한 워커만 다시 계산합니다.
+
+- 요청 범위: request_scope() 안에서는 같은 키를 저장소에서 한 번만 읽음
+- 저장소
+    SQLiteCacheStore  워커 간 공유 (기본, data/shared_cache.db WAL) - SET NX 와 같은 방식의 계산 잠금
+    LocalCacheStore   프로세스 로컬 메모리 (단일 프로세스, 테스트)
+  기본 저장소는 처음 조회할 때 생성 (import 만으로는 data/shared_cache.db 를 만들지 않음)
+  TTL 이 지나도 stale_ttl 동안은 이전 값을 보관하고, max_entries 를 넘으면 마지막 접근이 오래된 키부터 제거 (LRU)
+- 단일 계산(single-flight): 만료된 키는 계산 잠금을 잡은 워커의 한 스레드만 계산하고,
+  나머지는 이전 값이 있으면 그것을, 없으면 계산이 끝날 때까지 기다렸다가 결과를 사용
+- 값은 JSON 으로 저장 (dataclass 등은 encode/decode 로 변환)
+- 적중/실패/제거/계산/대기 메트릭
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'data/shared_cache.db'
+# 저장소 최대 키 수, 만료 후 이전 값 보관 시간(초)
+MAX_ENTRIES = 1024
+STALE_TTL = 300.0
+# 계산 잠금 만료(초, 계산 중 워커가 죽어도 풀림), 다른 워커의 계산 결과를 기다리는 시간/간격(초)
+LOCK_TTL = 30.0
+WAIT_TIMEOUT = 10.0
+POLL_INTERVAL = 0.05
+# 프로세스 안 키별 계산 잠금 수 (키 해시로 나눠 씀)
+LOCK_STRIPES = 64
+
+# 저장소 항목: (JSON 값, 만료 시각)
+Entry = Tuple[str, float]
+
+_request_values: contextvars.ContextVar = contextvars.ContextVar('shared_cache_request_values', default=None)
+
+
+class LocalCacheStore:
+    """프로세스 로컬 메모리 저장소 (OrderedDict LRU)"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key: str, value: str, expires_at: float, keep_until: float):
+        with self._lock:
+            self._entries[key] = (value, expires_at, keep_until)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def try_lock(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            holder = self._locks.get(key)
+            if holder is not None and holder[1] > now:
+                return False
+            self._locks[key] = (owner, now + ttl)
+            return True
+
+    def unlock(self, key: str, owner: str):
+        with self._lock:
+            if self._locks.get(key, (None,))[0] == owner:
+                del self._locks[key]
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheStore:
+    """
+    워커 간 공유 저장소 (SQLite WAL)
+
+    연결은 작업마다 열어 fork 된 워커끼리 공유하지 않음.
+    접근 시각 갱신은 touch_interval 초에 한 번만 기록해 읽기마다 쓰기 잠금을 잡지 않음.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_entries: int = MAX_ENTRIES,
+                 touch_interval: float = 1.0):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    keep_until REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(accessed_at)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_locks (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        return conn
+
+    def get(self, key: str) -> Optional[Entry]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT value, expires_at, accessed_at FROM cache_entries WHERE key = ? AND keep_until > ?',
+                (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] >= self.touch_interval:
+                conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+            return row[0], row[1]
+        finally:
+            conn.close()
+
+    def set(self, key: str, value: str, expires_at: float, keep_until: float):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, keep_until, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, value, expires_at, keep_until, now)
+            )
+            conn.execute('DELETE FROM cache_entries WHERE keep_until <= ?', (now,))
+            evicted = conn.execute(
+                'DELETE FROM cache_entries WHERE key IN ('
+                '  SELECT key FROM cache_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            ).rowcount
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        self.evictions += evicted
+
+    def try_lock(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM cache_locks WHERE key = ? AND expires_at <= ?', (key, now))
+            acquired = conn.execute(
+                'INSERT OR IGNORE INTO cache_locks (key, owner, expires_at) VALUES (?, ?, ?)',
+                (key, owner, now + ttl)
+            ).rowcount == 1
+            conn.execute('COMMIT')
+            return acquired
+        finally:
+            conn.close()
+
+    def unlock(self, key: str, owner: str):
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM cache_locks WHERE key = ? AND owner = ?', (key, owner))
+        finally:
+            conn.close()
+
+    def size(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM cache_entries WHERE keep_until > ?',
+                                (time.time(),)).fetchone()[0]
+        finally:
+            conn.close()
+
+
+def create_cache_store():
+    """환경 변수 SHARED_CACHE_BACKEND (sqlite | memory), SHARED_CACHE_PATH 로 저장소 선택"""
+    backend = os.getenv('SHARED_CACHE_BACKEND', 'sqlite').lower()
+    if backend == 'memory':
+        return LocalCacheStore()
+    try:
+        return SQLiteCacheStore(os.getenv('SHARED_CACHE_PATH', DEFAULT_DB_PATH))
+    except Exception as e:
+        logger.error(f"공유 캐시 저장소 초기화 실패, 프로세스 로컬 캐시 사용: {e}")
+        return LocalCacheStore()
+
+
+def _identity(value):
+    return value
+
+
+class SharedCache:
+    """TTL + LRU + 단일 계산 캐시"""
+
+    def __init__(self, store=None, stale_ttl: float = STALE_TTL, lock_ttl: float = LOCK_TTL,
+                 wait_timeout: float = WAIT_TIMEOUT, poll_interval: float = POLL_INTERVAL):
+        self._store = store
+        self._store_lock = threading.Lock()
+        self.stale_ttl = stale_ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._instance_id = uuid.uuid4().hex
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            'hits': 0,              # 저장소 적중 (만료 전)
+            'request_hits': 0,      # 요청 범위 적중
+            'misses': 0,            # 없음 또는 만료
+            'stale_hits': 0,        # 다른 워커가 계산 중이라 이전 값 사용
+            'computes': 0,          # 이 프로세스에서 계산
+            'waits': 0,             # 다른 워커의 계산 결과를 기다려 사용
+            'wait_timeouts': 0,     # 기다리다 시간 초과해 직접 계산
+            'errors': 0,            # 저장소 오류 (계산 결과를 그대로 반환)
+        }
+
+    @property
+    def store(self):
+        """저장소 (지정하지 않았으면 처음 사용할 때 create_cache_store 로 생성, import 시 디스크에 쓰지 않음)"""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = create_cache_store()
+        return self._store
+
+    def _owner(self) -> str:
+        """계산 잠금 소유자 (preload 후 fork 된 워커끼리 구분되도록 pid 포함)"""
+        return f'{self._instance_id}:{os.getpid()}'
+
+    def _count(self, name: str):
+        with self._metrics_lock:
+            self.metrics[name] += 1
+
+    @contextmanager
+    def request_scope(self):
+        """한 요청 동안 같은 키를 한 번만 조회 (중첩 시 바깥 범위 사용)"""
+        if _request_values.get() is not None:
+            yield
+            return
+        token = _request_values.set({})
+        try:
+            yield
+        finally:
+            _request_values.reset(token)
+
+    def begin_request(self):
+        """request_scope 를 before_request/teardown_request 훅으로 쓸 때 (end_request 에 토큰 전달)"""
+        return _request_values.set({})
+
+    def end_request(self, token):
+        _request_values.reset(token)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: float,
+                       encode: Callable[[Any], Any] = _identity,
+                       decode: Callable[[Any], Any] = _identity) -> Any:
+        """
+        캐시 값 조회, 없거나 만료되면 한 곳에서만 compute() 실행
+
+        Args:
+            ttl: 값 유효 시간(초)
+            encode/decode: 값 ↔ JSON 직렬화 가능한 객체 변환
+        """
+        scope = _request_values.get()
+        if scope is not None and key in scope:
+            self._count('request_hits')
+            return scope[key]
+
+        try:
+            value = self._get_or_compute(key, compute, ttl, encode, decode)
+        except _StoreError as e:
+            logger.error(f"공유 캐시 저장소 오류 ({key}): {e.__cause__}")
+            self._count('errors')
+            value = e.value if e.has_value else compute()
+
+        if scope is not None:
+            scope[key] = value
+        return value
+
+    def _get_or_compute(self, key, compute, ttl, encode, decode):
+        entry = self._store_call(self.store.get, key)
+        if entry is not None and entry[1] > time.time():
+            self._count('hits')
+            return decode(json.loads(entry[0]))
+        self._count('misses')
+
+        # 같은 프로세스의 다른 스레드는 여기서 기다렸다가 그 결과를 읽음
+        with self._stripes[hash(key) % LOCK_STRIPES]:
+            entry = self._store_call(self.store.get, key)
+            if entry is not None and entry[1] > time.time():
+                return decode(json.loads(entry[0]))
+
+            if self._store_call(self.store.try_lock, key, self._owner(), self.lock_ttl):
+                try:
+                    return self._compute_and_store(key, compute, ttl, encode)
+                finally:
+                    self._unlock(key)
+
+            # 다른 워커가 계산 중
+            if entry is not None:
+                self._count('stale_hits')
+                return decode(json.loads(entry[0]))
+
+            deadline = time.time() + self.wait_timeout
+            while time.time() < deadline:
+                time.sleep(self.poll_interval)
+                entry = self._store_call(self.store.get, key)
+                if entry is not None and entry[1] > time.time():
+                    self._count('waits')
+                    return decode(json.loads(entry[0]))
+
+            self._count('wait_timeouts')
+            return self._compute_and_store(key, compute, ttl, encode)
+
+    def _compute_and_store(self, key, compute, ttl, encode):
+        value = compute()
+        self._count('computes')
+        now = time.time()
+        payload = json.dumps(encode(value), ensure_ascii=False, default=float)
+        try:
+            self.store.set(key, payload, now + ttl, now + ttl + self.stale_ttl)
+        except Exception as e:
+            raise _StoreError(value) from e
+        return value
+
+    def refresh(self, key: str, compute: Callable[[], Any], ttl: float, ahead: float = 0.0,
+                encode: Callable[[Any], Any] = _identity) -> bool:
+        """
+        ahead 초 안에 만료될 키를 미리 다시 계산 (계산 잠금을 잡은 경우만)
+
+        Returns:
+            이 호출에서 계산했는지 여부
+        """
+        try:
+            entry = self._store_call(self.store.get, key)
+            if entry is not None and entry[1] - ahead > time.time():
+                return False
+            if not self._store_call(self.store.try_lock, key, self._owner(), self.lock_ttl):
+                return False
+        except _StoreError as e:
+            logger.error(f"공유 캐시 갱신 확인 실패 ({key}): {e.__cause__}")
+            self._count('errors')
+            return False
+
+        try:
+            self._compute_and_store(key, compute, ttl, encode)
+        except _StoreError as e:
+            logger.error(f"공유 캐시 갱신 저장 실패 ({key}): {e.__cause__}")
+            self._count('errors')
+        finally:
+            self._unlock(key)
+        return True
+
+    def _unlock(self, key: str):
+        """계산 잠금 해제 (실패해도 lock_ttl 후 만료되므로 기록만)"""
+        try:
+            self.store.unlock(key, self._owner())
+        except Exception as e:
+            logger.error(f"공유 캐시 잠금 해제 실패 ({key}): {e}")
+
+    def _store_call(self, method, *args):
+        try:
+            return method(*args)
+        except Exception as e:
+            raise _StoreError() from e
+
+    def get_metrics(self) -> Dict:
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_ratio'] = metrics['hits'] / lookups if lookups else 0.0
+        metrics['evictions'] = self.store.evictions
+        metrics['backend'] = type(self.store).__name__
+        try:
+            metrics['entries'] = self.store.size()
+        except Exception as e:
+            logger.error(f"공유 캐시 크기 조회 실패: {e}")
+            metrics['entries'] = None
+        return metrics
+
+
+class _StoreError(Exception):
+    """저장소 오류 (계산을 마친 경우 그 값을 함께 전달)"""
+
+    def __init__(self, *value):
+        super().__init__()
+        self.has_value = bool(value)
+        self.value = value[0] if value else None
+
+
+# 전역 인스턴스
+shared_cache = SharedCache()
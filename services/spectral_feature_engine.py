@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+스펙트럼 특징 엔진
+클립당 STFT/파워 스펙트로그램을 한 번만 계산하고 모든 스펙트럼 특징을 그로부터 유도
+(UnifiedAIService._extract_comprehensive_features 와 동일한 벡터 레이아웃)
+"""
+
+import threading
+import numpy as np
+import librosa
+from typing import Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# librosa 기본값과 동일하게 유지해야 기존 특징과 값이 일치함
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+N_MFCC = 13
+N_CHROMA = 12
+N_TONNETZ = 6
+N_CONTRAST_BANDS = 7
+
+LEAK_FREQ_RANGE = (2000, 8000)
+OVERLOAD_FREQ_RANGE = (50, 500)
+
+_STATS4 = ('mean', 'std', 'max', 'min')
+_STATS2 = ('mean', 'std')
+
+
+def _build_feature_names() -> List[str]:
+    """고정 순서 특징 이름 목록 생성"""
+    names = []
+    for base in ('rms', 'zcr', 'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth'):
+        names.extend(f'{base}_{stat}' for stat in _STATS4)
+    names.append('tempo')
+    for i in range(N_MFCC):
+        names.extend(f'mfcc{i}_{stat}' for stat in _STATS4)
+    names.extend(f'fft_magnitude_{stat}' for stat in _STATS4)
+    for i in range(N_CHROMA):
+        names.extend(f'chroma{i}_{stat}' for stat in _STATS2)
+    for i in range(N_TONNETZ):
+        names.extend(f'tonnetz{i}_{stat}' for stat in _STATS2)
+    for i in range(N_CONTRAST_BANDS):
+        names.extend(f'spectral_contrast{i}_{stat}' for stat in _STATS2)
+    names.extend(f'leak_energy_{stat}' for stat in _STATS4)
+    names.extend(f'overload_energy_{stat}' for stat in _STATS4)
+    return names
+
+
+FEATURE_NAMES = _build_feature_names()
+FEATURE_DIM = len(FEATURE_NAMES)
+
+
+class SpectralFeatureEngine:
+    """
+    공유 스펙트로그램 기반 특징 추출기
+
+    - STFT 1회 → 크기/파워 스펙트로그램 → 멜 → (MFCC, onset/tempo)
+    - centroid/rolloff/bandwidth/contrast 는 크기 스펙트로그램, chroma 는 파워 스펙트로그램 재사용
+    - 멜 필터뱅크와 주파수 축은 샘플링 레이트별로 캐시
+    - tonnetz 는 기존 레이아웃과 값 일치를 위해 기본적으로 CQT 크로마를 사용
+      (tonnetz_from_stft=True 이면 STFT 크로마를 재사용하여 CQT 비용 제거)
+    """
+
+    def __init__(self, tonnetz_from_stft: bool = False):
+        self.tonnetz_from_stft = tonnetz_from_stft
+        self._cache_lock = threading.Lock()
+        self._mel_basis: Dict[int, np.ndarray] = {}
+        self._freqs: Dict[int, np.ndarray] = {}
+        self._band_slices: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def feature_names(self) -> List[str]:
+        return list(FEATURE_NAMES)
+
+    def _get_mel_basis(self, sr: int) -> np.ndarray:
+        """샘플링 레이트별 멜 필터뱅크 (캐시)"""
+        basis = self._mel_basis.get(sr)
+        if basis is None:
+            with self._cache_lock:
+                basis = self._mel_basis.get(sr)
+                if basis is None:
+                    basis = librosa.filters.mel(sr=sr, n_fft=N_FFT, n_mels=N_MELS)
+                    self._mel_basis[sr] = basis
+        return basis
+
+    def _get_freqs(self, sr: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """샘플링 레이트별 주파수 축과 누수/과부하 대역 인덱스 (캐시)"""
+        freqs = self._freqs.get(sr)
+        if freqs is None:
+            with self._cache_lock:
+                freqs = librosa.fft_frequencies(sr=sr, n_fft=N_FFT)
+                leak = np.where((freqs >= LEAK_FREQ_RANGE[0]) & (freqs <= LEAK_FREQ_RANGE[1]))[0]
+                overload = np.where((freqs >= OVERLOAD_FREQ_RANGE[0]) & (freqs <= OVERLOAD_FREQ_RANGE[1]))[0]
+                self._band_slices[sr] = (leak, overload)
+                self._freqs[sr] = freqs
+        leak, overload = self._band_slices[sr]
+        return freqs, leak, overload
+
+    @staticmethod
+    def _frame_rms(y: np.ndarray) -> np.ndarray:
+        """librosa.feature.rms(y=y) 와 동일한 프레임 RMS (FFT 불필요)"""
+        padded = np.pad(y, N_FFT // 2, mode='constant')
+        frames = librosa.util.frame(padded, frame_length=N_FFT, hop_length=HOP_LENGTH)
+        return np.sqrt(np.mean(np.abs(frames) ** 2, axis=0))
+
+    @staticmethod
+    def _full_fft_stats(y: np.ndarray) -> List[float]:
+        """np.abs(np.fft.fft(y)) 통계를 rfft 로 계산 (켤레 대칭 이용, 연산량 절반)"""
+        n = len(y)
+        half = np.abs(np.fft.rfft(y))
+        # 전체 스펙트럼에서 한 번 더 나타나는 켤레 대칭 구간
+        mirrored = half[1:(n + 1) // 2]
+        total = half.sum() + mirrored.sum()
+        total_sq = np.sum(half ** 2) + np.sum(mirrored ** 2)
+        mean = total / n
+        std = np.sqrt(max(total_sq / n - mean ** 2, 0.0))
+        return [mean, std, half.max(), half.min()]
+
+    @staticmethod
+    def _stats4(values: np.ndarray) -> List[float]:
+        return [np.mean(values), np.std(values), np.max(values), np.min(values)]
+
+    def compute_spectrogram(self, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """STFT 1회 계산 후 (크기, 파워) 스펙트로그램 반환"""
+        magnitude = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+        return magnitude, magnitude ** 2
+
+    def extract(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """
+        클립 하나에서 고정 순서 float32 특징 벡터 추출
+
+        Args:
+            y: 모노 오디오 신호
+            sr: 샘플링 레이트
+
+        Returns:
+            FEATURE_NAMES 순서의 float32 벡터 (길이 FEATURE_DIM)
+        """
+        y = np.asarray(y)
+        if y.dtype != np.float32 and y.dtype != np.float64:
+            y = y.astype(np.float32)
+
+        freqs, leak_idx, overload_idx = self._get_freqs(sr)
+        magnitude, power = self.compute_spectrogram(y)
+
+        # 멜 스펙트로그램 1회 → MFCC 와 onset 강도가 공유
+        log_mel = librosa.power_to_db(self._get_mel_basis(sr).astype(power.dtype, copy=False) @ power)
+
+        rms = self._frame_rms(y)
+        zcr = librosa.feature.zero_crossing_rate(y, frame_length=N_FFT, hop_length=HOP_LENGTH)[0]
+        centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sr, freq=freqs)[0]
+        rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sr, freq=freqs)[0]
+        bandwidth = librosa.feature.spectral_bandwidth(S=magnitude, sr=sr, freq=freqs)[0]
+        contrast = librosa.feature.spectral_contrast(S=magnitude, sr=sr, freq=freqs)
+        chroma = librosa.feature.chroma_stft(S=power, sr=sr, n_fft=N_FFT, hop_length=HOP_LENGTH)
+        mfccs = librosa.feature.mfcc(S=log_mel, sr=sr, n_mfcc=N_MFCC)
+
+        onset_env = librosa.onset.onset_strength(S=log_mel, sr=sr, hop_length=HOP_LENGTH, aggregate=np.median)
+        tempo, _ = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH)
+        tempo = float(np.atleast_1d(tempo)[0])
+
+        if self.tonnetz_from_stft:
+            tonnetz = librosa.feature.tonnetz(sr=sr, chroma=chroma)
+        else:
+            tonnetz = librosa.feature.tonnetz(y=y, sr=sr)
+
+        features = np.empty(FEATURE_DIM, dtype=np.float32)
+        values: List[float] = []
+        for series in (rms, zcr, centroid, rolloff, bandwidth):
+            values.extend(self._stats4(series))
+        values.append(tempo)
+        for i in range(N_MFCC):
+            values.extend(self._stats4(mfccs[i]))
+        values.extend(self._full_fft_stats(y))
+        for block in (chroma, tonnetz, contrast):
+            values.extend(np.column_stack([block.mean(axis=1), block.std(axis=1)]).ravel())
+
+        # 대역 에너지는 스칼라이므로 (값, 0, 값, 값) 형태 유지
+        for indices in (leak_idx, overload_idx):
+            if len(indices) > 0:
+                energy = float(np.sum(magnitude[indices, :]))
+                values.extend([energy, 0.0, energy, energy])
+            else:
+                values.extend([0.0, 0.0, 0.0, 0.0])
+
+        features[:] = values
+        return features
+
+    def extract_named(self, y: np.ndarray, sr: int) -> Dict[str, float]:
+        """특징 이름 → 값 딕셔너리 (디버깅/리포트용)"""
+        return dict(zip(FEATURE_NAMES, self.extract(y, sr).tolist()))
+
+
+# 전역 엔진 인스턴스
+spectral_feature_engine = SpectralFeatureEngine()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+스트리밍 DSP 단계
+샘플링 레이트별로 캐시된 SOS 고역 통과 필터와 폴리페이즈 리샘플러를 사용하고,
+디바이스별 필터 상태를 청크 사이에 유지하여 연속 업로드를 끊김 없이 필터링합니다.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from math import gcd
+from typing import Dict, Optional, Tuple
+import numpy as np
+from scipy import signal
+import logging
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+# 기존 전처리와 동일: 4차 Butterworth 고역 통과, 정규화 차단 주파수 0.01 (16kHz 기준 80Hz)
+HIGHPASS_ORDER = 4
+HIGHPASS_CUTOFF = 0.01
+# scipy.signal.resample_poly 기본값과 동일한 안티앨리어싱 FIR 설계
+RESAMPLE_HALF_LEN = 10
+RESAMPLE_KAISER_BETA = 5.0
+
+
+@dataclass
+class PolyphaseFilter:
+    """폴리페이즈 분해된 리샘플링 FIR (up/down 비율별 캐시)"""
+    up: int
+    down: int
+    taps: np.ndarray  # 길이가 up 의 배수인 FIR 계수
+
+    @property
+    def taps_per_phase(self) -> int:
+        return len(self.taps) // self.up
+
+
+@dataclass
+class DeviceDSPState:
+    """디바이스별 스트리밍 상태"""
+    sample_rate: int
+    zi: Optional[np.ndarray] = None
+    history: Optional[np.ndarray] = None  # 리샘플러 입력 이력 (최소 taps_per_phase - 1 샘플)
+    history_start: int = 0                # history[0] 의 절대 입력 인덱스 (down 의 배수)
+    input_count: int = 0                  # 누적 입력 샘플 수
+    output_count: int = 0                 # 누적 출력 샘플 수
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class StreamingDSP:
+    """디바이스별 상태를 유지하는 스트리밍 전처리기 (정규화 → 리샘플링 → 고역 통과)"""
+
+    def __init__(self, target_rate: int = TARGET_SAMPLE_RATE):
+        self.target_rate = target_rate
+        self._cache_lock = threading.Lock()
+        self._sos_cache: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._poly_cache: Dict[int, Optional[PolyphaseFilter]] = {}
+        self._states: Dict[str, DeviceDSPState] = {}
+
+    # ------------------------------------------------------------------
+    # 계수 캐시
+    # ------------------------------------------------------------------
+    def get_sos(self, sample_rate: int) -> Tuple[np.ndarray, np.ndarray]:
+        """샘플링 레이트별 (SOS 계수, 단위 스텝 초기 상태)"""
+        cached = self._sos_cache.get(sample_rate)
+        if cached is None:
+            with self._cache_lock:
+                sos = signal.butter(HIGHPASS_ORDER, HIGHPASS_CUTOFF, 'high', output='sos')
+                cached = (sos, signal.sosfilt_zi(sos))
+                self._sos_cache[sample_rate] = cached
+        return cached
+
+    def get_polyphase(self, source_rate: int) -> Optional[PolyphaseFilter]:
+        """원본 샘플링 레이트 → 목표 레이트 폴리페이즈 필터 (같은 레이트면 None)"""
+        if source_rate in self._poly_cache:
+            return self._poly_cache[source_rate]
+
+        with self._cache_lock:
+            if source_rate == self.target_rate:
+                poly = None
+            else:
+                divisor = gcd(self.target_rate, source_rate)
+                up, down = self.target_rate // divisor, source_rate // divisor
+                max_rate = max(up, down)
+                taps = signal.firwin(2 * RESAMPLE_HALF_LEN * max_rate + 1, 1.0 / max_rate,
+                                     window=('kaiser', RESAMPLE_KAISER_BETA)) * up
+                # 위상당 탭 수가 정수가 되도록 길이를 up 의 배수로 맞춤
+                taps = np.concatenate((taps, np.zeros(-len(taps) % up)))
+                poly = PolyphaseFilter(up=up, down=down, taps=taps)
+            self._poly_cache[source_rate] = poly
+        return poly
+
+    # ------------------------------------------------------------------
+    # 디바이스 상태
+    # ------------------------------------------------------------------
+    def device_lock(self, device_id: str, sample_rate: int) -> threading.Lock:
+        """디바이스 상태 잠금 (윈도우 소비와 필터링 순서를 맞출 때 사용)"""
+        return self._get_state(device_id, sample_rate).lock
+
+    def _get_state(self, device_id: str, sample_rate: int) -> DeviceDSPState:
+        state = self._states.get(device_id)
+        if state is None or state.sample_rate != sample_rate:
+            with self._cache_lock:
+                state = self._states.get(device_id)
+                if state is None or state.sample_rate != sample_rate:
+                    state = DeviceDSPState(sample_rate=sample_rate)
+                    self._states[device_id] = state
+        return state
+
+    def release(self, device_id: str):
+        """디바이스 상태 해제"""
+        with self._cache_lock:
+            self._states.pop(device_id, None)
+
+    # ------------------------------------------------------------------
+    # 처리
+    # ------------------------------------------------------------------
+    def _resample(self, state: DeviceDSPState, audio: np.ndarray, poly: PolyphaseFilter) -> np.ndarray:
+        """
+        상태 유지 폴리페이즈 리샘플링 (청크 경계에서도 연속)
+
+        이력의 시작 인덱스를 down 의 배수로 유지하면 upfirdn 출력 격자가
+        절대 출력 인덱스와 정확히 맞으므로, 이전 청크에서 이미 내보낸 출력만 잘라내면 됩니다.
+        """
+        taps = poly.taps_per_phase
+        if state.history is None:
+            lead = -(-(taps - 1) // poly.down) * poly.down
+            state.history = np.zeros(lead, dtype=np.float64)
+            state.history_start = -lead
+
+        buffered = np.concatenate((state.history, audio))
+        total_in = state.input_count + len(audio)
+
+        # 출력 K 는 입력 인덱스 floor(K * down / up) 까지 필요 → 입력이 모두 도착한 마지막 출력
+        last_output = (total_in * poly.up - 1) // poly.down
+        first_relative = state.output_count - state.history_start * poly.up // poly.down
+        last_relative = last_output - state.history_start * poly.up // poly.down
+
+        resampled = signal.upfirdn(poly.taps, buffered, poly.up, poly.down)
+        output = resampled[first_relative:last_relative + 1]
+
+        # 다음 청크의 첫 출력에 필요한 taps - 1 개 이력을 down 배수 경계부터 보관
+        next_start = (total_in - (taps - 1)) // poly.down * poly.down
+        state.history = buffered[next_start - state.history_start:].copy()
+        state.history_start = next_start
+        state.input_count = total_in
+        state.output_count = last_output + 1
+        return output
+
+    def process(self, device_id: Optional[str], audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        int16 PCM 청크 전처리
+
+        Args:
+            device_id: 상태를 유지할 디바이스 ID (None 이면 일회성 처리)
+            audio_data: int16 오디오 샘플
+            sample_rate: 원본 샘플링 레이트
+
+        Returns:
+            목표 샘플링 레이트의 float64 필터링 신호
+        """
+        if device_id is None:
+            state = DeviceDSPState(sample_rate=sample_rate)
+        else:
+            state = self._get_state(device_id, sample_rate)
+
+        # 정규화
+        audio = audio_data.astype(np.float64) / 32768.0
+
+        # 리샘플링 (목표 레이트로 통일)
+        poly = self.get_polyphase(sample_rate)
+        if poly is not None:
+            audio = self._resample(state, audio, poly)
+        if len(audio) == 0:
+            return audio
+
+        # 고역 통과 필터 (이전 청크의 필터 상태에서 이어서)
+        sos, zi_unit = self.get_sos(self.target_rate)
+        if state.zi is None:
+            state.zi = zi_unit * audio[0]
+        filtered, state.zi = signal.sosfilt(sos, audio, zi=state.zi)
+        return filtered
+
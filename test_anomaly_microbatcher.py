@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+AnomalyMicroBatcher 테스트
+요청 묶기, 결과 순서, 취소/시간 초과 후에도 작업 스레드가 계속 동작하는지 확인
+"""
+
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from services.anomaly_detector import AnomalyMicroBatcher
+
+
+class RecordingDetector:
+    """predict_batch 호출을 기록하는 검출기 (gate 가 열릴 때까지 채점을 멈출 수 있음)"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = fail
+
+    def predict_batch(self, sensor_data_list):
+        self.gate.wait()
+        self.batches.append([data['value'] for data in sensor_data_list])
+        if self.fail:
+            raise RuntimeError('model not loaded')
+        return [{'success': True, 'value': data['value']} for data in sensor_data_list]
+
+
+@pytest.fixture
+def detector():
+    return RecordingDetector()
+
+
+def test_results_follow_submit_order(detector):
+    """한 배치로 묶여도 각 Future 는 자기 측정값의 결과를 받음"""
+    detector.gate.clear()
+    batcher = AnomalyMicroBatcher(detector, max_batch=8, max_wait_ms=50)
+    futures = [batcher.submit({'value': i}) for i in range(8)]
+    detector.gate.set()
+
+    assert [future.result(5)['value'] for future in futures] == list(range(8))
+    assert batcher.stats['readings'] == 8
+    batcher.stop()
+
+
+def test_cancelled_request_is_skipped(detector):
+    """취소된 요청은 채점하지 않고 작업 스레드도 계속 동작"""
+    detector.gate.clear()
+    batcher = AnomalyMicroBatcher(detector, max_batch=1, max_wait_ms=1)
+    blocking = batcher.submit({'value': 0})   # 작업 스레드가 이 요청에서 대기
+    cancelled = batcher.submit({'value': 1})
+    assert cancelled.cancel()
+    detector.gate.set()
+
+    assert blocking.result(5)['value'] == 0
+    assert batcher.predict({'value': 2}, timeout=5)['value'] == 2
+    assert [1] not in detector.batches
+    assert batcher.stats['cancelled'] == 1
+    batcher.stop()
+
+
+def test_predict_timeout_cancels_request(detector):
+    """predict 시간 초과 후 늦게 채점되어도 이후 요청이 정상 처리됨"""
+    detector.gate.clear()
+    batcher = AnomalyMicroBatcher(detector, max_batch=4, max_wait_ms=1)
+    with pytest.raises(FutureTimeoutError):
+        batcher.predict({'value': 0}, timeout=0.05)
+    detector.gate.set()
+
+    assert batcher.predict({'value': 1}, timeout=5)['value'] == 1
+    batcher.stop()
+
+
+def test_detector_error_becomes_result():
+    """predict_batch 예외는 요청마다 오류 결과로 전달"""
+    batcher = AnomalyMicroBatcher(RecordingDetector(fail=True), max_batch=4, max_wait_ms=1)
+    result = batcher.predict({'value': 0}, timeout=5)
+
+    assert result['success'] is False
+    assert 'model not loaded' in result['error']
+    assert batcher.worker.is_alive()
+    batcher.stop()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+컴파일 모델 패리티 테스트
+작은 sklearn 모델을 학습해 NumPy 컴파일 모델과 predict / predict_proba / transform 출력이 같은지 확인
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+from services.compiled_models import (
+    PARITY_ATOL, CompiledSVC, check_parity, compile_model, load_compiled
+)
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(300, 8))
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] ** 2 + 0.3 * rng.normal(size=300) > 0).astype(int)
+    X_test = rng.normal(size=(200, 8))
+    return X, y, X_test
+
+
+MODELS = {
+    'random_forest': lambda: RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0),
+    'decision_tree': lambda: DecisionTreeClassifier(max_depth=5, random_state=0),
+    'logistic': lambda: LogisticRegression(max_iter=500),
+    'svc_rbf_proba': lambda: SVC(kernel='rbf', probability=True, random_state=0),
+    'svc_linear': lambda: SVC(kernel='linear'),
+    'svc_poly': lambda: SVC(kernel='poly', degree=3),
+    'mlp': lambda: MLPClassifier(hidden_layer_sizes=(16,), max_iter=1000, random_state=0),
+}
+
+
+@pytest.mark.parametrize('name', MODELS)
+def test_classifier_parity(name, data, tmp_path):
+    """predict 레이블이 모두 같고 predict_proba 차이가 허용 오차 이내 (저장/로드 후에도)"""
+    X, y, X_test = data
+    model = MODELS[name]().fit(X, y)
+    path = str(tmp_path / f'{name}.npz')
+    compile_model(model).save(path)
+    compiled = load_compiled(path)
+
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+    assert hasattr(compiled, 'predict_proba') == hasattr(model, 'predict_proba')
+    if hasattr(model, 'predict_proba'):
+        np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test),
+                                   atol=PARITY_ATOL)
+    if hasattr(model, 'decision_function'):
+        np.testing.assert_allclose(compiled.decision_function(X_test), model.decision_function(X_test),
+                                   atol=PARITY_ATOL)
+    assert check_parity(model, compiled, X_test)['ok']
+
+
+def test_scaler_parity(data):
+    X, _, X_test = data
+    scaler = StandardScaler().fit(X)
+    np.testing.assert_allclose(compile_model(scaler).transform(X_test), scaler.transform(X_test),
+                               atol=PARITY_ATOL)
+
+
+def test_svc_without_probability_has_no_predict_proba(data):
+    """probability=False SVC 는 sklearn 처럼 predict_proba 속성이 없음 (앙상블 hasattr 분기)"""
+    X, y, _ = data
+    compiled = compile_model(SVC().fit(X, y))
+
+    assert isinstance(compiled, CompiledSVC)
+    assert not hasattr(compiled, 'predict_proba')
+    with pytest.raises(AttributeError):
+        compiled.predict_proba(X)
+
+
+def test_isolation_forest_is_not_compiled(data):
+    """IsolationForest 는 변환 대상이 아님 (export 는 joblib 모델을 그대로 사용)"""
+    X, _, _ = data
+    with pytest.raises(ValueError):
+        compile_model(IsolationForest(n_estimators=10, random_state=0).fit(X))
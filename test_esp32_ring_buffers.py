@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ESP32 오디오 링 버퍼 테스트
+디바이스 수 상한, 유휴 버퍼 해제, 처리 루프의 주기적 정리
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from services.audio_ring_buffer import DeviceAudioRingBuffer, RingBufferOverrun
+from services.esp32_optimizer import ESP32Optimizer
+
+SAMPLE_RATE = 16000
+
+
+def pcm(n_samples: int = 1000) -> bytes:
+    """분석 윈도우(1초)보다 짧은 PCM 업로드 (윈도우가 예약되지 않음)"""
+    return (np.sin(np.arange(n_samples) / 10.0) * 1000).astype('<i2').tobytes()
+
+
+@pytest.fixture
+def optimizer():
+    optimizer = ESP32Optimizer(max_workers=1, max_devices=2, idle_timeout=300.0)
+    yield optimizer
+    optimizer.stop_processing()
+
+
+def make_idle(optimizer: ESP32Optimizer, device_id: str, seconds: float = 1000.0):
+    optimizer.ring_buffers[device_id].last_write -= seconds
+
+
+def test_ring_buffer_overrun():
+    """여유 공간보다 큰 기록은 아무것도 쓰지 않고 거절"""
+    ring = DeviceAudioRingBuffer(1000, SAMPLE_RATE)
+    assert ring.write(pcm(600)) == 600
+    with pytest.raises(RingBufferOverrun):
+        ring.write(pcm(600))
+    assert ring.available() == 600
+    assert len(ring.read_window(600)) == 600
+
+
+def test_device_cap(optimizer):
+    """디바이스 수 상한을 넘는 새 디바이스는 server_overloaded"""
+    assert optimizer.add_audio_chunk('a', pcm(), SAMPLE_RATE).accepted
+    assert optimizer.add_audio_chunk('b', pcm(), SAMPLE_RATE).accepted
+
+    result = optimizer.add_audio_chunk('c', pcm(), SAMPLE_RATE)
+    assert not result.accepted
+    assert result.status == 'server_overloaded'
+    # 기존 디바이스는 계속 기록 가능
+    assert optimizer.add_audio_chunk('a', pcm(), SAMPLE_RATE).accepted
+
+
+def test_cap_evicts_idle_buffer(optimizer):
+    """상한에 도달해도 유휴 버퍼가 있으면 해제하고 새 디바이스를 받음"""
+    optimizer.add_audio_chunk('a', pcm(), SAMPLE_RATE)
+    optimizer.add_audio_chunk('b', pcm(), SAMPLE_RATE)
+    make_idle(optimizer, 'a')
+
+    assert optimizer.add_audio_chunk('c', pcm(), SAMPLE_RATE).accepted
+    assert set(optimizer.ring_buffers) == {'b', 'c'}
+    assert 'a' not in optimizer.dsp._states
+
+
+def test_cleanup_releases_unregistered_devices(optimizer):
+    """등록되지 않은 디바이스 ID 의 링 버퍼와 결과도 정리"""
+    optimizer.register_device('registered', '10.0.0.1')
+    optimizer.add_audio_chunk('registered', pcm(), SAMPLE_RATE)
+    optimizer.add_audio_chunk('unknown', pcm(), SAMPLE_RATE)
+    optimizer.results['unknown'] = [{'status': 'success'}]
+    make_idle(optimizer, 'unknown')
+
+    optimizer.cleanup_old_devices(timeout=300)
+
+    assert set(optimizer.ring_buffers) == {'registered'}
+    assert 'unknown' not in optimizer.results
+    assert 'registered' in optimizer.devices
+
+
+def test_processing_loop_runs_cleanup():
+    """처리 루프가 cleanup_interval 마다 유휴 버퍼를 해제"""
+    optimizer = ESP32Optimizer(max_workers=1, max_devices=1, idle_timeout=0.1, cleanup_interval=0.05)
+    try:
+        assert optimizer.add_audio_chunk('a', pcm(), SAMPLE_RATE).accepted
+        deadline = time.time() + 5
+        while optimizer.ring_buffers and time.time() < deadline:
+            time.sleep(0.05)
+        assert not optimizer.ring_buffers
+        assert optimizer.add_audio_chunk('b', pcm(), SAMPLE_RATE).accepted
+    finally:
+        optimizer.stop_processing()
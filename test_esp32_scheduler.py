@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+ESP32 스케줄러 / 샤딩 메트릭 테스트
+"""
+
+import threading
+
+from services.esp32_scheduler import FairWindowScheduler, ShardedMetrics
+
+
+def test_urgent_windows_first():
+    """긴급 우선순위 윈도우가 먼저 나오고 같은 우선순위는 디바이스 라운드 로빈"""
+    scheduler = FairWindowScheduler()
+    scheduler.put('a', 1, 3)
+    scheduler.put('b', 1, 1)
+    scheduler.put('c', 4, 1)
+
+    order = [scheduler.get(timeout=0.1)[:2] for _ in range(5)]
+    assert order[0] == ('c', 4)
+    assert [device for device, _ in order[1:3]] == ['a', 'b']
+    assert scheduler.get(timeout=0.01) is None
+
+
+def test_metrics_shards_stay_fixed_with_many_threads():
+    """스레드가 계속 생겨도 샤드 수는 고정이고 합계는 정확"""
+    metrics = ShardedMetrics(['processed_chunks', 'max_latency'], stripes=4)
+
+    def work(latency):
+        for _ in range(100):
+            metrics.incr('processed_chunks')
+        metrics.max('max_latency', latency)
+
+    threads = [threading.Thread(target=work, args=(i / 10,)) for i in range(200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(metrics._shards) == 4
+    snapshot = metrics.snapshot()
+    assert snapshot['processed_chunks'] == 200 * 100
+    assert snapshot['max_latency'] == 199 / 10
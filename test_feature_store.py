@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+특징 저장소 테스트
+지연 초기화, 교체된 샤드 삭제, compact() 재기록, 메모리 맵 LRU 상한
+"""
+
+import os
+
+import numpy as np
+
+from services.feature_store import FeatureSpec, FeatureStore
+
+SPEC = FeatureSpec('mfcc', '1', {'n_mfcc': 4})
+
+
+def make_files(tmp_path, count):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f'clip_{index}.wav'
+        path.write_bytes(os.urandom(64))
+        paths.append(str(path))
+    return paths
+
+
+def shard_files(store):
+    return sorted(name for name in os.listdir(store.shard_dir) if name.endswith('.npy'))
+
+
+def test_store_created_on_first_use(tmp_path):
+    store_dir = tmp_path / 'store'
+    store = FeatureStore(str(store_dir))
+    assert not store_dir.exists()
+
+    path = make_files(tmp_path, 1)[0]
+    store.put_many({path: np.ones((3, 4))}, SPEC)
+    assert (store_dir / 'index.db').exists()
+    found, missing = store.lookup([path], SPEC)
+    assert missing == []
+    assert np.array_equal(found[path], np.ones((3, 4)))
+
+
+def test_fully_replaced_shard_is_deleted(tmp_path):
+    store = FeatureStore(str(tmp_path / 'store'))
+    paths = make_files(tmp_path, 2)
+    store.put_many({path: np.zeros((2, 4)) for path in paths}, SPEC)
+    first = shard_files(store)
+    assert len(first) == 1
+
+    store.put_many({path: np.ones((2, 4)) for path in paths}, SPEC)
+    second = shard_files(store)
+    assert len(second) == 1 and second != first
+    found, _ = store.lookup(paths, SPEC)
+    assert all(np.array_equal(matrix, np.ones((2, 4))) for matrix in found.values())
+
+
+def test_compact_rewrites_mostly_dead_shard(tmp_path):
+    store = FeatureStore(str(tmp_path / 'store'))
+    paths = make_files(tmp_path, 4)
+    store.put_many({path: np.full((2, 4), index, dtype=float) for index, path in enumerate(paths)}, SPEC)
+    # 4개 중 3개를 교체 → 첫 샤드는 1/4 만 참조
+    store.put_many({path: np.full((2, 4), 10.0 + index) for index, path in enumerate(paths[1:])}, SPEC)
+    assert len(shard_files(store)) == 2
+
+    result = store.compact()
+    assert result['compacted_shards'] == 1
+    assert result['reclaimed_rows'] == 6
+    found, missing = store.lookup(paths, SPEC)
+    assert missing == []
+    assert np.array_equal(found[paths[0]], np.zeros((2, 4)))
+    assert np.array_equal(found[paths[3]], np.full((2, 4), 12.0))
+    assert len(shard_files(store)) == 2
+
+
+def test_compact_removes_orphan_files_and_stale_hashes(tmp_path, monkeypatch):
+    store = FeatureStore(str(tmp_path / 'store'))
+    paths = make_files(tmp_path, 2)
+    store.put_many({paths[0]: np.ones((1, 4))}, SPEC)
+    store.file_hash(paths[1])
+    os.remove(paths[1])
+    orphan = os.path.join(store.shard_dir, 'orphan.npy')
+    np.save(orphan, np.zeros((1, 4)))
+
+    monkeypatch.setattr('services.feature_store.ORPHAN_GRACE_SECONDS', -1)
+    result = store.compact()
+    assert result['deleted_shards'] == 1
+    assert result['stale_hashes'] == 1
+    assert not os.path.exists(orphan)
+    assert store.lookup([paths[0]], SPEC)[1] == []
+
+
+def test_open_shards_are_capped(tmp_path):
+    store = FeatureStore(str(tmp_path / 'store'), max_open_shards=2)
+    paths = make_files(tmp_path, 5)
+    for path in paths:
+        store.put_many({path: np.ones((1, 4))}, SPEC)
+    found, missing = store.lookup(paths, SPEC)
+    assert missing == [] and len(found) == 5
+    assert store.get_status()['open_shards'] == 2
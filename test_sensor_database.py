@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+센서 데이터베이스 서비스 테스트
+프로세스별 쓰기 스레드 생성, 잘못된 행이 섞인 배치 기록, 롤업 버킷, 디바이스별 최신값, 시간별 통계
+"""
+
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from services.sensor_database_service import SensorDatabaseService
+from services.sensor_rollups import ROLLUP_LEVELS, rollup_table
+
+
+def reading_row(device_id='ESP32_TEST_001', timestamp=None, temperature=-18.5, quality=0.95):
+    return (device_id, timestamp or time.time(), temperature, 0.2, 0.1, 0.3, 45.2, 150, quality)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = SensorDatabaseService(db_path=str(tmp_path / 'sensor.db'), batch_size=1000, batch_timeout=0.05)
+    yield service
+    service.shutdown()
+
+
+def raw(service, sql, params=()):
+    conn = sqlite3.connect(service.db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_writer_starts_lazily_per_process(service, monkeypatch):
+    assert service.batch_thread is None and service.conn is None
+
+    service.add_sensor_readings([reading_row()])
+    assert service.flush()
+    first_thread = service.batch_thread
+    assert first_thread.is_alive()
+
+    # fork 된 워커 흉내: pid 가 바뀌면 새 연결과 배치 스레드로 기록
+    child_pid = service._pid + 1
+    monkeypatch.setattr('services.sensor_database_service.os.getpid', lambda: child_pid)
+    service.add_sensor_readings([reading_row()])
+    assert service.flush()
+    assert service.batch_thread is not first_thread
+    assert raw(service, 'SELECT COUNT(*) FROM sensor_readings')[0][0] == 2
+
+
+def test_bad_row_is_dropped_without_losing_batch(service):
+    service.add_sensor_readings([reading_row('A'), reading_row(None), reading_row('B')])
+    assert service.flush()
+
+    devices = [row[0] for row in raw(service, 'SELECT device_id FROM sensor_readings ORDER BY id')]
+    assert devices == ['A', 'B']
+    status = service.get_database_status()
+    assert status['rows_rejected'] == 1
+    assert sorted(row[0] for row in raw(service, 'SELECT device_id FROM device_latest')) == ['A', 'B']
+
+
+@pytest.mark.parametrize('level', list(ROLLUP_LEVELS))
+def test_rollups_match_raw_group_by(service, level):
+    base = 1_700_000_000.0
+    rows = [reading_row(device_id, base + offset, temperature=20.0 + offset % 7, quality=0.5 + (offset % 2) * 0.4)
+            for device_id in ('A', 'B') for offset in range(0, 7200, 37)]
+    # 두 배치로 나눠 기록하고, 늦게 도착한 과거 측정값도 섞음
+    service.add_sensor_readings(rows[::2])
+    assert service.flush()
+    service.add_sensor_readings(rows[1::2] + [reading_row('A', base - 30, temperature=5.0)])
+    assert service.flush()
+
+    width = ROLLUP_LEVELS[level]
+    expected = raw(service, f'''
+        SELECT device_id, CAST(timestamp / {width} AS INTEGER) * {width} AS bucket, COUNT(*),
+               COUNT(CASE WHEN sensor_quality > 0.8 THEN 1 END),
+               SUM(temperature), MIN(temperature), MAX(temperature)
+        FROM sensor_readings GROUP BY device_id, bucket ORDER BY device_id, bucket
+    ''')
+    actual = raw(service, f'''
+        SELECT device_id, bucket, readings, good_readings, temperature_sum, temperature_min, temperature_max
+        FROM {rollup_table(level)} ORDER BY device_id, bucket
+    ''')
+    assert [row[:4] for row in actual] == [row[:4] for row in expected]
+    for got, want in zip(actual, expected):
+        assert got[4:] == pytest.approx(want[4:])
+
+
+def test_device_latest_ignores_late_readings(service):
+    now = time.time()
+    service.add_sensor_readings([reading_row('A', now - 10, temperature=1.0), reading_row('A', now, temperature=2.0)])
+    assert service.flush()
+    # 늦게 도착한 과거 측정값 (다른 배치)
+    service.add_sensor_readings([reading_row('A', now - 60, temperature=3.0)])
+    assert service.flush()
+    assert raw(service, 'SELECT timestamp, temperature FROM device_latest WHERE device_id = ?', ('A',)) == [(now, 2.0)]
+
+    service.add_sensor_readings([reading_row('A', now + 5, temperature=4.0)])
+    assert service.flush()
+    assert raw(service, 'SELECT temperature FROM device_latest WHERE device_id = ?', ('A',)) == [(4.0,)]
+
+
+def test_device_latest_backfilled_from_existing_readings(tmp_path):
+    db_path = str(tmp_path / 'sensor.db')
+    writer = SensorDatabaseService(db_path=db_path, batch_timeout=0.05)
+    writer.add_sensor_readings([reading_row('A', 100.0, temperature=1.0), reading_row('A', 200.0, temperature=2.0)])
+    assert writer.flush()
+    writer.shutdown()
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('DELETE FROM device_latest')
+    conn.close()
+
+    reopened = SensorDatabaseService(db_path=db_path)
+    try:
+        reopened.start()
+        assert raw(reopened, 'SELECT timestamp, temperature FROM device_latest') == [(200.0, 2.0)]
+    finally:
+        reopened.shutdown()
+
+
+def test_hourly_statistics_with_half_hour_utc_offset(service, monkeypatch):
+    monkeypatch.setenv('TZ', 'Asia/Kolkata')
+    time.tzset()
+    try:
+        hour_start = datetime(2024, 3, 1, 10, 0).timestamp()
+        service.add_sensor_readings([reading_row('A', hour_start + 60, temperature=-20.0),
+                                     reading_row('A', hour_start + 120, temperature=-18.0)])
+        assert service.flush()
+
+        service.generate_hourly_statistics('A', '2024-03-01')
+        rows = raw(service, 'SELECT hour, max_temperature FROM sensor_statistics WHERE device_id = ? '
+                            'AND max_temperature != 0', ('A',))
+        assert rows == [(10, -18.0)]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
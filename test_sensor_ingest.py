@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+센서 일괄 수집 파서 테스트
+NDJSON / 패킹 바이너리 디코딩, 잘못된 줄 처리, 요청당 측정값 수 제한
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from services.sensor_ingest import (
+    MAX_BATCH_READINGS, SensorBatchError, pack_readings, parse_ndjson, parse_packed, validate_batch
+)
+
+
+def make_reading(device_id: str = 'ESP32_TEST_001', offset: float = 0.0) -> dict:
+    return {
+        'device_id': device_id,
+        'timestamp': time.time() - 60 + offset,
+        'temperature': -18.5,
+        'vibration': {'x': 0.2, 'y': 0.1, 'z': 0.3},
+        'power_consumption': 45.2,
+        'audio_level': 150,
+        'sensor_quality': 0.95
+    }
+
+
+def ndjson(records) -> bytes:
+    return '\n'.join(json.dumps(record) for record in records).encode('utf-8')
+
+
+def test_ndjson_roundtrip():
+    """NDJSON 측정값이 열 배열로 디코딩됨"""
+    readings = [make_reading('A', i) for i in range(3)] + [make_reading('B')]
+    batch = parse_ndjson(ndjson(readings))
+
+    assert len(batch) == 4
+    assert batch.device_ids == ['A', 'B']
+    assert batch.device_index.tolist() == [0, 0, 0, 1]
+    assert batch.payload(1)['vibration'] == {'x': 0.2, 'y': 0.1, 'z': 0.3}
+    valid, errors = validate_batch(batch)
+    assert valid.all() and errors == []
+
+
+def test_ndjson_malformed_line_keeps_line_index():
+    """해석할 수 없는 줄은 같은 줄 번호의 무효 측정값이 됨"""
+    body = b'\n'.join([
+        json.dumps(make_reading()).encode(),
+        b'{not json',
+        json.dumps(make_reading()).encode(),
+        b'[1, 2]',
+    ])
+    batch = parse_ndjson(body)
+
+    assert len(batch) == 4
+    valid, errors = validate_batch(batch)
+    assert valid.tolist() == [True, False, True, False]
+    assert [error['index'] for error in errors] == [1, 3]
+    assert errors[0]['reason'] == 'device_id 누락'
+
+
+def test_ndjson_multiple_values_on_one_line():
+    """한 줄에 값 여러 개를 넣어도 측정값 수가 늘지 않고 그 줄만 무효"""
+    reading = json.dumps(make_reading())
+    body = '\n'.join([reading, ','.join([reading] * 3), reading]).encode()
+    batch = parse_ndjson(body)
+
+    assert len(batch) == 3
+    valid, errors = validate_batch(batch)
+    assert valid.tolist() == [True, False, True]
+    assert errors[0]['index'] == 1
+
+
+def test_ndjson_cap_on_lines():
+    """줄 수가 최대 측정값 수를 넘으면 요청 전체 거절"""
+    body = ndjson([make_reading()] * (MAX_BATCH_READINGS + 1))
+    with pytest.raises(SensorBatchError):
+        parse_ndjson(body)
+
+
+def test_ndjson_cap_not_bypassed_by_packing_lines():
+    """한 줄에 여러 값을 넣는 방식으로 최대 측정값 수를 우회할 수 없음"""
+    reading = json.dumps(make_reading())
+    body = ','.join([reading] * (MAX_BATCH_READINGS + 1)).encode()
+    batch = parse_ndjson(body)
+
+    assert len(batch) == 1
+    valid, _ = validate_batch(batch)
+    assert not valid.any()
+
+
+def test_packed_roundtrip():
+    """패킹 바이너리 프레임이 NDJSON 과 같은 열 배열로 디코딩됨"""
+    readings = [make_reading('A', i) for i in range(5)] + [make_reading('B')]
+    batch = parse_packed(pack_readings(readings))
+
+    assert len(batch) == 6
+    assert batch.device_ids == ['A', 'B']
+    np.testing.assert_allclose(batch.columns['timestamp'], [r['timestamp'] for r in readings])
+    np.testing.assert_allclose(batch.columns['temperature'], -18.5, rtol=1e-6)
+    assert batch.columns['audio_level'].tolist() == [150.0] * 6
+    valid, _ = validate_batch(batch)
+    assert valid.all()
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda body: b'XXXX' + body[4:],        # magic 불일치
+    lambda body: body[:5],                   # 헤더 잘림
+    lambda body: body[:-3],                  # 레코드 길이 불일치
+])
+def test_packed_malformed(mutate):
+    """잘못된 바이너리 프레임은 SensorBatchError"""
+    body = pack_readings([make_reading(), make_reading()])
+    with pytest.raises(SensorBatchError):
+        parse_packed(mutate(body))
+
+
+def test_packed_cap():
+    """헤더의 레코드 수가 최대 측정값 수를 넘으면 거절"""
+    body = pack_readings([make_reading()])
+    header_end = len(body) - 32
+    oversized = body[:header_end - 4] + (MAX_BATCH_READINGS + 1).to_bytes(4, 'little') + body[header_end:]
+    with pytest.raises(SensorBatchError):
+        parse_packed(oversized)
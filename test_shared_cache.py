@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+공유 캐시 테스트 (LocalCacheStore)
+TTL 만료, LRU 제거, 단일 계산, 다른 워커가 계산 중일 때 이전 값 사용
+"""
+
+import threading
+import time
+
+from services.shared_cache import LocalCacheStore, SharedCache
+
+
+def make_cache(**kwargs):
+    return SharedCache(store=LocalCacheStore(max_entries=kwargs.pop('max_entries', 16)), **kwargs)
+
+
+def test_value_cached_until_ttl():
+    cache = make_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'count': len(calls)}
+
+    assert cache.get_or_compute('k', compute, ttl=0.2) == {'count': 1}
+    assert cache.get_or_compute('k', compute, ttl=0.2) == {'count': 1}
+    time.sleep(0.25)
+    assert cache.get_or_compute('k', compute, ttl=0.2) == {'count': 2}
+    metrics = cache.get_metrics()
+    assert metrics['hits'] == 1 and metrics['computes'] == 2
+
+
+def test_least_recently_used_key_evicted():
+    cache = make_cache(max_entries=2)
+    cache.get_or_compute('a', lambda: 1, ttl=60)
+    cache.get_or_compute('b', lambda: 2, ttl=60)
+    cache.get_or_compute('a', lambda: 1, ttl=60)
+    cache.get_or_compute('c', lambda: 3, ttl=60)
+
+    assert cache.store.get('b') is None
+    assert cache.store.get('a') is not None and cache.store.get('c') is not None
+    assert cache.get_metrics()['evictions'] == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = make_cache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute, ttl=60)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_stale_value_served_while_other_worker_computes():
+    store = LocalCacheStore()
+    worker_a = SharedCache(store=store, stale_ttl=60)
+    worker_b = SharedCache(store=store, stale_ttl=60, wait_timeout=0.1)
+    worker_a.get_or_compute('k', lambda: 'old', ttl=0.05)
+    time.sleep(0.1)
+
+    # 워커 A 가 계산 잠금을 잡은 상태에서 워커 B 는 이전 값을 사용
+    assert store.try_lock('k', worker_a._owner(), 30)
+    assert worker_b.get_or_compute('k', lambda: 'new', ttl=60) == 'old'
+    assert worker_b.get_metrics()['stale_hits'] == 1
+    store.unlock('k', worker_a._owner())
+    assert worker_b.get_or_compute('k', lambda: 'new', ttl=60) == 'new'
+
+
+def test_request_scope_reads_store_once():
+    cache = make_cache()
+    cache.get_or_compute('k', lambda: 1, ttl=60)
+    with cache.request_scope():
+        cache.get_or_compute('k', lambda: 2, ttl=60)
+        cache.get_or_compute('k', lambda: 2, ttl=60)
+    assert cache.get_metrics()['request_hits'] == 1
+
+
+def test_default_store_created_on_first_use(tmp_path, monkeypatch):
+    db_path = tmp_path / 'shared_cache.db'
+    monkeypatch.setenv('SHARED_CACHE_PATH', str(db_path))
+    cache = SharedCache()
+    assert not db_path.exists()
+
+    assert cache.get_or_compute('k', lambda: 1, ttl=60) == 1
+    assert db_path.exists()